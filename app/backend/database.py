@@ -1,9 +1,20 @@
+import importlib.util
+import logging
 import os
+import threading
+import time
+from collections import deque
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, Optional, TypeVar
 
 from sqlmodel import SQLModel, create_engine, Session
-from sqlalchemy import text
+from sqlalchemy import event, exc as sa_exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+T = TypeVar("T")
+
+logger = logging.getLogger("app.database")
 
 def _dsn_from_pg_env() -> str | None:
     host = os.getenv("PGHOST")
@@ -21,25 +32,227 @@ DATABASE_URL = os.getenv("DATABASE_URL") or _dsn_from_pg_env() or "sqlite:///./d
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(DATABASE_URL, echo=False, connect_args=connect_args)
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+# Connection pool. After a restart every worker opens its connections at once: the pool is bounded
+# (DB_POOL_SIZE + DB_MAX_OVERFLOW per process, a checkout waits at most DB_POOL_TIMEOUT s), checks
+# connections before use and recycles them after DB_POOL_RECYCLE s. SQLite runs in WAL mode with a
+# busy timeout so concurrent readers and the writer wait instead of failing on "database is locked".
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)
+DB_POOL_PRE_PING = (os.getenv("DB_POOL_PRE_PING") or "1") != "0"
+SQLITE_WAL = (os.getenv("DB_SQLITE_WAL") or "1") != "0"
+SQLITE_BUSY_TIMEOUT_MS = _env_int("DB_SQLITE_BUSY_TIMEOUT_MS", 5000)
+
+
+class PoolMetrics:
+    """Checkout counters and latencies of the engine's pool (this process), for /metrics."""
+
+    def __init__(self, window: int = 1024) -> None:
+        self._lock = threading.Lock()
+        self._recent: deque = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total_s = 0.0
+        self.wait_max_s = 0.0
+        self.connects = 0
+        self.invalidated = 0
+
+    def record_checkout(self, dt: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total_s += dt
+            self.wait_max_s = max(self.wait_max_s, dt)
+            self._recent.append(dt)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidate(self) -> None:
+        with self._lock:
+            self.invalidated += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._recent)
+            out: Dict[str, Any] = {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_wait_total_ms": round(self.wait_total_s * 1000, 3),
+                "checkout_wait_max_ms": round(self.wait_max_s * 1000, 3),
+                "connects": self.connects,
+                "invalidated": self.invalidated,
+            }
+        for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+            out[f"checkout_wait_{name}_ms"] = round(recent[min(int(q * len(recent)), len(recent) - 1)] * 1000, 3) if recent else 0.0
+        return out
+
+
+pool_metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool measuring how long each checkout waits (kept by recreate()/dispose())."""
+
+    def connect(self):
+        t0 = time.perf_counter()
+        try:
+            conn = super().connect()
+        except sa_exc.TimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        pool_metrics.record_checkout(time.perf_counter() - t0)
+        return conn
+
+
+def _engine_kwargs(url: str) -> Dict[str, Any]:
+    if url.startswith("sqlite"):
+        kwargs: Dict[str, Any] = {"connect_args": {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}}
+        if (make_url(url).database or ":memory:") == ":memory:":
+            return kwargs  # in-memory: SQLAlchemy's single-connection pool
+    else:
+        kwargs = {"connect_args": {}, "pool_recycle": DB_POOL_RECYCLE}
+    kwargs.update(
+        poolclass=TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    return kwargs
+
+
+_engine_options = _engine_kwargs(DATABASE_URL)
+connect_args = _engine_options["connect_args"]
+engine = create_engine(DATABASE_URL, echo=False, **_engine_options)
+
+
+def _sqlite_pragmas(dbapi_conn) -> None:
+    if engine.url.get_backend_name() != "sqlite":
+        return
+    cur = dbapi_conn.cursor()
+    try:
+        cur.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT_MS)}")
+        if SQLITE_WAL and (engine.url.database or ":memory:") != ":memory:":
+            cur.execute("PRAGMA journal_mode=WAL")
+    finally:
+        cur.close()
+
+
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_conn, _record) -> None:
+    pool_metrics.record_connect()
+    _sqlite_pragmas(dbapi_conn)
+
+
+@event.listens_for(engine, "invalidate")
+def _on_invalidate(_dbapi_conn, _record, _exc) -> None:
+    pool_metrics.record_invalidate()
+
+
+# Optional async engine for the hot read endpoints (asyncpg for PostgreSQL, aiosqlite for SQLite,
+# both pinned in requirements.txt). Only created when the driver is installed and DB_ASYNC is not
+# "0"; otherwise those endpoints run the same query code on a sync Session in the threadpool (see
+# run_read), a warning is logged at import and /metrics reports db_pool_async_enabled 0.
+DB_ASYNC = (os.getenv("DB_ASYNC") or "1") != "0"
+_ASYNC_DRIVERS = {"sqlite": ("sqlite+aiosqlite", "aiosqlite"), "postgresql": ("postgresql+asyncpg", "asyncpg")}
+
+
+def _create_async_engine():
+    if not DB_ASYNC:
+        return None
+    backend = engine.url.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        return None
+    drivername, module = _ASYNC_DRIVERS[backend]
+    if importlib.util.find_spec(module) is None:
+        logger.warning("Async engine disabled: %s is not installed, async reads use the threadpool", module)
+        return None
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    kwargs = {k: v for k, v in _engine_options.items() if k not in ("poolclass", "connect_args")}
+    if "pool_size" in kwargs:
+        kwargs["poolclass"] = AsyncAdaptedQueuePool
+    if backend == "sqlite":
+        kwargs["connect_args"] = {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    aengine = create_async_engine(engine.url.set(drivername=drivername), echo=False, **kwargs)
+    event.listen(aengine.sync_engine, "connect", lambda dbapi_conn, _record: _sqlite_pragmas(dbapi_conn))
+    return aengine
+
+
+try:
+    async_engine = _create_async_engine()
+except Exception:
+    logger.warning("Async engine disabled, async reads use the threadpool", exc_info=True)
+    async_engine = None
+
+
+async def get_async_session() -> AsyncGenerator[Optional[Any], None]:
+    """AsyncSession on async_engine, or None when the async path is not available."""
+    if async_engine is None:
+        yield None
+        return
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    async with AsyncSession(async_engine) as session:
+        yield session
+
+
+def _run_with_session(fn: Callable[[Session], T]) -> T:
+    with Session(engine) as session:
+        return fn(session)
+
+
+async def run_read(session: Optional[Any], fn: Callable[[Session], T]) -> T:
+    """Run fn(sync Session) for an async handler: on the AsyncSession's connection when there is
+    one (non-blocking I/O), else on a sync Session in the threadpool."""
+    if session is not None:
+        return await session.run_sync(fn)
+    from starlette.concurrency import run_in_threadpool
+
+    return await run_in_threadpool(_run_with_session, fn)
+
+
+def pool_status() -> Dict[str, Any]:
+    """Current state of the connection pool of this process."""
+    pool = engine.pool
+    out: Dict[str, Any] = {"pool": type(pool).__name__, "pid": os.getpid()}
+    if isinstance(pool, QueuePool):
+        out.update(
+            size=pool.size(),
+            max_overflow=DB_MAX_OVERFLOW,
+            timeout_s=DB_POOL_TIMEOUT,
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            # connections currently open (idle + in use)
+            opened=pool.size() + pool.overflow(),
+        )
+    out.update(pool_metrics.snapshot())
+    apool = async_engine.pool if async_engine is not None else None
+    out["async_enabled"] = 1 if apool is not None else 0
+    if isinstance(apool, QueuePool):
+        out.update(async_checked_out=apool.checkedout(), async_overflow=max(apool.overflow(), 0))
+    return out
 
 
 def init_db() -> None:
-    SQLModel.metadata.create_all(engine)
-    ensure_final_version_column()
-    ensure_allergens_column()
-    ensure_notes_name_column()
-    ensure_reservation_item_comment_column()
-    ensure_reservation_last_pdf_column()
-    ensure_on_invoice_column()
-    ensure_drink_unique_index()
-    ensure_floorplan_columns()
-    ensure_floorplan_reservations_column()
-    ensure_menu_formula_column()
-    ensure_reminder_table()
-    ensure_billing_po_reference_column()
-    ensure_supplements_migrated()
+    """Create the tables and apply the pending schema migrations (see migrations.py)."""
+    from .migrations import run_migrations
+    run_migrations()
 
 
 def run_startup_migrations() -> None:
@@ -111,7 +324,7 @@ def run_startup_migrations() -> None:
             """
         ))
 
-def ensure_final_version_column() -> None:
+def ensure_final_version_column(strict: bool = False) -> None:
     """Idempotent column addition for reservation.final_version across backends."""
     try:
         backend = engine.url.get_backend_name()
@@ -144,11 +357,12 @@ def ensure_final_version_column() -> None:
                 except Exception:
                     pass
     except Exception:
-        # Non-fatal
-        pass
+        # Non-fatal unless strict (migration registry)
+        if strict:
+            raise
 
 
-def ensure_floorplan_reservations_column() -> None:
+def ensure_floorplan_reservations_column(strict: bool = False) -> None:
     """Ensure 'reservations' JSONB column exists on floorplaninstance table (idempotent)."""
     try:
         backend = engine.url.get_backend_name()
@@ -159,7 +373,7 @@ def ensure_floorplan_reservations_column() -> None:
                     cols = [row[1] for row in res.fetchall()]
                     if 'reservations' not in cols:
                         # SQLite: use TEXT to store JSON payloads
-                        conn.exec_driver_sql("ALTER TABLE floorplaninstance ADD COLUMN reservations TEXT DEFAULT '{}'::text;")
+                        conn.exec_driver_sql("ALTER TABLE floorplaninstance ADD COLUMN reservations TEXT DEFAULT '{}';")
                 except Exception:
                     pass
             elif backend == 'postgresql':
@@ -183,11 +397,12 @@ def ensure_floorplan_reservations_column() -> None:
                 except Exception:
                     pass
     except Exception:
-        # Non-fatal; will be surfaced by API if still missing
-        pass
+        # Non-fatal unless strict (migration registry); will be surfaced by API if still missing
+        if strict:
+            raise
 
 
-def ensure_floorplan_columns() -> None:
+def ensure_floorplan_columns(strict: bool = False) -> None:
     """Ensure JSON/JSONB columns exist for floorplan tables (idempotent)."""
     try:
         backend = engine.url.get_backend_name()
@@ -333,11 +548,12 @@ def ensure_floorplan_columns() -> None:
                 except Exception:
                     pass
     except Exception:
-        # Non-fatal; will be surfaced by API if still missing
-        pass
+        # Non-fatal unless strict (migration registry); will be surfaced by API if still missing
+        if strict:
+            raise
 
 
-def ensure_on_invoice_column() -> None:
+def ensure_on_invoice_column(strict: bool = False) -> None:
     """Ensure 'on_invoice' column exists on reservation table (idempotent)."""
     try:
         backend = engine.url.get_backend_name()
@@ -370,11 +586,12 @@ def ensure_on_invoice_column() -> None:
                 except Exception:
                     pass
     except Exception:
-        # Non-fatal
-        pass
+        # Non-fatal unless strict (migration registry)
+        if strict:
+            raise
 
 
-def ensure_reservation_last_pdf_column() -> None:
+def ensure_reservation_last_pdf_column(strict: bool = False) -> None:
     """Ensure 'last_pdf_exported_at' column exists on reservation table (idempotent)."""
     try:
         backend = engine.url.get_backend_name()
@@ -407,11 +624,12 @@ def ensure_reservation_last_pdf_column() -> None:
                 except Exception:
                     pass
     except Exception:
-        # Non-fatal; table may not exist yet in some flows
-        pass
+        # Non-fatal unless strict (migration registry); table may not exist yet in some flows
+        if strict:
+            raise
 
 
-def ensure_notes_name_column() -> None:
+def ensure_notes_name_column(strict: bool = False) -> None:
     """Ensure Note table has a non-null name column; backfill from content if empty.
     Idempotent across sqlite/postgresql.
     """
@@ -468,11 +686,12 @@ def ensure_notes_name_column() -> None:
                 except Exception:
                     pass
     except Exception:
-        # Non-fatal
-        pass
+        # Non-fatal unless strict (migration registry)
+        if strict:
+            raise
 
 
-def ensure_reservation_item_comment_column() -> None:
+def ensure_reservation_item_comment_column(strict: bool = False) -> None:
     """Ensure 'comment' column exists on reservationitem table (idempotent)."""
     try:
         backend = engine.url.get_backend_name()
@@ -506,11 +725,12 @@ def ensure_reservation_item_comment_column() -> None:
                 except Exception:
                     pass
     except Exception:
-        # Non-fatal
-        pass
+        # Non-fatal unless strict (migration registry)
+        if strict:
+            raise
 
 
-def ensure_drink_unique_index() -> None:
+def ensure_drink_unique_index(strict: bool = False) -> None:
     """Ensure uniqueness on drink.name (idempotent), across backends.
     - SQLite: create unique index if not exists
     - PostgreSQL: add UNIQUE constraint if missing and create index if not exists
@@ -555,11 +775,12 @@ def ensure_drink_unique_index() -> None:
                 except Exception:
                     pass
     except Exception:
-        # Non-fatal
-        pass
+        # Non-fatal unless strict (migration registry)
+        if strict:
+            raise
 
 
-def backfill_allergen_icons() -> None:
+def backfill_allergen_icons(strict: bool = False) -> None:
     """On startup, load any existing PNG icons from assets/allergens into DB rows.
     Idempotent: only sets icon_bytes if missing. Creates row if absent.
     """
@@ -618,10 +839,11 @@ def backfill_allergen_icons() -> None:
                 session.add(row)
             session.commit()
     except Exception:
-        # best-effort; non-fatal
-        pass
+        # best-effort; non-fatal unless strict (migration registry)
+        if strict:
+            raise
 
-def ensure_allergens_column() -> None:
+def ensure_allergens_column(strict: bool = False) -> None:
     try:
         backend = engine.url.get_backend_name()
         with engine.begin() as conn:
@@ -650,10 +872,11 @@ def ensure_allergens_column() -> None:
                 except Exception:
                     pass
     except Exception:
-        # Non-fatal; table may not exist yet in some flows
-        pass
+        # Non-fatal unless strict (migration registry); table may not exist yet in some flows
+        if strict:
+            raise
 
-def ensure_reminder_table() -> None:
+def ensure_reminder_table(strict: bool = False) -> None:
     """Ensure reservationreminder table exists. Idempotent (uses CREATE TABLE IF NOT EXISTS)."""
     try:
         backend = engine.url.get_backend_name()
@@ -683,10 +906,11 @@ def ensure_reminder_table() -> None:
                     CREATE INDEX IF NOT EXISTS ix_remider_res_id ON reservationreminder(reservation_id);
                 """))
     except Exception:
-        pass
+        if strict:
+            raise
 
 
-def ensure_menu_formula_column() -> None:
+def ensure_menu_formula_column(strict: bool = False) -> None:
     """Ensure reservation table has menu_formula column. Idempotent."""
     try:
         backend = engine.url.get_backend_name()
@@ -716,10 +940,11 @@ def ensure_menu_formula_column() -> None:
                 except Exception:
                     pass
     except Exception:
-        pass
+        if strict:
+            raise
 
 
-def ensure_billing_po_reference_column() -> None:
+def ensure_billing_po_reference_column(strict: bool = False) -> None:
     """Ensure billinginfo has po_reference column; rename from peppol_reference if present."""
     try:
         backend = engine.url.get_backend_name()
@@ -779,13 +1004,15 @@ def ensure_billing_po_reference_column() -> None:
                     except Exception:
                         pass
     except Exception:
-        pass
+        if strict:
+            raise
 
 
-def ensure_supplements_migrated() -> None:
+def ensure_supplements_migrated(strict: bool = False) -> None:
     """One-time idempotent migration: copy InvoiceSupplement records to
     ReservationItem(type='supplément') then remove them, so supplements
     appear on the fiche and all PDFs."""
+    from sqlmodel import select
     from .models import InvoiceSupplement, ReservationItem  # local import avoids circular
     try:
         with Session(engine) as session:
@@ -811,7 +1038,31 @@ def ensure_supplements_migrated() -> None:
                 session.delete(sup)
             session.commit()
     except Exception:
-        pass
+        if strict:
+            raise
+
+
+def ensure_floorplan_version_column(strict: bool = False) -> None:
+    """Ensure floorplanbase/floorplaninstance have the integer version column (optimistic concurrency)."""
+    try:
+        backend = engine.url.get_backend_name()
+        with engine.begin() as conn:
+            for table in ("floorplanbase", "floorplaninstance"):
+                if backend == 'sqlite':
+                    res = conn.exec_driver_sql(f"PRAGMA table_info({table});")
+                    cols = [row[1] for row in res.fetchall()]
+                    if cols and 'version' not in cols:
+                        conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1;")
+                elif backend == 'postgresql':
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;"))
+                else:
+                    try:
+                        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+                    except Exception:
+                        pass
+    except Exception:
+        if strict:
+            raise
 
 
 @contextmanager
@@ -0,0 +1,520 @@
+from __future__ import annotations
+import math
+import os
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+try:
+    import numpy as np
+except Exception:
+    np = None  # type: ignore
+
+# Occupancy raster used to pre-classify scan candidates (needs numpy; FLOORPLAN_RASTER=0 disables it)
+RASTER_ENABLED = np is not None and (os.getenv("FLOORPLAN_RASTER") or "1").strip().lower() not in ("0", "false", "no", "off")
+# Below this many candidates the plain index scan is cheaper than a vectorized pass
+RASTER_MIN_CANDIDATES = 64
+
+
+# ---- Compiled shapes ----
+
+class RectShape:
+    """Axis-aligned rectangle compiled from a plan item (floats, bounding box precomputed)."""
+    __slots__ = ("x", "y", "w", "h", "x1", "y1", "src")
+
+    def __init__(self, x: float, y: float, w: float, h: float, src: Optional[Dict[str, Any]] = None) -> None:
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+        self.x1 = x + w
+        self.y1 = y + h
+        self.src = src
+
+    def bbox(self) -> Tuple[float, float, float, float]:
+        return self.x, self.y, self.x1, self.y1
+
+
+class CircleShape:
+    """Circle compiled from a plan item (centre x/y, radius r)."""
+    __slots__ = ("x", "y", "r", "src")
+
+    def __init__(self, x: float, y: float, r: float, src: Optional[Dict[str, Any]] = None) -> None:
+        self.x = x
+        self.y = y
+        self.r = r
+        self.src = src
+
+    def bbox(self) -> Tuple[float, float, float, float]:
+        r = self.r
+        return self.x - r, self.y - r, self.x + r, self.y + r
+
+
+Shape = Union[RectShape, CircleShape]
+
+
+def _is_circle(obj: Dict[str, Any]) -> bool:
+    return "r" in obj and bool(obj.get("r"))
+
+
+def compile_rect(obj: Dict[str, Any], default_w: float = 0, default_h: float = 0, src: Optional[Dict[str, Any]] = None) -> RectShape:
+    return RectShape(float(obj.get("x") or 0), float(obj.get("y") or 0), float(obj.get("w") or default_w), float(obj.get("h") or default_h), src)
+
+
+def compile_circle(obj: Dict[str, Any], src: Optional[Dict[str, Any]] = None) -> CircleShape:
+    return CircleShape(float(obj.get("x") or 0), float(obj.get("y") or 0), float(obj.get("r") or 0), src)
+
+
+def compile_table(t: Dict[str, Any]) -> Shape:
+    """Tables without a radius default to 120x60, like the rest of the floorplan code."""
+    if _is_circle(t or {}):
+        return compile_circle(t, t)
+    return compile_rect(t, 120, 60, t)
+
+
+def compile_obstacles(plan: Dict[str, Any]) -> List[Shape]:
+    """Static obstacles of a plan: no_go zones, walls, fixtures (rect or circle) and columns."""
+    out: List[Shape] = []
+    for ng in (plan.get("no_go") or []):
+        out.append(compile_rect(ng))
+    for w in (plan.get("walls") or []):
+        out.append(compile_rect(w))
+    for fx in (plan.get("fixtures") or []):
+        out.append(compile_circle(fx) if _is_circle(fx) else compile_rect(fx))
+    for col in (plan.get("columns") or []):
+        out.append(compile_circle(col))
+    return out
+
+
+# ---- Intersection tests on raw floats ----
+# Rect/rect is strict (touching edges do not overlap); tests involving a circle count contact.
+
+def rect_rect(ax: float, ay: float, aw: float, ah: float, bx: float, by: float, bw: float, bh: float) -> bool:
+    return not (ax + aw <= bx or bx + bw <= ax or ay + ah <= by or by + bh <= ay)
+
+
+def circle_rect(cx: float, cy: float, cr: float, rx: float, ry: float, rw: float, rh: float) -> bool:
+    px = rx if cx < rx else (rx + rw if cx > rx + rw else cx)
+    py = ry if cy < ry else (ry + rh if cy > ry + rh else cy)
+    dx = cx - px
+    dy = cy - py
+    return dx * dx + dy * dy <= cr * cr
+
+
+def circle_circle(ax: float, ay: float, ar: float, bx: float, by: float, br: float) -> bool:
+    dx = ax - bx
+    dy = ay - by
+    rr = ar + br
+    return dx * dx + dy * dy <= rr * rr
+
+
+# ---- Occupancy raster ----
+
+FREE, BLOCKED, UNKNOWN = 0, 1, 2
+
+
+class OccupancyRaster:
+    """Boolean occupancy grid of a plan at room.grid resolution (numpy only).
+
+    Two layers are kept:
+    - touch: number of shapes whose closed bounding box touches the cell
+    - full: cell entirely covered by a rectangle, or by the inscribed square of a circle
+    A footprint touching no "touch" cell cannot collide; a footprint overlapping a "full" cell
+    with positive area (for a circle probe: its inscribed square does) always collides. Everything else is left to the exact tests, so
+    classify_*() never changes the answer of PlanIndex.rect_collides/circle_collides.
+    """
+
+    def __init__(self, width: float, height: float, cell: float) -> None:
+        self.cell = float(cell)
+        self.width = float(width)
+        self.height = float(height)
+        self.nx = int(math.floor(self.width / self.cell)) + 2
+        self.ny = int(math.floor(self.height / self.cell)) + 2
+        self.touch = np.zeros((self.ny, self.nx), dtype=np.int32)
+        self.full = np.zeros((self.ny, self.nx), dtype=np.int32)
+        self._sat_touch = None
+        self._sat_full = None
+
+    def add(self, shp: Shape) -> None:
+        cs = self.cell
+        x0, y0, x1, y1 = shp.bbox()
+        i0, i1 = max(0, math.floor(x0 / cs)), min(self.nx - 1, math.floor(x1 / cs))
+        j0, j1 = max(0, math.floor(y0 / cs)), min(self.ny - 1, math.floor(y1 / cs))
+        if i0 <= i1 and j0 <= j1:
+            self.touch[j0:j1 + 1, i0:i1 + 1] += 1
+            self._sat_touch = None
+        if shp.__class__ is CircleShape:
+            # inscribed square: every cell inside it is inside the circle
+            half = shp.r / math.sqrt(2.0) * 0.999
+            x0, y0, x1, y1 = shp.x - half, shp.y - half, shp.x + half, shp.y + half
+        i0, i1 = max(0, math.ceil(x0 / cs)), min(self.nx - 1, math.floor(x1 / cs) - 1)
+        j0, j1 = max(0, math.ceil(y0 / cs)), min(self.ny - 1, math.floor(y1 / cs) - 1)
+        if i0 <= i1 and j0 <= j1:
+            self.full[j0:j1 + 1, i0:i1 + 1] = 1
+            self._sat_full = None
+
+    @staticmethod
+    def _sat(a):
+        s = np.zeros((a.shape[0] + 1, a.shape[1] + 1), dtype=np.int64)
+        s[1:, 1:] = a.cumsum(axis=0).cumsum(axis=1)
+        return s
+
+    def _box_sum(self, sat, i0, i1, j0, j1):
+        """Sum over inclusive cell ranges (arrays); empty ranges sum to 0."""
+        i0 = np.clip(i0, 0, self.nx)
+        j0 = np.clip(j0, 0, self.ny)
+        i1 = np.clip(i1 + 1, i0, self.nx)
+        j1 = np.clip(j1 + 1, j0, self.ny)
+        return sat[j1, i1] - sat[j0, i1] - sat[j1, i0] + sat[j0, i0]
+
+    def classify_rects(self, xs, ys, w: float, h: float):
+        """FREE/BLOCKED/UNKNOWN for each top-left (xs[k], ys[k]) of a w x h footprint."""
+        if self._sat_touch is None:
+            self._sat_touch = self._sat(self.touch)
+        if self._sat_full is None:
+            self._sat_full = self._sat(self.full)
+        cs = self.cell
+        status = np.full(xs.shape, UNKNOWN, dtype=np.int8)
+        touched = self._box_sum(
+            self._sat_touch,
+            np.floor(xs / cs).astype(np.int64), np.floor((xs + w) / cs).astype(np.int64),
+            np.floor(ys / cs).astype(np.int64), np.floor((ys + h) / cs).astype(np.int64),
+        )
+        status[touched == 0] = FREE
+        if w > 0 and h > 0:
+            covered = self._box_sum(
+                self._sat_full,
+                np.floor(xs / cs).astype(np.int64), np.ceil((xs + w) / cs).astype(np.int64) - 1,
+                np.floor(ys / cs).astype(np.int64), np.ceil((ys + h) / cs).astype(np.int64) - 1,
+            )
+            status[covered > 0] = BLOCKED
+        status[(xs < 0) | (ys < 0) | (xs + w > self.width) | (ys + h > self.height)] = BLOCKED
+        return status
+
+    def classify_circles(self, cxs, cys, r: float):
+        """FREE/BLOCKED/UNKNOWN for each centre (cxs[k], cys[k]) of a radius-r footprint."""
+        if self._sat_touch is None:
+            self._sat_touch = self._sat(self.touch)
+        cs = self.cell
+        status = np.full(cxs.shape, UNKNOWN, dtype=np.int8)
+        touched = self._box_sum(
+            self._sat_touch,
+            np.floor((cxs - r) / cs).astype(np.int64), np.floor((cxs + r) / cs).astype(np.int64),
+            np.floor((cys - r) / cs).astype(np.int64), np.floor((cys + r) / cs).astype(np.int64),
+        )
+        status[touched == 0] = FREE
+        if r > 0:
+            if self._sat_full is None:
+                self._sat_full = self._sat(self.full)
+            half = r / math.sqrt(2.0) * 0.999
+            covered = self._box_sum(
+                self._sat_full,
+                np.floor((cxs - half) / cs).astype(np.int64), np.ceil((cxs + half) / cs).astype(np.int64) - 1,
+                np.floor((cys - half) / cs).astype(np.int64), np.ceil((cys + half) / cs).astype(np.int64) - 1,
+            )
+            status[covered > 0] = BLOCKED
+        status[(cxs - r < 0) | (cys - r < 0) | (cxs + r > self.width) | (cys + r > self.height)] = BLOCKED
+        return status
+
+
+def _in_zones_mask(cx, cy, zones: Sequence[Dict[str, Any]]):
+    mask = np.zeros(cx.shape, dtype=bool)
+    for zone in zones:
+        zx, zy, zw, zh = zone.get("x", 0), zone.get("y", 0), zone.get("w", 0), zone.get("h", 0)
+        mask |= (cx >= zx) & (cx <= zx + zw) & (cy >= zy) & (cy <= zy + zh)
+    return mask
+
+
+def _in_zones(x: float, y: float, zones: Sequence[Dict[str, Any]]) -> bool:
+    for zone in zones:
+        zx, zy, zw, zh = zone.get("x", 0), zone.get("y", 0), zone.get("w", 0), zone.get("h", 0)
+        if x >= zx and x <= zx + zw and y >= zy and y <= zy + zh:
+            return True
+    return False
+
+
+# ---- Spatial index ----
+
+class PlanIndex:
+    """Uniform-grid spatial index over the compiled obstacles of a floor plan.
+
+    Buckets no_go zones, walls, fixtures, columns and tables by their bounding box so a
+    collision probe only tests the shapes sharing a cell with it instead of the whole plan.
+    Tables are append-only: call sync_tables() (done by _find_spot_for_table) after new
+    dynamic tables were appended to plan["tables"]; a shrunk list triggers a full rebuild.
+    With numpy available, first_free_rect/first_free_circle also keep an OccupancyRaster at
+    room.grid resolution to classify whole candidate scans in one pass.
+    obstacles: shapes already compiled from this plan's static layers (e.g. the cached base plan).
+    """
+
+    def __init__(self, plan: Dict[str, Any], cell: Optional[float] = None, raster: Optional[bool] = None,
+                 obstacles: Optional[List[Shape]] = None) -> None:
+        room = plan.get("room") or {}
+        self.grid = int(room.get("grid") or 50)
+        self.cell = float(cell or max(50, self.grid * 2))
+        self.width = float(room.get("width") or 0)
+        self.height = float(room.get("height") or 0)
+        self.use_raster = RASTER_ENABLED if raster is None else bool(raster and np is not None)
+        self._plan = plan
+        self._obstacles = obstacles
+        self._build()
+
+    def _build(self) -> None:
+        self._buckets: Dict[Tuple[int, int], List[Shape]] = {}
+        self._shapes: List[Shape] = []
+        self._raster: Optional[OccupancyRaster] = None
+        self._tables_ref: Optional[List[Dict[str, Any]]] = None
+        self._tables_seen = 0
+        for shp in (self._obstacles if self._obstacles is not None else compile_obstacles(self._plan)):
+            self._insert(shp)
+        self.sync_tables(self._plan.get("tables") or [])
+
+    def _insert(self, shp: Shape) -> None:
+        self._shapes.append(shp)
+        if self._raster is not None:
+            self._raster.add(shp)
+        x0, y0, x1, y1 = shp.bbox()
+        cs = self.cell
+        buckets = self._buckets
+        for cx in range(math.floor(x0 / cs), math.floor(x1 / cs) + 1):
+            for cy in range(math.floor(y0 / cs), math.floor(y1 / cs) + 1):
+                lst = buckets.get((cx, cy))
+                if lst is None:
+                    buckets[(cx, cy)] = [shp]
+                else:
+                    lst.append(shp)
+
+    def add_table(self, t: Dict[str, Any]) -> None:
+        self._insert(compile_table(t))
+
+    def sync_tables(self, tables: List[Dict[str, Any]]) -> None:
+        """Index tables appended since the last call (tables are only ever appended during auto-assign)."""
+        if self._tables_ref is not None and self._tables_seen and (tables is not self._tables_ref or len(tables) < self._tables_seen):
+            self._build()
+            return
+        self._tables_ref = tables
+        for t in tables[self._tables_seen:]:
+            self.add_table(t)
+        self._tables_seen = len(tables)
+
+    # ---- queries ----
+
+    def query(self, x0: float, y0: float, x1: float, y1: float) -> List[Shape]:
+        """Return every shape whose bounding box shares a cell with [x0, x1] x [y0, y1] (edges inclusive)."""
+        out: List[Shape] = []
+        seen = set()
+        cs = self.cell
+        buckets = self._buckets
+        for cx in range(math.floor(x0 / cs), math.floor(x1 / cs) + 1):
+            for cy in range(math.floor(y0 / cs), math.floor(y1 / cs) + 1):
+                for shp in buckets.get((cx, cy), ()):
+                    if id(shp) not in seen:
+                        seen.add(id(shp))
+                        out.append(shp)
+        return out
+
+    def rect_collides(self, x: float, y: float, w: float, h: float, skip: Optional[Dict[str, Any]] = None) -> bool:
+        """True if the rect leaves the room or overlaps an indexed shape (other than the table `skip`)."""
+        if x < 0 or y < 0 or x + w > self.width or y + h > self.height:
+            return True
+        cs = self.cell
+        buckets = self._buckets
+        for cx in range(math.floor(x / cs), math.floor((x + w) / cs) + 1):
+            for cy in range(math.floor(y / cs), math.floor((y + h) / cs) + 1):
+                for shp in buckets.get((cx, cy), ()):
+                    if skip is not None and shp.src is skip:
+                        continue
+                    if shp.__class__ is RectShape:
+                        if not (x + w <= shp.x or shp.x1 <= x or y + h <= shp.y or shp.y1 <= y):
+                            return True
+                    elif circle_rect(shp.x, shp.y, shp.r, x, y, w, h):
+                        return True
+        return False
+
+    def circle_collides(self, cx: float, cy: float, r: float, skip: Optional[Dict[str, Any]] = None) -> bool:
+        """True if the circle leaves the room or touches an indexed shape (other than the table `skip`)."""
+        if cx - r < 0 or cy - r < 0 or cx + r > self.width or cy + r > self.height:
+            return True
+        cs = self.cell
+        buckets = self._buckets
+        for gx in range(math.floor((cx - r) / cs), math.floor((cx + r) / cs) + 1):
+            for gy in range(math.floor((cy - r) / cs), math.floor((cy + r) / cs) + 1):
+                for shp in buckets.get((gx, gy), ()):
+                    if skip is not None and shp.src is skip:
+                        continue
+                    if shp.__class__ is RectShape:
+                        if circle_rect(cx, cy, r, shp.x, shp.y, shp.w, shp.h):
+                            return True
+                    elif circle_circle(cx, cy, r, shp.x, shp.y, shp.r):
+                        return True
+        return False
+
+    # ---- candidate scans ----
+
+    def raster(self) -> Optional[OccupancyRaster]:
+        """Occupancy raster of every indexed shape (built on first use, kept in sync by _insert)."""
+        if not self.use_raster:
+            return None
+        if self._raster is None:
+            ras = OccupancyRaster(self.width, self.height, max(1, self.grid))
+            for shp in self._shapes:
+                ras.add(shp)
+            self._raster = ras
+        return self._raster
+
+    def first_free_rect(self, xs: Sequence[float], ys: Sequence[float], w: float, h: float, y_major: bool = True,
+                        exclude_zones: Sequence[Dict[str, Any]] = (), center: Tuple[float, float] = (0.0, 0.0)) -> Optional[Tuple[float, float]]:
+        """First top-left (x, y) where a w x h rect fits, scanning ys then xs (y_major) or xs then ys.
+        Candidates whose point (x + center[0], y + center[1]) lies in one of exclude_zones are skipped.
+        """
+        n = len(xs) * len(ys)
+        ras = self.raster() if n >= RASTER_MIN_CANDIDATES else None
+        if ras is None:
+            ox, oy = center
+            pairs = ((x, y) for y in ys for x in xs) if y_major else ((x, y) for x in xs for y in ys)
+            for x, y in pairs:
+                x, y = float(x), float(y)
+                if exclude_zones and _in_zones(x + ox, y + oy, exclude_zones):
+                    continue
+                if not self.rect_collides(x, y, w, h):
+                    return x, y
+            return None
+        X, Y = self._candidate_grid(xs, ys, y_major)
+        status = ras.classify_rects(X, Y, w, h)
+        if exclude_zones:
+            status[_in_zones_mask(X + center[0], Y + center[1], exclude_zones)] = BLOCKED
+        k = self._first_match(status, lambda i: not self.rect_collides(float(X[i]), float(Y[i]), w, h))
+        return None if k is None else (float(X[k]), float(Y[k]))
+
+    def first_free_circle(self, xs: Sequence[float], ys: Sequence[float], r: float,
+                          exclude_zones: Sequence[Dict[str, Any]] = ()) -> Optional[Tuple[float, float]]:
+        """First centre (x, y) where a radius-r circle fits, scanning ys then xs.
+        Candidates whose centre lies in one of exclude_zones are skipped.
+        """
+        n = len(xs) * len(ys)
+        ras = self.raster() if n >= RASTER_MIN_CANDIDATES else None
+        if ras is None:
+            for y in ys:
+                for x in xs:
+                    x, y = float(x), float(y)
+                    if exclude_zones and _in_zones(x, y, exclude_zones):
+                        continue
+                    if not self.circle_collides(x, y, r):
+                        return x, y
+            return None
+        X, Y = self._candidate_grid(xs, ys, True)
+        status = ras.classify_circles(X, Y, r)
+        if exclude_zones:
+            status[_in_zones_mask(X, Y, exclude_zones)] = BLOCKED
+        k = self._first_match(status, lambda i: not self.circle_collides(float(X[i]), float(Y[i]), r))
+        return None if k is None else (float(X[k]), float(Y[k]))
+
+    @staticmethod
+    def _candidate_grid(xs, ys, y_major: bool):
+        ax = np.asarray(xs, dtype=np.float64)
+        ay = np.asarray(ys, dtype=np.float64)
+        if y_major:
+            Y, X = np.meshgrid(ay, ax, indexing="ij")
+        else:
+            X, Y = np.meshgrid(ax, ay, indexing="ij")
+        return X.ravel(), Y.ravel()
+
+    @staticmethod
+    def _first_match(status, exact_free) -> Optional[int]:
+        """Index of the first candidate that is FREE, or UNKNOWN and confirmed free by exact_free()."""
+        free = np.flatnonzero(status == FREE)
+        stop = int(free[0]) if free.size else status.size
+        for i in np.flatnonzero(status[:stop] == UNKNOWN):
+            if exact_free(int(i)):
+                return int(i)
+        return stop if free.size else None
+
+
+# ---- Tables collées: which rect tables can be pushed together ----
+# Two rect tables are joinable when a pair of facing edges is at most `gap` apart and they overlap
+# on the other axis by at least half of the shorter side (side by side or end to end). The graph is
+# built once per auto-assign with grid buckets, so combo searches only walk real neighbours.
+
+JOIN_GAP = 60.0
+JOIN_MIN_OVERLAP = 0.5
+
+
+def rects_joinable(a: RectShape, b: RectShape, gap: float = JOIN_GAP) -> bool:
+    gx = max(b.x - (a.x + a.w), a.x - (b.x + b.w))
+    gy = max(b.y - (a.y + a.h), a.y - (b.y + b.h))
+    ox = min(a.x + a.w, b.x + b.w) - max(a.x, b.x)
+    oy = min(a.y + a.h, b.y + b.h) - max(a.y, b.y)
+    if gx <= gap and oy >= JOIN_MIN_OVERLAP * min(a.h, b.h):
+        return True
+    return gy <= gap and ox >= JOIN_MIN_OVERLAP * min(a.w, b.w)
+
+
+class JoinGraph:
+    """Adjacency graph of rect tables that can be pushed together (ids as str, plan order kept)."""
+
+    def __init__(self, tables: Iterable[Dict[str, Any]], gap: float = JOIN_GAP) -> None:
+        self.gap = float(gap)
+        self.order: Dict[str, int] = {}
+        shapes: Dict[str, RectShape] = {}
+        for t in tables:
+            tid = str(t.get("id"))
+            if tid not in self.order:
+                self.order[tid] = len(self.order)
+                shapes[tid] = compile_rect(t, 120, 60)
+        self.adj: Dict[str, Set[str]] = {tid: set() for tid in shapes}
+        if not shapes:
+            return
+        # Any joinable pair has origins less than one cell apart on both axes
+        cell = max(max(s.w, s.h) for s in shapes.values()) + self.gap + 1.0
+        buckets: Dict[Tuple[int, int], List[str]] = {}
+        for tid, shp in shapes.items():
+            buckets.setdefault((math.floor(shp.x / cell), math.floor(shp.y / cell)), []).append(tid)
+        for (cx, cy), members in buckets.items():
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for b in buckets.get((cx + dx, cy + dy), ()):
+                        for a in members:
+                            if self.order[a] < self.order[b] and rects_joinable(shapes[a], shapes[b], self.gap):
+                                self.adj[a].add(b)
+                                self.adj[b].add(a)
+
+    def edge_count(self) -> int:
+        return sum(len(n) for n in self.adj.values()) // 2
+
+    def pairs(self, avail: Set[str]) -> Iterator[Tuple[str, str]]:
+        """Joinable pairs of available tables, in plan order."""
+        for a in sorted((t for t in avail if t in self.adj), key=self.order.__getitem__):
+            for b in sorted(self.adj[a] & avail, key=self.order.__getitem__):
+                if self.order[a] < self.order[b]:
+                    yield a, b
+
+    def best_connected(self, avail: Set[str], target: int, seats: Callable[[str], int],
+                       max_tables: int = 5, budget: int = 20000) -> Optional[List[str]]:
+        """Connected set of available tables seating target: fewest tables, then fewest empty seats.
+        Subsets are grown one neighbour at a time, level by level, so the first level reaching
+        target is the minimum size. At most max_tables tables and budget subsets are visited."""
+        pool = {t for t in avail if t in self.adj}
+        level: Set[FrozenSet[str]] = {frozenset([t]) for t in pool}
+        seen = len(level)
+        for _ in range(max_tables):
+            best: Optional[FrozenSet[str]] = None
+            best_key: Optional[Tuple[int, Tuple[int, ...]]] = None
+            for sub in level:
+                total = sum(seats(t) for t in sub)
+                if total >= target:
+                    key = (total - target, tuple(sorted(self.order[t] for t in sub)))
+                    if best_key is None or key < best_key:
+                        best, best_key = sub, key
+            if best is not None:
+                return sorted(best, key=self.order.__getitem__)
+            grown: Set[FrozenSet[str]] = set()
+            for sub in level:
+                for t in sub:
+                    for n in self.adj[t] & pool:
+                        if n not in sub:
+                            grown.add(sub | {n})
+                if seen + len(grown) > budget:
+                    break
+            seen += len(grown)
+            level = grown
+            if not level:
+                break
+        return None
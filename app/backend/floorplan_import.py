@@ -0,0 +1,262 @@
+from __future__ import annotations
+import bisect
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import uuid
+from datetime import date, time as dtime
+from typing import Any, BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# Reservation rows read from a Zenchef service export (PDF tables), for the floor plan import.
+# Pages are processed one at a time from a spooled file: each page's parsed objects are released
+# before the next one, so memory stays at one page plus the rows found so far.
+
+RE_TIME = re.compile(r"^\d{1,2}:\d{2}$")
+RE_PAX = re.compile(r"^\d{1,2}$")
+SKIP_NAMES = {'commentaire', 'confirmé', 'web', 'google', 'heure', 'pax', 'client'}
+SPOOL_CHUNK = 1024 * 1024
+PARSER_VERSION = 2  # bump when the rows read from a given file change (parse cache key)
+
+
+def default_arrival(service_label: Optional[str]) -> dtime:
+    return dtime(12, 30) if (service_label or "").lower() == "lunch" else dtime(19, 0)
+
+
+def parse_table_row(row: Sequence[Any], service_date: date, default_time: dtime) -> Optional[Dict[str, Any]]:
+    """One table row -> {id, arrival_time, pax, client_name}, or None when it is not a reservation."""
+    if not row or len(row) < 3:
+        return None
+
+    # Nettoyer la ligne
+    clean_row = [str(cell).strip() if cell else "" for cell in row]
+
+    # Détecter colonnes heure/pax/nom (peuvent être dans différentes positions)
+    heure_idx = None
+    pax_idx = None
+    nom_idx = None
+    for idx, cell in enumerate(clean_row[:7]):
+        if cell and RE_TIME.match(cell):
+            heure_idx = idx
+        elif cell and RE_PAX.match(cell) and heure_idx is not None:
+            pax_idx = idx
+        elif cell and len(cell) >= 2 and any(c.isupper() for c in cell) and heure_idx is not None and pax_idx is not None:
+            if nom_idx is None and not cell.startswith('Commentaire'):
+                nom_idx = idx
+                break
+    if heure_idx is None or pax_idx is None or nom_idx is None:
+        return None
+
+    heure = clean_row[heure_idx]
+    nom = clean_row[nom_idx]
+    try:
+        pax = int(clean_row[pax_idx])
+    except ValueError:
+        return None
+    if not (1 <= pax <= 30 and nom and len(nom) >= 2):
+        return None
+
+    # Nettoyer le nom (prendre première ligne, retirer téléphone)
+    nom_clean = nom.split('\n')[0] if '\n' in nom else nom
+    nom_clean = nom_clean.split('Téléphone')[0].strip()
+    # Filtrer mots-clés commentaires
+    if nom_clean.lower() in SKIP_NAMES:
+        return None
+
+    try:
+        hh, mm = heure.split(":")
+        arrival_time = dtime(int(hh), int(mm))
+    except ValueError:
+        arrival_time = default_time
+
+    # ID déterministe: un ré-import du même PDF garde les mêmes identifiants
+    h = hashlib.md5(f"{service_date}_{heure}_{pax}_{nom_clean}".encode()).hexdigest()
+    return {
+        "id": str(uuid.UUID(h[:32])),
+        "arrival_time": arrival_time.isoformat(),
+        "pax": pax,
+        "client_name": nom_clean,
+    }
+
+
+def parse_tables(tables: List[List[List[Any]]], service_date: date, default_time: dtime) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for table in tables:
+        for row in table or []:
+            item = parse_table_row(row, service_date, default_time)
+            if item:
+                out.append(item)
+    return out
+
+
+def spool_upload(src: BinaryIO) -> str:
+    """Copy an upload to a temporary file by chunks (never whole in memory). Caller removes it."""
+    fd, path = tempfile.mkstemp(prefix="import_", suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            shutil.copyfileobj(src, f, SPOOL_CHUNK)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+# ---- Fast path: word coordinates instead of table detection ----
+# The export is one ruled table (Heure | Pax | Client | Table | Statut | Date | Source) whose cells
+# are vertically centred. Column borders are the vertical rules crossing the header row (first
+# page), reused on the following pages. A reservation is anchored on the line holding its time and
+# pax; the client name is the first line of the client cell around it. Pages the fast path cannot
+# fully explain (no layout yet, an anchor without a valid name, a time outside the anchors or client
+# text without any anchor, e.g. columns shifted on a continuation page) go through extract_tables().
+
+FAST_EXTRACT = (os.getenv("FLOORPLAN_IMPORT_FAST") or "1") != "0"
+HEADER_WORDS = ("Heure", "Pax", "Client")
+LINE_TOL = 2.0  # words of one text line share their top within this (pt)
+CELL_GAP = 14.0  # lines of one cell are closer than this; cell padding makes row gaps larger
+
+
+class ColumnLayout(NamedTuple):
+    borders: Tuple[float, ...]  # x of the vertical rules, left to right
+    names: Tuple[Optional[str], ...]  # header of each column between two borders
+    bottom: float  # bottom of the header line on the page it was found
+
+
+def _lines(words: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    lines: List[List[Dict[str, Any]]] = []
+    for w in sorted(words, key=lambda w: (w["top"], w["x0"])):
+        if lines and abs(w["top"] - lines[-1][0]["top"]) <= LINE_TOL:
+            lines[-1].append(w)
+        else:
+            lines.append([w])
+    for line in lines:
+        line.sort(key=lambda w: w["x0"])
+    return lines
+
+
+def _column_index(x: float, borders: Sequence[float]) -> Optional[int]:
+    i = bisect.bisect_right(borders, x)
+    return i - 1 if 0 < i < len(borders) else None
+
+
+def learn_layout(lines: List[List[Dict[str, Any]]], edges: List[Dict[str, Any]]) -> Optional[ColumnLayout]:
+    for line in lines:
+        texts = {w["text"] for w in line}
+        if not all(h in texts for h in HEADER_WORDS):
+            continue
+        top = min(w["top"] for w in line)
+        bottom = max(w["bottom"] for w in line)
+        xs = sorted(e["x0"] for e in edges
+                    if e["orientation"] == "v" and e["top"] <= top and e["bottom"] >= bottom)
+        borders: List[float] = []
+        for x in xs:
+            if not borders or x - borders[-1] > LINE_TOL:
+                borders.append(x)
+        names: List[Optional[str]] = [None] * max(len(borders) - 1, 0)
+        for w in line:
+            i = _column_index((w["x0"] + w["x1"]) / 2, borders)
+            if i is not None and names[i] is None:
+                names[i] = w["text"]
+        if all(h in names for h in HEADER_WORDS):
+            return ColumnLayout(tuple(borders), tuple(names), bottom)
+        return None
+    return None
+
+
+def _column(word: Dict[str, Any], layout: ColumnLayout) -> Optional[str]:
+    i = _column_index((word["x0"] + word["x1"]) / 2, layout.borders)
+    return layout.names[i] if i is not None else None
+
+
+def rows_from_words(lines: List[List[Dict[str, Any]]], layout: ColumnLayout, header_bottom: Optional[float],
+                    service_date: date, default_time: dtime) -> Optional[List[Dict[str, Any]]]:
+    """Reservations of one page from its text lines, or None when the page needs the table extractor."""
+    anchors: List[Tuple[float, str, str]] = []  # (top, heure, pax)
+    client_lines: List[Tuple[float, str]] = []
+    for line in lines:
+        top = line[0]["top"]
+        if header_bottom is not None and top <= header_bottom:
+            continue
+        cols: Dict[str, List[str]] = {}
+        for w in line:
+            cols.setdefault(_column(w, layout), []).append(w["text"])
+        heure = cols.get("Heure") or []
+        pax = cols.get("Pax") or []
+        if len(heure) == 1 and len(pax) == 1 and RE_TIME.match(heure[0]) and RE_PAX.match(pax[0]):
+            anchors.append((top, heure[0], pax[0]))
+        elif any(RE_TIME.match(w["text"]) for w in line):
+            # A reservation time the learned columns do not explain
+            return None
+        if cols.get("Client"):
+            client_lines.append((top, " ".join(cols["Client"])))
+    if not anchors and client_lines:
+        return None
+
+    out: List[Dict[str, Any]] = []
+    for top, heure, pax in anchors:
+        # The client cell is the run of close lines around the anchor line (between two of its
+        # lines when the cell has an even count)
+        if not client_lines:
+            return None
+        idx = min(range(len(client_lines)), key=lambda i: abs(client_lines[i][0] - top))
+        if abs(client_lines[idx][0] - top) >= CELL_GAP:
+            return None
+        while idx > 0 and client_lines[idx][0] - client_lines[idx - 1][0] < CELL_GAP:
+            idx -= 1
+        item = parse_table_row([heure, pax, client_lines[idx][1]], service_date, default_time)
+        if item is None:
+            return None
+        out.append(item)
+    return out
+
+
+def extract_page(page, layout: Optional[ColumnLayout], service_date: date, default_time: dtime,
+                 fast: bool = True) -> Tuple[List[Dict[str, Any]], Optional[ColumnLayout], bool]:
+    """Reservations of one pdfplumber page. Returns (rows, layout for the next pages, fast path used)."""
+    if fast:
+        lines = _lines(page.extract_words())
+        found = learn_layout(lines, page.edges)
+        layout = found or layout
+        if layout is not None:
+            rows = rows_from_words(lines, layout, found.bottom if found else None, service_date, default_time)
+            if rows is not None:
+                return rows, layout, True
+    return parse_tables(page.extract_tables(), service_date, default_time), layout, False
+
+
+def iter_pdf_pages(path: str, service_date: date, service_label: Optional[str] = None,
+                   fast: Optional[bool] = None) -> Iterator[Tuple[int, int, List[Dict[str, Any]]]]:
+    """Yield (page number, page count, reservations of that page), one page at a time."""
+    import pdfplumber
+
+    default_time = default_arrival(service_label)
+    fast = FAST_EXTRACT if fast is None else fast
+    layout: Optional[ColumnLayout] = None
+    with pdfplumber.open(path) as pdf:
+        count = len(pdf.pages)
+        for page_num, page in enumerate(pdf.pages, 1):
+            try:
+                rows, layout, _ = extract_page(page, layout, service_date, default_time, fast)
+            finally:
+                # Drop the page's layout objects before parsing the next one
+                page.close()
+            yield page_num, count, rows
+
+
+def iter_import_pages(path: str, service_date: date, service_label: Optional[str] = None) -> Iterator[Tuple[int, int, List[Dict[str, Any]]]]:
+    """iter_pdf_pages through the parse cache: a file already imported with the same parameters is
+    replayed from the cache, a fresh parse is stored once all its pages have been read."""
+    from . import parse_cache
+
+    key = parse_cache.parse_key(parse_cache.sha256_file(path), "floorplan_import", PARSER_VERSION, __file__,
+                                service_date=service_date.isoformat(), service_label=service_label)
+    cached = parse_cache.get(key)
+    if cached is not None:
+        for page_num, count, rows in cached:
+            yield page_num, count, rows
+        return
+    pages = []
+    for page in iter_pdf_pages(path, service_date, service_label):
+        pages.append(page)
+        yield page
+    parse_cache.put(key, pages)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+import copy
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Delta updates of a floor plan document ({"data": ..., "assignments": ...}) for the editor:
+# RFC 6902 JSON Patch operations (add, remove, replace, move, copy, test) on JSON pointers such as
+# /data/tables/3/x, plus compact table ops addressed by table id, so a drag sends a few bytes:
+#   {"op": "move_table", "id": "t3", "x": 120, "y": 80}
+#   {"op": "resize_table", "id": "t3", "w": 60, "h": 40}   (or "r" for round tables)
+#   {"op": "relabel_table", "id": "t3", "label": "12"}
+# Operations apply in order; any failure rejects the whole patch (the caller works on a copy).
+
+TABLE_OPS = {"move_table": ("x", "y"), "resize_table": ("w", "h", "r"), "relabel_table": ("label",)}
+
+
+class PatchError(ValueError):
+    pass
+
+
+def _parse_pointer(pointer: Any) -> List[str]:
+    if not isinstance(pointer, str) or (pointer and not pointer.startswith("/")):
+        raise PatchError(f"Invalid JSON pointer: {pointer!r}")
+    if pointer == "":
+        return []
+    return [p.replace("~1", "/").replace("~0", "~") for p in pointer[1:].split("/")]
+
+
+def _index(container: List[Any], token: str, allow_end: bool) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise PatchError(f"Invalid array index: {token!r}")
+    i = int(token)
+    if i > len(container) or (i == len(container) and not allow_end):
+        raise PatchError(f"Array index out of range: {i}")
+    return i
+
+
+def _parent(doc: Any, tokens: List[str]) -> Tuple[Any, str]:
+    if not tokens:
+        raise PatchError("Operation on the document root is not allowed")
+    node = doc
+    for tok in tokens[:-1]:
+        if isinstance(node, dict):
+            if tok not in node:
+                raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+            node = node[tok]
+        elif isinstance(node, list):
+            node = node[_index(node, tok, False)]
+        else:
+            raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+    return node, tokens[-1]
+
+
+def _get(doc: Any, tokens: List[str]) -> Any:
+    node = doc
+    for tok in tokens:
+        if isinstance(node, dict) and tok in node:
+            node = node[tok]
+        elif isinstance(node, list):
+            node = node[_index(node, tok, False)]
+        else:
+            raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+    return node
+
+
+def _add(doc: Any, tokens: List[str], value: Any) -> None:
+    parent, key = _parent(doc, tokens)
+    if isinstance(parent, dict):
+        parent[key] = value
+    elif isinstance(parent, list):
+        parent.insert(_index(parent, key, True), value)
+    else:
+        raise PatchError(f"Cannot add at /{'/'.join(tokens)}")
+
+
+def _remove(doc: Any, tokens: List[str]) -> Any:
+    parent, key = _parent(doc, tokens)
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+        return parent.pop(key)
+    if isinstance(parent, list):
+        return parent.pop(_index(parent, key, False))
+    raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+
+
+def _replace(doc: Any, tokens: List[str], value: Any) -> None:
+    parent, key = _parent(doc, tokens)
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+        parent[key] = value
+    elif isinstance(parent, list):
+        parent[_index(parent, key, False)] = value
+    else:
+        raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+
+
+def _table_op(doc: Dict[str, Any], op: Dict[str, Any]) -> None:
+    tables = (doc.get("data") or {}).get("tables")
+    if not isinstance(tables, list):
+        raise PatchError("Plan has no tables")
+    table = next((t for t in tables if isinstance(t, dict) and str(t.get("id")) == str(op.get("id"))), None)
+    if table is None:
+        raise PatchError(f"Table not found: {op.get('id')!r}")
+    fields = [f for f in TABLE_OPS[op["op"]] if f in op]
+    if not fields:
+        raise PatchError(f"{op['op']}: expected one of {', '.join(TABLE_OPS[op['op']])}")
+    for f in fields:
+        value = op[f]
+        if f == "label":
+            if value is not None and not isinstance(value, (str, int)):
+                raise PatchError("relabel_table: label must be a string")
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise PatchError(f"{op['op']}: {f} must be a number")
+        elif f != "x" and f != "y" and value <= 0:
+            raise PatchError(f"{op['op']}: {f} must be > 0")
+        table[f] = value
+
+
+def apply_patch(doc: Dict[str, Any], ops: Iterable[Dict[str, Any]], allowed: Iterable[str]) -> Dict[str, Any]:
+    """Apply ops to doc in place and return it. Pointers must start with one of the allowed keys."""
+    allowed = set(allowed)
+    for n, op in enumerate(ops):
+        if not isinstance(op, dict) or "op" not in op:
+            raise PatchError(f"Operation {n}: missing 'op'")
+        name = op["op"]
+        if name in TABLE_OPS:
+            if "data" not in allowed:
+                raise PatchError(f"Operation {n}: {name} not allowed here")
+            _table_op(doc, op)
+            continue
+        path = _parse_pointer(op.get("path"))
+        if not path or path[0] not in allowed:
+            raise PatchError(f"Operation {n}: path {op.get('path')!r} not allowed")
+        if name in ("add", "replace", "test") and "value" not in op:
+            raise PatchError(f"Operation {n}: missing 'value'")
+        if name == "add":
+            _add(doc, path, op["value"])
+        elif name == "remove":
+            _remove(doc, path)
+        elif name == "replace":
+            _replace(doc, path, op["value"])
+        elif name in ("move", "copy"):
+            src = _parse_pointer(op.get("from"))
+            if not src or src[0] not in allowed:
+                raise PatchError(f"Operation {n}: from {op.get('from')!r} not allowed")
+            if name == "move":
+                if path[:len(src)] == src and len(path) > len(src):
+                    raise PatchError(f"Operation {n}: cannot move a value into itself")
+                _add(doc, path, _remove(doc, src))
+            else:
+                _add(doc, path, copy.deepcopy(_get(doc, src)))
+        elif name == "test":
+            if _get(doc, path) != op["value"]:
+                raise PatchError(f"Operation {n}: test failed at {op['path']}")
+        else:
+            raise PatchError(f"Operation {n}: unknown op {name!r}")
+    return doc
@@ -0,0 +1,124 @@
+from __future__ import annotations
+import time
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+class Option:
+    """One way to seat a group: its cost and the shared resources it consumes.
+
+    uses: ((resource_key, amount), ...) checked against the capacities given to solve_assignment.
+    tag: opaque payload handed back to the caller (e.g. which table class / dynamic table to use).
+    """
+    __slots__ = ("cost", "uses", "tag")
+
+    def __init__(self, cost: int, uses: Sequence[Tuple[Hashable, int]], tag: Any = None) -> None:
+        self.cost = int(cost)
+        self.uses = tuple(uses)
+        self.tag = tag
+
+
+class SolveResult:
+    __slots__ = ("choices", "cost", "optimal", "nodes", "elapsed")
+
+    def __init__(self, choices: List[Optional[int]], cost: int, optimal: bool, nodes: int, elapsed: float) -> None:
+        self.choices = choices   # per group: index into its options, or None when left unplaced
+        self.cost = cost
+        self.optimal = optimal   # False when the time budget stopped the search
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+
+def solve_assignment(
+    options: List[List[Option]],
+    unplaced_cost: List[int],
+    capacities: Dict[Hashable, int],
+    time_budget: float = 2.0,
+    group_keys: Optional[List[Hashable]] = None,
+) -> SolveResult:
+    """Branch-and-bound over per-group options sharing limited resources.
+
+    Minimises sum(option.cost) + sum(unplaced_cost of groups left out) subject to
+    sum(amounts per resource) <= capacities[resource]. Options should be sorted by cost so
+    the first leaves reached are good incumbents. Consecutive groups with the same key in
+    group_keys are interchangeable: their choice indexes are forced non-decreasing to cut
+    symmetric branches. Stops after time_budget seconds and returns the best solution found.
+    """
+    n = len(options)
+    t0 = time.perf_counter()
+    deadline = t0 + max(0.0, float(time_budget))
+    remaining: Dict[Hashable, int] = {k: int(v) for k, v in capacities.items()}
+    keys = group_keys or [None] * n
+    current: List[Optional[int]] = [None] * n
+    best_choices: List[Optional[int]] = [None] * n
+    best_cost = sum(unplaced_cost)  # everything unplaced is always feasible
+    nodes = 0
+    timed_out = False
+
+    def fits(opt: Option) -> bool:
+        for key, amount in opt.uses:
+            if remaining.get(key, 0) < amount:
+                return False
+        return True
+
+    # every placed group consumes at least one unit of its option's first resource ("slot")
+    slot_keys = {opt.uses[0][0] for opts in options for opt in opts if opt.uses}
+
+    def lower_bound(k: int) -> int:
+        # each remaining group alone: cheapest option still feasible with the current stock
+        lb = 0
+        deltas: List[int] = []
+        for g in range(k, n):
+            best = unplaced_cost[g]
+            for opt in options[g]:
+                if opt.cost >= best:
+                    break
+                if fits(opt):
+                    best = opt.cost
+                    break
+            lb += best
+            if best < unplaced_cost[g]:
+                deltas.append(unplaced_cost[g] - best)
+        # no more groups than free slots can be placed: the cheapest surplus stays unplaced
+        slots = sum(max(0, remaining.get(key, 0)) for key in slot_keys)
+        if len(deltas) > slots:
+            deltas.sort()
+            lb += sum(deltas[:len(deltas) - slots])
+        return lb
+
+    def dfs(k: int, cost: int) -> None:
+        nonlocal best_cost, best_choices, nodes, timed_out
+        nodes += 1
+        if (nodes & 255) == 0 and time.perf_counter() > deadline:
+            timed_out = True
+        if timed_out:
+            return
+        if k == n:
+            if cost < best_cost:
+                best_cost = cost
+                best_choices = list(current)
+            return
+        if cost + lower_bound(k) >= best_cost:
+            return
+        # symmetry: same-key neighbours take options in non-decreasing order (unplaced = last)
+        start = 0
+        if k > 0 and keys[k] is not None and keys[k] == keys[k - 1]:
+            prev = current[k - 1]
+            start = len(options[k]) if prev is None else prev
+        for i in range(start, len(options[k])):
+            opt = options[k][i]
+            if not fits(opt):
+                continue
+            for key, amount in opt.uses:
+                remaining[key] -= amount
+            current[k] = i
+            dfs(k + 1, cost + opt.cost)
+            for key, amount in opt.uses:
+                remaining[key] += amount
+            if timed_out:
+                return
+        current[k] = None
+        dfs(k + 1, cost + unplaced_cost[k])
+
+    dfs(0, 0)
+    elapsed = time.perf_counter() - t0
+    return SolveResult(best_choices, best_cost, not timed_out, nodes, elapsed)
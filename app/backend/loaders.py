@@ -0,0 +1,26 @@
+from __future__ import annotations
+import uuid
+from typing import Dict, Iterable, List
+
+from sqlmodel import Session, select
+
+from .models import ReservationItem
+
+# Keep IN (...) lists below SQLite's bound-parameter limit
+_IN_CHUNK = 500
+
+
+def load_items_by_reservation(session: Session, reservation_ids: Iterable[uuid.UUID]) -> Dict[uuid.UUID, List[ReservationItem]]:
+    """Items of several reservations in one query (per 500 ids), grouped by reservation_id.
+
+    Every requested id is present in the result, with an empty list when it has no items.
+    No ORDER BY, same as the per-reservation selects it replaces.
+    """
+    ids = list(dict.fromkeys(reservation_ids))
+    out: Dict[uuid.UUID, List[ReservationItem]] = {rid: [] for rid in ids}
+    for i in range(0, len(ids), _IN_CHUNK):
+        chunk = ids[i:i + _IN_CHUNK]
+        stmt = select(ReservationItem).where(ReservationItem.reservation_id.in_(chunk))  # type: ignore[union-attr]
+        for it in session.exec(stmt).all():
+            out.setdefault(it.reservation_id, []).append(it)
+    return out
@@ -8,9 +8,12 @@ from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse, Response, FileResponse, StreamingResponse
+from sqlalchemy.orm.exc import StaleDataError
 
-from .database import init_db, run_startup_migrations, session_context, backfill_allergen_icons
-from .routers import reservations, menu_items, zenchef, allergens, notes, drinks, suppliers, purchase_orders, floorplan, incidents, facturation, reminders
+from .database import session_context, pool_status
+from .migrations import format_report, run_migrations
+from . import floorplan_geometry, pdf_service
+from .routers import reservations, menu_items, zenchef, allergens, notes, drinks, suppliers, purchase_orders, floorplan, incidents, facturation, reminders, pdf_jobs
 
 load_dotenv()
 
@@ -23,6 +26,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Plan-Version"],
 )
 
 # Routers
@@ -38,19 +42,29 @@ app.include_router(floorplan.router)
 app.include_router(incidents.router)
 app.include_router(facturation.router)
 app.include_router(reminders.router)
-
-# Ensure DB
-init_db()
-# Backfill existing allergen icons into DB rows (idempotent)
+app.include_router(pdf_jobs.router)
+
+# Ensure DB: versioned migrations, steps already recorded in schema_version are skipped.
+# DB_MIGRATE_ON_STARTUP=0 leaves them to `python -m backend.migrations` (run out of band).
+if (os.getenv("DB_MIGRATE_ON_STARTUP") or "1") != "0":
+    _t0 = time.perf_counter()
+    _report = run_migrations()
+    for _line in format_report(_report, (time.perf_counter() - _t0) * 1000):
+        print(_line)
+# Decode the PDF stamp and allergen icons once (served from memory while rendering)
 try:
-    backfill_allergen_icons()
+    pdf_service.warm_assets()
 except Exception as e:
-    print(f"Backfill allergen icons skipped: {e}")
-# Apply idempotent startup migrations automatically on Railway (PostgreSQL)
+    print(f"PDF assets warm-up skipped: {e}")
+# Auto-assign placement scans use the numpy occupancy raster; say it once when it is not available
+if not floorplan_geometry.RASTER_ENABLED:
+    _why = "numpy not installed" if floorplan_geometry.np is None else "FLOORPLAN_RASTER=0"
+    print(f"Floor plan occupancy raster disabled ({_why}): placement uses the linear scan")
+# Drop PDFs older than PDF_RETENTION_H left in generated_pdfs/ (exports are now streamed from memory)
 try:
-    run_startup_migrations()
+    pdf_service.gc_generated_pdfs()
 except Exception as e:
-    print(f"Startup migrations skipped due to error: {e}")
+    print(f"Generated PDFs cleanup skipped: {e}")
 
 # Static serving for built frontend if available
 backend_dir = Path(__file__).parent
@@ -120,7 +134,14 @@ async def log_requests(request: Request, call_next):
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     print(f"HTTPException {exc.status_code} at {request.url.path}: {exc.detail}")
-    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers=getattr(exc, "headers", None))
+
+
+@app.exception_handler(StaleDataError)
+async def stale_data_handler(request: Request, exc: StaleDataError):
+    # Versioned rows (plans de salle): the row changed between read and write
+    print(f"Version conflict at {request.url.path}: {exc}")
+    return JSONResponse(status_code=409, content={"detail": "Le plan a été modifié entre-temps. Rechargez-le puis réessayez."})
 
 
 @app.exception_handler(Exception)
@@ -149,6 +170,26 @@ async def health():
     return {"status": "ok", "db": ok_db}
 
 
+# --- Metrics: connection pool of this worker (Prometheus text, ?format=json for JSON) ---
+_METRIC_COUNTERS = {"checkouts", "checkout_timeouts", "checkout_wait_total_ms", "connects", "invalidated"}
+
+
+@app.get("/metrics")
+async def metrics(format: str = "prometheus"):
+    status = pool_status()
+    if format == "json":
+        return status
+    labels = f'pid="{status["pid"]}",pool="{status["pool"]}"'
+    lines = []
+    for key, value in status.items():
+        if key in ("pid", "pool"):
+            continue
+        name = f"db_pool_{key}"
+        lines.append(f"# TYPE {name} {'counter' if key in _METRIC_COUNTERS else 'gauge'}")
+        lines.append(f"{name}{{{labels}}} {value}")
+    return Response("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
+
 @app.get("/{full_path:path}")
 async def spa_fallback(full_path: str):
     index_file = frontend_dist / "index.html"
@@ -158,7 +199,7 @@ async def spa_fallback(full_path: str):
         full_path.startswith("api")
         or full_path.startswith("backend-assets")
         or full_path.startswith("assets")
-        or full_path in {"favicon.ico", "health", "docs", "redoc", "openapi.json"}
+        or full_path in {"favicon.ico", "health", "metrics", "docs", "redoc", "openapi.json"}
     ):
         raise HTTPException(status_code=404)
     return FileResponse(str(index_file))
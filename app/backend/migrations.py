@@ -0,0 +1,224 @@
+from __future__ import annotations
+import argparse
+import functools
+import hashlib
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Set
+
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel
+
+from . import database, models  # noqa: F401  (models registers every table on SQLModel.metadata)
+from .database import engine
+
+# Versioned startup migrations. Each step runs once per database and is then recorded in the
+# schema_version table, so a boot only reads that table (one query) instead of probing every column.
+# A step with a fingerprint is recorded as "<name>@<fingerprint>" and runs again when the
+# fingerprint changes (model tables/columns for create_all, icon files for the allergen backfill).
+# Steps run strict (errors propagate instead of being swallowed) and the schema objects they create
+# are checked afterwards, so a step is only recorded once it verifiably succeeded.
+# Run out of band with:  python -m backend.migrations [status|run]  (from app/)
+
+SCHEMA_VERSION_TABLE = "schema_version"
+
+
+class Migration(NamedTuple):
+    name: str
+    run: Callable[[], None]
+    fingerprint: Optional[Callable[[], str]] = None
+    verify: Optional[Callable[[], List[str]]] = None  # returns what is still missing after run()
+
+
+class StepReport(NamedTuple):
+    id: str
+    status: str  # applied | skipped | failed | pending
+    ms: float
+    error: Optional[str] = None
+
+
+def _short_hash(parts: List[str]) -> str:
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+def _models_fingerprint() -> str:
+    return _short_hash([
+        f"{t.name}:{','.join(sorted(c.name for c in t.columns))}"
+        for t in sorted(SQLModel.metadata.tables.values(), key=lambda t: t.name)
+    ])
+
+
+def _allergen_icons_fingerprint() -> str:
+    icons_dir = os.path.join(os.path.dirname(__file__), "assets", "allergens")
+    try:
+        names = sorted(n for n in os.listdir(icons_dir) if n.lower().endswith(".png"))
+    except OSError:
+        names = []
+    return _short_hash(names)
+
+
+def _create_all() -> None:
+    SQLModel.metadata.create_all(engine)
+
+
+def _strict(fn: Callable[..., None]) -> Callable[[], None]:
+    return functools.partial(fn, strict=True)
+
+
+def _columns(*expected: str) -> Callable[[], List[str]]:
+    """Verifier for steps adding columns: "table.column" entries missing from the live schema."""
+    def verify() -> List[str]:
+        insp = inspect(engine)
+        missing: List[str] = []
+        cache: Dict[str, Set[str]] = {}
+        for item in expected:
+            table, column = item.split(".", 1)
+            if table not in cache:
+                cache[table] = {c["name"] for c in insp.get_columns(table)} if insp.has_table(table) else set()
+            if column not in cache[table]:
+                missing.append(item)
+        return missing
+    return verify
+
+
+def _tables(*expected: str) -> Callable[[], List[str]]:
+    def verify() -> List[str]:
+        insp = inspect(engine)
+        return [t for t in expected if not insp.has_table(t)]
+    return verify
+
+
+def _unique_index(table: str, name: str) -> Callable[[], List[str]]:
+    """Verifier for a unique index or constraint (SQLite creates an index, PostgreSQL a constraint)."""
+    def verify() -> List[str]:
+        insp = inspect(engine)
+        if not insp.has_table(table):
+            return [f"{table}.{name}"]
+        names = {i["name"] for i in insp.get_indexes(table)} | {c["name"] for c in insp.get_unique_constraints(table)}
+        return [] if name in names else [f"{table}.{name}"]
+    return verify
+
+
+# Order matters: append new steps at the end, never rename a recorded one.
+MIGRATIONS: List[Migration] = [
+    Migration("create_all", _create_all, _models_fingerprint),
+    Migration("0001_reservation_final_version", _strict(database.ensure_final_version_column),
+              verify=_columns("reservation.final_version")),
+    Migration("0002_reservation_allergens", _strict(database.ensure_allergens_column),
+              verify=_columns("reservation.allergens")),
+    Migration("0003_note_name", _strict(database.ensure_notes_name_column), verify=_columns("note.name")),
+    Migration("0004_reservation_item_comment", _strict(database.ensure_reservation_item_comment_column),
+              verify=_columns("reservationitem.comment")),
+    Migration("0005_reservation_last_pdf_exported_at", _strict(database.ensure_reservation_last_pdf_column),
+              verify=_columns("reservation.last_pdf_exported_at")),
+    Migration("0006_reservation_on_invoice", _strict(database.ensure_on_invoice_column),
+              verify=_columns("reservation.on_invoice")),
+    Migration("0007_drink_unique_name", _strict(database.ensure_drink_unique_index),
+              verify=_unique_index("drink", "uq_drink_name")),
+    Migration("0008_floorplan_columns", _strict(database.ensure_floorplan_columns),
+              verify=_columns("floorplanbase.data", "floorplaninstance.data", "floorplaninstance.assignments",
+                              "floorplaninstance.template_id")),
+    Migration("0009_floorplan_instance_reservations", _strict(database.ensure_floorplan_reservations_column),
+              verify=_columns("floorplaninstance.reservations")),
+    Migration("0010_reservation_menu_formula", _strict(database.ensure_menu_formula_column),
+              verify=_columns("reservation.menu_formula")),
+    Migration("0011_reservation_reminder_table", _strict(database.ensure_reminder_table),
+              verify=_tables("reservationreminder")),
+    Migration("0012_billing_po_reference", _strict(database.ensure_billing_po_reference_column),
+              verify=_columns("billinginfo.po_reference")),
+    Migration("0013_supplements_to_items", _strict(database.ensure_supplements_migrated)),
+    Migration("0014_allergen_icons_backfill", _strict(database.backfill_allergen_icons), _allergen_icons_fingerprint),
+    Migration("0015_pg_reservation_slot_constraints", database.run_startup_migrations),
+    Migration("0016_floorplan_version", _strict(database.ensure_floorplan_version_column),
+              verify=_columns("floorplanbase.version", "floorplaninstance.version")),
+]
+
+
+def step_id(m: Migration) -> str:
+    return f"{m.name}@{m.fingerprint()}" if m.fingerprint else m.name
+
+
+def _ensure_version_table() -> None:
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} ("
+            " id VARCHAR(200) PRIMARY KEY,"
+            " applied_at TIMESTAMP NOT NULL,"
+            " duration_ms FLOAT"
+            ")"
+        ))
+
+
+def applied_ids() -> Set[str]:
+    _ensure_version_table()
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(text(f"SELECT id FROM {SCHEMA_VERSION_TABLE}"))}
+
+
+def _record(sid: str, ms: float) -> None:
+    try:
+        with engine.begin() as conn:
+            conn.execute(
+                text(f"INSERT INTO {SCHEMA_VERSION_TABLE} (id, applied_at, duration_ms) VALUES (:id, :at, :ms)"),
+                {"id": sid, "at": datetime.utcnow(), "ms": round(ms, 3)},
+            )
+    except Exception:
+        # Another worker booting at the same time recorded it first
+        pass
+
+
+def run_migrations(dry_run: bool = False) -> List[StepReport]:
+    """Apply the steps not yet recorded in schema_version, in order. Returns one report per step.
+    A step that raises or fails its verification is not recorded (retried on next boot) and does
+    not stop the following ones."""
+    done = applied_ids()
+    report: List[StepReport] = []
+    for m in MIGRATIONS:
+        t0 = time.perf_counter()
+        sid = step_id(m)
+        if sid in done:
+            report.append(StepReport(sid, "skipped", (time.perf_counter() - t0) * 1000))
+            continue
+        if dry_run:
+            report.append(StepReport(sid, "pending", 0.0))
+            continue
+        try:
+            m.run()
+            missing = m.verify() if m.verify else []
+            if missing:
+                raise RuntimeError(f"not applied: {', '.join(missing)}")
+        except Exception as e:
+            report.append(StepReport(sid, "failed", (time.perf_counter() - t0) * 1000, str(e)[:200]))
+            continue
+        ms = (time.perf_counter() - t0) * 1000
+        _record(sid, ms)
+        report.append(StepReport(sid, "applied", ms))
+    return report
+
+
+def format_report(report: List[StepReport], total_ms: float, verbose: bool = False) -> List[str]:
+    counts = {s: sum(1 for r in report if r.status == s) for s in ("applied", "skipped", "failed", "pending")}
+    lines = [
+        f"MIGRATIONS {total_ms:.1f} ms | "
+        + " ".join(f"{k}={v}" for k, v in counts.items() if v or k in ("applied", "skipped"))
+    ]
+    for r in report:
+        if verbose or r.status != "skipped":
+            lines.append(f"  {r.status:<8} {r.ms:9.1f} ms  {r.id}" + (f"  ({r.error})" if r.error else ""))
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.migrations", description="Migrations de schéma versionnées")
+    parser.add_argument("command", nargs="?", choices=("run", "status"), default="run")
+    args = parser.parse_args(argv)
+    t0 = time.perf_counter()
+    report = run_migrations(dry_run=args.command == "status")
+    for line in format_report(report, (time.perf_counter() - t0) * 1000, verbose=True):
+        print(line)
+    return 1 if any(r.status == "failed" for r in report) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,6 +6,7 @@ from typing import List, Optional
 
 from sqlmodel import Field, SQLModel
 from sqlalchemy import UniqueConstraint, CheckConstraint, Index, Column, JSON
+from sqlalchemy.orm import declared_attr
 
 
 class ReservationStatus(str, Enum):
@@ -557,14 +558,21 @@ class FloorPlanBase(SQLModel, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
     name: str = "base"
     data: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    # Bumped by every ORM update (optimistic concurrency for PATCH, conflicting writes fail)
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    @declared_attr
+    def __mapper_args__(cls):
+        return {"version_id_col": cls.__table__.c.version}
+
 
 class FloorPlanBaseRead(SQLModel):
     id: uuid.UUID
     name: str
     data: dict
+    version: int = 1
     created_at: datetime
     updated_at: datetime
 
@@ -582,12 +590,17 @@ class FloorPlanInstance(SQLModel, table=True):
     data: dict = Field(default_factory=dict, sa_column=Column(JSON))
     assignments: dict = Field(default_factory=dict, sa_column=Column(JSON))
     reservations: dict = Field(default_factory=dict, sa_column=Column(JSON))  # Parsed PDF data (not in main reservation table)
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     __table_args__ = (
         UniqueConstraint('service_date', 'service_label', name='uq_floorplan_instance'),
     )
 
+    @declared_attr
+    def __mapper_args__(cls):
+        return {"version_id_col": cls.__table__.c.version}
+
 
 class FloorPlanInstanceRead(SQLModel):
     id: uuid.UUID
@@ -597,6 +610,7 @@ class FloorPlanInstanceRead(SQLModel):
     data: dict
     assignments: dict
     reservations: dict
+    version: int = 1
     created_at: datetime
     updated_at: datetime
 
@@ -612,6 +626,11 @@ class FloorPlanInstanceUpdate(SQLModel):
     reservations: Optional[dict] = None
 
 
+class FloorPlanPatch(SQLModel):
+    version: int  # version the ops were computed against (409 when the plan changed since)
+    ops: List[dict]  # RFC 6902 operations and/or move_table / resize_table / relabel_table
+
+
 class ReservationReminder(SQLModel, table=True):
     """Stores snooze/mute state per reservation for the missing-dishes alert system."""
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Optional
+
+from . import pdf_service
+
+# Parse results of uploaded/imported PDFs keyed by content: sha256 of the file bytes, the parser
+# name and version (plus the parser module on disk) and the parameters the result depends on.
+# Re-importing the same file skips the parsing and only redoes the database side. Entries are JSON
+# files in PDF_DIR/parse_cache; the least recently used (mtime, refreshed on every hit) are removed
+# once the directory exceeds the size limit.
+PARSE_CACHE_DIR = os.path.join(pdf_service.PDF_DIR, "parse_cache")
+PARSE_CACHE_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_MB") or "50") * 1024 * 1024
+HASH_CHUNK = 1024 * 1024
+
+_lock = threading.Lock()
+
+
+def sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _code_sig(module_file: Optional[str]) -> Optional[list]:
+    if not module_file:
+        return None
+    try:
+        st = os.stat(module_file)
+        return [st.st_mtime_ns, st.st_size]
+    except OSError:
+        return None
+
+
+def parse_key(digest: str, parser: str, version: int, module_file: Optional[str] = None, **params: Any) -> str:
+    """Cache key of one parse: file digest + parser identity + the parameters of the parse."""
+    payload = {
+        "sha256": digest,
+        "parser": parser,
+        "version": version,
+        "code": _code_sig(module_file),
+        "params": params,
+    }
+    raw = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _path(key: str) -> str:
+    return os.path.join(PARSE_CACHE_DIR, f"{key}.json")
+
+
+def get(key: str) -> Optional[Any]:
+    """Cached parse result for key, or None. A hit refreshes its mtime for the LRU order."""
+    path = _path(key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            value = json.load(f)
+        os.utime(path, None)
+    except (OSError, ValueError):
+        return None
+    return value
+
+
+def put(key: str, value: Any) -> None:
+    """Store a parse result (JSON-serialisable) and evict old entries. Failures only cost a re-parse."""
+    try:
+        os.makedirs(PARSE_CACHE_DIR, exist_ok=True)
+        path = _path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(value, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except (OSError, TypeError, ValueError):
+        return
+    evict()
+
+
+def evict(max_bytes: Optional[int] = None) -> int:
+    """Remove least recently used entries until the cache fits in max_bytes. Returns files removed."""
+    limit = PARSE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with _lock:
+        entries = []
+        total = 0
+        try:
+            with os.scandir(PARSE_CACHE_DIR) as it:
+                for e in it:
+                    if not e.name.endswith(".json"):
+                        continue
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, e.path))
+                    total += st.st_size
+        except OSError:
+            return 0
+        removed = 0
+        if total <= limit:
+            return 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        return removed
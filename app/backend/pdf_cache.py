@@ -0,0 +1,118 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Iterable, List, Optional
+
+from .models import Reservation, ReservationItem, BillingInfo
+from . import pdf_service
+
+# Generated fiches keyed by content: sha256 of the reservation row, its items, its billing info,
+# the variant and the assets drawn on the page. Files live in PDF_DIR/cache as <key>.pdf and the
+# oldest (by mtime, refreshed on every hit) are removed once the directory exceeds the size limit.
+PDF_CACHE_DIR = os.path.join(pdf_service.PDF_DIR, "cache")
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_MB") or "200") * 1024 * 1024
+
+# Fields that change without changing the document
+_VOLATILE = {"last_pdf_exported_at", "created_at", "updated_at"}
+
+_lock = threading.Lock()
+
+
+def _dump(obj: Any) -> dict:
+    if obj is None:
+        return {}
+    return {k: v for k, v in obj.model_dump().items() if k not in _VOLATILE}
+
+
+def _file_sig(path: Optional[str]) -> Optional[List[Any]]:
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+        return [path, st.st_mtime_ns, st.st_size]
+    except OSError:
+        return None
+
+
+def _render_sig() -> List[Any]:
+    # Any edit of the layout code invalidates previous renders
+    return [_file_sig(pdf_service.__file__), pdf_service._asset_sig(pdf_service._find_stamp())]
+
+
+def reservation_pdf_key(reservation: Reservation, items: Iterable[ReservationItem], billing: Optional[BillingInfo], variant: str) -> str:
+    icons = [pdf_service._asset_sig(pdf_service._find_allergen_icon(k)) for k in pdf_service._parse_allergens(getattr(reservation, "allergens", ""))]
+    payload = {
+        "variant": variant,
+        "reservation": _dump(reservation),
+        "items": [_dump(it) for it in items],
+        "billing": _dump(billing),
+        "icons": icons,
+        "render": _render_sig(),
+    }
+    raw = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _path(key: str) -> str:
+    return os.path.join(PDF_CACHE_DIR, f"{key}.pdf")
+
+
+def get(key: str) -> Optional[bytes]:
+    """Cached PDF bytes for key, or None. A hit refreshes its mtime for the LRU order.
+    The bytes are read here, so a concurrent evict() cannot remove the file under a response."""
+    path = _path(key)
+    try:
+        os.utime(path, None)
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def put(key: str, data: bytes) -> str:
+    """Store a freshly rendered PDF in the cache and evict old entries. Returns the cached path."""
+    os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+    path = _path(key)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    evict()
+    return path
+
+
+def evict(max_bytes: Optional[int] = None) -> int:
+    """Remove least recently used files until the cache fits in max_bytes. Returns files removed."""
+    limit = PDF_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with _lock:
+        entries = []
+        total = 0
+        try:
+            with os.scandir(PDF_CACHE_DIR) as it:
+                for e in it:
+                    if not e.name.endswith(".pdf"):
+                        continue
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, e.path))
+                    total += st.st_size
+        except OSError:
+            return 0
+        removed = 0
+        if total <= limit:
+            return 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        return removed
@@ -0,0 +1,351 @@
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Set
+
+from . import pdf_service
+
+logger = logging.getLogger("app.pdf")
+
+# Background PDF rendering: jobs are persisted in a local SQLite file (independent of DATABASE_URL)
+# and rendered by a bounded process pool. The API only snapshots the rows it needs (plain dicts),
+# so workers never touch the main database.
+PDF_JOBS_DIR = os.path.join(pdf_service.PDF_DIR, "jobs")
+UPLOADS_DIR = os.path.join(PDF_JOBS_DIR, "uploads")
+PDF_JOBS_DB = os.getenv("PDF_JOBS_DB") or os.path.join(PDF_JOBS_DIR, "jobs.sqlite3")
+PDF_JOB_WORKERS = max(1, int(os.getenv("PDF_JOB_WORKERS") or "2"))
+PDF_JOB_TTL_S = int(os.getenv("PDF_JOB_TTL_S") or str(6 * 3600))
+
+STATUSES = ("queued", "running", "done", "error")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pdf_job (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    dedup_key TEXT NOT NULL,
+    params BLOB NOT NULL,
+    filename TEXT NOT NULL,
+    status TEXT NOT NULL,
+    path TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_pdf_job_status ON pdf_job (status, created_at);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_pdf_job_inflight ON pdf_job (dedup_key) WHERE status IN ('queued', 'running');
+"""
+
+
+# ---- Renderers (run in worker processes) ----
+
+def _ns(data: Optional[dict]):
+    from types import SimpleNamespace
+    return SimpleNamespace(**data) if data is not None else None
+
+
+def _render_reservation(p: dict) -> bytes:
+    res, items, billing = _ns(p["reservation"]), [_ns(it) for it in p["items"]], _ns(p.get("billing"))
+    v = p.get("variant") or "both"
+    if v == "salle":
+        return pdf_service.render_pdf(pdf_service.generate_reservation_pdf_salle, res, items, billing)[0]
+    if v == "cuisine":
+        return pdf_service.render_pdf(pdf_service.generate_reservation_pdf_cuisine, res, items)[0]
+    return pdf_service.render_pdf(pdf_service.generate_reservation_pdf_both, res, items, billing)[0]
+
+
+def _render_day(p: dict) -> bytes:
+    reservations = [_ns(r) for r in p["reservations"]]
+    items_by_res = {rid: [_ns(it) for it in items] for rid, items in p["items_by_res"].items()}
+    return pdf_service.render_pdf(pdf_service.generate_day_pdf, p["date"], reservations, items_by_res, workers=0)[0]
+
+
+def _render_invoice(p: dict) -> bytes:
+    return pdf_service.render_pdf(pdf_service.generate_invoice_pdf, _ns(p["reservation"]), [_ns(it) for it in p["items"]], _ns(p["billing"]), [])[0]
+
+
+def _render_incident(p: dict) -> bytes:
+    return pdf_service.render_pdf(pdf_service.generate_incident_report_pdf, _ns(p["incident"]))[0]
+
+
+def _floorplan_reservations(p: dict):
+    from .routers.floorplan import _load_reservations
+    return _load_reservations(None, p["service_date"], p.get("service_label"), instance=_ns({"reservations": p["reservations"]}))
+
+
+def _render_floorplan_instance(p: dict) -> bytes:
+    from .routers.floorplan import _render_instance_pdf
+    pdf_bytes, _ = _render_instance_pdf(p["plan"], p["assignments"], _floorplan_reservations(p))
+    return pdf_bytes
+
+
+def _render_floorplan_annotated(p: dict) -> bytes:
+    from .routers.floorplan import _render_annotated_pdf
+    with open(p["upload_path"], "rb") as f:
+        orig = f.read()
+    return _render_annotated_pdf(orig, p["plan"], p["assignments"], _floorplan_reservations(p), **p["layout"])
+
+
+# kind -> renderer returning the PDF bytes (or the path of a generated file)
+RENDERERS: Dict[str, Callable[[dict], Any]] = {
+    "reservation": _render_reservation,
+    "day": _render_day,
+    "invoice": _render_invoice,
+    "incident": _render_incident,
+    "floorplan_instance": _render_floorplan_instance,
+    "floorplan_annotated": _render_floorplan_annotated,
+}
+
+
+def _run_job(kind: str, params: dict, out_path: str, assets: int = 0) -> str:
+    pdf_service.sync_assets(assets)
+    result = RENDERERS[kind](params)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    if isinstance(result, (bytes, bytearray)):
+        tmp = out_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(result)
+        os.replace(tmp, out_path)
+    else:
+        os.replace(result, out_path)
+    return out_path
+
+
+# ---- Queue ----
+
+def dedup_key(kind: str, params: dict) -> str:
+    raw = json.dumps({"kind": kind, "params": params}, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def save_upload(data: bytes) -> str:
+    """Store an uploaded PDF by content hash so identical uploads share one file (and dedup key)."""
+    os.makedirs(UPLOADS_DIR, exist_ok=True)
+    path = os.path.join(UPLOADS_DIR, f"{hashlib.sha256(data).hexdigest()}.pdf")
+    if not os.path.exists(path):
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    else:
+        os.utime(path, None)
+    return path
+
+
+def _row(r: sqlite3.Row) -> Dict[str, Any]:
+    d = {k: r[k] for k in r.keys() if k != "params"}
+    for k in ("created_at", "started_at", "finished_at"):
+        if d.get(k) is not None:
+            d[k] = round(d[k], 3)
+    return d
+
+
+class JobQueue:
+    """SQLite-backed queue drained by a dispatcher thread into a ProcessPoolExecutor.
+
+    At most `workers` jobs run at once; submitting a job identical to one still queued or
+    running returns the existing job instead of rendering twice.
+    """
+
+    def __init__(self, db_path: str = PDF_JOBS_DB, workers: int = PDF_JOB_WORKERS) -> None:
+        self.db_path = db_path
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pool = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = 0
+        self._retried: Set[str] = set()  # jobs already requeued once after a worker crash
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        # Jobs left running by a previous process go back to the queue
+        self._db.execute("UPDATE pdf_job SET status = 'queued', started_at = NULL WHERE status = 'running'")
+
+    def _q(self, sql: str, args: tuple = ()) -> list:
+        with self._lock:
+            return self._db.execute(sql, args).fetchall()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, name="pdf-jobs", daemon=True)
+            self._thread.start()
+
+    def submit(self, kind: str, params: dict, filename: str) -> Dict[str, Any]:
+        if kind not in RENDERERS:
+            raise ValueError(f"unknown job kind: {kind}")
+        key = dedup_key(kind, params)
+        self.start()
+        with self._lock:
+            existing = self._db.execute(
+                "SELECT * FROM pdf_job WHERE dedup_key = ? AND status IN ('queued', 'running')", (key,)
+            ).fetchone()
+            if existing:
+                return {**_row(existing), "deduplicated": True}
+            job_id = str(uuid.uuid4())
+            self._db.execute(
+                "INSERT INTO pdf_job (id, kind, dedup_key, params, filename, status, created_at) VALUES (?, ?, ?, ?, ?, 'queued', ?)",
+                (job_id, kind, key, pickle.dumps(params), filename, time.time()),
+            )
+            row = self._db.execute("SELECT * FROM pdf_job WHERE id = ?", (job_id,)).fetchone()
+        self._wake.set()
+        return {**_row(row), "deduplicated": False}
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._q("SELECT * FROM pdf_job WHERE id = ?", (job_id,))
+        return _row(rows[0]) if rows else None
+
+    def metrics(self) -> Dict[str, Any]:
+        counts = {s: 0 for s in STATUSES}
+        for r in self._q("SELECT status, COUNT(*) AS n FROM pdf_job GROUP BY status"):
+            counts[r["status"]] = r["n"]
+        timing = self._q(
+            "SELECT AVG(started_at - created_at) AS wait, AVG(finished_at - started_at) AS run FROM pdf_job "
+            "WHERE status = 'done' AND finished_at > ?", (time.time() - 3600,)
+        )[0]
+        oldest = self._q("SELECT MIN(created_at) AS t FROM pdf_job WHERE status = 'queued'")[0]["t"]
+        return {
+            "queue_depth": counts["queued"],
+            "running": counts["running"],
+            "workers": self.workers,
+            "by_status": counts,
+            "oldest_queued_s": round(time.time() - oldest, 3) if oldest else 0.0,
+            "avg_wait_ms_1h": round((timing["wait"] or 0.0) * 1000, 1),
+            "avg_run_ms_1h": round((timing["run"] or 0.0) * 1000, 1),
+        }
+
+    def _get_pool(self):
+        if self._pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def _drop_pool(self, pool) -> None:
+        """Forget a broken pool (a worker crashed or was OOM-killed) so the next dispatch builds a new one."""
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _loop(self) -> None:
+        last_gc = 0.0
+        while True:
+            self._wake.wait(timeout=1.0)
+            self._wake.clear()
+            try:
+                self._dispatch()
+                if time.time() - last_gc > 300:
+                    last_gc = time.time()
+                    self.gc()
+            except Exception:  # keep the dispatcher alive
+                logger.exception("pdf-jobs dispatcher error")
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._lock:
+                if self._running >= self.workers:
+                    return
+                row = self._db.execute(
+                    "SELECT * FROM pdf_job WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if not row:
+                    return
+                self._db.execute("UPDATE pdf_job SET status = 'running', started_at = ? WHERE id = ?", (time.time(), row["id"]))
+                self._running += 1
+            out_path = os.path.join(PDF_JOBS_DIR, f"{row['id']}.pdf")
+            pool = None
+            try:
+                pool = self._get_pool()
+                fut = pool.submit(_run_job, row["kind"], pickle.loads(row["params"]), out_path, pdf_service.assets_version())
+            except Exception as e:
+                broken = isinstance(e, BrokenProcessPool)
+                if broken and pool is not None:
+                    self._drop_pool(pool)
+                with self._lock:
+                    if broken:
+                        # Not the job's fault: back to the queue, rendered by the rebuilt pool
+                        self._db.execute("UPDATE pdf_job SET status = 'queued', started_at = NULL WHERE id = ?", (row["id"],))
+                    else:
+                        self._db.execute(
+                            "UPDATE pdf_job SET status = 'error', error = ?, finished_at = ? WHERE id = ?",
+                            (f"{type(e).__name__}: {e}"[:500], time.time(), row["id"]),
+                        )
+                    self._running -= 1
+                logger.warning("pdf-jobs submit failed for %s (%s)", row["id"], "requeued" if broken else "error", exc_info=True)
+                return
+            fut.add_done_callback(lambda f, job_id=row["id"], pool=pool: self._finish(job_id, f, pool))
+
+    def _finish(self, job_id: str, fut, pool=None) -> None:
+        broken = False
+        try:
+            path, error, status = fut.result(), None, "done"
+        except BrokenProcessPool as e:
+            broken = True
+            logger.warning("pdf-jobs worker pool broke while rendering %s", job_id)
+            if pool is not None:
+                self._drop_pool(pool)
+            path, error, status = None, f"{type(e).__name__}: {e}"[:500], "error"
+        except Exception as e:
+            path, error, status = None, f"{type(e).__name__}: {e}"[:500], "error"
+        with self._lock:
+            # Every job in flight on a crashed pool fails with it: retry each once, then report the error
+            if broken and job_id not in self._retried:
+                self._retried.add(job_id)
+                self._db.execute("UPDATE pdf_job SET status = 'queued', started_at = NULL WHERE id = ?", (job_id,))
+            else:
+                self._retried.discard(job_id)
+                self._db.execute(
+                    "UPDATE pdf_job SET status = ?, path = ?, error = ?, finished_at = ? WHERE id = ?",
+                    (status, path, error, time.time(), job_id),
+                )
+            self._running -= 1
+        self._wake.set()
+
+    def gc(self, ttl_s: Optional[int] = None) -> int:
+        """Drop finished jobs (and their files) older than ttl_s. Returns jobs removed."""
+        cutoff = time.time() - (PDF_JOB_TTL_S if ttl_s is None else ttl_s)
+        rows = self._q("SELECT id, path FROM pdf_job WHERE status IN ('done', 'error') AND finished_at < ?", (cutoff,))
+        for r in rows:
+            if r["path"]:
+                try:
+                    os.remove(r["path"])
+                except OSError:
+                    pass
+            self._q("DELETE FROM pdf_job WHERE id = ?", (r["id"],))
+        # Uploads are content-addressed and may be shared by several jobs: expire them by age
+        try:
+            with os.scandir(UPLOADS_DIR) as it:
+                for e in it:
+                    if e.is_file() and e.stat().st_mtime < cutoff:
+                        os.remove(e.path)
+        except OSError:
+            pass
+        # Files left directly under PDF_DIR by direct generate_* calls
+        pdf_service.gc_generated_pdfs()
+        return len(rows)
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_queue() -> JobQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
@@ -0,0 +1,26 @@
+from __future__ import annotations
+from typing import Dict, Iterator, Optional
+from urllib.parse import quote
+
+from fastapi.responses import StreamingResponse
+
+# PDFs rendered in memory (pdf_service.render_pdf) are streamed in chunks instead of being
+# written under PDF_DIR and read back by a FileResponse.
+CHUNK_SIZE = 64 * 1024
+
+
+def _chunks(data: bytes) -> Iterator[bytes]:
+    view = memoryview(data)
+    for i in range(0, len(view), CHUNK_SIZE):
+        yield bytes(view[i:i + CHUNK_SIZE])
+
+
+def stream_pdf(data: bytes, filename: str, headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    """Download response for PDF bytes, with the same Content-Disposition as FileResponse."""
+    quoted = quote(filename)
+    if quoted != filename:
+        disposition = f"attachment; filename*=utf-8''{quoted}"
+    else:
+        disposition = f'attachment; filename="{filename}"'
+    out = {**(headers or {}), "Content-Disposition": disposition, "Content-Length": str(len(data))}
+    return StreamingResponse(_chunks(data), media_type="application/pdf", headers=out)
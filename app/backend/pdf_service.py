@@ -6,9 +6,13 @@ def _reservation_filename_variant(reservation: Reservation, variant: str) -> str
         v = "cuisine"
     return os.path.join(PDF_DIR, f"fiche_{v}_{reservation.service_date}_{safe_client}_{reservation.id}.pdf")
 
+import logging
 import os
+import threading
+import time
 from datetime import date
-from typing import List, Optional
+from functools import lru_cache
+from typing import BinaryIO, Callable, Dict, List, NamedTuple, Optional, Tuple
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -17,9 +21,12 @@ from reportlab.pdfgen import canvas
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image as RLImage, PageBreak
 from reportlab.platypus.flowables import HRFlowable
 from reportlab.lib.units import cm
+from reportlab.lib.utils import ImageReader
 
 from .models import Reservation, ReservationItem, BillingInfo, IncidentReport, InvoiceSupplement
 
+logger = logging.getLogger("app.pdf")
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PDF_DIR = os.getenv("PDF_DIR") or os.path.abspath(os.path.join(BASE_DIR, "../generated_pdfs"))
 ASSETS_DIR = os.path.join(BASE_DIR, "assets")
@@ -53,19 +60,57 @@ def _incident_filename(incident: IncidentReport) -> str:
     return os.path.join(PDF_DIR, f"incident_{incident.date}_{safe_client}_{incident.id}.pdf")
 
 
-def generate_incident_report_pdf(incident: IncidentReport) -> str:
+# ---- Output: file under PDF_DIR or in-memory buffer ----
+# Every generate_* function takes an optional `out` buffer: when given, the document is written
+# there and nothing is created on disk (the returned path is then only the download name).
+PDF_RETENTION_S = int(float(os.getenv("PDF_RETENTION_H") or "24") * 3600)
+
+
+def _target(out: Optional[BinaryIO], filename: str):
+    return out if out is not None else filename
+
+
+def render_pdf(generate: Callable[..., str], *args, **kwargs) -> Tuple[bytes, str]:
+    """Run a generate_* function into memory. Returns (pdf bytes, download file name)."""
+    import io
+    buf = io.BytesIO()
+    path = generate(*args, out=buf, **kwargs)
+    return buf.getvalue(), os.path.basename(path)
+
+
+def gc_generated_pdfs(max_age_s: Optional[int] = None) -> int:
+    """Remove PDFs left directly under PDF_DIR for longer than PDF_RETENTION_H hours.
+
+    Sub-directories (cache/, jobs/) have their own eviction. Returns the number of files removed.
+    """
+    cutoff = time.time() - (PDF_RETENTION_S if max_age_s is None else max_age_s)
+    removed = 0
+    try:
+        with os.scandir(PDF_DIR) as it:
+            for e in it:
+                if not e.is_file() or not e.name.lower().endswith(".pdf"):
+                    continue
+                try:
+                    if e.stat().st_mtime < cutoff:
+                        os.remove(e.path)
+                        removed += 1
+                except OSError:
+                    pass
+    except OSError:
+        pass
+    return removed
+
+
+def generate_incident_report_pdf(incident: IncidentReport, out: Optional[BinaryIO] = None) -> str:
     filename = _incident_filename(incident)
-    doc = SimpleDocTemplate(filename, pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=54)
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name="Section", fontSize=12, leading=14, spaceBefore=6, spaceAfter=4, textColor=colors.HexColor("#111111")))
-    styles.add(ParagraphStyle(name="Meta", fontSize=10, leading=13))
-    styles.add(ParagraphStyle(name="TitleBar", parent=styles['Title'], textColor=colors.white, backColor=colors.HexColor('#111827'), leading=22, spaceAfter=6))
+    doc = SimpleDocTemplate(_target(out, filename), pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=54)
+    styles = _fiche_styles()
     story = []
 
     title = f"Rapport d'incident – {getattr(incident, 'client', None) or 'Client'} – {_format_date_fr(incident.date)}"
     story.append(Paragraph(title, styles['TitleBar']))
     story.append(Spacer(1, 6))
-    story.append(HRFlowable(width='100%', thickness=2, color=colors.HexColor('#60a5fa')))
+    story.append(_hr_bar())
     story.append(Spacer(1, 10))
 
     meta_data = [
@@ -77,13 +122,7 @@ def generate_incident_report_pdf(incident: IncidentReport) -> str:
         [Paragraph("Gravité", styles['Meta']), Paragraph(str(getattr(incident, 'gravite', None) or '-'), styles['Meta'])],
     ]
     meta_tbl = Table(meta_data, colWidths=[110, None])
-    meta_tbl.setStyle(TableStyle([
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ('TEXTCOLOR', (0,0), (0,-1), colors.HexColor('#374151')),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-        ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
-        ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#f9fafb')),
-    ]))
+    meta_tbl.setStyle(_TS_INCIDENT_META)
     story.append(meta_tbl)
     story.append(Spacer(1, 12))
 
@@ -114,7 +153,138 @@ def _split_items(items: List[ReservationItem]):
     return entrees, plats, desserts, supplements
 
 
-def _find_stamp_path() -> str | None:
+# ---- Image assets (final stamp, allergen icons) ----
+# Decoded once per process and served from memory: a render does not touch the files. Entries are
+# keyed by path and remember the file mtime/size they were read with (used by the PDF cache key).
+# invalidate_assets() drops them in the process handling an upload and touches a marker file in
+# PDF_DIR; other processes (uvicorn or pool workers) stat that marker at most every
+# PDF_ASSETS_RECHECK_S seconds and drop their cache when it changed. sync_assets() makes pool
+# workers catch up immediately with the version of the process that queued the work.
+
+class _Asset(NamedTuple):
+    path: str
+    mtime_ns: int
+    size: int
+    reader: ImageReader
+
+
+class _AssetImage(RLImage):
+    """RLImage drawn from an already decoded ImageReader (no file access at layout or draw)."""
+
+    def __init__(self, asset: _Asset, width=None, height=None):
+        super().__init__(asset.path, width=width, height=height)
+        self._img = asset.reader
+
+
+_assets_lock = threading.Lock()
+_assets: Dict[str, Optional[_Asset]] = {}  # path -> asset, None when missing/unreadable
+_stamp_path: List[Optional[str]] = []  # resolved stamp path, empty until first lookup
+_assets_version = 0
+_ASSETS_MARKER = os.path.join(PDF_DIR, ".assets_version")
+ASSETS_RECHECK_S = float(os.getenv("PDF_ASSETS_RECHECK_S") or "2")
+
+
+def _marker_mtime() -> Optional[int]:
+    try:
+        return os.stat(_ASSETS_MARKER).st_mtime_ns
+    except OSError:
+        return None
+
+
+_marker_mtime_ns = _marker_mtime()
+_marker_checked_at = time.monotonic()
+
+
+def _check_assets_marker() -> None:
+    """Drop the cache when another process invalidated assets (throttled marker stat)."""
+    global _marker_checked_at, _marker_mtime_ns
+    now = time.monotonic()
+    if now - _marker_checked_at < ASSETS_RECHECK_S:
+        return
+    _marker_checked_at = now
+    mtime = _marker_mtime()
+    if mtime != _marker_mtime_ns:
+        with _assets_lock:
+            _assets.clear()
+            _stamp_path.clear()
+            _marker_mtime_ns = mtime
+
+
+def _load_asset(path: str) -> Optional[_Asset]:
+    try:
+        st = os.stat(path)
+        reader = ImageReader(path)
+        reader.getRGBData()  # decode now, keep the pixels with the reader
+    except Exception:
+        return None
+    return _Asset(path, st.st_mtime_ns, st.st_size, reader)
+
+
+def _get_asset(path: str) -> Optional[_Asset]:
+    _check_assets_marker()
+    try:
+        return _assets[path]
+    except KeyError:
+        pass
+    asset = _load_asset(path)
+    with _assets_lock:
+        _assets[path] = asset
+    return asset
+
+
+def _asset_sig(asset: Optional[_Asset]) -> Optional[list]:
+    return [asset.path, asset.mtime_ns, asset.size] if asset else None
+
+
+def _asset_image(asset: _Asset, width=None, height=None) -> RLImage:
+    return _AssetImage(asset, width=width, height=height)
+
+
+def invalidate_assets(path: Optional[str] = None) -> None:
+    """Forget a cached image (or all of them); it is read again on next use."""
+    global _assets_version, _marker_mtime_ns
+    with _assets_lock:
+        if path is None:
+            _assets.clear()
+        else:
+            _assets.pop(path, None)
+        _stamp_path.clear()
+        _assets_version += 1
+        try:
+            os.makedirs(PDF_DIR, exist_ok=True)
+            with open(_ASSETS_MARKER, "w") as f:
+                f.write(str(time.time_ns()))
+            _marker_mtime_ns = _marker_mtime()
+        except OSError:
+            pass
+
+
+def assets_version() -> int:
+    return _assets_version
+
+
+def sync_assets(version: int) -> None:
+    """Called in worker processes: drop everything if the parent invalidated assets since."""
+    global _assets_version
+    if version != _assets_version:
+        with _assets_lock:
+            _assets.clear()
+            _stamp_path.clear()
+            _assets_version = version
+
+
+def warm_assets() -> int:
+    """Preload the stamp and every allergen icon. Returns the number of images loaded."""
+    paths = [_find_stamp_path()]
+    try:
+        icons_dir = os.path.join(ASSETS_DIR, "allergens")
+        paths += [os.path.join(icons_dir, n) for n in sorted(os.listdir(icons_dir)) if n.lower().endswith(".png")]
+    except Exception:
+        pass
+    return sum(1 for p in paths if p and _get_asset(p))
+
+
+def _resolve_stamp_path() -> str | None:
     # 1) Explicit path via ENV
     env_path = os.getenv("FINAL_STAMP_PATH")
     if env_path and os.path.isfile(env_path):
@@ -133,19 +303,31 @@ def _find_stamp_path() -> str | None:
     return None
 
 
+def _find_stamp_path() -> str | None:
+    _check_assets_marker()
+    if not _stamp_path:
+        path = _resolve_stamp_path()
+        with _assets_lock:
+            _stamp_path[:] = [path]
+    return _stamp_path[0]
+
+
+def _find_stamp() -> Optional[_Asset]:
+    path = _find_stamp_path()
+    return _get_asset(path) if path else None
+
+
 def _draw_final_stamp(c: canvas.Canvas, page_width: float, position: str = 'top_right'):
     c.saveState()
     # Try PNG first
     try:
-        img_path = _find_stamp_path()
-        if img_path and os.path.isfile(img_path):
+        stamp = _find_stamp()
+        if stamp:
             # Target width, keep aspect
             target_w = 160
-            from PIL import Image as PILImage  # pillow is in requirements
-            with PILImage.open(img_path) as im:
-                w, h = im.size
-                ratio = target_w / float(w)
-                target_h = h * ratio
+            w, h = stamp.reader.getSize()
+            ratio = target_w / float(w)
+            target_h = h * ratio
             # Compute placement per position
             try:
                 page_w, page_h = c._pagesize  # type: ignore[attr-defined]
@@ -159,7 +341,7 @@ def _draw_final_stamp(c: canvas.Canvas, page_width: float, position: str = 'top_
             else:  # bottom_center
                 x = (page_w - target_w) / 2
                 y = 18
-            c.drawImage(img_path, x, y, width=target_w, height=target_h, mask='auto', preserveAspectRatio=True, anchor='sw')
+            c.drawImage(stamp.reader, x, y, width=target_w, height=target_h, mask='auto', preserveAspectRatio=True, anchor='sw')
             c.restoreState()
             return
     except Exception as e:
@@ -197,9 +379,8 @@ def _parse_allergens(csv: str | None) -> list[str]:
     return [s.strip() for s in str(csv).split(',') if s and s.strip()]
 
 
-def _find_allergen_icon(key: str) -> str | None:
-    p = os.path.join(ASSETS_DIR, "allergens", f"{key}.png")
-    return p if os.path.isfile(p) else None
+def _find_allergen_icon(key: str) -> Optional[_Asset]:
+    return _get_asset(os.path.join(ASSETS_DIR, "allergens", f"{key}.png"))
 
 
 def _drink_variant(label: str | None) -> str:
@@ -244,20 +425,144 @@ def _format_date_fr(d: date) -> str:
     return f"{jours[d.weekday()]} {d.day:02d}/{d.month:02d}/{d.year}"
 
 
-def generate_reservation_pdf(reservation: Reservation, items: List[ReservationItem]) -> str:
-    filename = _reservation_filename(reservation)
+# ---- Shared styles (built once per process) ----
+# ReportLab only reads paragraph and table styles while laying out, so one instance can serve every
+# render. The style sheets are shared too: callers must not add to or modify them.
 
-    doc = SimpleDocTemplate(filename, pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36 + 5*cm, bottomMargin=54)
+@lru_cache(maxsize=1)
+def _fiche_styles():
     styles = getSampleStyleSheet()
     styles.add(ParagraphStyle(name="Section", fontSize=12, leading=14, spaceBefore=6, spaceAfter=4, textColor=colors.HexColor("#111111")))
     styles.add(ParagraphStyle(name="Meta", fontSize=10, leading=13))
     styles.add(ParagraphStyle(name="TitleBar", parent=styles['Title'], textColor=colors.white, backColor=colors.HexColor('#111827'), leading=22, spaceAfter=6))
+    styles.add(ParagraphStyle(name="NoteStyle", parent=styles['Normal'], leading=14, spaceBefore=4, spaceAfter=4))
+    return styles
+
+
+@lru_cache(maxsize=1)
+def _invoice_styles():
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name="H1", fontSize=18, leading=22, spaceAfter=10))
+    styles.add(ParagraphStyle(name="H2", fontSize=12, leading=16, spaceAfter=6, textColor=colors.HexColor('#374151')))
+    styles.add(ParagraphStyle(name="Meta", fontSize=10, leading=14))
+    return styles
+
+
+_TS_META = TableStyle([
+    ('VALIGN', (0,0), (-1,-1), 'TOP'),
+    ('TEXTCOLOR', (0,0), (0,-1), colors.HexColor('#374151')),
+    ('BOTTOMPADDING', (0,0), (-1,-1), 4),
+])
+
+_TS_INCIDENT_META = TableStyle(_TS_META.getCommands() + [
+    ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
+    ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#f9fafb')),
+])
+
+_TS_ITEMS = TableStyle([
+    # Ligne d'en-tête colorée
+    ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#111827')),
+    ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+    ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
+    ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+    ('ALIGN', (0,1), (0,-1), 'CENTER'),
+    ('LEFTPADDING', (0,0), (-1,-1), 6),
+    ('RIGHTPADDING', (0,0), (-1,-1), 6),
+    ('TOPPADDING', (0,0), (-1,-1), 4),
+    ('BOTTOMPADDING', (0,0), (-1,-1), 4),
+    # Alternance légère des lignes de données
+    ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#f9fafb')]),
+])
+
+_TS_BILLING = TableStyle([
+    ('VALIGN', (0,0), (-1,-1), 'TOP'),
+    ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
+    ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#f9fafb')),
+    ('LEFTPADDING', (0,0), (-1,-1), 6),
+    ('RIGHTPADDING', (0,0), (-1,-1), 6),
+    ('TOPPADDING', (0,0), (-1,-1), 4),
+    ('BOTTOMPADDING', (0,0), (-1,-1), 4),
+])
+
+_TS_ALLERGENS = TableStyle([
+    ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+    ('LEFTPADDING', (0,0), (-1,-1), 0),
+    ('RIGHTPADDING', (0,0), (-1,-1), 6),
+])
+
+_TS_NOTES = TableStyle([
+    ('BOX', (0,0), (-1,-1), 0.5, colors.HexColor('#60a5fa')),
+    ('INNERGRID', (0,0), (-1,-1), 0.25, colors.HexColor('#bfdbfe')),
+    ('LEFTPADDING', (0,0), (-1,-1), 10),
+    ('RIGHTPADDING', (0,0), (-1,-1), 10),
+    ('TOPPADDING', (0,0), (-1,-1), 8),
+    ('BOTTOMPADDING', (0,0), (-1,-1), 8),
+    ('VALIGN', (0,0), (-1,-1), 'TOP'),
+])
+
+_TS_INVOICE_HEADER = TableStyle([
+    ('VALIGN', (0,0), (-1,-1), 'TOP'),
+    ('ALIGN', (1,0), (1,0), 'RIGHT'),
+])
+
+_TS_INVOICE_META = TableStyle([
+    ('VALIGN', (0,0), (-1,-1), 'TOP'),
+    ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
+    ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#f0f9ff')),
+    ('LEFTPADDING', (0,0), (-1,-1), 6),
+    ('RIGHTPADDING', (0,0), (-1,-1), 6),
+    ('TOPPADDING', (0,0), (-1,-1), 5),
+    ('BOTTOMPADDING', (0,0), (-1,-1), 5),
+    ('ROWBACKGROUNDS', (0,0), (-1,-1), [colors.white, colors.HexColor('#f9fafb')]),
+])
+
+_TS_INVOICE_SUPPLEMENTS = TableStyle([
+    ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
+    ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#111827')),
+    ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+    ('ALIGN', (1,1), (1,-1), 'CENTER'),
+    ('LEFTPADDING', (0,0), (-1,-1), 6),
+    ('RIGHTPADDING', (0,0), (-1,-1), 6),
+    ('TOPPADDING', (0,0), (-1,-1), 4),
+    ('BOTTOMPADDING', (0,0), (-1,-1), 4),
+    ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#f9fafb')]),
+])
+
+
+@lru_cache(maxsize=None)
+def _drink_table_style(variant: str) -> TableStyle:
+    bg, fg, bd = _drink_palette(variant)
+    return TableStyle([
+        ('BOX', (0,0), (-1,-1), 0.5, bd),
+        ('BACKGROUND', (0,0), (-1,-1), bg),
+        ('TEXTCOLOR', (0,0), (-1,-1), fg),
+        ('LEFTPADDING', (0,0), (-1,-1), 6),
+        ('RIGHTPADDING', (0,0), (-1,-1), 6),
+        ('TOPPADDING', (0,0), (-1,-1), 4),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 4),
+    ])
+
+
+_HR_BAR = HRFlowable(width='100%', thickness=2, color=colors.HexColor('#60a5fa'))
+
+
+def _hr_bar() -> HRFlowable:
+    # Les flowables gardent leur mise en page (wrap): une copie par usage
+    import copy
+    return copy.copy(_HR_BAR)
+
+
+def generate_reservation_pdf(reservation: Reservation, items: List[ReservationItem], out: Optional[BinaryIO] = None) -> str:
+    filename = _reservation_filename(reservation)
+
+    doc = SimpleDocTemplate(_target(out, filename), pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36 + 5*cm, bottomMargin=54)
+    styles = _fiche_styles()
     story = []
 
     title = f"{reservation.client_name} – {_format_date_fr(reservation.service_date)}"
     story.append(Paragraph(title, styles['TitleBar']))
     story.append(Spacer(1, 6))
-    story.append(HRFlowable(width='100%', thickness=2, color=colors.HexColor('#60a5fa')))
+    story.append(_hr_bar())
     story.append(Spacer(1, 10))
 
     meta_data = [
@@ -266,11 +571,7 @@ def generate_reservation_pdf(reservation: Reservation, items: List[ReservationIt
         [Paragraph("Couverts", styles['Meta']), Paragraph(str(reservation.pax), styles['Meta'])],
     ]
     meta_tbl = Table(meta_data, colWidths=[110, None])
-    meta_tbl.setStyle(TableStyle([
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ('TEXTCOLOR', (0,0), (0,-1), colors.HexColor('#374151')),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-    ]))
+    meta_tbl.setStyle(_TS_META)
     story.append(meta_tbl)
     story.append(Spacer(1, 14))
 
@@ -290,20 +591,7 @@ def generate_reservation_pdf(reservation: Reservation, items: List[ReservationIt
                     desc = f"{it.name}<br/><font size=9 color='#6b7280'>{safe_c}</font>"
                 data.append([str(it.quantity), Paragraph(desc, styles['Meta'])])
         tbl = Table(data, colWidths=[40, None])
-        tbl.setStyle(TableStyle([
-            # Ligne d'en-tête colorée
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#111827')),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-            ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('ALIGN', (0,1), (0,-1), 'CENTER'),
-            ('LEFTPADDING', (0,0), (-1,-1), 6),
-            ('RIGHTPADDING', (0,0), (-1,-1), 6),
-            ('TOPPADDING', (0,0), (-1,-1), 4),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-            # Alternance légère des lignes de données
-            ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#f9fafb')]),
-        ]))
+        tbl.setStyle(_TS_ITEMS)
         story.append(tbl)
         story.append(Spacer(1, 10))
 
@@ -316,17 +604,8 @@ def generate_reservation_pdf(reservation: Reservation, items: List[ReservationIt
     story.append(Paragraph("<b>Formule boissons :</b>", styles['Section']))
     drink_text = reservation.drink_formula or "-"
     variant = _drink_variant(drink_text)
-    bg, fg, bd = _drink_palette(variant)
     fb_tbl = Table([[drink_text]], colWidths=[None])
-    fb_tbl.setStyle(TableStyle([
-        ('BOX', (0,0), (-1,-1), 0.5, bd),
-        ('BACKGROUND', (0,0), (-1,-1), bg),
-        ('TEXTCOLOR', (0,0), (-1,-1), fg),
-        ('LEFTPADDING', (0,0), (-1,-1), 6),
-        ('RIGHTPADDING', (0,0), (-1,-1), 6),
-        ('TOPPADDING', (0,0), (-1,-1), 4),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-    ]))
+    fb_tbl.setStyle(_drink_table_style(variant))
     story.append(fb_tbl)
     story.append(Spacer(1, 10))
 
@@ -351,15 +630,7 @@ def generate_reservation_pdf(reservation: Reservation, items: List[ReservationIt
         if getattr(billing, 'payment_terms', None):
             rows2.append([Paragraph("Conditions de paiement", styles['Meta']), Paragraph(str(billing.payment_terms), styles['Meta'])])
         bill_tbl = Table(rows2, colWidths=[160, None])
-        bill_tbl.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-            ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#f9fafb')),
-            ('LEFTPADDING', (0,0), (-1,-1), 6),
-            ('RIGHTPADDING', (0,0), (-1,-1), 6),
-            ('TOPPADDING', (0,0), (-1,-1), 4),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-        ]))
+        bill_tbl.setStyle(_TS_BILLING)
         story.append(bill_tbl)
         story.append(Spacer(1, 10))
 
@@ -374,7 +645,7 @@ def generate_reservation_pdf(reservation: Reservation, items: List[ReservationIt
             icon = _find_allergen_icon(key)
             if icon:
                 try:
-                    row.append(RLImage(icon, width=20, height=20))
+                    row.append(_asset_image(icon, width=20, height=20))
                     # Afficher aussi le libellé à côté de l'icône
                     row.append(Paragraph(key, styles['Meta']))
                 except Exception:
@@ -382,11 +653,7 @@ def generate_reservation_pdf(reservation: Reservation, items: List[ReservationIt
             else:
                 row.append(Paragraph(key, styles['Meta']))
         tbl = Table([row])
-        tbl.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('LEFTPADDING', (0,0), (-1,-1), 0),
-            ('RIGHTPADDING', (0,0), (-1,-1), 6),
-        ]))
+        tbl.setStyle(_TS_ALLERGENS)
         story.append(tbl)
     story.append(Spacer(1, 10))
 
@@ -408,13 +675,7 @@ def generate_reservation_pdf(reservation: Reservation, items: List[ReservationIt
         return text
     
     # Créer un style pour les notes avec support du HTML
-    note_style = ParagraphStyle(
-        'NoteStyle',
-        parent=styles['Normal'],
-        leading=14,
-        spaceBefore=4,
-        spaceAfter=4
-    )
+    note_style = styles['NoteStyle']
     
     # Créer un paragraphe avec formatage HTML
     formatted_notes = format_text(notes)
@@ -422,15 +683,7 @@ def generate_reservation_pdf(reservation: Reservation, items: List[ReservationIt
     
     # Créer un tableau avec une seule cellule pour le paragraphe formaté
     note_tbl = Table([[note_para]], colWidths=[doc.width])
-    note_tbl.setStyle(TableStyle([
-        ('BOX', (0,0), (-1,-1), 0.5, colors.HexColor('#60a5fa')),
-        ('INNERGRID', (0,0), (-1,-1), 0.25, colors.HexColor('#bfdbfe')),
-        ('LEFTPADDING', (0,0), (-1,-1), 10),
-        ('RIGHTPADDING', (0,0), (-1,-1), 10),
-        ('TOPPADDING', (0,0), (-1,-1), 8),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 8),
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-    ]))
+    note_tbl.setStyle(_TS_NOTES)
     story.append(note_tbl)
 
     # Build with onLaterPages to add stamp if needed by drawing after flowables
@@ -442,17 +695,14 @@ def generate_reservation_pdf(reservation: Reservation, items: List[ReservationIt
     return filename
 
 
-def generate_reservation_pdf_both(reservation: Reservation, items: List[ReservationItem], billing: BillingInfo | None = None) -> str:
+def generate_reservation_pdf_both(reservation: Reservation, items: List[ReservationItem], billing: BillingInfo | None = None, out: Optional[BinaryIO] = None) -> str:
     """Build a single PDF with salle page first (no extra top margin), then cuisine page
     (with 5cm top offset), and duplicate the cuisine page if desserts are present with
     quantity > 0.
     """
     filename = _reservation_filename_variant(reservation, "both")
-    doc = SimpleDocTemplate(filename, pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=54)
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name="Section", fontSize=12, leading=14, spaceBefore=6, spaceAfter=4, textColor=colors.HexColor("#111111")))
-    styles.add(ParagraphStyle(name="Meta", fontSize=10, leading=13))
-    styles.add(ParagraphStyle(name="TitleBar", parent=styles['Title'], textColor=colors.white, backColor=colors.HexColor('#111827'), leading=22, spaceAfter=6))
+    doc = SimpleDocTemplate(_target(out, filename), pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=54)
+    styles = _fiche_styles()
 
     entrees, plats, desserts, supplements = _split_items(items)
 
@@ -461,7 +711,7 @@ def generate_reservation_pdf_both(reservation: Reservation, items: List[Reservat
         title = f"{reservation.client_name} – {_format_date_fr(reservation.service_date)}"
         s.append(Paragraph(title, styles['TitleBar']))
         s.append(Spacer(1, 6))
-        s.append(HRFlowable(width='100%', thickness=2, color=colors.HexColor('#60a5fa')))
+        s.append(_hr_bar())
         s.append(Spacer(1, 10))
 
         meta_data = [
@@ -472,11 +722,7 @@ def generate_reservation_pdf_both(reservation: Reservation, items: List[Reservat
         if getattr(reservation, 'on_invoice', False):
             meta_data.append([Paragraph("Sur facture", styles['Meta']), Paragraph("Oui", styles['Meta'])])
         meta_tbl = Table(meta_data, colWidths=[110, None])
-        meta_tbl.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-            ('TEXTCOLOR', (0,0), (0,-1), colors.HexColor('#374151')),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-        ]))
+        meta_tbl.setStyle(_TS_META)
         s.append(meta_tbl)
         s.append(Spacer(1, 14))
 
@@ -493,18 +739,7 @@ def generate_reservation_pdf_both(reservation: Reservation, items: List[Reservat
                         desc = f"{it.name}<br/><font size=9 color='#6b7280'>{safe_c}</font>"
                     data.append([str(it.quantity), Paragraph(desc, styles['Meta'])])
             tbl = Table(data, colWidths=[40, None])
-            tbl.setStyle(TableStyle([
-                ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#111827')),
-                ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-                ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-                ('ALIGN', (0,1), (0,-1), 'CENTER'),
-                ('LEFTPADDING', (0,0), (-1,-1), 6),
-                ('RIGHTPADDING', (0,0), (-1,-1), 6),
-                ('TOPPADDING', (0,0), (-1,-1), 4),
-                ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-                ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#f9fafb')]),
-            ]))
+            tbl.setStyle(_TS_ITEMS)
             s.append(tbl)
             s.append(Spacer(1, 10))
 
@@ -518,17 +753,8 @@ def generate_reservation_pdf_both(reservation: Reservation, items: List[Reservat
         s.append(Paragraph("<b>Formule boissons :</b>", styles['Section']))
         drink_text = reservation.drink_formula or "-"
         variant = _drink_variant(drink_text)
-        bg, fg, bd = _drink_palette(variant)
         fb_tbl = Table([[drink_text]], colWidths=[None])
-        fb_tbl.setStyle(TableStyle([
-            ('BOX', (0,0), (-1,-1), 0.5, bd),
-            ('BACKGROUND', (0,0), (-1,-1), bg),
-            ('TEXTCOLOR', (0,0), (-1,-1), fg),
-            ('LEFTPADDING', (0,0), (-1,-1), 6),
-            ('RIGHTPADDING', (0,0), (-1,-1), 6),
-            ('TOPPADDING', (0,0), (-1,-1), 4),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-        ]))
+        fb_tbl.setStyle(_drink_table_style(variant))
         s.append(fb_tbl)
         s.append(Spacer(1, 10))
 
@@ -553,15 +779,7 @@ def generate_reservation_pdf_both(reservation: Reservation, items: List[Reservat
             if getattr(billing, 'payment_terms', None):
                 rows_b.append([Paragraph("Conditions de paiement", styles['Meta']), Paragraph(str(billing.payment_terms), styles['Meta'])])
             bill_tbl = Table(rows_b, colWidths=[160, None])
-            bill_tbl.setStyle(TableStyle([
-                ('VALIGN', (0,0), (-1,-1), 'TOP'),
-                ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
-                ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#f9fafb')),
-                ('LEFTPADDING', (0,0), (-1,-1), 6),
-                ('RIGHTPADDING', (0,0), (-1,-1), 6),
-                ('TOPPADDING', (0,0), (-1,-1), 4),
-                ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-            ]))
+            bill_tbl.setStyle(_TS_BILLING)
             s.append(bill_tbl)
             s.append(Spacer(1, 10))
 
@@ -576,18 +794,14 @@ def generate_reservation_pdf_both(reservation: Reservation, items: List[Reservat
                 icon = _find_allergen_icon(key)
                 if icon:
                     try:
-                        row.append(RLImage(icon, width=20, height=20))
+                        row.append(_asset_image(icon, width=20, height=20))
                         row.append(Paragraph(key, styles['Meta']))
                     except Exception:
                         row.append(Paragraph(key, styles['Meta']))
                 else:
                     row.append(Paragraph(key, styles['Meta']))
             tbl = Table([row])
-            tbl.setStyle(TableStyle([
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-                ('LEFTPADDING', (0,0), (-1,-1), 0),
-                ('RIGHTPADDING', (0,0), (-1,-1), 6),
-            ]))
+            tbl.setStyle(_TS_ALLERGENS)
             s.append(tbl)
         s.append(Spacer(1, 10))
 
@@ -603,19 +817,11 @@ def generate_reservation_pdf_both(reservation: Reservation, items: List[Reservat
             text = re.sub(r'\[color=([^\]]+)\](.*?)\[/color\]', r'<font color="\1">\2</font>', text)
             text = text.replace('\n- ', '<br/>• ')
             return text
-        note_style = ParagraphStyle('NoteStyle', parent=styles['Normal'], leading=14, spaceBefore=4, spaceAfter=4)
+        note_style = styles['NoteStyle']
         formatted_notes = format_text(notes)
         note_para = Paragraph(formatted_notes, note_style)
         note_tbl = Table([[note_para]], colWidths=[doc.width])
-        note_tbl.setStyle(TableStyle([
-            ('BOX', (0,0), (-1,-1), 0.5, colors.HexColor('#60a5fa')),
-            ('INNERGRID', (0,0), (-1,-1), 0.25, colors.HexColor('#bfdbfe')),
-            ('LEFTPADDING', (0,0), (-1,-1), 10),
-            ('RIGHTPADDING', (0,0), (-1,-1), 10),
-            ('TOPPADDING', (0,0), (-1,-1), 8),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 8),
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ]))
+        note_tbl.setStyle(_TS_NOTES)
         s.append(note_tbl)
         return s
 
@@ -626,7 +832,7 @@ def generate_reservation_pdf_both(reservation: Reservation, items: List[Reservat
         title = f"{_format_date_fr(reservation.service_date)} – {reservation.client_name}"
         s.append(Paragraph(title, styles['TitleBar']))
         s.append(Spacer(1, 6))
-        s.append(HRFlowable(width='100%', thickness=2, color=colors.HexColor('#60a5fa')))
+        s.append(_hr_bar())
         s.append(Spacer(1, 10))
 
         meta_data = [
@@ -635,11 +841,7 @@ def generate_reservation_pdf_both(reservation: Reservation, items: List[Reservat
             [Paragraph("Couverts", styles['Meta']), Paragraph(str(reservation.pax), styles['Meta'])],
         ]
         meta_tbl = Table(meta_data, colWidths=[110, None])
-        meta_tbl.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-            ('TEXTCOLOR', (0,0), (0,-1), colors.HexColor('#374151')),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-        ]))
+        meta_tbl.setStyle(_TS_META)
         s.append(meta_tbl)
         s.append(Spacer(1, 14))
 
@@ -656,18 +858,7 @@ def generate_reservation_pdf_both(reservation: Reservation, items: List[Reservat
                         desc = f"{it.name}<br/><font size=9 color='#6b7280'>{safe_c}</font>"
                     data.append([str(it.quantity), Paragraph(desc, styles['Meta'])])
             tbl = Table(data, colWidths=[40, None])
-            tbl.setStyle(TableStyle([
-                ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#111827')),
-                ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-                ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-                ('ALIGN', (0,1), (0,-1), 'CENTER'),
-                ('LEFTPADDING', (0,0), (-1,-1), 6),
-                ('RIGHTPADDING', (0,0), (-1,-1), 6),
-                ('TOPPADDING', (0,0), (-1,-1), 4),
-                ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-                ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#f9fafb')]),
-            ]))
+            tbl.setStyle(_TS_ITEMS)
             s.append(tbl)
             s.append(Spacer(1, 10))
 
@@ -688,18 +879,14 @@ def generate_reservation_pdf_both(reservation: Reservation, items: List[Reservat
                 icon = _find_allergen_icon(key)
                 if icon:
                     try:
-                        row.append(RLImage(icon, width=20, height=20))
+                        row.append(_asset_image(icon, width=20, height=20))
                         row.append(Paragraph(key, styles['Meta']))
                     except Exception:
                         row.append(Paragraph(key, styles['Meta']))
                 else:
                     row.append(Paragraph(key, styles['Meta']))
             tbl = Table([row])
-            tbl.setStyle(TableStyle([
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-                ('LEFTPADDING', (0,0), (-1,-1), 0),
-                ('RIGHTPADDING', (0,0), (-1,-1), 6),
-            ]))
+            tbl.setStyle(_TS_ALLERGENS)
             s.append(tbl)
         s.append(Spacer(1, 10))
         return s
@@ -733,14 +920,11 @@ def generate_reservation_pdf_both(reservation: Reservation, items: List[Reservat
     return filename
 
 
-def generate_reservation_pdf_cuisine(reservation: Reservation, items: List[ReservationItem]) -> str:
+def generate_reservation_pdf_cuisine(reservation: Reservation, items: List[ReservationItem], out: Optional[BinaryIO] = None) -> str:
     filename = _reservation_filename_variant(reservation, "cuisine")
 
-    doc = SimpleDocTemplate(filename, pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36 + 5*cm, bottomMargin=54)
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name="Section", fontSize=12, leading=14, spaceBefore=6, spaceAfter=4, textColor=colors.HexColor("#111111")))
-    styles.add(ParagraphStyle(name="Meta", fontSize=10, leading=13))
-    styles.add(ParagraphStyle(name="TitleBar", parent=styles['Title'], textColor=colors.white, backColor=colors.HexColor('#111827'), leading=22, spaceAfter=6))
+    doc = SimpleDocTemplate(_target(out, filename), pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36 + 5*cm, bottomMargin=54)
+    styles = _fiche_styles()
 
     entrees, plats, desserts, supplements = _split_items(items)
 
@@ -749,7 +933,7 @@ def generate_reservation_pdf_cuisine(reservation: Reservation, items: List[Reser
         title = f"{_format_date_fr(reservation.service_date)} – {reservation.client_name}"
         page_story.append(Paragraph(title, styles['TitleBar']))
         page_story.append(Spacer(1, 6))
-        page_story.append(HRFlowable(width='100%', thickness=2, color=colors.HexColor('#60a5fa')))
+        page_story.append(_hr_bar())
         page_story.append(Spacer(1, 10))
 
         meta_data = [
@@ -758,11 +942,7 @@ def generate_reservation_pdf_cuisine(reservation: Reservation, items: List[Reser
             [Paragraph("Couverts", styles['Meta']), Paragraph(str(reservation.pax), styles['Meta'])],
         ]
         meta_tbl = Table(meta_data, colWidths=[110, None])
-        meta_tbl.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-            ('TEXTCOLOR', (0,0), (0,-1), colors.HexColor('#374151')),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-        ]))
+        meta_tbl.setStyle(_TS_META)
         page_story.append(meta_tbl)
         page_story.append(Spacer(1, 14))
 
@@ -779,18 +959,7 @@ def generate_reservation_pdf_cuisine(reservation: Reservation, items: List[Reser
                         desc = f"{it.name}<br/><font size=9 color='#6b7280'>{safe_c}</font>"
                     data.append([str(it.quantity), Paragraph(desc, styles['Meta'])])
             tbl = Table(data, colWidths=[40, None])
-            tbl.setStyle(TableStyle([
-                ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#111827')),
-                ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-                ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-                ('ALIGN', (0,1), (0,-1), 'CENTER'),
-                ('LEFTPADDING', (0,0), (-1,-1), 6),
-                ('RIGHTPADDING', (0,0), (-1,-1), 6),
-                ('TOPPADDING', (0,0), (-1,-1), 4),
-                ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-                ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#f9fafb')]),
-            ]))
+            tbl.setStyle(_TS_ITEMS)
             page_story.append(tbl)
             page_story.append(Spacer(1, 10))
 
@@ -810,18 +979,14 @@ def generate_reservation_pdf_cuisine(reservation: Reservation, items: List[Reser
                 icon = _find_allergen_icon(key)
                 if icon:
                     try:
-                        row.append(RLImage(icon, width=20, height=20))
+                        row.append(_asset_image(icon, width=20, height=20))
                         row.append(Paragraph(key, styles['Meta']))
                     except Exception:
                         row.append(Paragraph(key, styles['Meta']))
                 else:
                     row.append(Paragraph(key, styles['Meta']))
             tbl = Table([row])
-            tbl.setStyle(TableStyle([
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-                ('LEFTPADDING', (0,0), (-1,-1), 0),
-                ('RIGHTPADDING', (0,0), (-1,-1), 6),
-            ]))
+            tbl.setStyle(_TS_ALLERGENS)
             page_story.append(tbl)
         page_story.append(Spacer(1, 10))
         return page_story
@@ -844,20 +1009,17 @@ def generate_reservation_pdf_cuisine(reservation: Reservation, items: List[Reser
     return filename
 
 
-def generate_reservation_pdf_salle(reservation: Reservation, items: List[ReservationItem], billing: BillingInfo | None = None) -> str:
+def generate_reservation_pdf_salle(reservation: Reservation, items: List[ReservationItem], billing: BillingInfo | None = None, out: Optional[BinaryIO] = None) -> str:
     filename = _reservation_filename_variant(reservation, "salle")
 
-    doc = SimpleDocTemplate(filename, pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=54)
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name="Section", fontSize=12, leading=14, spaceBefore=6, spaceAfter=4, textColor=colors.HexColor("#111111")))
-    styles.add(ParagraphStyle(name="Meta", fontSize=10, leading=13))
-    styles.add(ParagraphStyle(name="TitleBar", parent=styles['Title'], textColor=colors.white, backColor=colors.HexColor('#111827'), leading=22, spaceAfter=6))
+    doc = SimpleDocTemplate(_target(out, filename), pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=54)
+    styles = _fiche_styles()
 
     story: list = []
     title = f"{reservation.client_name} – {_format_date_fr(reservation.service_date)}"
     story.append(Paragraph(title, styles['TitleBar']))
     story.append(Spacer(1, 6))
-    story.append(HRFlowable(width='100%', thickness=2, color=colors.HexColor('#60a5fa')))
+    story.append(_hr_bar())
     story.append(Spacer(1, 10))
 
     meta_data = [
@@ -868,11 +1030,7 @@ def generate_reservation_pdf_salle(reservation: Reservation, items: List[Reserva
     if getattr(reservation, 'on_invoice', False):
         meta_data.append([Paragraph("Sur facture", styles['Meta']), Paragraph("Oui", styles['Meta'])])
     meta_tbl = Table(meta_data, colWidths=[110, None])
-    meta_tbl.setStyle(TableStyle([
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ('TEXTCOLOR', (0,0), (0,-1), colors.HexColor('#374151')),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-    ]))
+    meta_tbl.setStyle(_TS_META)
     story.append(meta_tbl)
     story.append(Spacer(1, 14))
 
@@ -891,18 +1049,7 @@ def generate_reservation_pdf_salle(reservation: Reservation, items: List[Reserva
                     desc = f"{it.name}<br/><font size=9 color='#6b7280'>{safe_c}</font>"
                 data.append([str(it.quantity), Paragraph(desc, styles['Meta'])])
         tbl = Table(data, colWidths=[40, None])
-        tbl.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#111827')),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-            ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('ALIGN', (0,1), (0,-1), 'CENTER'),
-            ('LEFTPADDING', (0,0), (-1,-1), 6),
-            ('RIGHTPADDING', (0,0), (-1,-1), 6),
-            ('TOPPADDING', (0,0), (-1,-1), 4),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-            ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#f9fafb')]),
-        ]))
+        tbl.setStyle(_TS_ITEMS)
         story.append(tbl)
         story.append(Spacer(1, 10))
 
@@ -916,17 +1063,8 @@ def generate_reservation_pdf_salle(reservation: Reservation, items: List[Reserva
     story.append(Paragraph("<b>Formule boissons :</b>", styles['Section']))
     drink_text = reservation.drink_formula or "-"
     variant = _drink_variant(drink_text)
-    bg, fg, bd = _drink_palette(variant)
     fb_tbl = Table([[drink_text]], colWidths=[None])
-    fb_tbl.setStyle(TableStyle([
-        ('BOX', (0,0), (-1,-1), 0.5, bd),
-        ('BACKGROUND', (0,0), (-1,-1), bg),
-        ('TEXTCOLOR', (0,0), (-1,-1), fg),
-        ('LEFTPADDING', (0,0), (-1,-1), 6),
-        ('RIGHTPADDING', (0,0), (-1,-1), 6),
-        ('TOPPADDING', (0,0), (-1,-1), 4),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-    ]))
+    fb_tbl.setStyle(_drink_table_style(variant))
     story.append(fb_tbl)
     story.append(Spacer(1, 10))
 
@@ -941,18 +1079,14 @@ def generate_reservation_pdf_salle(reservation: Reservation, items: List[Reserva
             icon = _find_allergen_icon(key)
             if icon:
                 try:
-                    row.append(RLImage(icon, width=20, height=20))
+                    row.append(_asset_image(icon, width=20, height=20))
                     row.append(Paragraph(key, styles['Meta']))
                 except Exception:
                     row.append(Paragraph(key, styles['Meta']))
             else:
                 row.append(Paragraph(key, styles['Meta']))
         tbl = Table([row])
-        tbl.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('LEFTPADDING', (0,0), (-1,-1), 0),
-            ('RIGHTPADDING', (0,0), (-1,-1), 6),
-        ]))
+        tbl.setStyle(_TS_ALLERGENS)
         story.append(tbl)
     story.append(Spacer(1, 10))
 
@@ -968,19 +1102,11 @@ def generate_reservation_pdf_salle(reservation: Reservation, items: List[Reserva
         text = re.sub(r'\[color=([^\]]+)\](.*?)\[/color\]', r'<font color="\1">\2</font>', text)
         text = text.replace('\n- ', '<br/>• ')
         return text
-    note_style = ParagraphStyle('NoteStyle', parent=styles['Normal'], leading=14, spaceBefore=4, spaceAfter=4)
+    note_style = styles['NoteStyle']
     formatted_notes = format_text(notes)
     note_para = Paragraph(formatted_notes, note_style)
     note_tbl = Table([[note_para]], colWidths=[doc.width])
-    note_tbl.setStyle(TableStyle([
-        ('BOX', (0,0), (-1,-1), 0.5, colors.HexColor('#60a5fa')),
-        ('INNERGRID', (0,0), (-1,-1), 0.25, colors.HexColor('#bfdbfe')),
-        ('LEFTPADDING', (0,0), (-1,-1), 10),
-        ('RIGHTPADDING', (0,0), (-1,-1), 10),
-        ('TOPPADDING', (0,0), (-1,-1), 8),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 8),
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-    ]))
+    note_tbl.setStyle(_TS_NOTES)
     story.append(note_tbl)
 
     def on_page(canvas_obj, doc_obj):
@@ -989,14 +1115,12 @@ def generate_reservation_pdf_salle(reservation: Reservation, items: List[Reserva
 
     doc.build(story, onLaterPages=on_page, onFirstPage=on_page)
     return filename
-def generate_day_pdf(d: date, reservations: List[Reservation], items_by_res: dict) -> str:
-    filename = _day_filename(d)
-    doc = SimpleDocTemplate(filename, pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=54)
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name="Section", fontSize=12, leading=14, spaceBefore=6, spaceAfter=4, textColor=colors.HexColor("#111111")))
-    styles.add(ParagraphStyle(name="Meta", fontSize=10, leading=13))
-    styles.add(ParagraphStyle(name="TitleBar", parent=styles['Title'], textColor=colors.white, backColor=colors.HexColor('#111827'), leading=22, spaceAfter=6))
+def _day_doc(target) -> SimpleDocTemplate:
+    return SimpleDocTemplate(target, pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=54)
+
 
+def _day_section(res: Reservation, items: List[ReservationItem], styles, doc_width: float) -> list:
+    """Flowables of one reservation in the day sheet (each one starts on its own page)."""
     story: list = []
 
     def section_builder(container: list, title: str, collection: List[ReservationItem]):
@@ -1012,124 +1136,180 @@ def generate_day_pdf(d: date, reservations: List[Reservation], items_by_res: dic
                     desc = f"{it.name}<br/><font size=9 color='#6b7280'>{safe_c}</font>"
                 data.append([str(it.quantity), Paragraph(desc, styles['Meta'])])
         tbl = Table(data, colWidths=[40, None])
-        tbl.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#111827')),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-            ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('ALIGN', (0,1), (0,-1), 'CENTER'),
-            ('LEFTPADDING', (0,0), (-1,-1), 6),
-            ('RIGHTPADDING', (0,0), (-1,-1), 6),
-            ('TOPPADDING', (0,0), (-1,-1), 4),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-            ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#f9fafb')]),
-        ]))
+        tbl.setStyle(_TS_ITEMS)
         container.append(tbl)
         container.append(Spacer(1, 10))
 
-    for idx, res in enumerate(reservations):
-        # Title
-        title = f"{res.client_name} – {_format_date_fr(res.service_date)}"
-        story.append(Paragraph(title, styles['TitleBar']))
-        story.append(Spacer(1, 6))
-        story.append(HRFlowable(width='100%', thickness=2, color=colors.HexColor('#60a5fa')))
-        story.append(Spacer(1, 10))
+    # Title
+    title = f"{res.client_name} – {_format_date_fr(res.service_date)}"
+    story.append(Paragraph(title, styles['TitleBar']))
+    story.append(Spacer(1, 6))
+    story.append(_hr_bar())
+    story.append(Spacer(1, 10))
 
-        # Meta
-        meta_data = [
-            [Paragraph("Client", styles['Meta']), Paragraph(str(res.client_name), styles['Meta'])],
-            [Paragraph("Heure d’arrivée", styles['Meta']), Paragraph(str(res.arrival_time), styles['Meta'])],
-            [Paragraph("Couverts", styles['Meta']), Paragraph(str(res.pax), styles['Meta'])],
-        ]
-        if getattr(res, 'on_invoice', False):
-            meta_data.append([Paragraph("Sur facture", styles['Meta']), Paragraph("Oui", styles['Meta'])])
-        meta_tbl = Table(meta_data, colWidths=[110, None])
-        meta_tbl.setStyle(TableStyle([
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-            ('TEXTCOLOR', (0,0), (0,-1), colors.HexColor('#374151')),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-        ]))
-        story.append(meta_tbl)
-        story.append(Spacer(1, 14))
+    # Meta
+    meta_data = [
+        [Paragraph("Client", styles['Meta']), Paragraph(str(res.client_name), styles['Meta'])],
+        [Paragraph("Heure d’arrivée", styles['Meta']), Paragraph(str(res.arrival_time), styles['Meta'])],
+        [Paragraph("Couverts", styles['Meta']), Paragraph(str(res.pax), styles['Meta'])],
+    ]
+    if getattr(res, 'on_invoice', False):
+        meta_data.append([Paragraph("Sur facture", styles['Meta']), Paragraph("Oui", styles['Meta'])])
+    meta_tbl = Table(meta_data, colWidths=[110, None])
+    meta_tbl.setStyle(_TS_META)
+    story.append(meta_tbl)
+    story.append(Spacer(1, 14))
 
-        entrees, plats, desserts, supplements = _split_items(items_by_res.get(str(res.id), []))
-        section_builder(story, "Entrées :", entrees)
-        section_builder(story, "Plats :", plats)
-        section_builder(story, "Desserts :", desserts)
-        if supplements:
-            section_builder(story, "Suppléments hors menu :", supplements)
+    entrees, plats, desserts, supplements = _split_items(items)
+    section_builder(story, "Entrées :", entrees)
+    section_builder(story, "Plats :", plats)
+    section_builder(story, "Desserts :", desserts)
+    if supplements:
+        section_builder(story, "Suppléments hors menu :", supplements)
 
-        # Drink formula (same badge style as salle)
-        story.append(Paragraph("<b>Formule boissons :</b>", styles['Section']))
-        drink_text = res.drink_formula or "-"
-        variant = _drink_variant(drink_text)
-        bg, fg, bd = _drink_palette(variant)
-        fb_tbl = Table([[drink_text]], colWidths=[None])
-        fb_tbl.setStyle(TableStyle([
-            ('BOX', (0,0), (-1,-1), 0.5, bd),
-            ('BACKGROUND', (0,0), (-1,-1), bg),
-            ('TEXTCOLOR', (0,0), (-1,-1), fg),
-            ('LEFTPADDING', (0,0), (-1,-1), 6),
-            ('RIGHTPADDING', (0,0), (-1,-1), 6),
-            ('TOPPADDING', (0,0), (-1,-1), 4),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-        ]))
-        story.append(fb_tbl)
-        story.append(Spacer(1, 10))
+    # Drink formula (same badge style as salle)
+    story.append(Paragraph("<b>Formule boissons :</b>", styles['Section']))
+    drink_text = res.drink_formula or "-"
+    variant = _drink_variant(drink_text)
+    fb_tbl = Table([[drink_text]], colWidths=[None])
+    fb_tbl.setStyle(_drink_table_style(variant))
+    story.append(fb_tbl)
+    story.append(Spacer(1, 10))
 
-        # Allergènes (même présentation que salle)
-        story.append(Paragraph("<b>Allergènes :</b>", styles['Section']))
-        alls = _parse_allergens(getattr(res, 'allergens', ''))
-        if not alls:
-            story.append(Paragraph("-", styles['Meta']))
-        else:
-            row = []
-            for key in alls:
-                icon = _find_allergen_icon(key)
-                if icon:
-                    try:
-                        row.append(RLImage(icon, width=20, height=20))
-                        row.append(Paragraph(key, styles['Meta']))
-                    except Exception:
-                        row.append(Paragraph(key, styles['Meta']))
-                else:
+    # Allergènes (même présentation que salle)
+    story.append(Paragraph("<b>Allergènes :</b>", styles['Section']))
+    alls = _parse_allergens(getattr(res, 'allergens', ''))
+    if not alls:
+        story.append(Paragraph("-", styles['Meta']))
+    else:
+        row = []
+        for key in alls:
+            icon = _find_allergen_icon(key)
+            if icon:
+                try:
+                    row.append(_asset_image(icon, width=20, height=20))
                     row.append(Paragraph(key, styles['Meta']))
-            tbl = Table([row])
-            tbl.setStyle(TableStyle([
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-                ('LEFTPADDING', (0,0), (-1,-1), 0),
-                ('RIGHTPADDING', (0,0), (-1,-1), 6),
-            ]))
-            story.append(tbl)
-        story.append(Spacer(1, 10))
+                except Exception:
+                    row.append(Paragraph(key, styles['Meta']))
+            else:
+                row.append(Paragraph(key, styles['Meta']))
+        tbl = Table([row])
+        tbl.setStyle(_TS_ALLERGENS)
+        story.append(tbl)
+    story.append(Spacer(1, 10))
 
-        # Notes (bloc style salle)
-        notes = res.notes or ""
-        story.append(Paragraph("<b>Notes :</b>", styles['Section']))
-        note_style = ParagraphStyle('NoteStyle', parent=styles['Normal'], leading=14, spaceBefore=4, spaceAfter=4)
-        # Simple conversion des marqueurs de formatage custom
-        import re as _re
-        txt = notes
-        if txt:
-            txt = txt.replace('*', '<b>', 1).replace('*', '</b>', 1)
-            txt = txt.replace('_', '<i>', 1).replace('_', '</i>', 1)
-            txt = _re.sub(r'\[color=([^\]]+)\](.*?)\[/color\]', r'<font color="\1">\2</font>', txt)
-            txt = txt.replace('\n- ', '<br/>• ')
-        else:
-            txt = "-"
-        note_para = Paragraph(txt, note_style)
-        note_tbl = Table([[note_para]], colWidths=[doc.width])
-        note_tbl.setStyle(TableStyle([
-            ('BOX', (0,0), (-1,-1), 0.5, colors.HexColor('#60a5fa')),
-            ('INNERGRID', (0,0), (-1,-1), 0.25, colors.HexColor('#bfdbfe')),
-            ('LEFTPADDING', (0,0), (-1,-1), 10),
-            ('RIGHTPADDING', (0,0), (-1,-1), 10),
-            ('TOPPADDING', (0,0), (-1,-1), 8),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 8),
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ]))
-        story.append(note_tbl)
+    # Notes (bloc style salle)
+    notes = res.notes or ""
+    story.append(Paragraph("<b>Notes :</b>", styles['Section']))
+    note_style = styles['NoteStyle']
+    # Simple conversion des marqueurs de formatage custom
+    import re as _re
+    txt = notes
+    if txt:
+        txt = txt.replace('*', '<b>', 1).replace('*', '</b>', 1)
+        txt = txt.replace('_', '<i>', 1).replace('_', '</i>', 1)
+        txt = _re.sub(r'\[color=([^\]]+)\](.*?)\[/color\]', r'<font color="\1">\2</font>', txt)
+        txt = txt.replace('\n- ', '<br/>• ')
+    else:
+        txt = "-"
+    note_para = Paragraph(txt, note_style)
+    note_tbl = Table([[note_para]], colWidths=[doc_width])
+    note_tbl.setStyle(_TS_NOTES)
+    story.append(note_tbl)
 
+
+    return story
+
+
+def _render_day_section(res_data: dict, items_data: List[dict], assets: int = 0) -> bytes:
+    """Process-pool worker: one reservation of the day sheet rendered as a standalone PDF."""
+    from types import SimpleNamespace
+    import io
+    sync_assets(assets)
+    res = SimpleNamespace(**res_data)
+    items = [SimpleNamespace(**it) for it in items_data]
+    buf = io.BytesIO()
+    doc = _day_doc(buf)
+    doc.build(_day_section(res, items, _fiche_styles(), doc.width))
+    return buf.getvalue()
+
+
+# Day sheets: reservations rendered in parallel processes from this many reservations on
+# (PDF_DAY_WORKERS=0 keeps the single-threaded path)
+PDF_DAY_WORKERS = int(os.getenv("PDF_DAY_WORKERS") or "0")
+PDF_DAY_PARALLEL_MIN = 8
+_day_pool = None
+_day_pool_workers = 0
+_day_pool_lock = threading.Lock()
+
+
+def _get_day_pool(workers: int):
+    """Shared pool, rebuilt when a caller asks for another size or after it broke."""
+    global _day_pool, _day_pool_workers
+    with _day_pool_lock:
+        if _day_pool is not None and _day_pool_workers != workers:
+            # Jobs already submitted to the old pool still complete
+            _day_pool.shutdown(wait=False)
+            _day_pool = None
+        if _day_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            _day_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _day_pool_workers = workers
+        return _day_pool
+
+
+def _drop_day_pool(pool) -> None:
+    """Forget a pool whose worker crashed (BrokenProcessPool) so the next day sheet builds a new one."""
+    global _day_pool
+    with _day_pool_lock:
+        if _day_pool is not pool:
+            return
+        _day_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _generate_day_pdf_parallel(target, reservations: List[Reservation], items_by_res: dict, workers: int) -> None:
+    import io
+    from concurrent.futures.process import BrokenProcessPool
+    from pypdf import PdfReader, PdfWriter
+    pool = _get_day_pool(workers)
+    version = assets_version()
+    try:
+        jobs = [
+            pool.submit(_render_day_section, res.model_dump(), [it.model_dump() for it in items_by_res.get(str(res.id), [])], version)
+            for res in reservations
+        ]
+        parts = [job.result() for job in jobs]
+    except BrokenProcessPool:
+        _drop_day_pool(pool)
+        raise
+    writer = PdfWriter()
+    for part in parts:
+        for page in PdfReader(io.BytesIO(part)).pages:
+            writer.add_page(page)
+    writer.write(target)
+
+
+def generate_day_pdf(d: date, reservations: List[Reservation], items_by_res: dict, workers: Optional[int] = None, out: Optional[BinaryIO] = None) -> str:
+    """All fiches of a day in one PDF. With workers > 1 (default PDF_DAY_WORKERS) and enough
+    reservations, each reservation is rendered in a process pool and the pages are concatenated
+    with pypdf; the pages are the same as the sequential build since every fiche starts a new page.
+    """
+    filename = _day_filename(d)
+    workers = PDF_DAY_WORKERS if workers is None else workers
+    if workers > 1 and len(reservations) >= PDF_DAY_PARALLEL_MIN:
+        try:
+            _generate_day_pdf_parallel(_target(out, filename), reservations, items_by_res, workers)
+            return filename
+        except Exception:
+            # pypdf missing, pool unavailable or a fiche failing in a worker: sequential build
+            logger.warning("Day sheet %s: parallel build failed, falling back to sequential", d, exc_info=True)
+    doc = _day_doc(_target(out, filename))
+    styles = _fiche_styles()
+    story: list = []
+    for idx, res in enumerate(reservations):
+        story.extend(_day_section(res, items_by_res.get(str(res.id), []), styles, doc.width))
         # Saut de page entre les réservations
         if idx < len(reservations) - 1:
             story.append(PageBreak())
@@ -1158,7 +1338,7 @@ def _deduce_formula(items: List[ReservationItem]) -> str:
     return "-"
 
 
-def generate_invoice_pdf(reservation: Reservation, items: List[ReservationItem], billing: BillingInfo, supplements: Optional[List[InvoiceSupplement]] = None) -> str:
+def generate_invoice_pdf(reservation: Reservation, items: List[ReservationItem], billing: BillingInfo, supplements: Optional[List[InvoiceSupplement]] = None, out: Optional[BinaryIO] = None) -> str:
     filename = _invoice_filename(reservation)
     if supplements is None:
         supplements = []
@@ -1167,11 +1347,8 @@ def generate_invoice_pdf(reservation: Reservation, items: List[ReservationItem],
         return s.lower().strip().replace("é", "e")
     item_supplements = [i for i in items if _norm(i.type) in ["supplement", "supplements"]]
 
-    doc = SimpleDocTemplate(filename, pagesize=A4, rightMargin=36, leftMargin=36, topMargin=48 + 5*cm, bottomMargin=48)
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name="H1", fontSize=18, leading=22, spaceAfter=10))
-    styles.add(ParagraphStyle(name="H2", fontSize=12, leading=16, spaceAfter=6, textColor=colors.HexColor('#374151')))
-    styles.add(ParagraphStyle(name="Meta", fontSize=10, leading=14))
+    doc = SimpleDocTemplate(_target(out, filename), pagesize=A4, rightMargin=36, leftMargin=36, topMargin=48 + 5*cm, bottomMargin=48)
+    styles = _invoice_styles()
 
     story: list = []
 
@@ -1179,10 +1356,7 @@ def generate_invoice_pdf(reservation: Reservation, items: List[ReservationItem],
     title_tbl = Table([
         [Paragraph("<b>FEUILLE DE FACTURATION (INTERNE)</b>", styles['H1']), Paragraph(f"Date: {_format_date_fr(reservation.service_date)}<br/>N° facture: ", styles['Meta'])]
     ], colWidths=[None, 220])
-    title_tbl.setStyle(TableStyle([
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ('ALIGN', (1,0), (1,0), 'RIGHT'),
-    ]))
+    title_tbl.setStyle(_TS_INVOICE_HEADER)
     story.append(title_tbl)
     story.append(Spacer(1, 10))
 
@@ -1208,10 +1382,7 @@ def generate_invoice_pdf(reservation: Reservation, items: List[ReservationItem],
     left = Paragraph("<br/>".join([str(x) for x in bill_to_lines if x]), styles['Meta'])
     right = Paragraph("<b>Client</b><br/>" + str(reservation.client_name), styles['Meta'])
     addr_tbl = Table([[left, right]], colWidths=[None, 220])
-    addr_tbl.setStyle(TableStyle([
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ('ALIGN', (1,0), (1,0), 'RIGHT'),
-    ]))
+    addr_tbl.setStyle(_TS_INVOICE_HEADER)
     story.append(addr_tbl)
     story.append(Spacer(1, 16))
 
@@ -1225,16 +1396,7 @@ def generate_invoice_pdf(reservation: Reservation, items: List[ReservationItem],
         [Paragraph("<b>Formule boisson</b>", styles['Meta']), Paragraph(str(reservation.drink_formula or '-'), styles['Meta'])],
     ]
     meta_tbl = Table(meta_rows, colWidths=[160, None])
-    meta_tbl.setStyle(TableStyle([
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
-        ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#f0f9ff')),
-        ('LEFTPADDING', (0,0), (-1,-1), 6),
-        ('RIGHTPADDING', (0,0), (-1,-1), 6),
-        ('TOPPADDING', (0,0), (-1,-1), 5),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 5),
-        ('ROWBACKGROUNDS', (0,0), (-1,-1), [colors.white, colors.HexColor('#f9fafb')]),
-    ]))
+    meta_tbl.setStyle(_TS_INVOICE_META)
     story.append(meta_tbl)
     story.append(Spacer(1, 14))
 
@@ -1247,17 +1409,7 @@ def generate_invoice_pdf(reservation: Reservation, items: List[ReservationItem],
         for s in item_supplements:
             sup_data.append([Paragraph(str(s.name), styles['Meta']), Paragraph(str(s.quantity), styles['Meta'])])
         sup_tbl = Table(sup_data, colWidths=[None, 60])
-        sup_tbl.setStyle(TableStyle([
-            ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#111827')),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-            ('ALIGN', (1,1), (1,-1), 'CENTER'),
-            ('LEFTPADDING', (0,0), (-1,-1), 6),
-            ('RIGHTPADDING', (0,0), (-1,-1), 6),
-            ('TOPPADDING', (0,0), (-1,-1), 4),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 4),
-            ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#f9fafb')]),
-        ]))
+        sup_tbl.setStyle(_TS_INVOICE_SUPPLEMENTS)
         story.append(sup_tbl)
         story.append(Spacer(1, 14))
 
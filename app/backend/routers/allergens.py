@@ -1,15 +1,18 @@
 from __future__ import annotations
 import os
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from datetime import datetime
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..database import get_session  # unused, but keeps pattern consistent
+from ..database import get_async_session, get_session, run_read
 from ..models import Allergen as AllergenModel
+from .. import pdf_service
 
 router = APIRouter(prefix="/api/allergens", tags=["allergens"])
 
@@ -88,11 +91,7 @@ def _normalize_png(content: bytes, target_px: int = 320, padding_ratio: float =
     except Exception:
         return content
 
-@router.get("", response_model=List[AllergenResponse])
-def list_allergens(session: Session = Depends(get_session)):
-    meta = _read_meta()
-    # Load DB rows
-    rows = session.exec(select(AllergenModel)).all()
+def _allergen_list(meta: Dict[str, Dict[str, Any]], rows: List[AllergenModel]) -> List[AllergenResponse]:
     labels: Dict[str, str] = {}
     for key, info in meta.items():
         labels[key] = (info.get("label") or key)
@@ -106,6 +105,15 @@ def list_allergens(session: Session = Depends(get_session)):
     return out
 
 
+@router.get("", response_model=List[AllergenResponse])
+async def list_allergens(session: Optional[AsyncSession] = Depends(get_async_session)):
+    # meta.json and the icon files are read in the threadpool, never on the event loop
+    meta = await run_in_threadpool(_read_meta)
+    # Load DB rows
+    rows = await run_read(session, lambda s: s.exec(select(AllergenModel)).all())
+    return await run_in_threadpool(_allergen_list, meta, rows)
+
+
 @router.put("/{key}", response_model=AllergenResponse)
 def upsert_allergen(key: str, payload: AllergenUpsert, session: Session = Depends(get_session)):
     key = key.strip()
@@ -144,6 +152,7 @@ def upload_icon(key: str, file: UploadFile = File(...), session: Session = Depen
     normalized = _normalize_png(content)
     with open(_icon_path_for(key), "wb") as f:
         f.write(normalized)
+    pdf_service.invalidate_assets(_icon_path_for(key))
     meta = _read_meta()
     label = meta.get(key, {}).get("label", key)
     # Upsert icon bytes in DB
@@ -179,4 +188,5 @@ def delete_allergen(key: str, session: Session = Depends(get_session)):
     #     os.remove(_icon_path_for(key))
     # except Exception:
     #     pass
+    pdf_service.invalidate_assets(_icon_path_for(key))
     return {"ok": True}
@@ -8,16 +8,18 @@ import csv
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from pydantic import BaseModel
 from sqlmodel import Session, select, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..database import get_session
+from ..database import get_async_session, get_session, run_read
+from .. import parse_cache
 from ..models import Drink, DrinkCreate, DrinkRead, DrinkUpdate, DrinkStock, DrinkStockRead, DrinkStockUpdate
 
 router = APIRouter(prefix="/api/drinks", tags=["drinks"])
 
 
 @router.get("", response_model=List[DrinkRead])
-def list_drinks(session: Session = Depends(get_session)):
-    return session.exec(select(Drink).order_by(Drink.name.asc())).all()
+async def list_drinks(session: Optional[AsyncSession] = Depends(get_async_session)):
+    return await run_read(session, lambda s: s.exec(select(Drink).order_by(Drink.name.asc())).all())
 
 
 @router.post("", response_model=DrinkRead)
@@ -69,6 +71,9 @@ def delete_all_drinks(confirm: bool = False, session: Session = Depends(get_sess
     return {"ok": True}
 
 
+PDF_LINES_VERSION = 1  # bump when the text lines read from a drinks PDF change (parse cache key)
+
+
 class DrinksImportPdfIn(BaseModel):
     path: str
     category: Optional[str] = None
@@ -92,25 +97,30 @@ def import_from_pdf(payload: DrinksImportPdfIn, session: Session = Depends(get_s
     except HTTPException:
         raise
 
-    try:
-        reader = PdfReader(str(full_path))
-    except Exception as e:
-        raise HTTPException(400, f"Cannot read PDF: {e}")
-
-    lines: List[str] = []
-    for page in reader.pages:
+    # Same file already read: reuse its text lines, only the database side is redone
+    key = parse_cache.parse_key(parse_cache.sha256_file(str(full_path)), "drinks_pdf_lines", PDF_LINES_VERSION, __file__)
+    lines: Optional[List[str]] = parse_cache.get(key)
+    if lines is None:
         try:
-            txt = page.extract_text() or ""
-        except Exception:
-            txt = ""
-        if not txt:
-            continue
-        for ln in txt.splitlines():
-            ln = ln.replace("\u00a0", " ")
-            ln = re.sub(r"\s+", " ", ln).strip()
-            if not ln:
+            reader = PdfReader(str(full_path))
+        except Exception as e:
+            raise HTTPException(400, f"Cannot read PDF: {e}")
+
+        lines = []
+        for page in reader.pages:
+            try:
+                txt = page.extract_text() or ""
+            except Exception:
+                txt = ""
+            if not txt:
                 continue
-            lines.append(ln)
+            for ln in txt.splitlines():
+                ln = ln.replace("\u00a0", " ")
+                ln = re.sub(r"\s+", " ", ln).strip()
+                if not ln:
+                    continue
+                lines.append(ln)
+        parse_cache.put(key, lines)
 
     if not lines:
         raise HTTPException(400, "No extractable text in PDF")
@@ -154,7 +164,11 @@ class ReplenishRequest(BaseModel):
 
 
 @router.get("/stock", response_model=List[DrinkStockRead])
-def list_stock(session: Session = Depends(get_session)):
+async def list_stock(session: Optional[AsyncSession] = Depends(get_async_session)):
+    return await run_read(session, _list_stock)
+
+
+def _list_stock(session: Session) -> List[DrinkStockRead]:
     rows = session.exec(select(Drink)).all()
     existing = { s.drink_id: s for s in session.exec(select(DrinkStock)).all() }
     out: list[DrinkStockRead] = []
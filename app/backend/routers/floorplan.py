@@ -419,14 +419,24 @@ def _draw_reservations_page(
 
         y -= row_h
 
+import copy
+import hashlib
 import io
+import json
+import os
+import threading
 import uuid
 from datetime import date, time as dtime
 import math
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Response
+from fastapi import APIRouter, Depends, Header, HTTPException, UploadFile, File, Form, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy.orm.exc import StaleDataError
 from sqlmodel import Session, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 import logging
 from reportlab.pdfgen import canvas as pdfcanvas
 from reportlab.lib.pagesizes import A4
@@ -440,7 +450,21 @@ except Exception:
     PdfWriter = None  # type: ignore
     PdfMerger = None  # type: ignore
 
-from ..database import get_session
+from ..database import get_async_session, get_session, run_read, session_context
+from .. import floorplan_import, floorplan_patch
+from ..floorplan_geometry import (
+    JOIN_GAP,
+    CircleShape,
+    JoinGraph,
+    PlanIndex,
+    RectShape,
+    circle_circle,
+    circle_rect,
+    compile_obstacles,
+    compile_table,
+    rect_rect,
+)
+from ..floorplan_solver import Option, solve_assignment
 from ..models import (
     FloorPlanBase,
     FloorPlanBaseRead,
@@ -449,6 +473,7 @@ from ..models import (
     FloorPlanInstanceCreate,
     FloorPlanInstanceRead,
     FloorPlanInstanceUpdate,
+    FloorPlanPatch,
     Reservation,
 )
 
@@ -458,7 +483,7 @@ logger.propagate = True
 logger.setLevel(logging.DEBUG)
 
 # --- In-memory debug buffer for UI tail ---
-from collections import deque
+from collections import OrderedDict, deque
 from datetime import datetime
 
 _dbg_buffer: "deque[dict]" = deque(maxlen=1000)
@@ -486,6 +511,14 @@ class RenumberTablesPayload(SQLModel):
     start: int = 1
 
 
+class ReservationChangePayload(SQLModel):
+    op: str  # add | remove | resize
+    reservation_id: Optional[str] = None
+    client_name: Optional[str] = None
+    pax: Optional[int] = None
+    arrival_time: Optional[str] = None  # "HH:MM"
+
+
 def _apply_manual_renumber(plan: Dict[str, Any], payload: RenumberTablesPayload) -> Dict[str, Any]:
     ids = [str(x) for x in (payload.table_ids or [])]
     if not ids:
@@ -561,6 +594,108 @@ def _get_or_create_base(session: Session) -> FloorPlanBase:
     return row
 
 
+# ---- Label map cache ----
+# Transient labels (persist=False) only depend on the id, kind, locked flag and position of each
+# table, in plan order, and on the limits. compare, exports and PDF jobs ask for the same map over
+# and over on an unchanged plan: keep the last maps keyed by exactly those fields (the tuple itself,
+# so no hash collision can return wrong labels). Building the key costs about a third of a relabel.
+
+LABEL_CACHE_SIZE = int(os.getenv("FLOORPLAN_LABEL_CACHE_SIZE") or "64")  # 0 disables
+
+_label_cache: "OrderedDict[Tuple[Any, ...], Dict[str, str]]" = OrderedDict()
+_label_cache_lock = threading.Lock()
+
+
+def _table_labels(plan: Dict[str, Any], max_numbers: int = 20, max_tnumbers: int = 20, max_rnumbers: int = 20) -> Dict[str, str]:
+    """id -> label as _assign_table_numbers(persist=False) would compute it, memoized. The returned
+    map is shared between callers: read it, never modify it."""
+    tables = plan.get("tables") or []
+    if LABEL_CACHE_SIZE <= 0:
+        return _assign_table_numbers(dict(plan), max_numbers, max_tnumbers, max_rnumbers, persist=False)[1]
+    key = (max_numbers, max_tnumbers, max_rnumbers,
+           tuple([(t.get("id"), t.get("kind"), t.get("locked"), t.get("x"), t.get("y")) for t in tables]))
+    with _label_cache_lock:
+        labels = _label_cache.get(key)
+        if labels is not None:
+            _label_cache.move_to_end(key)
+            return labels
+    labels = _assign_table_numbers(dict(plan), max_numbers, max_tnumbers, max_rnumbers, persist=False)[1]
+    with _label_cache_lock:
+        _label_cache[key] = labels
+        while len(_label_cache) > LABEL_CACHE_SIZE:
+            _label_cache.popitem(last=False)
+    return labels
+
+
+# ---- Base plan cache ----
+# The base plan only changes through the /base endpoints but is read by every export, auto-assign
+# and numbering of an instance without its own tables. One snapshot per process, keyed by the row
+# version: a request only reads (id, version), then reuses the snapshot with its label map, table
+# counts by kind and compiled obstacles. Snapshot data is shared between requests and must never
+# be mutated; plan_copy() gives a writable plan.
+
+BASE_STATIC_LAYERS = ("no_go", "walls", "fixtures", "columns")  # what compile_obstacles reads
+
+
+class BasePlanSnapshot:
+    __slots__ = ("id", "version", "data", "labels", "kind_counts", "_obstacles")
+
+    def __init__(self, row_id: uuid.UUID, version: int, data: Optional[Dict[str, Any]]) -> None:
+        self.id = row_id
+        self.version = version
+        self.data: Dict[str, Any] = copy.deepcopy(data or {})
+        self.labels = _table_labels(self.data)
+        tables = self.data.get("tables") or []
+        self.kind_counts = {
+            "fixed": sum(1 for t in tables if t.get("kind") == "fixed" or t.get("locked")),
+            "rect": sum(1 for t in tables if t.get("kind") == "rect"),
+            "round": sum(1 for t in tables if t.get("kind") == "round"),
+        }
+        self._obstacles: Optional[List[Any]] = None
+
+    @property
+    def obstacles(self) -> List[Any]:
+        if self._obstacles is None:
+            self._obstacles = compile_obstacles(self.data)
+        return self._obstacles
+
+    def plan_copy(self) -> Dict[str, Any]:
+        """Writable plan for an instance. Only the tables list and the table dicts are ever written
+        (labels, dynamic tables appended), so those are copied; room, walls, zones... stay shared."""
+        plan = dict(self.data)
+        plan["tables"] = [dict(t) for t in (self.data.get("tables") or [])]
+        return plan
+
+
+_base_cache: Optional[BasePlanSnapshot] = None
+
+
+def _base_snapshot(session: Session) -> BasePlanSnapshot:
+    global _base_cache
+    head = session.exec(select(FloorPlanBase.id, FloorPlanBase.version).order_by(FloorPlanBase.created_at.asc())).first()
+    snap = _base_cache
+    if head is not None and snap is not None and snap.id == head[0] and snap.version == head[1]:
+        return snap
+    row = _get_or_create_base(session)
+    snap = BasePlanSnapshot(row.id, row.version, row.data)
+    _base_cache = snap
+    logger.info("Base plan cache -> loaded id=%s version=%s tables=%d", row.id, row.version, len(snap.data.get("tables") or []))
+    return snap
+
+
+def _invalidate_base_cache() -> None:
+    global _base_cache
+    _base_cache = None
+
+
+def _cached_obstacles(plan: Dict[str, Any]) -> Optional[List[Any]]:
+    """Compiled obstacles of the cached base plan when plan shares its static layers (plan_copy())."""
+    snap = _base_cache
+    if snap is not None and all(plan.get(k) is snap.data.get(k) for k in BASE_STATIC_LAYERS):
+        return snap.obstacles
+    return None
+
+
 def _classify_service_label(t: dtime) -> str:
     return "lunch" if t.hour < 17 else "dinner"
 
@@ -604,6 +739,33 @@ def _load_reservations(session: Session, service_date: date, service_label: Opti
         return rows
 
 
+def _reservations_from_items(res_data: List[Dict[str, Any]]) -> List[Any]:
+    """Reservation-like objects for _auto_assign from FloorPlanInstance.reservations["items"].
+    Items without an id get a stable one (written back into the item).
+    """
+    from types import SimpleNamespace
+    reservations = []
+    for idx, item in enumerate(res_data):
+        # IMPORTANT: NE PAS régénérer les IDs si ils existent déjà (créés par import-pdf)
+        # Utiliser l'ID existant pour maintenir la cohérence
+        res_id = item.get("id")
+        if not res_id:
+            # Fallback: générer un ID seulement si absent
+            content = f"{idx}_{item.get('client_name', '')}_{item.get('pax', 0)}_{item.get('arrival_time', '')}"
+            hash_val = hashlib.md5(content.encode()).hexdigest()
+            res_id = str(uuid.UUID(hash_val))
+            item["id"] = res_id
+        
+        res = SimpleNamespace(
+            id=res_id,
+            client_name=item.get("client_name", "Client"),
+            pax=int(item.get("pax", 0)),
+            arrival_time=dtime.fromisoformat(item.get("arrival_time", "12:00") + (":00" if len(item.get("arrival_time", "12:00")) == 5 else ""))
+        )
+        reservations.append(res)
+    return reservations
+
+
 def _capacity_for_table(tbl: Dict[str, Any]) -> int:
     cap = int(tbl.get("capacity") or 0)
     kind = (tbl.get("kind") or "").lower()
@@ -634,101 +796,66 @@ def _fit_text(c: pdfcanvas.Canvas, text: str, max_w: float, font_name: str, font
     return s + ell if s else ell
 
 
-def _rect_intersects(a: Dict[str, float], b: Dict[str, float]) -> bool:
-    return not (a["x"] + a["w"] <= b["x"] or b["x"] + b["w"] <= a["x"] or a["y"] + a["h"] <= b["y"] or b["y"] + b["h"] <= a["y"])
+def _rect_intersects(a: RectShape, b: RectShape) -> bool:
+    return rect_rect(a.x, a.y, a.w, a.h, b.x, b.y, b.w, b.h)
 
 
-def _circle_rect_intersects(c: Dict[str, float], r: Dict[str, float]) -> bool:
-    cx = max(r["x"], min(c["x"], r["x"] + r["w"]))
-    cy = max(r["y"], min(c["y"], r["y"] + r["h"]))
-    dx = c["x"] - cx
-    dy = c["y"] - cy
-    return dx * dx + dy * dy <= (c.get("r") or 0) ** 2
+def _circle_rect_intersects(c: CircleShape, r: RectShape) -> bool:
+    return circle_rect(c.x, c.y, c.r, r.x, r.y, r.w, r.h)
 
 
-def _circle_circle_intersects(a: Dict[str, float], b: Dict[str, float]) -> bool:
-    dx = a["x"] - b["x"]
-    dy = a["y"] - b["y"]
-    rr = (a.get("r") or 0) + (b.get("r") or 0)
-    return dx * dx + dy * dy <= rr * rr
+def _circle_circle_intersects(a: CircleShape, b: CircleShape) -> bool:
+    return circle_circle(a.x, a.y, a.r, b.x, b.y, b.r)
 
 
-def _table_collides(plan: Dict[str, Any], t: Dict[str, Any], existing_tables: Optional[List[Dict[str, Any]]] = None) -> bool:
+def _table_collides(plan: Dict[str, Any], t: Dict[str, Any], existing_tables: Optional[List[Dict[str, Any]]] = None, index: Optional[PlanIndex] = None) -> bool:
+    """True if table t is out of the room or overlaps an obstacle/another table.
+    With a PlanIndex, only the shapes sharing a grid cell with t are tested (the index covers plan["tables"]).
+    """
+    probe = compile_table(t)
+    if index is not None:
+        if isinstance(probe, CircleShape):
+            return index.circle_collides(probe.x, probe.y, probe.r, skip=t)
+        return index.rect_collides(probe.x, probe.y, probe.w, probe.h, skip=t)
     room = (plan.get("room") or {"width": 0, "height": 0})
-    x = float(t.get("x") or 0)
-    y = float(t.get("y") or 0)
-    if "r" in t and t.get("r"):
-        r = float(t.get("r") or 0)
-        # bounds
-        if x - r < 0 or y - r < 0 or x + r > float(room.get("width") or 0) or y + r > float(room.get("height") or 0):
-            return True
-        c = {"x": x, "y": y, "r": r}
-        for rr in (plan.get("no_go") or []):
-            if _circle_rect_intersects(c, {"x": float(rr.get("x")), "y": float(rr.get("y")), "w": float(rr.get("w")), "h": float(rr.get("h"))}):
-                return True
-        for w in (plan.get("walls") or []):
-            if _circle_rect_intersects(c, {"x": float(w.get("x")), "y": float(w.get("y")), "w": float(w.get("w")), "h": float(w.get("h"))}):
-                return True
-        for fx in (plan.get("fixtures") or []):
-            if "r" in fx and fx.get("r"):
-                if _circle_circle_intersects(c, {"x": float(fx.get("x")), "y": float(fx.get("y")), "r": float(fx.get("r"))}):
+    W = float(room.get("width") or 0)
+    H = float(room.get("height") or 0)
+    x0, y0, x1, y1 = probe.bbox()
+    # bounds
+    if x0 < 0 or y0 < 0 or x1 > W or y1 > H:
+        return True
+    shapes = compile_obstacles(plan)
+    shapes.extend(compile_table(ot) for ot in (existing_tables or (plan.get("tables") or [])) if ot is not t)
+    if isinstance(probe, CircleShape):
+        for shp in shapes:
+            if isinstance(shp, CircleShape):
+                if _circle_circle_intersects(probe, shp):
                     return True
-            else:
-                if _circle_rect_intersects(c, {"x": float(fx.get("x")), "y": float(fx.get("y")), "w": float(fx.get("w")), "h": float(fx.get("h"))}):
-                    return True
-        for col in (plan.get("columns") or []):
-            if _circle_circle_intersects(c, {"x": float(col.get("x")), "y": float(col.get("y")), "r": float(col.get("r") or 0)}):
+            elif _circle_rect_intersects(probe, shp):
                 return True
-        for ot in (existing_tables or (plan.get("tables") or [])):
-            if ot is t:
-                continue
-            if "r" in (ot or {}) and ot.get("r"):
-                if _circle_circle_intersects(c, {"x": float(ot.get("x")), "y": float(ot.get("y")), "r": float(ot.get("r"))}):
-                    return True
-            else:
-                if _circle_rect_intersects(c, {"x": float(ot.get("x")), "y": float(ot.get("y")), "w": float(ot.get("w") or 120), "h": float(ot.get("h") or 60)}):
-                    return True
-        return False
     else:
-        w = float(t.get("w") or 120)
-        h = float(t.get("h") or 60)
-        # bounds
-        if x < 0 or y < 0 or x + w > float(room.get("width") or 0) or y + h > float(room.get("height") or 0):
-            return True
-        rr = {"x": x, "y": y, "w": w, "h": h}
-        for ng in (plan.get("no_go") or []):
-            if _rect_intersects(rr, {"x": float(ng.get("x")), "y": float(ng.get("y")), "w": float(ng.get("w")), "h": float(ng.get("h"))}):
-                return True
-        for w2 in (plan.get("walls") or []):
-            if _rect_intersects(rr, {"x": float(w2.get("x")), "y": float(w2.get("y")), "w": float(w2.get("w")), "h": float(w2.get("h"))}):
-                return True
-        for fx in (plan.get("fixtures") or []):
-            if "r" in fx and fx.get("r"):
-                if _circle_rect_intersects({"x": float(fx.get("x")), "y": float(fx.get("y")), "r": float(fx.get("r"))}, rr):
-                    return True
-            else:
-                if _rect_intersects(rr, {"x": float(fx.get("x")), "y": float(fx.get("y")), "w": float(fx.get("w") or 0), "h": float(fx.get("h") or 0)}):
+        for shp in shapes:
+            if isinstance(shp, CircleShape):
+                if _circle_rect_intersects(shp, probe):
                     return True
-        for col in (plan.get("columns") or []):
-            if _circle_rect_intersects({"x": float(col.get("x")), "y": float(col.get("y")), "r": float(col.get("r") or 0)}, rr):
+            elif _rect_intersects(probe, shp):
                 return True
-        for ot in (existing_tables or (plan.get("tables") or [])):
-            if ot is t:
-                continue
-            if "r" in (ot or {}) and ot.get("r"):
-                if _circle_rect_intersects({"x": float(ot.get("x")), "y": float(ot.get("y")), "r": float(ot.get("r"))}, rr):
-                    return True
-            else:
-                if _rect_intersects(rr, {"x": float(ot.get("x")), "y": float(ot.get("y")), "w": float(ot.get("w") or 120), "h": float(ot.get("h") or 60)}):
-                    return True
-        return False
+    return False
 
 
-def _find_spot_for_table(plan: Dict[str, Any], shape: str, w: float = 120, h: float = 60, r: float = 50, require_rect_zone: bool = False, prefer_right: bool = False, prefer_center: bool = False, prefer_center_y: bool = False, prefer_vertical: bool = False) -> Optional[Dict[str, float]]:
+def _find_spot_for_table(plan: Dict[str, Any], shape: str, w: float = 120, h: float = 60, r: float = 50, require_rect_zone: bool = False, prefer_right: bool = False, prefer_center: bool = False, prefer_center_y: bool = False, prefer_vertical: bool = False, index: Optional[PlanIndex] = None) -> Optional[Dict[str, float]]:
     """Find spot for table. shape can be: rect, round, sofa, standing.
     prefer_vertical=True: portrait orientation (w narrow, h tall), placed on the right wall, no T-zone required.
+    index: PlanIndex reused across calls (e.g. by _auto_assign); tables appended since the last call are picked up.
     """
     room = (plan.get("room") or {"width": 0, "height": 0})
+    existing = plan.get("tables") or []
+    if index is None:
+        index = PlanIndex(plan)
+    else:
+        index.sync_tables(existing)
+    # Probe footprint as compiled for collision tests (same defaults as compile_table)
+    fw, fh, fr = float(w or 120), float(h or 60), float(r or 0)
     gw = int(room.get("grid") or 50)
     W = int(room.get("width") or 0)
     H = int(room.get("height") or 0)
@@ -754,30 +881,12 @@ def _find_spot_for_table(plan: Dict[str, Any], shape: str, w: float = 120, h: fl
                 y_candidates.append(y_up[i])
             if i < len(y_down):
                 y_candidates.append(y_down[i])
-        for xx in x_candidates:
-            for yy in y_candidates:
-                cand = {"x": float(xx), "y": float(yy), "w": float(w), "h": float(h)}
-                t = {"id": "_probe", **cand}
-                if not _table_collides(plan, t, existing_tables=plan.get("tables") or []):
-                    return cand
+        # column by column (x outer), same order as the original nested loops
+        pos = index.first_free_rect(x_candidates, y_candidates, fw, fh, y_major=False)
+        if pos is not None:
+            return {"x": pos[0], "y": pos[1], "w": float(w), "h": float(h)}
         return None
     
-    def is_in_round_only_zone(x: float, y: float) -> bool:
-        """Vérifie si une position est dans une zone round-only (R)."""
-        for zone in round_zones:
-            zx, zy, zw, zh = zone.get("x", 0), zone.get("y", 0), zone.get("w", 0), zone.get("h", 0)
-            if x >= zx and x <= zx + zw and y >= zy and y <= zy + zh:
-                return True
-        return False
-    
-    def is_in_rect_only_zone(x: float, y: float) -> bool:
-        """Vérifie si une position est dans une zone rect-only (T)."""
-        for zone in rect_zones:
-            zx, zy, zw, zh = zone.get("x", 0), zone.get("y", 0), zone.get("w", 0), zone.get("h", 0)
-            if x >= zx and x <= zx + zw and y >= zy and y <= zy + zh:
-                return True
-        return False
-    
     # If a rect spot must be inside a T zone, try biased placement, then scan inside each T zone
     if require_rect_zone and shape == "rect":
         if not rect_zones:
@@ -804,8 +913,7 @@ def _find_spot_for_table(plan: Dict[str, Any], shape: str, w: float = 120, h: fl
             if cand["x"] < zx or cand["y"] < zy or cand["x"] + w > zx + zw or cand["y"] + h > zy + zh:
                 pass
             else:
-                t = {"id": "_probe", **cand}
-                if not _table_collides(plan, t, existing_tables=plan.get("tables") or []):
+                if not index.rect_collides(cand["x"], cand["y"], fw, fh):
                     return cand
         # fallback: scan grid inside each rect-only zone
         gw = int(room.get("grid") or 50)
@@ -844,12 +952,9 @@ def _find_spot_for_table(plan: Dict[str, Any], shape: str, w: float = 120, h: fl
                         x_iter.append(right[i])
             else:
                 x_iter = list(range(int(zx), int(max_x), step))
-            for yy in y_iter:
-                for xx in x_iter:
-                    cand = {"x": float(xx), "y": float(yy), "w": float(w), "h": float(h)}
-                    t = {"id": "_probe", **cand}
-                    if not _table_collides(plan, t, existing_tables=plan.get("tables") or []):
-                        return cand
+            pos = index.first_free_rect(x_iter, y_iter, fw, fh)
+            if pos is not None:
+                return {"x": pos[0], "y": pos[1], "w": float(w), "h": float(h)}
         return None
     # scan grid row by row (default)
     is_circular = shape in ("round", "standing")
@@ -858,37 +963,47 @@ def _find_spot_for_table(plan: Dict[str, Any], shape: str, w: float = 120, h: fl
         x_range = range(max(0, int(W - (int(w)))), -1, -max(1, gw))
     else:
         x_range = range(0, max(0, W - (int(w) if not is_circular else int(r))), max(1, gw))
-    for yy in y_range:
-        for xx in x_range:
-            cand: Dict[str, Any]
-            if shape in ("rect", "sofa"):
-                cand = {"x": float(xx), "y": float(yy), "w": float(w), "h": float(h)}
-                check_x, check_y = float(xx + w/2), float(yy + h/2)  # Centre de la table
-            else:  # round, standing
-                cand = {"x": float(xx + r), "y": float(yy + r), "r": float(r)}
-                check_x, check_y = float(xx + r), float(yy + r)  # Centre du cercle
-            
-            # Vérifier si la position est dans une zone spécialisée
-            in_round_zone = is_in_round_only_zone(check_x, check_y)
-            in_rect_zone = is_in_rect_only_zone(check_x, check_y)
-            
-            # Si c'est une zone round-only (R), seules les tables rondes sont autorisées (pas standing, sofa, etc.)
-            if in_round_zone and shape not in ("round",):
-                continue
-            
-            # Si c'est une zone rect-only (T), seules les tables rectangulaires sont autorisées (pas sofa)
-            if in_rect_zone and shape not in ("rect",):
-                continue
-            
-            t = {"id": "_probe", **cand}
-            if not _table_collides(plan, t, existing_tables=plan.get("tables") or []):
-                return cand
+    # Zones spécialisées, testées sur le centre de la table:
+    # - zone round-only (R): seules les tables rondes sont autorisées (pas standing, sofa, etc.)
+    # - zone rect-only (T): seules les tables rectangulaires sont autorisées (pas sofa)
+    excluded_zones: List[Dict[str, Any]] = []
+    if shape not in ("round",):
+        excluded_zones.extend(round_zones or [])
+    if shape not in ("rect",):
+        excluded_zones.extend(rect_zones or [])
+    if shape in ("rect", "sofa"):
+        pos = index.first_free_rect(x_range, y_range, fw, fh, exclude_zones=excluded_zones, center=(w / 2, h / 2))
+        if pos is not None:
+            return {"x": pos[0], "y": pos[1], "w": float(w), "h": float(h)}
+        return None
+    # round, standing: candidates are circle centres
+    centers_x = [float(xx + r) for xx in x_range]
+    centers_y = [float(yy + r) for yy in y_range]
+    if fr:
+        pos = index.first_free_circle(centers_x, centers_y, fr, exclude_zones=excluded_zones)
+    else:
+        pos = index.first_free_rect(centers_x, centers_y, 120.0, 60.0, exclude_zones=excluded_zones)
+    if pos is not None:
+        return {"x": pos[0], "y": pos[1], "r": float(r)}
     return None
 
 
+# Tables collées on existing rect tables: at most this many tables, for groups up to this size
+JOIN_MAX_TABLES = 5
+JOIN_MAX_PAX = 30
+
+
+def _join_graph(tables: List[Dict[str, Any]], cfg: Dict[str, Any]) -> JoinGraph:
+    """Which unlocked rect tables can be pushed together (large_table_config.join_gap overrides the gap)."""
+    rects = [t for t in tables if t.get("kind") == "rect" and t.get("locked") is not True]
+    return JoinGraph(rects, gap=float(cfg.get("join_gap", JOIN_GAP)))
+
+
 def _auto_assign(plan_data: Dict[str, Any], reservations: List[Reservation]) -> Dict[str, Any]:
     plan = plan_data  # Alias for consistency with helper functions
     tables: List[Dict[str, Any]] = list(plan_data.get("tables") or [])
+    # Index spatial partagé par tous les placements dynamiques (mis à jour à chaque ajout de table)
+    spot_index = PlanIndex(plan_data, obstacles=_cached_obstacles(plan_data))
     
     # Limites de tables dynamiques disponibles (stock)
     max_dynamic = plan_data.get("max_dynamic_tables", {})
@@ -920,7 +1035,11 @@ def _auto_assign(plan_data: Dict[str, Any], reservations: List[Reservation]) ->
     pax_threshold_right    = int(_cfg.get("pax_threshold_right", 10))
     pax_threshold_vertical = int(_cfg.get("pax_threshold_vertical", 20))
     vertical_span_max      = int(_cfg.get("vertical_span_max", 7))
-    _dbg_add("INFO", f"large_table_config: seuil_droite={pax_threshold_right} seuil_vertical={pax_threshold_vertical} span_max_v={vertical_span_max}")
+    join_tables            = _cfg.get("join_tables") is True
+    _dbg_add("INFO", f"large_table_config: seuil_droite={pax_threshold_right} seuil_vertical={pax_threshold_vertical} span_max_v={vertical_span_max} tables_collées={join_tables}")
+    # Graphe des tables rect qui peuvent être collées (voisines ou alignées)
+    join_graph = _join_graph(rects, _cfg)
+    _dbg_add("INFO", f"join graph: {len(join_graph.adj)} rect tables, {join_graph.edge_count()} paires collables (gap={join_graph.gap:g})")
 
     # Sort reservations largest first to minimize waste; tie-breaker by arrival time
     groups = sorted(reservations, key=lambda r: (-int(r.pax), r.arrival_time or dtime(0, 0)))
@@ -1062,66 +1181,64 @@ def _auto_assign(plan_data: Dict[str, Any], reservations: List[Reservation]) ->
 
     def take_best_rect_combo(pax: int) -> Optional[List[Dict[str, Any]]]:
         """Pick best pair of existing rect tables.
+        With large_table_config.join_tables only pairs that can be pushed together (edges of join_graph).
         Preference: use base capacity (6 + 6 = 12). Only allow limited extension to reach up to 14 if necessary.
         Do NOT target 16 by default to avoid over-extending; larger groups should use aligned dynamic tables.
         """
-        available_ids = [id for id in avail_rects.keys() if id not in assignments_by_table]
-        if len(available_ids) < 2:
+        free = {str(k): t for k, t in avail_rects.items() if k not in assignments_by_table}
+        if len(free) < 2:
             return None
-        ids = available_ids
+        if join_tables:
+            candidates = join_graph.pairs(set(free))
+        else:
+            ids = list(free)
+            candidates = ((ids[i], ids[j]) for i in range(len(ids)) for j in range(i + 1, len(ids)))
         best_pair: Optional[List[Dict[str, Any]]] = None
         best_score = (10**9, 10**9)  # (total_cap, total_extension)
-        for i in range(len(ids)):
-            for j in range(i + 1, len(ids)):
-                a = avail_rects[ids[i]]
-                b = avail_rects[ids[j]]
-                base_a = max(6, int(a.get("capacity") or 6))
-                base_b = max(6, int(b.get("capacity") or 6))
-                base_sum = base_a + base_b
-                if base_sum >= pax:
-                    # Prefer minimal total capacity (avoid waste), zero extension
-                    score = (base_sum, 0)
-                    if score < best_score:
+        for ida, idb in candidates:
+            a = free[ida]
+            b = free[idb]
+            base_a = max(6, int(a.get("capacity") or 6))
+            base_b = max(6, int(b.get("capacity") or 6))
+            base_sum = base_a + base_b
+            if base_sum >= pax:
+                # Prefer minimal total capacity (avoid waste), zero extension
+                score = (base_sum, 0)
+                if score < best_score:
+                    best_score = score
+                    best_pair = [a, b]
+                continue
+            # Allow limited extension ONLY up to 14 total
+            if pax <= 14:
+                # Minimal extension needed but cap at 14
+                need = pax - base_sum
+                if need <= 4:
+                    total_cap = min(14, base_sum + need)
+                    # Prefer less extension, then less total_cap
+                    score = (total_cap, need)
+                    if total_cap >= pax and score < best_score:
                         best_score = score
                         best_pair = [a, b]
-                    continue
-                # Allow limited extension ONLY up to 14 total
-                if pax <= 14:
-                    # Minimal extension needed but cap at 14
-                    need = pax - base_sum
-                    if need <= 4:
-                        total_cap = min(14, base_sum + need)
-                        # Prefer less extension, then less total_cap
-                        score = (total_cap, need)
-                        if total_cap >= pax and score < best_score:
-                            best_score = score
-                            best_pair = [a, b]
         return best_pair
 
     def pack_from_pool(pool: Dict[str, Dict[str, Any]], target: int, allow_rect_ext: bool = False) -> Optional[List[Dict[str, Any]]]:
-        items = list(pool.values())
-        if not items:
-            return None
+        """Tables collées from pool seating target: a connected set of join_graph (tables that can
+        physically be pushed together), fewest tables first, then fewest empty seats."""
         # CRITICAL: Filter out already assigned tables (same as take_table)
-        items = [t for t in items if t.get("id") not in assignments_by_table]
-        if not items:
+        free = {str(k): t for k, t in pool.items() if k not in assignments_by_table}
+        if not free:
             return None
-        # Greedy: pick largest capacities first to minimize number of tables
-        items.sort(key=lambda t: _capacity_for_table(t), reverse=True)
-        chosen: List[Dict[str, Any]] = []
-        total = 0
-        for t in items:
-            if total >= target:
-                break
-            chosen.append(t)
+
+        def seats(tid: str) -> int:
+            t = free[tid]
             cap = _capacity_for_table(t)
             # Allow +2 extension for rect tables
             if allow_rect_ext and t.get("kind") == "rect":
                 cap = min(8, cap + 2)
-            total += cap
-        if total >= target:
-            return chosen
-        return None
+            return cap
+
+        ids = join_graph.best_connected(set(free), target, seats, max_tables=JOIN_MAX_TABLES)
+        return [free[i] for i in ids] if ids else None
 
     for r in groups:
         if str(r.id) in placed_small_ids:
@@ -1138,7 +1255,7 @@ def _auto_assign(plan_data: Dict[str, Any], reservations: List[Reservation]) ->
             w_total = 120
             cap = 6 * needed
             if cap >= total:
-                spot = _find_spot_for_table(plan_data, "rect", w=w_total, h=h_total, prefer_vertical=True, prefer_right=True)
+                spot = _find_spot_for_table(plan_data, "rect", w=w_total, h=h_total, prefer_vertical=True, prefer_right=True, index=spot_index)
                 if spot:
                     new_id = str(uuid.uuid4())
                     new_tbl = {"id": new_id, "kind": "rect", "capacity": cap, **spot, "dynamic": True, "span": needed, "orientation": "vertical"}
@@ -1172,7 +1289,7 @@ def _auto_assign(plan_data: Dict[str, Any], reservations: List[Reservation]) ->
             except Exception:
                 pass
             if cap >= total:
-                spot = _find_spot_for_table(plan_data, "rect", w=width, h=60, require_rect_zone=True, prefer_right=True, prefer_center_y=True)
+                spot = _find_spot_for_table(plan_data, "rect", w=width, h=60, require_rect_zone=True, prefer_right=True, prefer_center_y=True, index=spot_index)
                 if spot:
                     new_id = str(uuid.uuid4())
                     new_tbl = {"id": new_id, "kind": "rect", "capacity": cap, **spot, "dynamic": True, "span": needed}
@@ -1298,7 +1415,7 @@ def _auto_assign(plan_data: Dict[str, Any], reservations: List[Reservation]) ->
                 h_total = needed * h_seg + (needed - 1) * gap
                 cap = 6 * needed
                 if cap >= total:
-                    spot = _find_spot_for_table(plan_data, "rect", w=120, h=h_total, prefer_vertical=True, prefer_right=True)
+                    spot = _find_spot_for_table(plan_data, "rect", w=120, h=h_total, prefer_vertical=True, prefer_right=True, index=spot_index)
                     if spot:
                         new_id = str(uuid.uuid4())
                         new_tbl = {"id": new_id, "kind": "rect", "capacity": cap, **spot, "dynamic": True, "span": needed, "orientation": "vertical"}
@@ -1330,7 +1447,7 @@ def _auto_assign(plan_data: Dict[str, Any], reservations: List[Reservation]) ->
                 except Exception:
                     pass
                 if cap >= total:
-                    spot = _find_spot_for_table(plan_data, "rect", w=width, h=60, require_rect_zone=True, prefer_right=True, prefer_center_y=True)
+                    spot = _find_spot_for_table(plan_data, "rect", w=width, h=60, require_rect_zone=True, prefer_right=True, prefer_center_y=True, index=spot_index)
                     if spot:
                         new_id = str(uuid.uuid4())
                         new_tbl = {"id": new_id, "kind": "rect", "capacity": cap, **spot, "dynamic": True, "span": needed}
@@ -1345,7 +1462,16 @@ def _auto_assign(plan_data: Dict[str, Any], reservations: List[Reservation]) ->
         if placed:
             continue
 
-        # 3) Rect combo (two tables) disabled to avoid splitting groups across separate existing tables
+        # 3) Rect combo disabled by default to avoid splitting groups across separate existing tables.
+        #    large_table_config.join_tables=true: tables collées, rect existantes physiquement voisines (graphe).
+        if join_tables and rect_allowed and 9 <= int(r.pax) <= JOIN_MAX_PAX:
+            combo = pack_from_pool(avail_rects, int(r.pax), allow_rect_ext=True)
+            if combo:
+                _assign_tables_to_reservation(r, combo, int(r.pax))
+                placed = True
+                _dbg_add("INFO", f"assign rect-collées (graphe) -> res={r.id} pax={int(r.pax)} tables={[t.get('id') for t in combo]}")
+        if placed:
+            continue
 
         # 3aa) Standing single (8 pax)
         standing_allowed = True
@@ -1364,7 +1490,7 @@ def _auto_assign(plan_data: Dict[str, Any], reservations: List[Reservation]) ->
 
         # 3b) Pack multiple fixed tables disabled (never split groups across distant fixed tables)
 
-        # 3c) Pack multiple rect tables disabled (prefer aligned dynamic cluster)
+        # 3c) Pack multiple rect tables: only as tables collées in 3) (joinable neighbours, after dynamic)
 
         # 3d) Pack multiple round tables disabled (avoid splitting groups)
 
@@ -1421,7 +1547,7 @@ def _auto_assign(plan_data: Dict[str, Any], reservations: List[Reservation]) ->
             if remaining <= pax_threshold_right:
                 width = 120
                 cap = 8  # 6 + head
-                spot = _find_spot_for_table(plan_data, "rect", w=width, h=60, require_rect_zone=True, prefer_center=True, prefer_center_y=True)
+                spot = _find_spot_for_table(plan_data, "rect", w=width, h=60, require_rect_zone=True, prefer_center=True, prefer_center_y=True, index=spot_index)
                 if spot and rect_dynamic_created < max_rect_dynamic and cap >= remaining:
                     new_id = str(uuid.uuid4())
                     new_tbl = {"id": new_id, "kind": "rect", "capacity": cap, **spot, "dynamic": True, "span": 1}
@@ -1445,7 +1571,7 @@ def _auto_assign(plan_data: Dict[str, Any], reservations: List[Reservation]) ->
                     h_total = needed_v * h_seg + (needed_v - 1) * gap
                     cap_v = 6 * needed_v
                     if cap_v >= remaining:
-                        spot = _find_spot_for_table(plan_data, "rect", w=120, h=h_total, prefer_vertical=True, prefer_right=True)
+                        spot = _find_spot_for_table(plan_data, "rect", w=120, h=h_total, prefer_vertical=True, prefer_right=True, index=spot_index)
                         if spot:
                             new_id = str(uuid.uuid4())
                             new_tbl = {"id": new_id, "kind": "rect", "capacity": cap_v, **spot, "dynamic": True, "span": needed_v, "orientation": "vertical"}
@@ -1477,7 +1603,7 @@ def _auto_assign(plan_data: Dict[str, Any], reservations: List[Reservation]) ->
                     except Exception:
                         pass
                     if cap >= remaining:
-                        spot = _find_spot_for_table(plan_data, "rect", w=width, h=60, require_rect_zone=True, prefer_right=True, prefer_center_y=True)
+                        spot = _find_spot_for_table(plan_data, "rect", w=width, h=60, require_rect_zone=True, prefer_right=True, prefer_center_y=True, index=spot_index)
                         if spot:
                             new_id = str(uuid.uuid4())
                             new_tbl = {"id": new_id, "kind": "rect", "capacity": cap, **spot, "dynamic": True, "span": needed}
@@ -1490,7 +1616,7 @@ def _auto_assign(plan_data: Dict[str, Any], reservations: List[Reservation]) ->
                             _dbg_add("INFO", f"✓ Created large rect {rect_dynamic_created}/{max_rect_dynamic} span={needed}")
             # If still remaining, try a single round 10 (still not split)
             if remaining > 0 and (round_dynamic_created) < max_round_dynamic:
-                spot = _find_spot_for_table(plan_data, "round", r=50)
+                spot = _find_spot_for_table(plan_data, "round", r=50, index=spot_index)
                 if spot:
                     new_id = str(uuid.uuid4())
                     cap = 10
@@ -1550,17 +1676,513 @@ def _auto_assign(plan_data: Dict[str, Any], reservations: List[Reservation]) ->
     return {"tables": assignments_by_table, "alerts": alerts}
 
 
+# ---- Optimal solver (branch-and-bound) ----
+
+# Cost weights, lexicographic in practice: unplaced groups >> empty seats >> dynamic tables >> last resort >> extension
+_OPT_W_UNPLACED = 1_000_000
+_OPT_W_UNPLACED_PAX = 1_000
+_OPT_W_WASTE = 10
+_OPT_W_DYNAMIC = 3
+_OPT_W_LAST_RESORT = 2
+_OPT_W_EXTENSION = 1
+
+
+def _dynamic_rect_specs(pax: int, cfg: Dict[str, Any], rect_zones: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Dynamic rect shapes _auto_assign would try for a group, in its order (vertical first for very large groups).
+    Horizontal shapes are dropped when no T zone is large enough to hold them.
+    """
+    thr_right = int(cfg.get("pax_threshold_right", 10))
+    thr_vertical = int(cfg.get("pax_threshold_vertical", 20))
+    span_max_v = int(cfg.get("vertical_span_max", 7))
+
+    def zone_fits(width: float) -> bool:
+        return any(float(z.get("w", 0)) >= width and float(z.get("h", 0)) >= 60 for z in rect_zones)
+
+    specs: List[Dict[str, Any]] = []
+    if pax <= thr_right:
+        if zone_fits(120):
+            specs.append({"span": 1, "cap": 8, "w": 120, "h": 60, "find": dict(require_rect_zone=True, prefer_center=True, prefer_center_y=True)})
+        return specs
+    if pax > thr_vertical:
+        n = min(span_max_v, math.ceil(pax / 6))
+        if 6 * n >= pax:
+            specs.append({"span": n, "cap": 6 * n, "w": 120, "h": n * 60 + (n - 1) * 10, "orientation": "vertical", "find": dict(prefer_vertical=True, prefer_right=True)})
+    n = min(4, math.ceil(pax / 6))
+    width = n * 120 + (n - 1) * 10
+    if 6 * n >= pax and zone_fits(width):
+        specs.append({"span": n, "cap": 6 * n, "w": width, "h": 60, "find": dict(require_rect_zone=True, prefer_right=True, prefer_center_y=True)})
+    return specs
+
+
+def _effective_capacity(t: Dict[str, Any], pax: int) -> int:
+    """Seats a table offers for pax guests: rect tables extend by a head seat (up to 8) only when needed."""
+    cap = int(_capacity_for_table(t))
+    if t.get("kind") == "rect" and pax > cap:
+        cap = min(8, cap + 2)
+    return cap
+
+
+def _assignment_metrics(plan_data: Dict[str, Any], result: Dict[str, Any], reservations: List[Reservation]) -> Dict[str, Any]:
+    """Placement quality of an assignments dict: unplaced groups/pax, empty seats, tables used."""
+    by_id = {str(t.get("id")): t for t in (plan_data.get("tables") or [])}
+    waste = 0
+    dynamic = 0
+    last_resort = 0
+    for tid, a in (result.get("tables") or {}).items():
+        t = by_id.get(str(tid))
+        if not t:
+            continue
+        pax = int(a.get("pax") or 0)
+        waste += max(0, _effective_capacity(t, pax) - pax)
+        if t.get("dynamic"):
+            dynamic += 1
+        if a.get("last_resort"):
+            last_resort += 1
+    placed_ids = {str(a.get("res_id")) for a in (result.get("tables") or {}).values()}
+    unplaced = [r for r in reservations if str(r.id) not in placed_ids]
+    return {
+        "placed_groups": len(reservations) - len(unplaced),
+        "unplaced_groups": len(unplaced),
+        "unplaced_pax": sum(int(r.pax or 0) for r in unplaced),
+        "seats_wasted": waste,
+        "tables_used": len(result.get("tables") or {}),
+        "dynamic_tables": dynamic,
+        "last_resort": last_resort,
+    }
+
+
+def _auto_assign_optimal(plan_data: Dict[str, Any], reservations: List[Reservation], time_budget: float = 2.0, busy_ids: Optional[Set[str]] = None) -> Dict[str, Any]:
+    """Assignment by branch-and-bound instead of greedy passes.
+
+    Tables are grouped in interchangeable classes (kind, capacity); each group gets the options the
+    greedy rules allow (fixed ≤4 pax within fixed_chair_stock, rect with head extension, two rects
+    collées for 9–14 pax, standing, round/sofa as last resort, dynamic rect/round within
+    max_dynamic_tables) and floorplan_solver picks the combination with the fewest unplaced groups,
+    then the fewest empty seats. Dynamic tables are placed afterwards with _find_spot_for_table.
+    Returns the same {"tables", "alerts"} shape as _auto_assign plus a "solver" block.
+    Tables listed in busy_ids are already taken and are left out of the pools.
+    """
+    busy = busy_ids or set()
+    tables: List[Dict[str, Any]] = [t for t in (plan_data.get("tables") or []) if str(t.get("id")) not in busy]
+    cfg = plan_data.get("large_table_config") or {}
+    max_dynamic = plan_data.get("max_dynamic_tables", {})
+    fixed_chair_stock = int(plan_data.get("fixed_chair_stock", 28))
+
+    # Interchangeable table classes
+    classes: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+    for t in tables:
+        if t.get("kind") == "fixed" or t.get("locked") is True:
+            kind = "fixed"
+        elif t.get("kind") in ("rect", "round", "sofa", "standing"):
+            kind = str(t.get("kind"))
+        else:
+            continue
+        classes.setdefault((kind, int(_capacity_for_table(t))), []).append(t)
+    capacities: Dict[Any, int] = {("tbl", k): len(v) for k, v in classes.items()}
+    capacities["fixed_chairs"] = fixed_chair_stock
+    capacities["dyn_rect"] = int(max_dynamic.get("rect", 10))
+    capacities["dyn_round"] = int(max_dynamic.get("round", 5))
+    rect_keys = sorted(k for k in classes if k[0] == "rect")
+    # Pair options only for classes with joinable pairs of tables. The solver counts tables per class,
+    # so each class pair also gets a ("pair", ka, kb) stock: an upper bound on how many disjoint
+    # joinable pairs it has, lowered to what _materialize could actually seat when it falls short.
+    join_graph = _join_graph(tables, cfg)
+    class_of = {str(t.get("id")): k for k, v in classes.items() for t in v}
+    pair_ends: Dict[Tuple[Any, Any], Tuple[Set[str], Set[str]]] = {}
+    for a, b in join_graph.pairs(set(join_graph.adj)):
+        if a not in class_of or b not in class_of:
+            continue
+        if class_of[b] < class_of[a]:
+            a, b = b, a
+        ends = pair_ends.setdefault((class_of[a], class_of[b]), (set(), set()))
+        ends[0].add(a)
+        ends[1].add(b)
+    for (ka, kb), (ends_a, ends_b) in pair_ends.items():
+        capacities[("pair", ka, kb)] = len(ends_a | ends_b) // 2 if ka == kb else min(len(ends_a), len(ends_b))
+
+    groups = sorted(reservations, key=lambda r: (-int(r.pax), r.arrival_time or dtime(0, 0)))
+    all_options: List[List[Option]] = []
+    for r in groups:
+        pax = int(r.pax)
+        opts: List[Option] = []
+        for (kind, cap) in classes:
+            key = ("tbl", (kind, cap))
+            if kind == "fixed":
+                if pax <= 4 and cap >= pax:
+                    opts.append(Option((cap - pax) * _OPT_W_WASTE, [(key, 1), ("fixed_chairs", pax)], ("table", (kind, cap), False)))
+            elif kind == "rect":
+                if pax <= 8 and cap > 8:
+                    continue
+                cap_ext = min(8, cap + 2)
+                if cap_ext >= pax:
+                    eff = cap if pax <= cap else cap_ext
+                    opts.append(Option((eff - pax) * _OPT_W_WASTE + (_OPT_W_EXTENSION if pax > cap else 0), [(key, 1)], ("table", (kind, cap), False)))
+            elif cap >= pax:
+                last_resort = kind in ("round", "sofa")
+                opts.append(Option((cap - pax) * _OPT_W_WASTE + (_OPT_W_LAST_RESORT if last_resort else 0), [(key, 1)], ("table", (kind, cap), last_resort)))
+        # Two rect tables collées (same rule as take_best_rect_combo)
+        if 9 <= pax <= 14:
+            for i, ka in enumerate(rect_keys):
+                for kb in rect_keys[i:]:
+                    if ka == kb and len(classes[ka]) < 2:
+                        continue
+                    if (ka, kb) not in pair_ends:
+                        continue
+                    base_sum = max(6, ka[1]) + max(6, kb[1])
+                    if base_sum >= pax:
+                        eff, ext = base_sum, 0
+                    elif pax - base_sum <= 4:
+                        eff, ext = pax, pax - base_sum
+                    else:
+                        continue
+                    uses = [(("tbl", ka), 2)] if ka == kb else [(("tbl", ka), 1), (("tbl", kb), 1)]
+                    uses.append((("pair", ka, kb), 1))
+                    opts.append(Option((eff - pax) * _OPT_W_WASTE + ext * _OPT_W_EXTENSION, uses, ("pair", ka, kb)))
+        specs = _dynamic_rect_specs(pax, cfg, plan_data.get("rect_only_zones") or [])
+        if specs:
+            opts.append(Option((specs[0]["cap"] - pax) * _OPT_W_WASTE + _OPT_W_DYNAMIC, [("dyn_rect", 1)], ("dyn_rect", specs)))
+        if pax <= 10:
+            opts.append(Option((10 - pax) * _OPT_W_WASTE + _OPT_W_DYNAMIC + _OPT_W_LAST_RESORT, [("dyn_round", 1)], ("dyn_round",)))
+        opts.sort(key=lambda o: o.cost)
+        all_options.append(opts)
+    unplaced_cost = [_OPT_W_UNPLACED + _OPT_W_UNPLACED_PAX * int(r.pax) for r in groups]
+
+    def _entry(r: Reservation, pax: int, last_resort: bool = False) -> Dict[str, Any]:
+        e: Dict[str, Any] = {"res_id": str(r.id), "name": (r.client_name or "").upper(), "pax": pax}
+        if last_resort:
+            e["last_resort"] = True
+        return e
+
+    def _materialize(choices: List[Optional[int]]) -> Tuple[Dict[str, Dict[str, Any]], List[str], Dict[Any, int], Dict[Any, int]]:
+        """Concrete tables from each class; dynamic tables placed largest group first."""
+        out: Dict[str, Dict[str, Any]] = {}
+        notes: List[str] = []
+        placed: Dict[Any, int] = {"dyn_rect": 0, "dyn_round": 0}
+        failed: Dict[Any, int] = {"dyn_rect": 0, "dyn_round": 0}
+        pools = {k: list(v) for k, v in classes.items()}
+        spot_index = PlanIndex(plan_data, obstacles=_cached_obstacles(plan_data))
+        for r, choice, opts in zip(groups, choices, all_options):
+            if choice is None:
+                continue
+            tag = opts[choice].tag
+            pax = int(r.pax)
+            if tag[0] == "table":
+                t = pools[tag[1]].pop(0)
+                out[str(t.get("id"))] = _entry(r, min(pax, _effective_capacity(t, pax)), tag[2])
+                if tag[2]:
+                    notes.append(f"Dernier recours: {'table ronde' if tag[1][0] == 'round' else 'canapé'} pour {r.client_name} ({pax}p)")
+            elif tag[0] == "pair":
+                pa, pb = pools[tag[1]], pools[tag[2]]
+                pick = next(((a, b) for a in pa for b in pb if a is not b and str(b.get("id")) in join_graph.adj.get(str(a.get("id")), ())), None)
+                stock = ("pair", tag[1], tag[2])
+                if pick is None:
+                    # Every joinable pair of these classes is already taken: never seat on tables apart
+                    failed[stock] = failed.get(stock, 0) + 1
+                    notes.append(f"Pas de tables collées voisines libres pour {r.client_name} ({pax}p)")
+                    continue
+                placed[stock] = placed.get(stock, 0) + 1
+                pa.remove(pick[0])
+                pb.remove(pick[1])
+                pair = list(pick)
+                remaining = pax
+                for t in pair:
+                    take = min(min(8, int(_capacity_for_table(t)) + 2), remaining)
+                    out[str(t.get("id"))] = _entry(r, take)
+                    remaining -= take
+            elif tag[0] == "dyn_rect":
+                new_tbl = None
+                for spec in tag[1]:
+                    spot = _find_spot_for_table(plan_data, "rect", w=spec["w"], h=spec["h"], index=spot_index, **spec["find"])
+                    if spot:
+                        new_tbl = {"id": str(uuid.uuid4()), "kind": "rect", "capacity": spec["cap"], **spot, "dynamic": True, "span": spec["span"]}
+                        if spec.get("orientation"):
+                            new_tbl["orientation"] = spec["orientation"]
+                        break
+                if new_tbl is None:
+                    failed["dyn_rect"] += 1
+                    notes.append(f"Pas d'espace pour table rect dynamique pour {r.client_name} ({pax}p)")
+                    continue
+                (plan_data.setdefault("tables", [])).append(new_tbl)
+                out[new_tbl["id"]] = _entry(r, pax)
+                placed["dyn_rect"] += 1
+            elif tag[0] == "dyn_round":
+                spot = _find_spot_for_table(plan_data, "round", r=50, index=spot_index)
+                if not spot:
+                    failed["dyn_round"] += 1
+                    notes.append("Impossible de placer une table ronde en dernier recours")
+                    continue
+                new_tbl = {"id": str(uuid.uuid4()), "kind": "round", "capacity": 10, **spot, "dynamic": True}
+                (plan_data.setdefault("tables", [])).append(new_tbl)
+                out[new_tbl["id"]] = _entry(r, pax, True)
+                placed["dyn_round"] += 1
+                notes.append(f"Dernier recours dynamique: table ronde créée pour {r.client_name} ({pax}p)")
+        return out, notes, placed, failed
+
+    # The solver does not see geometry: when dynamic tables find no room, or a class pair runs out
+    # of free neighbouring tables, cap that stock at what actually fit and solve again (up to 3
+    # rounds within the same time budget).
+    t_start = time.perf_counter()
+    tables_before = len(plan_data.get("tables") or [])
+    total_nodes = 0
+    for attempt in range(3):
+        budget_left = max(0.1, time_budget - (time.perf_counter() - t_start))
+        solved = solve_assignment(all_options, unplaced_cost, capacities, time_budget=budget_left * (0.6 if attempt == 0 else 1.0),
+                                  group_keys=[int(r.pax) for r in groups])
+        total_nodes += solved.nodes
+        _dbg_add("INFO", f"AUTO-ASSIGN optimal #{attempt + 1}: cost={solved.cost} optimal={solved.optimal} nodes={solved.nodes} elapsed={solved.elapsed * 1000:.0f}ms")
+        assignments_by_table, alerts, placed, failed = _materialize(solved.choices)
+        if not any(failed.values()) or attempt == 2:
+            break
+        for key, n_failed in failed.items():
+            if n_failed:
+                capacities[key] = placed.get(key, 0)
+        del (plan_data.get("tables") or [])[tables_before:]
+
+    assigned_res_ids = {str(v.get("res_id")) for v in assignments_by_table.values()}
+    unassigned = [r for r in reservations if str(r.id) not in assigned_res_ids]
+    if unassigned:
+        names = ", ".join((r.client_name or "").upper()[:18] for r in unassigned[:8])
+        extra = "" if len(unassigned) <= 8 else f" (+{len(unassigned)-8} autres)"
+        msg = f"{len(unassigned)} réservation(s) non assignée(s): {names}{extra}"
+        _dbg_add("WARNING", msg)
+        alerts.append(msg)
+    return {
+        "tables": assignments_by_table,
+        "alerts": alerts,
+        "solver": {
+            "name": "optimal",
+            "optimal": solved.optimal,
+            "rounds": attempt + 1,
+            "nodes": total_nodes,
+            "elapsed_ms": round((time.perf_counter() - t_start) * 1000, 1),
+            "time_budget_ms": int(time_budget * 1000),
+        },
+    }
+
+
+# ---- Incremental re-assignment (one reservation) ----
+
+_UNASSIGNED_ALERT = "réservation(s) non assignée(s)"
+
+
+def _is_fixed_table(t: Dict[str, Any]) -> bool:
+    return t.get("kind") == "fixed" or t.get("locked") is True
+
+
+def _fixed_chairs_in_use(plan_data: Dict[str, Any], tables_map: Dict[str, Dict[str, Any]], skip_res_id: Optional[str] = None) -> int:
+    by_id = {str(t.get("id")): t for t in (plan_data.get("tables") or [])}
+    used = 0
+    for tid, a in tables_map.items():
+        t = by_id.get(str(tid))
+        if t and _is_fixed_table(t) and str(a.get("res_id")) != skip_res_id:
+            used += int(a.get("pax") or 0)
+    return used
+
+
+def _release_reservation(plan_data: Dict[str, Any], tables_map: Dict[str, Dict[str, Any]], res_id: str, only: Optional[Set[str]] = None) -> List[str]:
+    """Free the tables held by res_id (or only those listed); dynamic tables it used leave the plan."""
+    freed = [tid for tid, a in tables_map.items() if str(a.get("res_id")) == res_id and (only is None or tid in only)]
+    for tid in freed:
+        del tables_map[tid]
+    if freed:
+        gone = set(freed)
+        plan_data["tables"] = [t for t in (plan_data.get("tables") or []) if not (t.get("dynamic") and str(t.get("id")) in gone)]
+    return freed
+
+
+def _resized_entry(a: Dict[str, Any], pax: int) -> Dict[str, Any]:
+    return {"res_id": a.get("res_id"), "name": a.get("name"), "pax": pax}
+
+
+def _resize_in_place(plan_data: Dict[str, Any], tables_map: Dict[str, Dict[str, Any]], res_id: str, pax: int) -> bool:
+    """Spread the new pax over the tables res_id already holds when they still fit.
+    Tables left empty after a decrease are freed. Returns False when the group must move.
+    A last-resort placement (round/sofa) is never kept as is: the group is seated again so the
+    flag is recomputed for the new pax. Kept entries are rebuilt with res_id/name/pax only.
+    """
+    by_id = {str(t.get("id")): t for t in (plan_data.get("tables") or [])}
+    held = [(tid, by_id[tid]) for tid, a in tables_map.items() if str(a.get("res_id")) == res_id and tid in by_id]
+    if not held or any(tables_map[tid].get("last_resort") for tid, _ in held):
+        return False
+    if len(held) == 1:
+        tid, t = held[0]
+        if _is_fixed_table(t):
+            stock = int(plan_data.get("fixed_chair_stock", 28))
+            if pax > 4 or pax > int(_capacity_for_table(t)) or _fixed_chairs_in_use(plan_data, tables_map, res_id) + pax > stock:
+                return False
+        elif pax > _effective_capacity(t, pax):
+            return False
+        tables_map[tid] = _resized_entry(tables_map[tid], pax)
+        return True
+    # Tables collées: same seat rule as the pair options (rect extends by a head seat up to 8)
+    seats = [min(8, int(_capacity_for_table(t)) + 2) if t.get("kind") == "rect" else int(_capacity_for_table(t)) for _, t in held]
+    if sum(seats) < pax:
+        return False
+    remaining = pax
+    emptied: Set[str] = set()
+    for (tid, _), cap in zip(held, seats):
+        take = min(cap, remaining)
+        remaining -= take
+        if take > 0:
+            tables_map[tid] = _resized_entry(tables_map[tid], take)
+        else:
+            emptied.add(tid)
+    if emptied:
+        _release_reservation(plan_data, tables_map, res_id, only=emptied)
+    return True
+
+
+def _incremental_assign(plan_data: Dict[str, Any], tables_map: Dict[str, Dict[str, Any]], reservation: Any, time_budget: float = 0.2) -> Dict[str, Any]:
+    """Seat one group without touching the others.
+
+    Only free tables are candidates; fixed chairs and dynamic tables already in use are taken off
+    the stocks. Dynamic tables created here are appended to plan_data["tables"] and tables_map is
+    updated in place. Returns the _auto_assign_optimal result for this single group.
+    """
+    tables = plan_data.setdefault("tables", [])
+    max_dynamic = plan_data.get("max_dynamic_tables", {})
+    dyn_rect = sum(1 for t in tables if t.get("dynamic") and t.get("kind") == "rect")
+    dyn_round = sum(1 for t in tables if t.get("dynamic") and t.get("kind") == "round")
+    # Shallow view: same tables list, stocks reduced to what is still available
+    view = dict(plan_data)
+    view["fixed_chair_stock"] = max(0, int(plan_data.get("fixed_chair_stock", 28)) - _fixed_chairs_in_use(plan_data, tables_map))
+    view["max_dynamic_tables"] = {
+        "rect": max(0, int(max_dynamic.get("rect", 10)) - dyn_rect),
+        "round": max(0, int(max_dynamic.get("round", 5)) - dyn_round),
+    }
+    result = _auto_assign_optimal(view, [reservation], time_budget=time_budget, busy_ids=set(tables_map.keys()))
+    tables_map.update(result["tables"])
+    return result
+
+
+def _assignment_diff(before: Dict[str, Dict[str, Any]], after: Dict[str, Dict[str, Any]], tables_before: Set[str], tables_after: Set[str]) -> Dict[str, Any]:
+    return {
+        "added": {tid: a for tid, a in after.items() if tid not in before},
+        "removed": sorted(tid for tid in before if tid not in after),
+        "changed": {tid: a for tid, a in after.items() if tid in before and before[tid] != a},
+        "tables_added": sorted(tables_after - tables_before),
+        "tables_removed": sorted(tables_before - tables_after),
+    }
+
+
 # ---- Base plan ----
 
+# ---- Conditional GET: ETag = row id + version (bumped on every write), 304 on If-None-Match ----
+
+def _plan_etag(row_id: Any, version: int) -> str:
+    return f'"{row_id}-{version}"'
+
+
+def _list_etag(rows: List[Tuple[Any, int]]) -> str:
+    h = hashlib.sha1(",".join(f"{i}:{v}" for i, v in rows).encode("utf-8"))
+    return f'"{h.hexdigest()[:20]}"'
+
+
+def _etag_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def _not_modified(if_none_match: Optional[str], etag: str) -> Optional[Response]:
+    if if_none_match and etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=_etag_headers(etag))
+    return None
+
+
 @router.get("/base", response_model=FloorPlanBaseRead)
-def get_base(session: Session = Depends(get_session)):
+def get_base(response: Response, if_none_match: Optional[str] = Header(default=None), session: Session = Depends(get_session)):
     _dbg_add("INFO", "GET /base")
+    if if_none_match:
+        # Version only: an unchanged plan is answered without loading its JSON
+        head = session.exec(select(FloorPlanBase.id, FloorPlanBase.version).order_by(FloorPlanBase.created_at.asc())).first()
+        if head:
+            not_modified = _not_modified(if_none_match, _plan_etag(*head))
+            if not_modified:
+                return not_modified
     row = _get_or_create_base(session)
-    logger.info("GET /base -> id=%s", row.id)
+    response.headers.update(_etag_headers(_plan_etag(row.id, row.version)))
+    logger.info("GET /base -> id=%s version=%s", row.id, row.version)
     _dbg_add("INFO", f"GET /base -> id={row.id}")
     return FloorPlanBaseRead(**row.model_dump())
 
 
+def _validate_base_data(plan_data: Any) -> None:
+    if not isinstance(plan_data, dict):
+        raise HTTPException(400, "Invalid data format: must be dict")
+    if "tables" in plan_data:
+        if not isinstance(plan_data["tables"], list):
+            raise HTTPException(400, "Invalid data.tables format: must be list")
+        # Validate each table
+        for i, table in enumerate(plan_data["tables"]):
+            if not isinstance(table, dict):
+                raise HTTPException(400, f"Invalid table at index {i}: must be dict")
+            if "id" not in table:
+                raise HTTPException(400, f"Invalid table at index {i}: missing 'id'")
+            if "x" not in table or "y" not in table:
+                raise HTTPException(400, f"Invalid table {table.get('id')}: missing x/y coordinates")
+    if "room" in plan_data:
+        room = plan_data["room"]
+        if not isinstance(room, dict):
+            raise HTTPException(400, "Invalid room format: must be dict")
+        if "width" not in room or "height" not in room:
+            raise HTTPException(400, "Invalid room: missing width/height")
+        if room["width"] < 100 or room["height"] < 100:
+            raise HTTPException(400, "Invalid room: dimensions must be >= 100")
+
+
+def _validate_instance_data(plan_data: Any) -> None:
+    if not isinstance(plan_data, dict):
+        raise HTTPException(400, "Invalid data format: must be dict")
+    if "tables" in plan_data and not isinstance(plan_data["tables"], list):
+        raise HTTPException(400, "Invalid data.tables format: must be list")
+
+
+def _validate_assignments(assignments: Any) -> None:
+    if not isinstance(assignments, dict) or "tables" not in assignments:
+        raise HTTPException(400, "Invalid assignments format: must have 'tables' key")
+    tables_map = assignments.get("tables", {})
+    if not isinstance(tables_map, dict):
+        raise HTTPException(400, "Invalid assignments.tables format: must be dict")
+    for table_id, assignment in tables_map.items():
+        if not isinstance(assignment, dict):
+            raise HTTPException(400, f"Invalid assignment for table {table_id}: must be dict")
+        required_keys = ["res_id", "name", "pax"]
+        for key in required_keys:
+            if key not in assignment:
+                raise HTTPException(400, f"Invalid assignment for table {table_id}: missing '{key}'")
+
+
+def _apply_plan_patch(session: Session, row: Any, payload: FloorPlanPatch, fields: Tuple[str, ...], validators: Dict[str, Any], what: str) -> Dict[str, Any]:
+    """Apply a PATCH to row (base or instance) at payload.version; only the touched fields are written.
+    The version column makes the UPDATE conditional: a concurrent write turns into a 409."""
+    if row.version != payload.version:
+        raise HTTPException(409, f"Plan version conflict: current version is {row.version}", headers={"X-Plan-Version": str(row.version)})
+    doc = {f: copy.deepcopy(getattr(row, f) or {}) for f in fields}
+    try:
+        floorplan_patch.apply_patch(doc, payload.ops, fields)
+    except floorplan_patch.PatchError as e:
+        raise HTTPException(400, f"Invalid patch: {e}")
+    touched = [f for f in fields if doc[f] != getattr(row, f)]
+    for f in touched:
+        if doc[f]:
+            validators[f](doc[f])
+        setattr(row, f, doc[f])
+    if touched:
+        row.updated_at = datetime.utcnow()
+        session.add(row)
+        try:
+            session.flush()
+        except StaleDataError:
+            session.rollback()
+            raise HTTPException(409, "Plan version conflict: modified concurrently")
+        version = row.version
+        session.commit()
+    else:
+        version = row.version
+    logger.info("PATCH %s -> ops=%d touched=%s version=%d", what, len(payload.ops), touched, version)
+    _dbg_add("INFO", f"PATCH {what} -> ops={len(payload.ops)} version={version}")
+    return {"version": version}
+
+
 @router.put("/base", response_model=FloorPlanBaseRead)
 def update_base(payload: FloorPlanBaseUpdate, session: Session = Depends(get_session)):
     _dbg_add("INFO", "PUT /base")
@@ -1569,39 +2191,29 @@ def update_base(payload: FloorPlanBaseUpdate, session: Session = Depends(get_ses
     
     # Validate data if present
     if "data" in data and data["data"]:
-        plan_data = data["data"]
-        if not isinstance(plan_data, dict):
-            raise HTTPException(400, "Invalid data format: must be dict")
-        if "tables" in plan_data:
-            if not isinstance(plan_data["tables"], list):
-                raise HTTPException(400, "Invalid data.tables format: must be list")
-            # Validate each table
-            for i, table in enumerate(plan_data["tables"]):
-                if not isinstance(table, dict):
-                    raise HTTPException(400, f"Invalid table at index {i}: must be dict")
-                if "id" not in table:
-                    raise HTTPException(400, f"Invalid table at index {i}: missing 'id'")
-                if "x" not in table or "y" not in table:
-                    raise HTTPException(400, f"Invalid table {table.get('id')}: missing x/y coordinates")
-        if "room" in plan_data:
-            room = plan_data["room"]
-            if not isinstance(room, dict):
-                raise HTTPException(400, "Invalid room format: must be dict")
-            if "width" not in room or "height" not in room:
-                raise HTTPException(400, "Invalid room: missing width/height")
-            if room["width"] < 100 or room["height"] < 100:
-                raise HTTPException(400, "Invalid room: dimensions must be >= 100")
+        _validate_base_data(data["data"])
     
     for k, v in data.items():
         setattr(row, k, v)
     session.add(row)
     session.commit()
     session.refresh(row)
+    _invalidate_base_cache()
     logger.info("PUT /base -> updated id=%s (keys=%s)", row.id, list(data.keys()))
     _dbg_add("INFO", f"PUT /base -> updated id={row.id} keys={list(data.keys())}")
     return FloorPlanBaseRead(**row.model_dump())
 
 
+@router.patch("/base")
+def patch_base(payload: FloorPlanPatch, response: Response, session: Session = Depends(get_session)):
+    """Delta update of the base plan (JSON Patch / table ops) against its version; returns {"version"}."""
+    row = _get_or_create_base(session)
+    result = _apply_plan_patch(session, row, payload, ("data",), {"data": _validate_base_data}, "/base")
+    _invalidate_base_cache()
+    response.headers.update(_etag_headers(_plan_etag(row.id, result["version"])))
+    return result
+
+
 # ---- Numbering and PDF (Base) ----
 
 @router.post("/base/number-tables", response_model=FloorPlanBaseRead)
@@ -1611,9 +2223,13 @@ def number_base_tables(session: Session = Depends(get_session)):
     plan = row.data or {}
     plan, _ = _assign_table_numbers(plan, max_numbers=20, max_tnumbers=20, persist=True)
     row.data = plan
+    # Labels are written in place: force SQLAlchemy to detect the JSON change
+    from sqlalchemy.orm.attributes import flag_modified
+    flag_modified(row, "data")
     session.add(row)
     session.commit()
     session.refresh(row)
+    _invalidate_base_cache()
     tables = plan.get("tables") or []
     used = sum(1 for t in tables if t.get("label"))
     logger.info("POST /base/number-tables -> labeled=%d", used)
@@ -1628,22 +2244,25 @@ def renumber_base_tables(payload: RenumberTablesPayload, session: Session = Depe
     plan = row.data or {}
     plan = _apply_manual_renumber(plan, payload)
     row.data = plan
+    # Labels are written in place: force SQLAlchemy to detect the JSON change
+    from sqlalchemy.orm.attributes import flag_modified
+    flag_modified(row, "data")
     session.add(row)
     session.commit()
     session.refresh(row)
+    _invalidate_base_cache()
     return FloorPlanBaseRead(**row.model_dump())
 
 
 @router.get("/base/export-pdf")
 def export_base_pdf(session: Session = Depends(get_session)):
     _dbg_add("INFO", "GET /base/export-pdf")
-    row = _get_or_create_base(session)
-    plan = row.data or {}
-    # Do not mutate DB; compute labels transiently if missing
-    _plan, id_to_label = _assign_table_numbers(dict(plan), persist=False)
+    # Do not mutate DB; labels computed transiently (once per base version, kept in the snapshot)
+    base = _base_snapshot(session)
+    id_to_label = base.labels
     buf = io.BytesIO()
     c = pdfcanvas.Canvas(buf, pagesize=A4)
-    _draw_plan_page(c, _plan, id_to_label)
+    _draw_plan_page(c, base.data, id_to_label)
     c.showPage()
     c.save()
     pdf_bytes = buf.getvalue()
@@ -1654,51 +2273,36 @@ def export_base_pdf(session: Session = Depends(get_session)):
     return Response(content=pdf_bytes, media_type="application/pdf", headers=headers)
 
 
-@router.post("/instances/{instance_id}/export-annotated")
-def export_instance_annotated(
-    instance_id: uuid.UUID,
-    file: UploadFile = File(...),
-    page_start: int = Form(0),
-    start_y_mm: float = Form(95.0),
-    row_h_mm: float = Form(13.5),
-    table_x_mm: float = Form(137.0),
-    session: Session = Depends(get_session),
-):
-    _dbg_add("INFO", f"POST /instances/{instance_id}/export-annotated")
-    row = session.get(FloorPlanInstance, instance_id)
-    if not row:
-        raise HTTPException(404, "Instance not found")
-    if PdfReader is None:
-        raise HTTPException(501, "PDF annotation not available (pypdf not installed)")
-    
-    # Si l'instance n'a pas de plan, copier depuis le plan de base
-    plan = row.data or {}
-    if not plan.get("tables"):
-        base = _get_or_create_base(session)
-        if base and base.data:
-            import copy
-            plan = copy.deepcopy(base.data)
-            logger.info("POST /instances/%s/export-annotated -> copied base plan with %d tables", instance_id, len(plan.get("tables") or []))
-            _dbg_add("INFO", f"POST /instances/{instance_id}/export-annotated -> copied base plan with {len(plan.get('tables') or [])} tables")
-    _plan, id_to_label = _assign_table_numbers(dict(plan), persist=False)
+def _render_instance_pdf(plan: Dict[str, Any], assignments: Dict[str, Any], reservations: List[Any]) -> Tuple[bytes, Dict[str, str]]:
+    """Reservations list + labelled floor plan of an instance. No DB access (also run by pdf_jobs workers)."""
+    id_to_label = _table_labels(plan)
+    buf = io.BytesIO()
+    c = pdfcanvas.Canvas(buf, pagesize=A4)
+    _draw_reservations_page(c, reservations, assignments, id_to_label)
+    c.showPage()
+    # Floor plan with labels and assignments
+    _draw_plan_page(c, plan, id_to_label, assignments=assignments)
+    c.save()
+    pdf_bytes = buf.getvalue()
+    buf.close()
+    return pdf_bytes, id_to_label
+
+
+def _render_annotated_pdf(orig_bytes: bytes, plan: Dict[str, Any], assignments: Dict[str, Any], reservations: List[Any],
+                          page_start: int = 0, start_y_mm: float = 95.0, row_h_mm: float = 13.5, table_x_mm: float = 137.0) -> bytes:
+    """Table numbers written next to each reservation row of the uploaded PDF, followed by the
+    reservations list and floor plan pages. No DB access (also run by pdf_jobs workers).
+    """
+    id_to_label = _table_labels(plan)
     # Build labels by reservation id
     lab_by_res: Dict[str, List[str]] = {}
-    tbl_map: Dict[str, Any] = (row.assignments or {}).get("tables", {})
+    tbl_map: Dict[str, Any] = assignments.get("tables", {})
     for tid, a in tbl_map.items():
         rid = str(a.get("res_id"))
         lbl = id_to_label.get(tid)
         if lbl:
             lab_by_res.setdefault(rid, []).append(lbl)
-    try:
-        reservations = _load_reservations(session, row.service_date, row.service_label, instance=row)
-    except Exception as e:
-        logger.error("export_instance_annotated -> failed to load reservations: %s", str(e))
-        _dbg_add("ERROR", f"export_instance_annotated -> load reservations failed: {str(e)[:100]}")
-        reservations = []
-    # Reservations already sorted by _load_reservations (arrival_time asc, created_at asc)
-
     # Read original PDF
-    orig_bytes = file.file.read()
     reader = PdfReader(io.BytesIO(orig_bytes))
     writer = PdfWriter()
 
@@ -1706,9 +2310,6 @@ def export_instance_annotated(
     res_idx = 0
     total_annotated = 0
     
-    logger.info("POST /instances/%s/export-annotated -> annotating %d reservations", instance_id, len(reservations))
-    _dbg_add("INFO", f"Annotating {len(reservations)} reservations with table numbers")
-    
     for pidx in range(len(reader.pages)):
         page = reader.pages[pidx]
         pw = float(page.mediabox.width)
@@ -1756,9 +2357,9 @@ def export_instance_annotated(
     # Append the generated plan+lists PDF
     plan_buf = io.BytesIO()
     c = pdfcanvas.Canvas(plan_buf, pagesize=A4)
-    _draw_reservations_page(c, reservations, (row.assignments or {}), id_to_label)
+    _draw_reservations_page(c, reservations, assignments, id_to_label)
     c.showPage()
-    _draw_plan_page(c, _plan, id_to_label, assignments=(row.assignments or {}))
+    _draw_plan_page(c, plan, id_to_label, assignments=assignments)
     c.save()
     plan_reader = PdfReader(io.BytesIO(plan_buf.getvalue()))
     for pg in plan_reader.pages:
@@ -1768,6 +2369,45 @@ def export_instance_annotated(
     writer.write(out)
     pdf_bytes = out.getvalue()
     out.close()
+    return pdf_bytes
+
+
+@router.post("/instances/{instance_id}/export-annotated")
+def export_instance_annotated(
+    instance_id: uuid.UUID,
+    file: UploadFile = File(...),
+    page_start: int = Form(0),
+    start_y_mm: float = Form(95.0),
+    row_h_mm: float = Form(13.5),
+    table_x_mm: float = Form(137.0),
+    session: Session = Depends(get_session),
+):
+    _dbg_add("INFO", f"POST /instances/{instance_id}/export-annotated")
+    row = session.get(FloorPlanInstance, instance_id)
+    if not row:
+        raise HTTPException(404, "Instance not found")
+    if PdfReader is None:
+        raise HTTPException(501, "PDF annotation not available (pypdf not installed)")
+    
+    # Si l'instance n'a pas de plan, copier depuis le plan de base
+    plan = row.data or {}
+    if not plan.get("tables"):
+        base = _base_snapshot(session)
+        if base.data:
+            plan = base.data  # read-only: shared snapshot, no copy
+            logger.info("POST /instances/%s/export-annotated -> base plan v%d with %d tables", instance_id, base.version, len(plan.get("tables") or []))
+            _dbg_add("INFO", f"POST /instances/{instance_id}/export-annotated -> base plan with {len(plan.get('tables') or [])} tables")
+    try:
+        reservations = _load_reservations(session, row.service_date, row.service_label, instance=row)
+    except Exception as e:
+        logger.error("export_instance_annotated -> failed to load reservations: %s", str(e))
+        _dbg_add("ERROR", f"export_instance_annotated -> load reservations failed: {str(e)[:100]}")
+        reservations = []
+    # Reservations already sorted by _load_reservations (arrival_time asc, created_at asc)
+    logger.info("POST /instances/%s/export-annotated -> annotating %d reservations", instance_id, len(reservations))
+    _dbg_add("INFO", f"Annotating {len(reservations)} reservations with table numbers")
+    pdf_bytes = _render_annotated_pdf(file.file.read(), plan, (row.assignments or {}), reservations,
+                                      page_start=page_start, start_y_mm=start_y_mm, row_h_mm=row_h_mm, table_x_mm=table_x_mm)
     headers = {"Content-Disposition": "attachment; filename=floorplan_instance_annotated.pdf"}
     logger.info("POST /instances/%s/export-annotated -> bytes=%d", instance_id, len(pdf_bytes))
     _dbg_add("INFO", f"POST /instances/{instance_id}/export-annotated -> bytes={len(pdf_bytes)} reservations={len(reservations)}")
@@ -1778,7 +2418,7 @@ def export_instance_annotated(
 @router.post("/instances", response_model=FloorPlanInstanceRead)
 def create_instance(payload: FloorPlanInstanceCreate, session: Session = Depends(get_session)):
     _dbg_add("INFO", f"POST /instances date={payload.service_date} label={payload.service_label}")
-    base = _get_or_create_base(session)
+    base = _base_snapshot(session)
     # Check unique
     existing = session.exec(
         select(FloorPlanInstance).where(
@@ -1795,7 +2435,7 @@ def create_instance(payload: FloorPlanInstanceCreate, session: Session = Depends
         service_date=payload.service_date,
         service_label=payload.service_label,
         template_id=base.id,
-        data=base.data or {},
+        data=base.plan_copy(),
         assignments={"tables": {}},
         reservations={"items": []},  # Initialize empty reservations
     )
@@ -1807,24 +2447,43 @@ def create_instance(payload: FloorPlanInstanceCreate, session: Session = Depends
     return FloorPlanInstanceRead(**row.model_dump())
 
 
-@router.get("/instances", response_model=List[FloorPlanInstanceRead])
-def list_instances(service_date: Optional[date] = None, service_label: Optional[str] = None, session: Session = Depends(get_session)):
-    stmt = select(FloorPlanInstance).order_by(FloorPlanInstance.service_date.desc())
-    rows = session.exec(stmt).all()
+def _filter_instances(rows: List[Any], service_date: Optional[date], service_label: Optional[str]) -> List[Any]:
     if service_date:
         rows = [r for r in rows if r.service_date == service_date]
     if service_label:
         rows = [r for r in rows if (r.service_label or "").lower() == service_label.lower()]
+    return rows
+
+
+@router.get("/instances", response_model=List[FloorPlanInstanceRead])
+async def list_instances(response: Response, service_date: Optional[date] = None, service_label: Optional[str] = None, if_none_match: Optional[str] = Header(default=None), session: Optional[AsyncSession] = Depends(get_async_session)):
+    if if_none_match:
+        # ETag of the list = (id, version) of every listed instance, read without the plan JSON
+        head_stmt = select(FloorPlanInstance.id, FloorPlanInstance.version, FloorPlanInstance.service_date, FloorPlanInstance.service_label).order_by(FloorPlanInstance.service_date.desc())
+        heads = _filter_instances(await run_read(session, lambda s: s.exec(head_stmt).all()), service_date, service_label)
+        not_modified = _not_modified(if_none_match, _list_etag([(h.id, h.version) for h in heads]))
+        if not_modified:
+            return not_modified
+    stmt = select(FloorPlanInstance).order_by(FloorPlanInstance.service_date.desc())
+    rows = _filter_instances(await run_read(session, lambda s: s.exec(stmt).all()), service_date, service_label)
+    response.headers.update(_etag_headers(_list_etag([(r.id, r.version) for r in rows])))
     logger.info("GET /instances -> count=%d (filters: date=%s label=%s)", len(rows), service_date, service_label)
     return [FloorPlanInstanceRead(**r.model_dump()) for r in rows]
 
 
 @router.get("/instances/{instance_id}", response_model=FloorPlanInstanceRead)
-def get_instance(instance_id: uuid.UUID, session: Session = Depends(get_session)):
+async def get_instance(instance_id: uuid.UUID, response: Response, if_none_match: Optional[str] = Header(default=None), session: Optional[AsyncSession] = Depends(get_async_session)):
     _dbg_add("INFO", f"GET /instances/{instance_id}")
-    row = session.get(FloorPlanInstance, instance_id)
+    if if_none_match:
+        version = await run_read(session, lambda s: s.exec(select(FloorPlanInstance.version).where(FloorPlanInstance.id == instance_id)).first())
+        if version is not None:
+            not_modified = _not_modified(if_none_match, _plan_etag(instance_id, version))
+            if not_modified:
+                return not_modified
+    row = await run_read(session, lambda s: s.get(FloorPlanInstance, instance_id))
     if not row:
         raise HTTPException(404, "Instance not found")
+    response.headers.update(_etag_headers(_plan_etag(row.id, row.version)))
     logger.info("GET /instances/%s -> found", instance_id)
     _dbg_add("INFO", f"GET /instances/{instance_id} -> found")
     return FloorPlanInstanceRead(**row.model_dump())
@@ -1840,15 +2499,17 @@ def number_instance_tables(instance_id: uuid.UUID, session: Session = Depends(ge
     # Si l'instance n'a pas de plan, copier depuis le plan de base
     plan = row.data or {}
     if not plan.get("tables"):
-        base = _get_or_create_base(session)
-        if base and base.data:
-            import copy
-            plan = copy.deepcopy(base.data)
+        base = _base_snapshot(session)
+        if base.data:
+            plan = base.plan_copy()
             logger.info("POST /instances/%s/number-tables -> copied base plan with %d tables", instance_id, len(plan.get("tables") or []))
             _dbg_add("INFO", f"POST /instances/{instance_id}/number-tables -> copied base plan with {len(plan.get('tables') or [])} tables")
     
     plan, _ = _assign_table_numbers(plan, max_numbers=20, max_tnumbers=20, persist=True)
     row.data = plan
+    # Labels are written in place: force SQLAlchemy to detect the JSON change
+    from sqlalchemy.orm.attributes import flag_modified
+    flag_modified(row, "data")
     session.add(row)
     session.commit()
     session.refresh(row)
@@ -1868,6 +2529,9 @@ def renumber_instance_tables(instance_id: uuid.UUID, payload: RenumberTablesPayl
     plan = row.data or {}
     plan = _apply_manual_renumber(plan, payload)
     row.data = plan
+    # Labels are written in place: force SQLAlchemy to detect the JSON change
+    from sqlalchemy.orm.attributes import flag_modified
+    flag_modified(row, "data")
     session.add(row)
     session.commit()
     session.refresh(row)
@@ -1884,15 +2548,11 @@ def export_instance_pdf(instance_id: uuid.UUID, session: Session = Depends(get_s
     # Si l'instance n'a pas de plan, copier depuis le plan de base
     plan = row.data or {}
     if not plan.get("tables"):
-        base = _get_or_create_base(session)
-        if base and base.data:
-            import copy
-            plan = copy.deepcopy(base.data)
-            logger.info("GET /instances/%s/export-pdf -> copied base plan with %d tables", instance_id, len(plan.get("tables") or []))
-            _dbg_add("INFO", f"GET /instances/{instance_id}/export-pdf -> copied base plan with {len(plan.get('tables') or [])} tables")
-    _plan, id_to_label = _assign_table_numbers(dict(plan), persist=False)
-    buf = io.BytesIO()
-    c = pdfcanvas.Canvas(buf, pagesize=A4)
+        base = _base_snapshot(session)
+        if base.data:
+            plan = base.data  # read-only: shared snapshot, no copy
+            logger.info("GET /instances/%s/export-pdf -> base plan v%d with %d tables", instance_id, base.version, len(plan.get("tables") or []))
+            _dbg_add("INFO", f"GET /instances/{instance_id}/export-pdf -> base plan with {len(plan.get('tables') or [])} tables")
     # 1) Reservations + assigned tables
     try:
         reservations = _load_reservations(session, row.service_date, row.service_label, instance=row)
@@ -1901,13 +2561,7 @@ def export_instance_pdf(instance_id: uuid.UUID, session: Session = Depends(get_s
         logger.error("export_instance_pdf -> failed to load reservations: %s", str(e))
         _dbg_add("ERROR", f"export_instance_pdf -> load reservations failed: {str(e)[:100]}")
         reservations = []
-    _draw_reservations_page(c, reservations, (row.assignments or {}), id_to_label)
-    c.showPage()
-    # 2) Floor plan with labels and assignments
-    _draw_plan_page(c, _plan, id_to_label, assignments=(row.assignments or {}))
-    c.save()
-    pdf_bytes = buf.getvalue()
-    buf.close()
+    pdf_bytes, id_to_label = _render_instance_pdf(plan, (row.assignments or {}), reservations)
     headers = {"Content-Disposition": "attachment; filename=floorplan_instance.pdf"}
     logger.info("GET /instances/%s/export-pdf -> bytes=%d labels=%d", instance_id, len(pdf_bytes), len(id_to_label))
     _dbg_add("INFO", f"GET /instances/{instance_id}/export-pdf -> bytes={len(pdf_bytes)} labels={len(id_to_label)} reservations={len(reservations)}")
@@ -1960,7 +2614,7 @@ def compare_instance(instance_id: uuid.UUID, session: Session = Depends(get_sess
         reservations = []
     # Build label map from plan snapshot
     plan = row.data or {}
-    _plan, id_to_label = _assign_table_numbers(dict(plan), persist=False)
+    id_to_label = _table_labels(plan)
     tables = {str(t.get("id")): t for t in (plan.get("tables") or [])}
     # Build mapping res_id -> labels and assigned pax
     labels_by_res: Dict[str, List[str]] = {}
@@ -2025,27 +2679,11 @@ def update_instance(instance_id: uuid.UUID, payload: FloorPlanInstanceUpdate, se
     
     # Validate assignments if present
     if "assignments" in data and data["assignments"]:
-        assignments = data["assignments"]
-        if not isinstance(assignments, dict) or "tables" not in assignments:
-            raise HTTPException(400, "Invalid assignments format: must have 'tables' key")
-        tables_map = assignments.get("tables", {})
-        if not isinstance(tables_map, dict):
-            raise HTTPException(400, "Invalid assignments.tables format: must be dict")
-        for table_id, assignment in tables_map.items():
-            if not isinstance(assignment, dict):
-                raise HTTPException(400, f"Invalid assignment for table {table_id}: must be dict")
-            required_keys = ["res_id", "name", "pax"]
-            for key in required_keys:
-                if key not in assignment:
-                    raise HTTPException(400, f"Invalid assignment for table {table_id}: missing '{key}'")
+        _validate_assignments(data["assignments"])
     
     # Validate data if present
     if "data" in data and data["data"]:
-        plan_data = data["data"]
-        if not isinstance(plan_data, dict):
-            raise HTTPException(400, "Invalid data format: must be dict")
-        if "tables" in plan_data and not isinstance(plan_data["tables"], list):
-            raise HTTPException(400, "Invalid data.tables format: must be list")
+        _validate_instance_data(data["data"])
     
     for k, v in data.items():
         setattr(row, k, v)
@@ -2057,6 +2695,18 @@ def update_instance(instance_id: uuid.UUID, payload: FloorPlanInstanceUpdate, se
     return FloorPlanInstanceRead(**row.model_dump())
 
 
+@router.patch("/instances/{instance_id}")
+def patch_instance(instance_id: uuid.UUID, payload: FloorPlanPatch, response: Response, session: Session = Depends(get_session)):
+    """Delta update of an instance's data/assignments (JSON Patch / table ops); returns {"version"}."""
+    row = session.get(FloorPlanInstance, instance_id)
+    if not row:
+        raise HTTPException(404, "Instance not found")
+    validators = {"data": _validate_instance_data, "assignments": _validate_assignments}
+    result = _apply_plan_patch(session, row, payload, ("data", "assignments"), validators, f"/instances/{instance_id}")
+    response.headers.update(_etag_headers(_plan_etag(instance_id, result["version"])))
+    return result
+
+
 @router.delete("/instances/{instance_id}")
 def delete_instance(instance_id: uuid.UUID, session: Session = Depends(get_session)):
     """Supprime une instance de floorplan."""
@@ -2078,12 +2728,13 @@ def delete_instance(instance_id: uuid.UUID, session: Session = Depends(get_sessi
 
 
 @router.post("/instances/{instance_id}/auto-assign", response_model=FloorPlanInstanceRead)
-def auto_assign(instance_id: uuid.UUID, session: Session = Depends(get_session)):
-    print("=" * 80)
-    print("🔥 AUTO-ASSIGN VERSION 2.0 - WITH ANTI-REUSE FIX 🔥")
-    print("=" * 80)
-    _dbg_add("INFO", "🔥 AUTO-ASSIGN V2.0 - ANTI-REUSE FIX")
-    _dbg_add("INFO", f"POST /instances/{instance_id}/auto-assign")
+def auto_assign(instance_id: uuid.UUID, solver: str = "greedy", time_budget_ms: int = 2000, session: Session = Depends(get_session)):
+    solver = (solver or "greedy").strip().lower()
+    if solver not in ("greedy", "optimal"):
+        raise HTTPException(400, "Invalid solver (greedy|optimal)")
+    time_budget_ms = max(100, min(30000, int(time_budget_ms)))
+    logger.info("POST /instances/%s/auto-assign solver=%s", instance_id, solver)
+    _dbg_add("INFO", f"POST /instances/{instance_id}/auto-assign solver={solver}")
     row = session.get(FloorPlanInstance, instance_id)
     if not row:
         raise HTTPException(404, "Instance not found")
@@ -2097,27 +2748,7 @@ def auto_assign(instance_id: uuid.UUID, session: Session = Depends(get_session))
         raise HTTPException(400, "Aucune réservation trouvée. Importez d'abord un PDF de réservations via l'interface.")
     
     # Convertir les données dict en objets Reservation pour compatibilité avec _auto_assign
-    from types import SimpleNamespace
-    reservations = []
-    for idx, item in enumerate(res_data):
-        # IMPORTANT: NE PAS régénérer les IDs si ils existent déjà (créés par import-pdf)
-        # Utiliser l'ID existant pour maintenir la cohérence
-        res_id = item.get("id")
-        if not res_id:
-            # Fallback: générer un ID seulement si absent
-            import hashlib
-            content = f"{idx}_{item.get('client_name', '')}_{item.get('pax', 0)}_{item.get('arrival_time', '')}"
-            hash_val = hashlib.md5(content.encode()).hexdigest()
-            res_id = str(uuid.UUID(hash_val))
-            item["id"] = res_id
-        
-        res = SimpleNamespace(
-            id=res_id,
-            client_name=item.get("client_name", "Client"),
-            pax=int(item.get("pax", 0)),
-            arrival_time=dtime.fromisoformat(item.get("arrival_time", "12:00") + (":00" if len(item.get("arrival_time", "12:00")) == 5 else ""))
-        )
-        reservations.append(res)
+    reservations = _reservations_from_items(res_data)
     
     # Mettre à jour les IDs dans row.reservations pour cohérence
     row.reservations = {"items": res_data}
@@ -2125,14 +2756,11 @@ def auto_assign(instance_id: uuid.UUID, session: Session = Depends(get_session))
     # Si l'instance n'a pas de plan, copier depuis le plan de base
     plan = row.data or {}
     if not plan.get("tables"):
-        base = _get_or_create_base(session)
-        if base and base.data:
-            import copy
-            plan = copy.deepcopy(base.data)
+        base = _base_snapshot(session)
+        if base.data:
+            plan = base.plan_copy()
             tables = plan.get("tables") or []
-            fixed_count = sum(1 for t in tables if t.get("kind") == "fixed" or t.get("locked"))
-            rect_count = sum(1 for t in tables if t.get("kind") == "rect")
-            round_count = sum(1 for t in tables if t.get("kind") == "round")
+            fixed_count, rect_count, round_count = (base.kind_counts[k] for k in ("fixed", "rect", "round"))
             logger.info("POST /instances/%s/auto-assign -> copied base plan: %d tables (fixed=%d rect=%d round=%d)", instance_id, len(tables), fixed_count, rect_count, round_count)
             _dbg_add("INFO", f"POST /instances/{instance_id}/auto-assign -> copied base: {len(tables)} tables (fixed={fixed_count} rect={rect_count} round={round_count})")
     
@@ -2141,12 +2769,24 @@ def auto_assign(instance_id: uuid.UUID, session: Session = Depends(get_session))
     fixed_count = sum(1 for t in tables if t.get("kind") == "fixed" or t.get("locked"))
     rect_count = sum(1 for t in tables if t.get("kind") == "rect")
     round_count = sum(1 for t in tables if t.get("kind") == "round")
-    print(f"POST /instances/{instance_id}/auto-assign -> BEFORE: reservations={len(reservations)} tables={tables_before_count} (fixed={fixed_count} rect={rect_count} round={round_count})")
+    logger.info("POST /instances/%s/auto-assign -> BEFORE: reservations=%d tables=%d (fixed=%d rect=%d round=%d)", instance_id, len(reservations), tables_before_count, fixed_count, rect_count, round_count)
     _dbg_add("INFO", f"POST /instances/{instance_id}/auto-assign -> BEFORE: reservations={len(reservations)} tables={tables_before_count} (fixed={fixed_count} rect={rect_count} round={round_count})")
     
     # Sauvegarder le plan avec les tables du base avant auto-assign
     row.data = plan
-    row.assignments = _auto_assign(plan, reservations)
+    if solver == "optimal":
+        # Greedy run on a copy, only for the comparison report
+        greedy_plan = copy.deepcopy(plan)
+        greedy = _auto_assign(greedy_plan, reservations)
+        result = _auto_assign_optimal(plan, reservations, time_budget=time_budget_ms / 1000.0)
+        result["solver"]["report"] = {
+            "optimal": _assignment_metrics(plan, result, reservations),
+            "greedy": _assignment_metrics(greedy_plan, greedy, reservations),
+        }
+        _dbg_add("INFO", f"POST /instances/{instance_id}/auto-assign -> solver report {result['solver']['report']}")
+        row.assignments = result
+    else:
+        row.assignments = _auto_assign(plan, reservations)
     
     # Le plan peut avoir été modifié par _auto_assign (tables créées dynamiquement)
     row.data = plan  # Important: sauvegarder le plan modifié
@@ -2156,13 +2796,12 @@ def auto_assign(instance_id: uuid.UUID, session: Session = Depends(get_session))
     round_after = sum(1 for t in tables_after if t.get("kind") == "round")
     tables_created = len(tables_after) - tables_before_count
     
-    print(f"POST /instances/{instance_id}/auto-assign -> AFTER: tables={len(tables_after)} (fixed={fixed_after} rect={rect_after} round={round_after}) CREATED={tables_created}")
+    logger.info("POST /instances/%s/auto-assign -> AFTER: tables=%d (fixed=%d rect=%d round=%d) CREATED=%d", instance_id, len(tables_after), fixed_after, rect_after, round_after, tables_created)
     _dbg_add("INFO", f"POST /instances/{instance_id}/auto-assign -> AFTER: tables={len(tables_after)} (fixed={fixed_after} rect={rect_after} round={round_after}) CREATED={tables_created}")
     
     if tables_created > 0:
-        print(f"POST /instances/{instance_id}/auto-assign -> NEW TABLES CREATED:")
         for t in tables_after[tables_before_count:]:
-            print(f"  - {t.get('id')}: {t.get('kind')} {t.get('capacity', 0)} pax @ ({t.get('x')}, {t.get('y')})")
+            logger.info("POST /instances/%s/auto-assign -> NEW TABLE %s: %s %s pax @ (%s, %s)", instance_id, t.get("id"), t.get("kind"), t.get("capacity", 0), t.get("x"), t.get("y"))
             _dbg_add("INFO", f"  NEW TABLE: {t.get('id')} {t.get('kind')} {t.get('capacity')}pax @({t.get('x')},{t.get('y')})")
     
     # CRITICAL: Force SQLAlchemy to detect JSON dict changes
@@ -2185,8 +2824,148 @@ def auto_assign(instance_id: uuid.UUID, session: Session = Depends(get_session))
     return FloorPlanInstanceRead(**row.model_dump())
 
 
+@router.post("/instances/{instance_id}/reservations/change")
+def change_instance_reservation(instance_id: uuid.UUID, payload: ReservationChangePayload, session: Session = Depends(get_session)):
+    """Add, remove or resize one reservation without re-running the whole auto-assign.
+
+    Other groups keep their tables: a removal frees its tables, a resize stays in place when the
+    current tables still fit, otherwise the group is seated again on the free tables only.
+    Returns the assignment diff and the updated instance.
+    """
+    t0 = time.perf_counter()
+    op = (payload.op or "").strip().lower()
+    if op not in ("add", "remove", "resize"):
+        raise HTTPException(400, "Invalid op (add|remove|resize)")
+    _dbg_add("INFO", f"POST /instances/{instance_id}/reservations/change op={op} res={payload.reservation_id}")
+    row = session.get(FloorPlanInstance, instance_id)
+    if not row:
+        raise HTTPException(404, "Instance not found")
+
+    items: List[Dict[str, Any]] = copy.deepcopy((row.reservations or {}).get("items", []))
+    plan = copy.deepcopy(row.data or {})
+    if not plan.get("tables"):
+        base = _base_snapshot(session)
+        if base.data:
+            plan = base.plan_copy()
+    assignments = copy.deepcopy(row.assignments or {})
+    tables_map: Dict[str, Dict[str, Any]] = assignments.get("tables") or {}
+    before = copy.deepcopy(tables_map)
+    tables_before = {str(t.get("id")) for t in (plan.get("tables") or [])}
+
+    item: Optional[Dict[str, Any]] = None
+    if op == "add":
+        if payload.pax is None or int(payload.pax) <= 0:
+            raise HTTPException(400, "pax must be > 0")
+        res_id = str(payload.reservation_id or uuid.uuid4())
+        if any(str(it.get("id")) == res_id for it in items):
+            raise HTTPException(409, "Reservation already exists")
+        item = {
+            "id": res_id,
+            "arrival_time": payload.arrival_time or "12:00",
+            "pax": int(payload.pax),
+            "client_name": payload.client_name or "Client",
+        }
+        items.append(item)
+    else:
+        if not payload.reservation_id:
+            raise HTTPException(400, "reservation_id required")
+        res_id = str(payload.reservation_id)
+        item = next((it for it in items if str(it.get("id")) == res_id), None)
+        if item is None:
+            raise HTTPException(404, "Reservation not found")
+        if op == "remove":
+            items.remove(item)
+            _release_reservation(plan, tables_map, res_id)
+        else:
+            if payload.pax is None or int(payload.pax) <= 0:
+                raise HTTPException(400, "pax must be > 0")
+            item["pax"] = int(payload.pax)
+            for k in ("client_name", "arrival_time"):
+                if getattr(payload, k) is not None:
+                    item[k] = getattr(payload, k)
+            if _resize_in_place(plan, tables_map, res_id, int(payload.pax)):
+                name = (item.get("client_name") or "").upper()
+                for a in tables_map.values():
+                    if str(a.get("res_id")) == res_id:
+                        a["name"] = name
+            else:
+                _release_reservation(plan, tables_map, res_id)
+
+    solver: Dict[str, Any] = {}
+    placed = any(str(a.get("res_id")) == res_id for a in tables_map.values())
+    if op != "remove" and not placed:
+        res = _reservations_from_items([item])[0]
+        result = _incremental_assign(plan, tables_map, res)
+        solver = result.get("solver") or {}
+        placed = any(str(a.get("res_id")) == res_id for a in tables_map.values())
+
+    # Only the "non assignée(s)" summary depends on the whole service: recompute it
+    placed_ids = {str(a.get("res_id")) for a in tables_map.values()}
+    unassigned = [it for it in items if str(it.get("id")) not in placed_ids]
+    alerts = [a for a in (assignments.get("alerts") or []) if _UNASSIGNED_ALERT not in str(a)]
+    if unassigned:
+        names = ", ".join((it.get("client_name") or "").upper()[:18] for it in unassigned[:8])
+        extra = "" if len(unassigned) <= 8 else f" (+{len(unassigned)-8} autres)"
+        alerts.append(f"{len(unassigned)} {_UNASSIGNED_ALERT}: {names}{extra}")
+    assignments["tables"] = tables_map
+    assignments["alerts"] = alerts
+
+    diff = _assignment_diff(before, tables_map, tables_before, {str(t.get("id")) for t in (plan.get("tables") or [])})
+    diff["op"] = op
+    diff["reservation_id"] = res_id
+    diff["unplaced"] = op != "remove" and not placed
+    diff["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    if solver:
+        diff["solver"] = solver
+
+    row.reservations = {"items": items}
+    row.data = plan
+    row.assignments = assignments
+    from sqlalchemy.orm.attributes import flag_modified
+    flag_modified(row, "reservations")
+    flag_modified(row, "data")
+    flag_modified(row, "assignments")
+    session.add(row)
+    session.commit()
+    session.refresh(row)
+    logger.info("POST /instances/%s/reservations/change -> op=%s res=%s added=%d removed=%d changed=%d unplaced=%s (%.1f ms)",
+                instance_id, op, res_id, len(diff["added"]), len(diff["removed"]), len(diff["changed"]), diff["unplaced"], diff["elapsed_ms"])
+    _dbg_add("INFO", f"POST /instances/{instance_id}/reservations/change -> op={op} added={len(diff['added'])} removed={len(diff['removed'])} changed={len(diff['changed'])} unplaced={diff['unplaced']}")
+    return {"diff": diff, "instance": FloorPlanInstanceRead(**row.model_dump())}
+
+
 # ---- Import PDF ----
 
+def _store_imported_reservations(session: Session, service_date: date, service_label: Optional[str], out: List[Dict[str, Any]]) -> Optional[uuid.UUID]:
+    # NOTE: L'outil floorplan est complètement indépendant.
+    # Il ne crée JAMAIS de réservations dans la table principale.
+    # Les données parsées sont stockées dans l'instance pour usage temporaire.
+    stmt = select(FloorPlanInstance).where(FloorPlanInstance.service_date == service_date)
+    if service_label:
+        stmt = stmt.where(FloorPlanInstance.service_label == service_label)
+    instance = session.exec(stmt).first()
+    if not instance:
+        logger.warning("POST /import-pdf -> no instance found for %s/%s, reservations not stored", service_date, service_label)
+        _dbg_add("WARNING", f"POST /import-pdf -> no instance found, create one first")
+        return None
+    # Stocker les réservations parsées dans l'instance
+    instance.reservations = {"items": out}
+    instance.updated_at = datetime.utcnow()
+    session.add(instance)
+    session.commit()
+    logger.info("POST /import-pdf -> stored %d reservations in instance %s", len(out), instance.id)
+    _dbg_add("INFO", f"POST /import-pdf -> stored in instance {instance.id}")
+    return instance.id
+
+
+def _spool_import_upload(file: UploadFile) -> str:
+    try:
+        import pdfplumber  # noqa: F401
+    except Exception:
+        raise HTTPException(500, "pdfplumber non installé côté serveur")
+    return floorplan_import.spool_upload(file.file)
+
+
 @router.post("/import-pdf")
 def import_reservations_pdf(
     file: UploadFile = File(...),
@@ -2195,129 +2974,86 @@ def import_reservations_pdf(
     create: bool = Form(False),  # Deprecated: kept for API compatibility but ignored
     session: Session = Depends(get_session),
 ):
-    try:
-        import pdfplumber
-    except Exception:
-        raise HTTPException(500, "pdfplumber non installé côté serveur")
-
-    blob = file.file.read()
+    path = _spool_import_upload(file)
     out: List[Dict[str, Any]] = []
-    import re
-    import hashlib
-    
-    # Regex patterns
-    re_time = re.compile(r"^\d{1,2}:\d{2}$")
-    re_pax = re.compile(r"^\d{1,2}$")
-    default_time = dtime(12, 30) if (service_label or "").lower() == "lunch" else dtime(19, 0)
-    
+
     logger.info("POST /import-pdf -> starting PDF table extraction")
     _dbg_add("INFO", "POST /import-pdf -> extracting tables with pdfplumber")
-    
-    # Parser avec pdfplumber (extrait les tableaux)
     try:
-        with pdfplumber.open(io.BytesIO(blob)) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                tables = page.extract_tables()
-                logger.debug("POST /import-pdf -> page %d: found %d tables", page_num, len(tables))
-                
-                for table in tables:
-                    if not table:
-                        continue
-                    
-                    # Parcourir les lignes du tableau
-                    for row in table:
-                        if not row or len(row) < 3:
-                            continue
-                        
-                        # Nettoyer la ligne
-                        clean_row = [str(cell).strip() if cell else "" for cell in row]
-                        
-                        # Détecter colonnes heure/pax/nom (peuvent être dans différentes positions)
-                        heure_idx = None
-                        pax_idx = None
-                        nom_idx = None
-                        
-                        for idx, cell in enumerate(clean_row[:7]):
-                            if cell and re_time.match(cell):
-                                heure_idx = idx
-                            elif cell and re_pax.match(cell) and heure_idx is not None:
-                                pax_idx = idx
-                            elif cell and len(cell) >= 2 and any(c.isupper() for c in cell) and heure_idx is not None and pax_idx is not None:
-                                if nom_idx is None and not cell.startswith('Commentaire'):
-                                    nom_idx = idx
-                                    break
-                        
-                        # Valider et extraire
-                        if heure_idx is not None and pax_idx is not None and nom_idx is not None:
-                            heure = clean_row[heure_idx]
-                            pax_str = clean_row[pax_idx]
-                            nom = clean_row[nom_idx]
-                            
-                            try:
-                                pax = int(pax_str)
-                                if 1 <= pax <= 30 and nom and len(nom) >= 2:
-                                    # Nettoyer le nom (prendre première ligne, retirer téléphone)
-                                    nom_clean = nom.split('\n')[0] if '\n' in nom else nom
-                                    nom_clean = nom_clean.split('Téléphone')[0].strip()
-                                    
-                                    # Filtrer mots-clés commentaires
-                                    if nom_clean.lower() not in ['commentaire', 'confirmé', 'web', 'google', 'heure', 'pax', 'client']:
-                                        # Parser l'heure
-                                        try:
-                                            hh, mm = heure.split(":")
-                                            arrival_time = dtime(int(hh), int(mm))
-                                        except:
-                                            arrival_time = default_time
-                                        
-                                        # Générer ID déterministe
-                                        h = hashlib.md5(f"{service_date}_{heure}_{pax}_{nom_clean}".encode()).hexdigest()
-                                        res_id = str(uuid.UUID(h[:32]))
-                                        
-                                        out.append({
-                                            "id": res_id,
-                                            "arrival_time": arrival_time.isoformat(),
-                                            "pax": pax,
-                                            "client_name": nom_clean
-                                        })
-                            except ValueError:
-                                pass
-    
+        for page_num, _, rows in floorplan_import.iter_import_pages(path, service_date, service_label):
+            logger.debug("POST /import-pdf -> page %d: %d reservations", page_num, len(rows))
+            out.extend(rows)
     except Exception as e:
         logger.error("POST /import-pdf -> PDF extraction failed: %s", str(e))
         _dbg_add("ERROR", f"POST /import-pdf -> extraction failed: {str(e)[:200]}")
         raise HTTPException(400, f"Erreur lors de l'extraction PDF: {str(e)[:100]}")
-    
+    finally:
+        os.remove(path)
+
     parsed_count = len(out)
     _dbg_add("INFO", f"POST /import-pdf -> parsed={parsed_count} reservations")
-    
     if parsed_count == 0:
         logger.error("POST /import-pdf -> NO RESERVATIONS PARSED!")
         _dbg_add("ERROR", "NO RESERVATIONS PARSED!")
         raise HTTPException(400, "Aucune réservation trouvée dans le PDF. Vérifiez le format.")
-    
-    # NOTE: L'outil floorplan est complètement indépendant.
-    # Il ne crée JAMAIS de réservations dans la table principale.
-    # Les données parsées sont stockées dans l'instance pour usage temporaire.
-    
-    # Trouver ou créer l'instance pour ce service
-    from sqlmodel import select
-    stmt = select(FloorPlanInstance).where(
-        FloorPlanInstance.service_date == service_date
-    )
-    if service_label:
-        stmt = stmt.where(FloorPlanInstance.service_label == service_label)
-    instance = session.exec(stmt).first()
-    
-    if instance:
-        # Stocker les réservations parsées dans l'instance
-        instance.reservations = {"items": out}
-        instance.updated_at = datetime.utcnow()
-        session.add(instance)
-        session.commit()
-        logger.info("POST /import-pdf -> stored %d reservations in instance %s", len(out), instance.id)
-        _dbg_add("INFO", f"POST /import-pdf -> stored in instance {instance.id}")
-    else:
-        logger.warning("POST /import-pdf -> no instance found for %s/%s, reservations not stored", service_date, service_label)
-        _dbg_add("WARNING", f"POST /import-pdf -> no instance found, create one first")
-    
+
+    _store_imported_reservations(session, service_date, service_label, out)
     return {"parsed": out, "message": f"Parsed {len(out)} reservations from PDF (stored in instance)"}
+
+
+@router.post("/import-pdf/stream")
+def import_reservations_pdf_stream(
+    file: UploadFile = File(...),
+    service_date: date = Form(...),
+    service_label: Optional[str] = Form(None),
+):
+    """Same import, streamed as NDJSON while the pages are parsed:
+    {"event": "page", "page", "pages", "rows"} per page, then {"event": "done", "parsed", "instance_id"}
+    or {"event": "error", "detail"}. Rows are stored in the instance once the whole file is read.
+    """
+    path = _spool_import_upload(file)
+
+    def cleanup() -> None:
+        # Background task: also runs when the client disconnects before the stream starts
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def stream():
+        out: List[Dict[str, Any]] = []
+        t0 = time.perf_counter()
+        try:
+            for page_num, pages, rows in floorplan_import.iter_import_pages(path, service_date, service_label):
+                out.extend(rows)
+                yield json.dumps({"event": "page", "page": page_num, "pages": pages, "rows": rows}) + "\n"
+        except Exception as e:
+            logger.error("POST /import-pdf/stream -> PDF extraction failed: %s", str(e))
+            _dbg_add("ERROR", f"POST /import-pdf/stream -> extraction failed: {str(e)[:200]}")
+            yield json.dumps({"event": "error", "detail": f"Erreur lors de l'extraction PDF: {str(e)[:100]}"}) + "\n"
+            return
+        finally:
+            cleanup()
+        _dbg_add("INFO", f"POST /import-pdf/stream -> parsed={len(out)} reservations")
+        if not out:
+            yield json.dumps({"event": "error", "detail": "Aucune réservation trouvée dans le PDF. Vérifiez le format."}) + "\n"
+            return
+        # The request session is closed once the response starts: use a dedicated one
+        try:
+            with session_context() as session:
+                instance_id = _store_imported_reservations(session, service_date, service_label, out)
+        except Exception as e:
+            logger.error("POST /import-pdf/stream -> storing reservations failed: %s", str(e))
+            _dbg_add("ERROR", f"POST /import-pdf/stream -> store failed: {str(e)[:200]}")
+            detail = e.detail if isinstance(e, HTTPException) else f"Erreur lors de l'enregistrement: {str(e)[:100]}"
+            yield json.dumps({"event": "error", "detail": detail}) + "\n"
+            return
+        yield json.dumps({
+            "event": "done",
+            "parsed": len(out),
+            "instance_id": str(instance_id) if instance_id else None,
+            "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
+        }) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson", headers={"Cache-Control": "no-cache"},
+                             background=BackgroundTask(cleanup))
@@ -9,7 +9,6 @@ from typing import Any, Dict, List, Optional
 
 import requests
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
 from sqlmodel import Session, select
 
 from ..database import get_session
@@ -20,7 +19,8 @@ from ..models import (
     IncidentReportUpdate,
     IncidentSeverity,
 )
-from ..pdf_service import generate_incident_report_pdf
+from ..pdf_response import stream_pdf
+from ..pdf_service import generate_incident_report_pdf, render_pdf
 
 router = APIRouter(prefix="/api/incidents", tags=["incidents"])
 
@@ -156,8 +156,8 @@ def incident_pdf(incident_id: uuid.UUID, session: Session = Depends(get_session)
     row = session.get(IncidentReport, incident_id)
     if not row:
         raise HTTPException(404, "Rapport introuvable")
-    filename = generate_incident_report_pdf(row)
-    return FileResponse(filename, media_type="application/pdf", filename=os.path.basename(filename))
+    data, filename = render_pdf(generate_incident_report_pdf, row)
+    return stream_pdf(data, filename)
 
 
 def _extract_json(text: str) -> Dict[str, Any]:
@@ -0,0 +1,172 @@
+from __future__ import annotations
+import asyncio
+import json
+import os
+import uuid
+from datetime import date
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from sqlmodel import Session, SQLModel, select
+
+from ..database import get_session
+from ..loaders import load_items_by_reservation
+from ..models import BillingInfo, FloorPlanInstance, IncidentReport, Reservation, ReservationItem
+from .. import pdf_jobs, pdf_service
+
+router = APIRouter(prefix="/api/pdf-jobs", tags=["pdf-jobs"])
+
+
+class PdfJobCreate(SQLModel):
+    kind: str  # reservation | day | invoice | incident | floorplan_instance
+    target_id: Optional[uuid.UUID] = None
+    variant: Optional[str] = None  # reservation: salle | cuisine | both
+    service_date: Optional[date] = None  # day
+
+
+def _dump(obj: Any) -> Optional[dict]:
+    return obj.model_dump() if obj is not None else None
+
+
+def _reservation_snapshot(session: Session, reservation_id: uuid.UUID):
+    res = session.get(Reservation, reservation_id)
+    if not res:
+        raise HTTPException(404, "Reservation not found")
+    items = session.exec(select(ReservationItem).where(ReservationItem.reservation_id == res.id)).all()
+    return res, [it.model_dump() for it in items], session.get(BillingInfo, reservation_id)
+
+
+def _floorplan_snapshot(session: Session, instance_id: uuid.UUID) -> Dict[str, Any]:
+    from .floorplan import _base_snapshot
+    row = session.get(FloorPlanInstance, instance_id)
+    if not row:
+        raise HTTPException(404, "Instance not found")
+    plan = row.data or {}
+    if not plan.get("tables"):
+        base = _base_snapshot(session)
+        if base.data:
+            plan = base.data
+    return {
+        "plan": plan,
+        "assignments": row.assignments or {},
+        "reservations": row.reservations or {},
+        "service_date": row.service_date,
+        "service_label": row.service_label,
+    }
+
+
+def _job_out(job: Dict[str, Any]) -> JSONResponse:
+    body = {**job, "download_url": f"/api/pdf-jobs/{job['id']}/download" if job.get("status") == "done" else None}
+    return JSONResponse(body, status_code=202 if job.get("status") in ("queued", "running") else 200)
+
+
+@router.post("")
+def submit_pdf_job(payload: PdfJobCreate, session: Session = Depends(get_session)):
+    kind = (payload.kind or "").strip().lower()
+    if kind == "reservation":
+        if not payload.target_id:
+            raise HTTPException(400, "target_id required")
+        res, items, billing = _reservation_snapshot(session, payload.target_id)
+        v = (payload.variant or "").lower().strip()
+        if v not in ("salle", "cuisine"):
+            v = "both"
+        params = {"reservation": res.model_dump(), "items": items, "billing": _dump(billing) if v != "cuisine" else None, "variant": v}
+        filename = os.path.basename(pdf_service._reservation_filename_variant(res, v))
+    elif kind == "invoice":
+        if not payload.target_id:
+            raise HTTPException(400, "target_id required")
+        res, items, billing = _reservation_snapshot(session, payload.target_id)
+        if not billing:
+            raise HTTPException(404, "Billing not found")
+        params = {"reservation": res.model_dump(), "items": items, "billing": billing.model_dump()}
+        filename = os.path.basename(pdf_service._invoice_filename(res))
+    elif kind == "day":
+        if not payload.service_date:
+            raise HTTPException(400, "service_date required")
+        rows = session.exec(select(Reservation).where(Reservation.service_date == payload.service_date).order_by(Reservation.arrival_time.asc())).all()
+        items_by_res = load_items_by_reservation(session, [r.id for r in rows])
+        params = {
+            "date": payload.service_date,
+            "reservations": [r.model_dump() for r in rows],
+            "items_by_res": {str(rid): [it.model_dump() for it in items] for rid, items in items_by_res.items()},
+        }
+        filename = os.path.basename(pdf_service._day_filename(payload.service_date))
+    elif kind == "incident":
+        row = session.get(IncidentReport, payload.target_id) if payload.target_id else None
+        if not row:
+            raise HTTPException(404, "Rapport introuvable")
+        params = {"incident": row.model_dump()}
+        filename = os.path.basename(pdf_service._incident_filename(row))
+    elif kind == "floorplan_instance":
+        if not payload.target_id:
+            raise HTTPException(400, "target_id required")
+        params = _floorplan_snapshot(session, payload.target_id)
+        filename = "floorplan_instance.pdf"
+    else:
+        raise HTTPException(400, "Invalid kind (reservation|day|invoice|incident|floorplan_instance)")
+    return _job_out(pdf_jobs.get_queue().submit(kind, params, filename))
+
+
+@router.post("/floorplan-annotated/{instance_id}")
+def submit_annotated_job(
+    instance_id: uuid.UUID,
+    file: UploadFile = File(...),
+    page_start: int = Form(0),
+    start_y_mm: float = Form(95.0),
+    row_h_mm: float = Form(13.5),
+    table_x_mm: float = Form(137.0),
+    session: Session = Depends(get_session),
+):
+    params = _floorplan_snapshot(session, instance_id)
+    params["upload_path"] = pdf_jobs.save_upload(file.file.read())
+    params["layout"] = {"page_start": page_start, "start_y_mm": start_y_mm, "row_h_mm": row_h_mm, "table_x_mm": table_x_mm}
+    return _job_out(pdf_jobs.get_queue().submit("floorplan_annotated", params, "floorplan_instance_annotated.pdf"))
+
+
+@router.get("/metrics")
+def pdf_jobs_metrics():
+    return pdf_jobs.get_queue().metrics()
+
+
+@router.get("/{job_id}")
+def get_pdf_job(job_id: str):
+    job = pdf_jobs.get_queue().get(job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+    return _job_out(job)
+
+
+@router.get("/{job_id}/events")
+async def pdf_job_events(job_id: str):
+    """Server-sent events: one `status` event per change until the job is done or failed."""
+    queue = pdf_jobs.get_queue()
+    if not queue.get(job_id):
+        raise HTTPException(404, "Job not found")
+
+    async def stream():
+        last = None
+        while True:
+            job = queue.get(job_id)
+            if job is None:
+                return
+            if job["status"] != last:
+                last = job["status"]
+                yield f"event: status\ndata: {json.dumps(job)}\n\n"
+            if last in ("done", "error"):
+                return
+            await asyncio.sleep(0.25)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.get("/{job_id}/download")
+def download_pdf_job(job_id: str):
+    job = pdf_jobs.get_queue().get(job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+    if job["status"] == "error":
+        raise HTTPException(500, job.get("error") or "Job failed")
+    if job["status"] != "done" or not job.get("path") or not os.path.exists(job["path"]):
+        raise HTTPException(409, "Job not finished")
+    return FileResponse(job["path"], filename=job["filename"], media_type="application/pdf")
@@ -4,8 +4,10 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Query
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..database import get_session
+from ..database import get_async_session, get_session, run_read
+from ..loaders import load_items_by_reservation
 from ..models import (
     Reservation,
     ReservationItem,
@@ -28,10 +30,14 @@ def _has_effective_dishes(items: List[ReservationItem]) -> bool:
 
 
 @router.get("/pending", response_model=List[ReminderRead])
-def get_pending_reminders(
+async def get_pending_reminders(
     days: int = Query(default=5, ge=1, le=30),
-    session: Session = Depends(get_session),
+    session: Optional[AsyncSession] = Depends(get_async_session),
 ):
+    return await run_read(session, lambda s: _pending_reminders(s, days))
+
+
+def _pending_reminders(session: Session, days: int) -> List[ReminderRead]:
     """
     Return reservations that:
     - are within the next `days` days (today included)
@@ -61,18 +67,18 @@ def get_pending_reminders(
         for rem in session.exec(rem_stmt).all():
             reminders[rem.reservation_id] = rem
 
+    # Items only matter for reservations without a provisional menu_formula: one batched query
+    items_by_res = load_items_by_reservation(
+        session, [r.id for r in reservations if not (r.menu_formula or "").strip()]
+    )
+
     result: List[ReminderRead] = []
     for res in reservations:
         # Skip if menu_formula already set (provisional formula covers it)
         if (res.menu_formula or "").strip():
             continue
 
-        # Load items for this reservation
-        items = session.exec(
-            select(ReservationItem).where(ReservationItem.reservation_id == res.id)
-        ).all()
-
-        if _has_effective_dishes(list(items)):
+        if _has_effective_dishes(items_by_res.get(res.id, [])):
             continue
 
         # Check reminder state
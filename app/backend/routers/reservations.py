@@ -1,24 +1,27 @@
 from __future__ import annotations
 import os
 import uuid
-import os
+import base64
 from datetime import date, datetime, time as dtime, timedelta
 from zoneinfo import ZoneInfo
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy import delete
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy import or_, and_
 
-from ..database import get_session
+from .. import pdf_cache
+from ..database import get_async_session, get_session, run_read
+from ..loaders import load_items_by_reservation
 from ..models import (
     Reservation,
     ReservationCreate,
     ReservationCreateIn,
     ReservationItem,
     ReservationRead,
+    ReservationStatus,
     ReservationUpdate,
     BillingInfo,
     BillingInfoCreate,
@@ -26,46 +29,110 @@ from ..models import (
     BillingInfoUpdate,
 )
 from ..pdf_service import (
+    _reservation_filename_variant,
     generate_reservation_pdf,
     generate_reservation_pdf_cuisine,
     generate_reservation_pdf_salle,
     generate_reservation_pdf_both,
     generate_day_pdf,
     generate_invoice_pdf,
+    render_pdf,
 )
+from ..pdf_response import stream_pdf
 
 router = APIRouter(prefix="/api/reservations", tags=["reservations"])
 
 
+def _encode_cursor(r: Reservation) -> str:
+    raw = f"{r.service_date.isoformat()}|{r.arrival_time.isoformat()}|{r.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[date, dtime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        d, t, rid = raw.split("|")
+        return date.fromisoformat(d), dtime.fromisoformat(t), uuid.UUID(rid)
+    except Exception:
+        raise HTTPException(400, "Invalid cursor")
+
+
+def _keyset_after(keys):
+    """Rows strictly after the cursor for a lexicographic ORDER BY.
+    keys: [(column, cursor_value, descending)] in ORDER BY order.
+    """
+    clauses = []
+    for i, (col, val, desc) in enumerate(keys):
+        eqs = [c == v for c, v, _ in keys[:i]]
+        clauses.append(and_(*eqs, col < val if desc else col > val))
+    return or_(*clauses)
+
+
+def _paginate(stmt, cursor: Optional[str], limit: int, page: int, desc: tuple[bool, bool, bool]):
+    """Keyset page on (service_date, arrival_time, id); X-Next-Cursor is set when more rows may follow.
+    Without a cursor, page > 1 still falls back to OFFSET for older clients.
+    """
+    cols = (Reservation.service_date, Reservation.arrival_time, Reservation.id)
+    stmt = stmt.order_by(*[c.desc() if d else c.asc() for c, d in zip(cols, desc)])
+    if cursor:
+        values = _decode_cursor(cursor)
+        stmt = stmt.where(_keyset_after([(c, v, d) for c, v, d in zip(cols, values, desc)]))
+    elif page > 1:
+        stmt = stmt.offset((page - 1) * limit)
+    return stmt.limit(limit)
+
+
+def _page_out(session: Session, rows: List[Reservation], response: Response, limit: Optional[int]) -> List[ReservationRead]:
+    if limit and len(rows) == limit:
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1])
+    items_by_res = load_items_by_reservation(session, [r.id for r in rows])
+    return [ReservationRead(**r.model_dump(), items=items_by_res.get(r.id, [])) for r in rows]
+
+
 @router.get("", response_model=List[ReservationRead])
-def list_reservations(
+async def list_reservations(
+    response: Response,
     q: Optional[str] = None,
     service_date: Optional[date] = None,
-    session: Session = Depends(get_session),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[ReservationStatus] = None,
+    final_version: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=1000),
+    session: Optional[AsyncSession] = Depends(get_async_session),
 ):
-    stmt = select(Reservation).order_by(Reservation.service_date.desc(), Reservation.arrival_time.asc())
-    results = session.exec(stmt).all()
-    rows: List[Reservation] = results
+    # Filters run in SQL; without limit every matching row is returned (previous behaviour)
+    stmt = select(Reservation)
     if q:
-        rows = [r for r in rows if q.lower() in r.client_name.lower()]
+        stmt = stmt.where(Reservation.client_name.ilike(f"%{q}%"))
     if service_date:
-        rows = [r for r in rows if r.service_date == service_date]
-
-    # Attach items for read model
-    out: List[ReservationRead] = []
-    for r in rows:
-        items = session.exec(select(ReservationItem).where(ReservationItem.reservation_id == r.id)).all()
-        rr = ReservationRead(**r.model_dump(), items=items)
-        out.append(rr)
-    return out
+        stmt = stmt.where(Reservation.service_date == service_date)
+    if date_from:
+        stmt = stmt.where(Reservation.service_date >= date_from)
+    if date_to:
+        stmt = stmt.where(Reservation.service_date <= date_to)
+    if status is not None:
+        stmt = stmt.where(Reservation.status == status)
+    if final_version is not None:
+        stmt = stmt.where(Reservation.final_version == final_version)
+    if limit:
+        stmt = _paginate(stmt, cursor, limit, 1, (True, False, False))
+    else:
+        if cursor:
+            raise HTTPException(400, "cursor requires limit")
+        stmt = stmt.order_by(Reservation.service_date.desc(), Reservation.arrival_time.asc(), Reservation.id.asc())
+    return await run_read(session, lambda s: _page_out(s, s.exec(stmt).all(), response, limit))
 
 
 @router.get("/upcoming", response_model=List[ReservationRead])
-def list_upcoming_reservations(
+async def list_upcoming_reservations(
+    response: Response,
     q: Optional[str] = None,
     page: int = 1,
     per_page: int = 50,
-    session: Session = Depends(get_session),
+    cursor: Optional[str] = None,
+    session: Optional[AsyncSession] = Depends(get_async_session),
 ):
     tz_name = os.getenv("TZ", "Europe/Paris")
     now_local = datetime.now(ZoneInfo(tz_name))
@@ -77,32 +144,25 @@ def list_upcoming_reservations(
         and_(Reservation.service_date == today, Reservation.arrival_time >= now_time),
     )
 
-    stmt = (
-        select(Reservation)
-        .where(condition)
-        .order_by(Reservation.service_date.asc(), Reservation.arrival_time.asc())
-    )
+    stmt = select(Reservation).where(condition)
     if q:
         stmt = stmt.where(Reservation.client_name.ilike(f"%{q}%"))
     if page < 1:
         page = 1
     if per_page < 1:
         per_page = 50
-    stmt = stmt.offset((page - 1) * per_page).limit(per_page)
+    stmt = _paginate(stmt, cursor, per_page, page, (False, False, False))
 
-    rows = session.exec(stmt).all()
-    out: List[ReservationRead] = []
-    for r in rows:
-        items = session.exec(select(ReservationItem).where(ReservationItem.reservation_id == r.id)).all()
-        out.append(ReservationRead(**r.model_dump(), items=items))
-    return out
+    return await run_read(session, lambda s: _page_out(s, s.exec(stmt).all(), response, per_page))
 
 @router.get("/past", response_model=List[ReservationRead])
-def list_past_reservations(
+async def list_past_reservations(
+    response: Response,
     q: Optional[str] = None,
     page: int = 1,
     per_page: int = 50,
-    session: Session = Depends(get_session),
+    cursor: Optional[str] = None,
+    session: Optional[AsyncSession] = Depends(get_async_session),
 ):
     tz_name = os.getenv("TZ", "Europe/Paris")
     now_local = datetime.now(ZoneInfo(tz_name))
@@ -114,25 +174,16 @@ def list_past_reservations(
         and_(Reservation.service_date == today, Reservation.arrival_time < now_time),
     )
 
-    stmt = (
-        select(Reservation)
-        .where(condition)
-        .order_by(Reservation.service_date.desc(), Reservation.arrival_time.desc())
-    )
+    stmt = select(Reservation).where(condition)
     if q:
         stmt = stmt.where(Reservation.client_name.ilike(f"%{q}%"))
     if page < 1:
         page = 1
     if per_page < 1:
         per_page = 50
-    stmt = stmt.offset((page - 1) * per_page).limit(per_page)
+    stmt = _paginate(stmt, cursor, per_page, page, (True, True, True))
 
-    rows = session.exec(stmt).all()
-    out: List[ReservationRead] = []
-    for r in rows:
-        items = session.exec(select(ReservationItem).where(ReservationItem.reservation_id == r.id)).all()
-        out.append(ReservationRead(**r.model_dump(), items=items))
-    return out
+    return await run_read(session, lambda s: _page_out(s, s.exec(stmt).all(), response, per_page))
 
 
 @router.post("", response_model=ReservationRead)
@@ -413,10 +464,20 @@ def duplicate_reservation(reservation_id: uuid.UUID, session: Session = Depends(
     return ReservationRead(**new_res.model_dump(), items=new_items)
 
 
+def _mark_exported(session: Session, res: Reservation) -> None:
+    try:
+        res.last_pdf_exported_at = datetime.utcnow()
+        session.add(res)
+        session.commit()
+    except Exception:
+        pass
+
+
 @router.get("/{reservation_id}/pdf")
 def export_reservation_pdf(
     reservation_id: uuid.UUID,
     variant: str | None = None,
+    if_none_match: Optional[str] = Header(default=None),
     session: Session = Depends(get_session),
 ):
     res = session.get(Reservation, reservation_id)
@@ -425,33 +486,39 @@ def export_reservation_pdf(
     items = session.exec(select(ReservationItem).where(ReservationItem.reservation_id == res.id)).all()
     billing = session.get(BillingInfo, reservation_id)
     v = (variant or "").lower().strip()
-    if v == "salle":
-        path = generate_reservation_pdf_salle(res, items, billing)
-    elif v == "cuisine":
-        path = generate_reservation_pdf_cuisine(res, items)
-    elif v == "both":
-        path = generate_reservation_pdf_both(res, items, billing)
-    else:
+    if v not in ("salle", "cuisine"):
         # Default to a single PDF containing salle then cuisine (and extra cuisine if desserts)
-        path = generate_reservation_pdf_both(res, items, billing)
+        v = "both"
+    # Unchanged fiche: answer from the content-addressed cache (or 304 for the browser's copy)
+    key = pdf_cache.reservation_pdf_key(res, items, billing if v != "cuisine" else None, v)
+    etag = f'"{key}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        # The browser's copy is exported again: still counts as an export
+        _mark_exported(session, res)
+        return Response(status_code=304, headers=headers)
+    data = pdf_cache.get(key)
+    filename = os.path.basename(_reservation_filename_variant(res, v))
+    if data is None:
+        if v == "salle":
+            data, _ = render_pdf(generate_reservation_pdf_salle, res, items, billing)
+        elif v == "cuisine":
+            data, _ = render_pdf(generate_reservation_pdf_cuisine, res, items)
+        else:
+            data, _ = render_pdf(generate_reservation_pdf_both, res, items, billing)
+        pdf_cache.put(key, data)
     # Mark as exported now
-    try:
-        res.last_pdf_exported_at = datetime.utcnow()
-        session.add(res)
-        session.commit()
-    except Exception:
-        pass
-    return FileResponse(path, filename=os.path.basename(path), media_type="application/pdf")
+    _mark_exported(session, res)
+    return stream_pdf(data, filename, headers=headers)
 
 
 @router.get("/day/{d}/pdf")
-def export_day_pdf(d: date, session: Session = Depends(get_session)):
+def export_day_pdf(d: date, parallel: Optional[bool] = None, session: Session = Depends(get_session)):
     rows = session.exec(select(Reservation).where(Reservation.service_date == d).order_by(Reservation.arrival_time.asc())).all()
-    items_by_res = {}
-    for r in rows:
-        items = session.exec(select(ReservationItem).where(ReservationItem.reservation_id == r.id)).all()
-        items_by_res[str(r.id)] = items
-    path = generate_day_pdf(d, rows, items_by_res)
+    items_by_res = {str(rid): items for rid, items in load_items_by_reservation(session, [r.id for r in rows]).items()}
+    # parallel=None keeps the PDF_DAY_WORKERS setting
+    workers = None if parallel is None else ((os.cpu_count() or 2) if parallel else 0)
+    data, filename = render_pdf(generate_day_pdf, d, rows, items_by_res, workers=workers)
     # Mark all as exported now
     try:
         now = datetime.utcnow()
@@ -461,7 +528,7 @@ def export_day_pdf(d: date, session: Session = Depends(get_session)):
         session.commit()
     except Exception:
         pass
-    return FileResponse(path, filename=os.path.basename(path), media_type="application/pdf")
+    return stream_pdf(data, filename)
 
 
 # ===== Billing endpoints =====
@@ -549,5 +616,5 @@ def export_invoice_pdf(reservation_id: uuid.UUID, session: Session = Depends(get
     billing = session.get(BillingInfo, reservation_id)
     if not billing:
         raise HTTPException(404, "Billing not found")
-    path = generate_invoice_pdf(res, items, billing, [])
-    return FileResponse(path, filename=os.path.basename(path), media_type="application/pdf")
+    data, filename = render_pdf(generate_invoice_pdf, res, items, billing, [])
+    return stream_pdf(data, filename)
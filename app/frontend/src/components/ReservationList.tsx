@@ -1,6 +1,6 @@
 import { useEffect, useMemo, useState } from 'react'
 import { Link } from 'react-router-dom'
-import { api, fileDownload } from '../lib/api'
+import { api, downloadPdfJob, fileDownload, submitPdfJob } from '../lib/api'
 import { Reservation } from '../types'
 import { Plus, Printer, Pencil, Search, User, CalendarDays, Clock, Users, Wine, Trash2, FileDown, AlertTriangle } from 'lucide-react'
 import ConfirmDeleteModal from './ConfirmDeleteModal'
@@ -229,7 +229,7 @@ export default function ReservationList() {
               <button className={`btn btn-sm ${viewMode==='compact'?'btn-primary':'btn-outline'} w-full sm:w-auto`} onClick={()=>setViewMode('compact')}>Liste</button>
             </div>
             <Link to={date ? `/reservation/new?date=${encodeURIComponent(date)}` : "/reservation/new"} className="btn btn-sm btn-primary w-full sm:w-auto"><Plus className="h-4 w-4"/> Nouvelle fiche</Link>
-            <button className="btn btn-sm btn-outline w-full sm:w-auto" title="Exporter le PDF du jour" onClick={() => { if (!date) { alert('Sélectionnez une date'); return } fileDownload(`/api/reservations/day/${date}/pdf`) }}><Printer className="h-4 w-4"/> PDF du jour</button>
+            <button className="btn btn-sm btn-outline w-full sm:w-auto" title="Exporter le PDF du jour" onClick={() => { if (!date) { alert('Sélectionnez une date'); return } submitPdfJob({ kind: 'day', service_date: date }).then(downloadPdfJob).catch((e) => alert('Erreur export PDF: ' + (e?.message || e))) }}><Printer className="h-4 w-4"/> PDF du jour</button>
           </div>
         </div>
       </div>
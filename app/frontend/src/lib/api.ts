@@ -1,4 +1,5 @@
 import axios, { AxiosRequestHeaders } from 'axios'
+import type { FloorPatchOp } from '../types'
 
 export const api = axios.create({
   baseURL: '',
@@ -69,6 +70,12 @@ export async function updateFloorBase(payload: { name?: string; data?: any }) {
   return r.data
 }
 
+// Delta update against the plan version; a 409 means the plan changed meanwhile (reload it)
+export async function patchFloorBase(version: number, ops: FloorPatchOp[]): Promise<{ version: number }> {
+  const r = await api.patch('/api/floorplan/base', { version, ops })
+  return r.data
+}
+
 export async function listFloorBases() {
   // Backend only has single base, return as array for compatibility
   const r = await api.get('/api/floorplan/base')
@@ -95,8 +102,21 @@ export async function updateFloorInstance(id: string, payload: { data?: any; ass
   return r.data
 }
 
-export async function autoAssignInstance(id: string) {
-  const r = await api.post(`/api/floorplan/instances/${id}/auto-assign`)
+export async function patchFloorInstance(id: string, version: number, ops: FloorPatchOp[]): Promise<{ version: number }> {
+  const r = await api.patch(`/api/floorplan/instances/${id}`, { version, ops })
+  return r.data
+}
+
+export async function autoAssignInstance(id: string, opts?: { solver?: 'greedy' | 'optimal'; timeBudgetMs?: number }) {
+  const params: Record<string, any> = {}
+  if (opts?.solver) params.solver = opts.solver
+  if (opts?.timeBudgetMs) params.time_budget_ms = opts.timeBudgetMs
+  const r = await api.post(`/api/floorplan/instances/${id}/auto-assign`, null, { params })
+  return r.data
+}
+
+export async function changeInstanceReservation(id: string, payload: { op: 'add' | 'remove' | 'resize'; reservation_id?: string; client_name?: string; pax?: number; arrival_time?: string }) {
+  const r = await api.post(`/api/floorplan/instances/${id}/reservations/change`, payload)
   return r.data
 }
 
@@ -110,6 +130,46 @@ export async function importReservationsPdf(file: File, service_date: string, se
   return r.data
 }
 
+// Same import, parsed rows received page by page (NDJSON events: page | done | error)
+export async function importReservationsPdfStream(
+  file: File,
+  service_date: string,
+  service_label: string | null | undefined,
+  onPage: (ev: { page: number; pages: number; rows: any[] }) => void,
+) {
+  const fd = new FormData()
+  fd.append('file', file)
+  fd.append('service_date', service_date)
+  if (service_label) fd.append('service_label', service_label)
+  const resp = await fetch('/api/floorplan/import-pdf/stream', { method: 'POST', body: fd, headers: _salleDebug ? { 'X-Salle-Debug': '1' } : undefined })
+  if (!resp.ok || !resp.body) throw new Error(`Import PDF: HTTP ${resp.status}`)
+  const reader = resp.body.getReader()
+  const decoder = new TextDecoder()
+  const parsed: any[] = []
+  let buf = ''
+  let last: any = null
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (value) buf += decoder.decode(value, { stream: true })
+    let nl: number
+    while ((nl = buf.indexOf('\n')) >= 0) {
+      const line = buf.slice(0, nl).trim()
+      buf = buf.slice(nl + 1)
+      if (!line) continue
+      const ev = JSON.parse(line)
+      if (ev.event === 'page') {
+        parsed.push(...ev.rows)
+        onPage(ev)
+      } else {
+        last = ev
+      }
+    }
+    if (done) break
+  }
+  if (!last || last.event === 'error') throw new Error(last?.detail || 'Import PDF interrompu')
+  return { parsed, instance_id: last.instance_id as string | null }
+}
+
 // ----- Numbering & PDF -----
 
 export async function numberBaseTables() {
@@ -170,3 +230,42 @@ export async function exportInstanceAnnotatedPdf(
   a.remove()
   URL.revokeObjectURL(url)
 }
+
+export async function submitPdfJob(payload: { kind: 'reservation' | 'day' | 'invoice' | 'incident' | 'floorplan_instance'; target_id?: string; variant?: string; service_date?: string }) {
+  const r = await api.post('/api/pdf-jobs', payload)
+  return r.data
+}
+
+export async function getPdfJob(id: string) {
+  const r = await api.get(`/api/pdf-jobs/${id}`)
+  return r.data
+}
+
+export function pdfJobDownloadUrl(id: string) {
+  return `/api/pdf-jobs/${id}/download`
+}
+
+export async function submitAnnotatedPdfJob(
+  id: string,
+  file: File,
+  opts?: { page_start?: number; start_y_mm?: number; row_h_mm?: number; table_x_mm?: number }
+) {
+  const fd = new FormData()
+  fd.append('file', file)
+  if (opts?.page_start != null) fd.append('page_start', String(opts.page_start))
+  if (opts?.start_y_mm != null) fd.append('start_y_mm', String(opts.start_y_mm))
+  if (opts?.row_h_mm != null) fd.append('row_h_mm', String(opts.row_h_mm))
+  if (opts?.table_x_mm != null) fd.append('table_x_mm', String(opts.table_x_mm))
+  const r = await api.post(`/api/pdf-jobs/floorplan-annotated/${id}`, fd)
+  return r.data
+}
+
+// Poll a job until it is rendered, then download it (throws with the job error on failure)
+export async function downloadPdfJob(job: { id: string; status: string; filename?: string; error?: string | null }, intervalMs = 500) {
+  while (job.status === 'queued' || job.status === 'running') {
+    await new Promise((resolve) => setTimeout(resolve, intervalMs))
+    job = await getPdfJob(job.id)
+  }
+  if (job.status !== 'done') throw new Error(job.error || 'PDF job failed')
+  fileDownload(pdfJobDownloadUrl(job.id), job.filename)
+}
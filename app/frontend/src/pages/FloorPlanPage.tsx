@@ -1,5 +1,5 @@
 ﻿import React, { useEffect, useState } from 'react'
-import { api, fileDownload, getFloorBase, updateFloorBase } from '../lib/api'
+import { api, downloadPdfJob, fileDownload, getFloorBase, submitAnnotatedPdfJob, submitPdfJob, updateFloorBase } from '../lib/api'
 import FloorCanvas from '../components/FloorCanvas'
 import type { FloorPlanData, FloorPlanBase, FloorPlanInstance } from '../types'
 import { Plus, Save, Trash2, Download, Upload, Calendar, Layers } from 'lucide-react'
@@ -281,17 +281,8 @@ export default function FloorPlanPage() {
       const file = e.target?.files?.[0]
       if (!file) return
       try {
-        const formData = new FormData()
-        formData.append('file', file)
-        formData.append('start_y_mm', '95.0')
-        formData.append('row_h_mm', '13.5')
-        formData.append('table_x_mm', '137.0')
-        const res = await api.post(
-          `/api/floorplan/instances/${selectedInstance.id}/export-annotated`,
-          formData,
-          { responseType: 'blob', headers: { 'Content-Type': 'multipart/form-data' } }
-        )
-        fileDownload(res.data, `annotated_${selectedInstance.service_date}.pdf`)
+        const job = await submitAnnotatedPdfJob(selectedInstance.id, file, { start_y_mm: 95.0, row_h_mm: 13.5, table_x_mm: 137.0 })
+        await downloadPdfJob({ ...job, filename: `annotated_${selectedInstance.service_date}.pdf` })
       } catch (err) {
         console.error('Failed to export annotated:', err)
         toast('error', 'Erreur export annotÃ©')
@@ -303,10 +294,8 @@ export default function FloorPlanPage() {
   async function exportComplete() {
     if (!selectedInstance) return
     try {
-      const res = await api.get(`/api/floorplan/instances/${selectedInstance.id}/export-pdf`, {
-        responseType: 'blob'
-      })
-      fileDownload(res.data, `plan_${selectedInstance.service_date}.pdf`)
+      const job = await submitPdfJob({ kind: 'floorplan_instance', target_id: selectedInstance.id })
+      await downloadPdfJob({ ...job, filename: `plan_${selectedInstance.service_date}.pdf` })
     } catch (err) {
       console.error('Failed to export complete:', err)
       toast('error', 'Erreur export PDF')
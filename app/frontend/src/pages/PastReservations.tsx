@@ -148,13 +148,15 @@ export default function PastReservations() {
     try {
       const perPage = 200
       const all: Reservation[] = []
-      let page = 1
+      let cursor: string | undefined
       while (true) {
-        const res = await api.get('/api/reservations/past', { params: { page, per_page: perPage } })
+        const params: Record<string, any> = { per_page: perPage }
+        if (cursor) params.cursor = cursor
+        const res = await api.get('/api/reservations/past', { params })
         const batch = Array.isArray(res.data) ? (res.data as Reservation[]) : []
         all.push(...batch)
-        if (batch.length < perPage) break
-        page += 1
+        cursor = res.headers?.['x-next-cursor']
+        if (!cursor || batch.length < perPage) break
       }
       setRows(all)
     } catch (err: any) {
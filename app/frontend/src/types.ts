@@ -187,6 +187,8 @@ export type LargeTableConfig = {
   pax_threshold_right?: number
   pax_threshold_vertical?: number
   vertical_span_max?: number
+  join_gap?: number
+  join_tables?: boolean
 }
 
 export type FloorPlanData = {
@@ -211,6 +213,7 @@ export type FloorPlanBase = {
   id: UUID
   name: string
   data: FloorPlanData
+  version?: number
   created_at: string
   updated_at: string
 }
@@ -223,6 +226,16 @@ export type FloorPlanInstance = {
   data: FloorPlanData
   assignments: AssignmentMap
   reservations?: { items: any[] }
+  version?: number
   created_at: string
   updated_at: string
 }
+
+// RFC 6902 JSON Patch op, or compact table op (move_table / resize_table / relabel_table)
+export type FloorPatchOp =
+  | { op: 'add' | 'replace' | 'test'; path: string; value: any }
+  | { op: 'remove'; path: string }
+  | { op: 'move' | 'copy'; from: string; path: string }
+  | { op: 'move_table'; id: string; x?: number; y?: number }
+  | { op: 'resize_table'; id: string; w?: number; h?: number; r?: number }
+  | { op: 'relabel_table'; id: string; label: string | null }
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test de charge des endpoints de lecture: handlers sync (threadpool) contre async (AsyncSession)
+Remplit une base SQLite temporaire (réservations + lignes, rappels, boissons, allergènes, instances
+de plan), lance deux serveurs uvicorn (DB_ASYNC=0 puis DB_ASYNC=1, un worker chacun) et envoie
+des requêtes concurrentes sur les listes de réservations, l'instance de plan, les rappels, les
+allergènes et les boissons. Affiche req/s, latences p50/p95 et vérifie que les deux modes
+renvoient les mêmes réponses. Le mode async demande aiosqlite (asyncpg pour PostgreSQL).
+Usage: python bench/bench_async_reads.py [durée_s] [concurrence...]
+"""
+import sys
+import os
+import time
+import asyncio
+import socket
+import subprocess
+import tempfile
+import warnings
+warnings.filterwarnings("ignore")
+BENCH_DB = os.path.join(tempfile.gettempdir(), "bench_async_reads.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{BENCH_DB}")
+os.environ.setdefault("PDF_DIR", os.path.join(tempfile.gettempdir(), "bench_async_reads_pdfs"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from datetime import date, time as dtime, timedelta
+
+ROUTES = (
+    "/api/reservations?limit=50",
+    "/api/reservations/upcoming?per_page=50",
+    "/api/reminders/pending?days=10",
+    "/api/allergens",
+    "/api/drinks",
+    "/api/floorplan/instances",
+    "/api/floorplan/instances/{instance_id}",
+)
+
+
+def make_app():
+    from fastapi import FastAPI
+    from backend.routers import reservations, reminders, allergens, drinks, floorplan
+    app = FastAPI()
+    for r in (reservations, reminders, allergens, drinks, floorplan):
+        app.include_router(r.router)
+    return app
+
+
+def seed() -> str:
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(BENCH_DB + suffix)
+        except OSError:
+            pass
+    from backend.database import init_db, session_context
+    from backend.models import (Allergen, Drink, FloorPlanBase, FloorPlanInstance, Reservation,
+                                ReservationItem, ReservationReminder)
+    init_db()
+    today = date.today()
+    with session_context() as s:
+        for i in range(600):
+            r = Reservation(client_name=f"Client {i:04d}", pax=2 + i % 10, service_date=today + timedelta(days=i % 30 - 5),
+                            arrival_time=dtime(11 + i % 10, (i * 7) % 60), drink_formula="Forfait")
+            s.add(r)
+            if i % 3:
+                for j in range(4):
+                    s.add(ReservationItem(reservation_id=r.id, type=("entrée", "plat", "dessert")[j % 3], name=f"Plat {j}", quantity=j + 1))
+            if i % 7 == 0:
+                s.add(ReservationReminder(reservation_id=r.id, muted=i % 14 == 0))
+        for i in range(150):
+            s.add(Drink(name=f"Boisson {i:03d}", category="vin" if i % 2 else "bière", unit="bouteille"))
+        for key in ("gluten", "lait", "oeuf", "arachide", "soja", "poisson", "crustaces", "celeri"):
+            s.add(Allergen(key=key, label=key.capitalize()))
+        base = FloorPlanBase(data={"tables": [{"id": f"t{k}", "kind": "rect", "x": 40 * k, "y": 40, "w": 30, "h": 30} for k in range(60)]})
+        s.add(base)
+        s.flush()
+        inst = None
+        for k in range(10):
+            inst = FloorPlanInstance(service_date=today + timedelta(days=k), service_label="dinner", template_id=base.id,
+                                     data=base.data, reservations={"items": [{"id": str(n), "client_name": f"C{n}", "pax": 2} for n in range(40)]})
+            s.add(inst)
+        s.commit()
+        return str(inst.id)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(db_async: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, DB_ASYNC=db_async)
+    return subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", str(port)], env=env)
+
+
+async def wait_ready(client, base: str) -> None:
+    for _ in range(200):
+        try:
+            if (await client.get(base + "/api/drinks")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("serveur non démarré")
+
+
+async def load(base: str, routes, concurrency: int, duration: float):
+    import httpx
+    lat, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        await wait_ready(client, base)
+        stop = time.perf_counter() + duration
+
+        async def worker(k: int):
+            nonlocal errors
+            i = k
+            while time.perf_counter() < stop:
+                t0 = time.perf_counter()
+                r = await client.get(base + routes[i % len(routes)])
+                lat.append(time.perf_counter() - t0)
+                errors += r.status_code != 200
+                i += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(k) for k in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+    lat.sort()
+    pct = lambda q: lat[min(int(q * len(lat)), len(lat) - 1)] * 1000 if lat else 0.0
+    return len(lat) / elapsed, pct(0.50), pct(0.95), errors
+
+
+async def snapshot(base: str, routes):
+    import httpx
+    async with httpx.AsyncClient(timeout=60) as client:
+        await wait_ready(client, base)
+        return [(await client.get(base + r)).json() for r in routes]
+
+
+def main() -> None:
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    levels = [int(x) for x in sys.argv[2:]] or [1, 16, 64]
+    instance_id = seed()
+    routes = [r.format(instance_id=instance_id) for r in ROUTES]
+    from backend import database
+    print(f"{len(routes)} routes, {duration:.0f} s par mesure, pool {database.DB_POOL_SIZE}+{database.DB_MAX_OVERFLOW}")
+    print(f"{'mode':<11} {'conc.':>5} {'req/s':>8} {'p50':>9} {'p95':>9} {'erreurs':>8}")
+    snapshots = {}
+    for mode, db_async in (("threadpool", "0"), ("async", "1")):
+        port = free_port()
+        proc = start_server(db_async, port)
+        base = f"http://127.0.0.1:{port}"
+        try:
+            snapshots[mode] = asyncio.run(snapshot(base, routes))
+            for c in levels:
+                rps, p50, p95, errors = asyncio.run(load(base, routes, c, duration))
+                print(f"{mode:<11} {c:>5} {rps:>8.0f} {p50:>6.1f} ms {p95:>6.1f} ms {errors:>8}")
+        finally:
+            proc.terminate()
+            proc.wait()
+    print("réponses identiques:", "oui" if snapshots["threadpool"] == snapshots["async"] else "NON")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--serve":
+        import uvicorn
+        from backend import database
+        if os.environ.get("DB_ASYNC") != "0" and database.async_engine is None:
+            print("async indisponible (pilote manquant), mode threadpool")
+        uvicorn.run(make_app(), host="127.0.0.1", port=int(sys.argv[2]), log_level="warning")
+    else:
+        main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'auto-assign (_auto_assign, _find_spot_for_table, _assign_table_numbers)
+
+- Plans synthétiques paramétrables (20 à 300 tables) et réservations générées pour viser
+  les trois modes de service (aérer < 55% de charge, normal, optimiser > 75%)
+- Rejeu des instances réelles stockées en base (FloorPlanInstance.reservations)
+- Mesures: temps (médiane), pic mémoire (tracemalloc), tables créées, groupes non placés,
+  chaises perdues
+- Résultats en JSON (--out) et comparaison avec un run précédent (--baseline) pour
+  détecter les régressions (code de sortie 1)
+
+Exemples:
+  python bench/bench_auto_assign.py
+  python bench/bench_auto_assign.py --sizes 20,100,300 --modes normal --repeat 5
+  python bench/bench_auto_assign.py --replay sqlite:///./data.db --sizes ""
+  python bench/bench_auto_assign.py --baseline bench/bench_output/auto_assign_20260101-120000.json
+"""
+import argparse
+import contextlib
+import copy
+import io
+import json
+import logging
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, time as dtime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from backend.routers.floorplan import (
+    _assign_table_numbers,
+    _assignment_metrics,
+    _auto_assign,
+    _auto_assign_optimal,
+    _find_spot_for_table,
+    _reservations_from_items,
+)
+from backend.floorplan_geometry import RASTER_ENABLED
+
+# Charge visée par mode (même formule que _auto_assign: pax / capacité approximative)
+LOAD_TARGETS = {"aerer": 0.40, "normal": 0.65, "optimiser": 0.90}
+PAX_WEIGHTS = [(1, 3), (2, 30), (3, 10), (4, 20), (5, 6), (6, 8), (7, 4), (8, 6), (10, 4), (12, 3), (14, 2), (16, 2), (22, 1)]
+KIND_MIX = [("fixed", 0.35), ("rect", 0.35), ("round", 0.15), ("sofa", 0.08), ("standing", 0.07)]
+KIND_CAP = {"fixed": 4, "rect": 6, "round": 10, "sofa": 5, "standing": 8}
+SPOT_QUERIES = [
+    ("round", dict(r=50)),
+    ("rect", dict(w=120, h=60, require_rect_zone=True, prefer_center=True, prefer_center_y=True)),
+    ("rect", dict(w=370, h=60, require_rect_zone=True, prefer_right=True, prefer_center_y=True)),
+    ("rect", dict(w=120, h=340, prefer_vertical=True, prefer_right=True)),
+]
+
+
+# ---- Générateurs ----
+
+def synthetic_plan(n_tables: int, seed: int = 1) -> dict:
+    rnd = random.Random(seed)
+    cols = max(4, int(math.ceil(math.sqrt(n_tables * 1.6))))
+    rows = int(math.ceil(n_tables / cols))
+    W = cols * 260 + 900
+    H = max(1000, rows * 180 + 200)
+    kinds = [k for k, _ in KIND_MIX]
+    weights = [w for _, w in KIND_MIX]
+    tables = []
+    for i in range(n_tables):
+        gx, gy = 60 + (i % cols) * 260, 60 + (i // cols) * 180
+        kind = rnd.choices(kinds, weights)[0]
+        t = {"id": f"{kind[:2]}{i}", "kind": kind, "capacity": KIND_CAP[kind]}
+        if kind in ("round", "standing"):
+            t.update({"x": gx + 60, "y": gy + 60, "r": 50})
+        else:
+            t.update({"x": gx, "y": gy, "w": 120 if kind != "fixed" else 80, "h": 60 if kind != "fixed" else 80})
+        tables.append(t)
+    n_fixed = sum(1 for t in tables if t["kind"] == "fixed")
+    return {
+        "room": {"width": W, "height": H, "grid": 50},
+        "tables": tables,
+        "walls": [{"x": 0, "y": 0, "w": W, "h": 10}],
+        "columns": [{"x": rnd.randint(100, W - 100), "y": rnd.randint(100, H - 100), "r": 20} for _ in range(max(2, n_tables // 20))],
+        "fixtures": [],
+        "no_go": [],
+        "round_only_zones": [],
+        "rect_only_zones": [{"x": W - 800, "y": 100, "w": 750, "h": H - 200}],
+        "fixed_chair_stock": int(n_fixed * 4 * 0.8),
+        "max_dynamic_tables": {"rect": 10, "round": 5},
+    }
+
+
+def approx_capacity(plan: dict) -> int:
+    tables = plan.get("tables") or []
+    rects = [t for t in tables if t.get("kind") == "rect" and not t.get("locked")]
+    rounds = [t for t in tables if t.get("kind") == "round" and not t.get("locked")]
+    return max(1, int(plan.get("fixed_chair_stock", 28)) + sum(max(6, int(t.get("capacity") or 6)) for t in rects) + sum(int(t.get("capacity") or 10) for t in rounds))
+
+
+def synthetic_reservations(plan: dict, load: float, seed: int = 1) -> list:
+    rnd = random.Random(seed)
+    target = int(approx_capacity(plan) * load)
+    sizes = [p for p, _ in PAX_WEIGHTS]
+    weights = [w for _, w in PAX_WEIGHTS]
+    out, total = [], 0
+    while total < target:
+        pax = min(rnd.choices(sizes, weights)[0], max(1, target - total))
+        i = len(out)
+        out.append(SimpleNamespace(id=f"res{i}", client_name=f"Client {i}", pax=pax, arrival_time=dtime(12 + (i % 10), (i * 7) % 60)))
+        total += pax
+    return out
+
+
+# ---- Mesures ----
+
+def _quiet():
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def run_case(name: str, plan: dict, reservations: list, repeat: int, solver: str, budget: float) -> dict:
+    assign = _auto_assign if solver == "greedy" else (lambda p, r: _auto_assign_optimal(p, r, budget))
+    total_pax = sum(int(r.pax) for r in reservations)
+    load = total_pax / approx_capacity(plan)
+    times = []
+    result = metrics = None
+    tables_created = 0
+    for _ in range(max(1, repeat)):
+        p = copy.deepcopy(plan)
+        before = len(p.get("tables") or [])
+        with _quiet():
+            t0 = time.perf_counter()
+            result = assign(p, reservations)
+            times.append((time.perf_counter() - t0) * 1000)
+        tables_created = len(p.get("tables") or []) - before
+        metrics = _assignment_metrics(p, result, reservations)
+    # Pic mémoire sur un run séparé (tracemalloc ralentit l'exécution)
+    p = copy.deepcopy(plan)
+    tracemalloc.start()
+    with _quiet():
+        assign(p, reservations)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p = copy.deepcopy(plan)
+    t0 = time.perf_counter()
+    for _ in range(max(1, repeat)):
+        for shape, kw in SPOT_QUERIES:
+            _find_spot_for_table(p, shape, **kw)
+    spot_ms = (time.perf_counter() - t0) * 1000 / max(1, repeat) / len(SPOT_QUERIES)
+
+    t0 = time.perf_counter()
+    for _ in range(max(1, repeat)):
+        _assign_table_numbers(p, persist=False)
+    numbering_ms = (time.perf_counter() - t0) * 1000 / max(1, repeat)
+
+    return {
+        "case": name,
+        "solver": solver,
+        "tables": len(plan.get("tables") or []),
+        "reservations": len(reservations),
+        "pax": total_pax,
+        "load_ratio": round(load, 3),
+        "seat_mode": "aerer" if load < 0.55 else ("optimiser" if load > 0.75 else "normal"),
+        "auto_assign_ms": round(statistics.median(times), 2),
+        "auto_assign_peak_kib": round(peak / 1024, 1),
+        "find_spot_ms": round(spot_ms, 3),
+        "numbering_ms": round(numbering_ms, 3),
+        "tables_created": tables_created,
+        "unplaced_groups": metrics["unplaced_groups"],
+        "unplaced_pax": metrics["unplaced_pax"],
+        "seats_wasted": metrics["seats_wasted"],
+    }
+
+
+def replay_cases(db_url: str):
+    """(name, plan, reservations) pour chaque FloorPlanInstance ayant des réservations importées."""
+    from sqlmodel import Session, create_engine, select
+    from backend.models import FloorPlanBase, FloorPlanInstance
+
+    engine = create_engine(db_url, connect_args={"check_same_thread": False} if db_url.startswith("sqlite") else {})
+    with Session(engine) as session:
+        base = session.exec(select(FloorPlanBase).order_by(FloorPlanBase.created_at.asc())).first()
+        base_data = (base.data if base else None) or {}
+        for row in session.exec(select(FloorPlanInstance).order_by(FloorPlanInstance.service_date.asc())).all():
+            items = copy.deepcopy((row.reservations or {}).get("items") or [])
+            if not items:
+                continue
+            plan = row.data if (row.data or {}).get("tables") else base_data
+            if not (plan or {}).get("tables"):
+                continue
+            # Rejouer sur le plan sans les tables dynamiques créées par un auto-assign précédent
+            plan = copy.deepcopy(plan)
+            plan["tables"] = [t for t in plan.get("tables") or [] if not t.get("dynamic")]
+            name = f"instance:{row.service_date}:{row.service_label or '-'}:{str(row.id)[:8]}"
+            yield name, plan, _reservations_from_items(items)
+
+
+# ---- Comparaison ----
+
+def compare(results: list, baseline_path: str, tolerance: float) -> list:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        base = {(r["case"], r["solver"]): r for r in json.load(f).get("results", [])}
+    regressions = []
+    for r in results:
+        b = base.get((r["case"], r["solver"]))
+        if not b:
+            continue
+        for key in ("auto_assign_ms", "find_spot_ms", "numbering_ms"):
+            # marge absolue pour ne pas signaler le bruit sur les temps très courts
+            if r[key] > b[key] * (1 + tolerance) + 2.0:
+                regressions.append(f"{r['case']} [{r['solver']}] {key}: {b[key]} -> {r[key]}")
+        for key in ("unplaced_groups", "unplaced_pax", "seats_wasted"):
+            if r[key] > b[key]:
+                regressions.append(f"{r['case']} [{r['solver']}] {key}: {b[key]} -> {r[key]}")
+    return regressions
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return ""
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark auto-assign")
+    ap.add_argument("--sizes", default="20,50,100,200,300", help="tailles de plan (nb de tables), séparées par des virgules")
+    ap.add_argument("--modes", default="aerer,normal,optimiser", help="modes de charge visés")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--solver", default="greedy", choices=["greedy", "optimal", "both"])
+    ap.add_argument("--time-budget-ms", type=int, default=2000, help="budget du solveur optimal")
+    ap.add_argument("--replay", default=None, help="URL de base (ex. sqlite:///./data.db) pour rejouer les instances")
+    ap.add_argument("--out", default=None, help="fichier JSON de sortie (défaut: bench/bench_output/auto_assign_<date>.json)")
+    ap.add_argument("--baseline", default=None, help="JSON d'un run précédent à comparer")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="tolérance relative sur les temps")
+    args = ap.parse_args()
+
+    # Les logs de l'auto-assign restent dans le buffer debug
+    logging.getLogger("app.floorplan").propagate = False
+
+    cases = []
+    sizes = [int(x) for x in args.sizes.split(",") if x.strip()]
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    for size in sizes:
+        plan = synthetic_plan(size, seed=args.seed + size)
+        for mode in modes:
+            cases.append((f"synthetic:{size}:{mode}", plan, synthetic_reservations(plan, LOAD_TARGETS[mode], seed=args.seed + size)))
+    if args.replay:
+        cases.extend(replay_cases(args.replay))
+
+    solvers = ["greedy", "optimal"] if args.solver == "both" else [args.solver]
+    results = []
+    print(f"{'case':<42} {'solver':<8} {'mode':<9} {'ms':>9} {'KiB':>8} {'spot ms':>8} {'num ms':>7} {'créées':>6} {'non pl.':>7} {'perdues':>7}")
+    for name, plan, reservations in cases:
+        for solver in solvers:
+            r = run_case(name, plan, reservations, args.repeat, solver, args.time_budget_ms / 1000.0)
+            results.append(r)
+            print(f"{name[:42]:<42} {solver:<8} {r['seat_mode']:<9} {r['auto_assign_ms']:>9.1f} {r['auto_assign_peak_kib']:>8.0f} {r['find_spot_ms']:>8.2f} {r['numbering_ms']:>7.2f} {r['tables_created']:>6} {r['unplaced_groups']:>7} {r['seats_wasted']:>7}")
+
+    payload = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "git": _git_rev(),
+            "python": platform.python_version(),
+            "raster": RASTER_ENABLED,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    out = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_output", f"auto_assign_{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+    print(f"\nRésultats: {out}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} régression(s):")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print("\n✅ Aucune régression par rapport à la référence")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la feuille du jour (generate_day_pdf)
+Génère une journée synthétique de N réservations en mode séquentiel puis en pool de processus
+(rendu par réservation + concaténation pypdf), vérifie que les pages sont identiques
+(nombre de pages et texte extrait page par page) et affiche les temps.
+Usage: python bench/bench_day_pdf.py [nb_reservations] [workers]
+"""
+import sys
+import os
+import time
+import random
+import tempfile
+os.environ.setdefault("PDF_DIR", os.path.join(tempfile.gettempdir(), "bench_day_pdf"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from datetime import date, time as dtime
+from pypdf import PdfReader
+from backend.models import Reservation, ReservationItem
+from backend.pdf_service import generate_day_pdf
+
+
+def build_day(n: int, seed: int = 3):
+    rnd = random.Random(seed)
+    d = date(2026, 12, 18)
+    reservations, items_by_res = [], {}
+    for i in range(n):
+        r = Reservation(
+            client_name=f"Client {i:02d}", pax=rnd.randint(2, 40), service_date=d,
+            arrival_time=dtime(rnd.choice([12, 13, 19, 20]), rnd.choice([0, 15, 30])),
+            drink_formula=rnd.choice(["Forfait vin", "Softs", "Sans alcool", ""]),
+            notes=rnd.choice(["", "*VIP* table au calme\n- gâteau", "Anniversaire"]),
+            allergens=rnd.choice(["", "gl", "gl,la", "ar,fr,se"]),
+            on_invoice=rnd.random() < 0.3,
+        )
+        items_by_res[str(r.id)] = [
+            ReservationItem(type=t, name=f"{t.capitalize()} {j}", quantity=rnd.randint(1, 12), reservation_id=r.id,
+                            comment=rnd.choice([None, "sans sel"]))
+            for t in ("entrée", "plat", "dessert") for j in range(rnd.randint(1, 3))
+        ]
+        reservations.append(r)
+    return d, reservations, items_by_res
+
+
+def page_texts(path: str):
+    return [p.extract_text() for p in PdfReader(path).pages]
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 2)
+    d, reservations, items_by_res = build_day(n)
+
+    t0 = time.perf_counter()
+    seq_path = generate_day_pdf(d, reservations, items_by_res, workers=0)
+    t_seq = time.perf_counter() - t0
+    seq = page_texts(seq_path)
+
+    # Premier appel: démarrage du pool inclus; second appel: pool déjà chaud
+    timings = []
+    for _ in range(2):
+        t0 = time.perf_counter()
+        par_path = generate_day_pdf(d, reservations, items_by_res, workers=workers)
+        timings.append(time.perf_counter() - t0)
+    par = page_texts(par_path)
+
+    assert len(seq) == len(par), (len(seq), len(par))
+    assert seq == par, "Texte différent entre rendu séquentiel et parallèle"
+    print(f"{n} réservations, {len(seq)} pages, {workers} workers")
+    print(f"  séquentiel          : {t_seq * 1000:8.1f} ms")
+    print(f"  parallèle (à froid) : {timings[0] * 1000:8.1f} ms")
+    print(f"  parallèle (à chaud) : {timings[1] * 1000:8.1f} ms -> x{t_seq / max(timings[1], 1e-9):.1f}")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'index spatial du plan de salle (PlanIndex)
+Compare le scan linéaire de _table_collides à la version indexée sur un grand plan
+synthétique, puis l'index seul au raster numpy (si disponible) pour _find_spot_for_table,
+vérifie que les résultats sont identiques, puis chronomètre _auto_assign.
+Usage: python bench/bench_floorplan_index.py [nb_tables]
+"""
+import sys
+import os
+import time
+import copy
+import random
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from backend.routers.floorplan import _auto_assign, _table_collides, _find_spot_for_table
+from backend.floorplan_geometry import PlanIndex, RASTER_ENABLED
+from datetime import time as dtime
+from types import SimpleNamespace
+
+
+def build_plan(n_tables: int, seed: int = 42) -> dict:
+    rnd = random.Random(seed)
+    W, H = 4000, 2500
+    tables = []
+    i = 0
+    for gy in range(60, H - 200, 180):
+        for gx in range(60, W - 300, 260):
+            if i >= n_tables:
+                break
+            if rnd.random() < 0.25:
+                tables.append({"id": f"rd{i}", "kind": "round", "x": gx + 60, "y": gy + 60, "r": 50, "capacity": 10})
+            else:
+                kind = "fixed" if rnd.random() < 0.4 else "rect"
+                tables.append({"id": f"t{i}", "kind": kind, "x": gx, "y": gy, "w": 120, "h": 60, "capacity": 4 if kind == "fixed" else 6})
+            i += 1
+    return {
+        "room": {"width": W, "height": H, "grid": 50},
+        "tables": tables,
+        "walls": [{"x": 0, "y": 0, "w": W, "h": 10}, {"x": 0, "y": H - 10, "w": W, "h": 10}],
+        "columns": [{"x": rnd.randint(100, W - 100), "y": rnd.randint(100, H - 100), "r": 20} for _ in range(30)],
+        "fixtures": [{"x": rnd.randint(0, W - 200), "y": rnd.randint(0, H - 100), "w": 150, "h": 60} for _ in range(20)]
+        + [{"x": rnd.randint(100, W - 100), "y": rnd.randint(100, H - 100), "r": 40} for _ in range(10)],
+        "no_go": [{"x": rnd.randint(0, W - 300), "y": rnd.randint(0, H - 200), "w": 200, "h": 120} for _ in range(10)],
+        "round_only_zones": [],
+        "rect_only_zones": [{"x": W - 700, "y": 100, "w": 650, "h": 2300}],
+        "max_dynamic_tables": {"rect": 20, "round": 10},
+    }
+
+
+def probes(plan: dict):
+    room = plan["room"]
+    gw = room["grid"]
+    for y in range(0, room["height"], gw):
+        for x in range(0, room["width"], gw):
+            yield {"id": "_probe", "x": float(x), "y": float(y), "w": 120.0, "h": 60.0}
+            yield {"id": "_probe", "x": float(x + 50), "y": float(y + 50), "r": 50.0}
+
+
+def bench_collisions(plan: dict) -> None:
+    all_probes = list(probes(plan))
+    tables = plan.get("tables") or []
+
+    t0 = time.perf_counter()
+    linear = [_table_collides(plan, p, existing_tables=tables) for p in all_probes]
+    t_linear = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    index = PlanIndex(plan)
+    t_build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    indexed = [_table_collides(plan, p, existing_tables=tables, index=index) for p in all_probes]
+    t_indexed = time.perf_counter() - t0
+
+    assert linear == indexed, "Résultats différents entre scan linéaire et index"
+    print(f"  {len(all_probes)} sondes, {len(tables)} tables, {sum(linear)} collisions")
+    print(f"  linéaire : {t_linear * 1000:8.1f} ms")
+    print(f"  indexé   : {t_indexed * 1000:8.1f} ms (+ construction {t_build * 1000:.1f} ms) -> x{t_linear / max(t_indexed, 1e-9):.1f}")
+
+
+def bench_find_spot(plan: dict) -> None:
+    # Chaque appel sans index reconstruit l'index: on compare avec un index partagé
+    p1, p2 = copy.deepcopy(plan), copy.deepcopy(plan)
+    t0 = time.perf_counter()
+    a = [_find_spot_for_table(p1, "round", r=50), _find_spot_for_table(p1, "rect", w=240, h=60, require_rect_zone=True, prefer_right=True, prefer_center_y=True)]
+    t_fresh = time.perf_counter() - t0
+    idx = PlanIndex(p2)
+    t0 = time.perf_counter()
+    b = [_find_spot_for_table(p2, "round", r=50, index=idx), _find_spot_for_table(p2, "rect", w=240, h=60, require_rect_zone=True, prefer_right=True, prefer_center_y=True, index=idx)]
+    t_shared = time.perf_counter() - t0
+    assert a == b, (a, b)
+    print(f"  _find_spot_for_table x2 : {t_fresh * 1000:.1f} ms (index construit) / {t_shared * 1000:.1f} ms (index partagé)")
+
+
+def bench_raster(plan: dict) -> None:
+    # Scans longues (emplacements introuvables ou lointains): raster numpy vs index seul
+    queries = [
+        ("round", dict(r=50)),
+        ("sofa", dict(w=400, h=200)),
+        ("rect", dict(w=600, h=60, require_rect_zone=True, prefer_right=True, prefer_center_y=True)),
+        ("rect", dict(w=120, h=900, prefer_vertical=True, prefer_right=True)),
+    ]
+    results = {}
+    for use_raster in (False, True):
+        if use_raster and not RASTER_ENABLED:
+            print("  raster: numpy indisponible (ou FLOORPLAN_RASTER=0), ignoré")
+            return
+        t0 = time.perf_counter()
+        idx = PlanIndex(plan, raster=use_raster)
+        for _ in range(10):
+            results[use_raster] = [_find_spot_for_table(plan, shape, index=idx, **kw) for shape, kw in queries]
+        dt = time.perf_counter() - t0
+        print(f"  {'raster' if use_raster else 'index '} : {dt * 1000:8.1f} ms (10 x {len(queries)} recherches)")
+    assert results[False] == results[True], results
+
+
+def bench_auto_assign(plan: dict, n_res: int) -> None:
+    rnd = random.Random(7)
+    reservations = [
+        SimpleNamespace(id=f"res{i}", client_name=f"Client {i}", pax=rnd.choice([2, 2, 3, 4, 4, 5, 6, 8, 10, 12]), arrival_time=dtime(19, 0))
+        for i in range(n_res)
+    ]
+    p = copy.deepcopy(plan)
+    t0 = time.perf_counter()
+    result = _auto_assign(p, reservations)
+    dt = time.perf_counter() - t0
+    assigned = len({v.get("res_id") for v in result["tables"].values()})
+    print(f"  _auto_assign: {n_res} réservations, {assigned} placées, {dt * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    plan = build_plan(n)
+    print(f"=== Collisions (plan {plan['room']['width']}x{plan['room']['height']}) ===")
+    bench_collisions(plan)
+    print("=== Recherche d'emplacement ===")
+    bench_find_spot(plan)
+    print("=== Raster d'occupation ===")
+    bench_raster(plan)
+    print("=== Auto-assign ===")
+    bench_auto_assign(plan, n_res=max(10, n // 2))
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Mise à jour du plan de salle: PUT du document complet contre PATCH delta (move_table)
+Base SQLite temporaire, plan de base et instance de N tables; simule un déplacement de table
+depuis l'éditeur et compare la taille de la requête et de la réponse, et la latence des deux
+chemins (TestClient, sans réseau). Vérifie que les deux chemins donnent le même plan.
+Usage: python bench/bench_floorplan_patch.py [nb_tables] [itérations]
+"""
+import sys
+import os
+import json
+import time
+import tempfile
+import warnings
+warnings.filterwarnings("ignore")
+BENCH_DB = os.path.join(tempfile.gettempdir(), "bench_floorplan_patch.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{BENCH_DB}")
+os.environ.setdefault("PDF_DIR", os.path.join(tempfile.gettempdir(), "bench_floorplan_patch_pdfs"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+
+def make_client():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from backend.routers import floorplan
+    app = FastAPI()
+    app.include_router(floorplan.router)
+    return TestClient(app)
+
+
+def plan(n: int) -> dict:
+    tables = []
+    for k in range(n):
+        kind = ("rect", "round", "fixed")[k % 3]
+        t = {"id": f"t{k}", "kind": kind, "x": 40 + 70 * (k % 12), "y": 40 + 70 * (k // 12), "capacity": 4}
+        if kind == "round":
+            t["r"] = 25
+        else:
+            t.update(w=50, h=50)
+        tables.append(t)
+    return {
+        "room": {"width": 1200, "height": 900, "grid": 10},
+        "walls": [{"x": 0, "y": 0, "w": 1200, "h": 10}],
+        "tables": tables,
+    }
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    iters = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(BENCH_DB + suffix)
+        except OSError:
+            pass
+    from backend.database import init_db
+    init_db()
+    c = make_client()
+    data = plan(n)
+    c.put("/api/floorplan/base", json={"data": data})
+    inst = c.post("/api/floorplan/instances", json={"service_date": "2026-12-19", "service_label": "dinner"}).json()
+    inst_url = f"/api/floorplan/instances/{inst['id']}"
+
+    print(f"{n} tables, {iters} déplacements par chemin")
+    print(f"{'chemin':<16} {'requête':>10} {'réponse':>10} {'moyenne':>10} {'p95':>9}")
+    results = {}
+    for label, url in (("base", "/api/floorplan/base"), ("instance", inst_url)):
+        for mode in ("PUT", "PATCH"):
+            doc = c.get(url).json()
+            lat, req_bytes, resp_bytes = [], 0, 0
+            for i in range(iters):
+                tid, x, y = f"t{i % n}", 40 + i % 500, 60 + i % 300
+                if mode == "PUT":
+                    for t in doc["data"]["tables"]:
+                        if t["id"] == tid:
+                            t["x"], t["y"] = x, y
+                    body = json.dumps({"data": doc["data"]})
+                    t0 = time.perf_counter()
+                    r = c.put(url, content=body, headers={"content-type": "application/json"})
+                else:
+                    body = json.dumps({"version": doc["version"], "ops": [{"op": "move_table", "id": tid, "x": x, "y": y}]})
+                    t0 = time.perf_counter()
+                    r = c.patch(url, content=body, headers={"content-type": "application/json"})
+                lat.append(time.perf_counter() - t0)
+                assert r.status_code == 200, r.text
+                doc["version"] = r.json()["version"]
+                req_bytes += len(body)
+                resp_bytes += len(r.content)
+            lat.sort()
+            results[(label, mode)] = c.get(url).json()["data"]["tables"]
+            print(f"{label + ' ' + mode:<16} {req_bytes / iters:>8.0f} o {resp_bytes / iters:>8.0f} o "
+                  f"{sum(lat) / iters * 1000:>7.2f} ms {lat[int(0.95 * (iters - 1))] * 1000:>6.2f} ms")
+    same = all(
+        [{k: t[k] for k in ("id", "x", "y")} for t in results[(label, "PUT")]]
+        == [{k: t[k] for k in ("id", "x", "y")} for t in results[(label, "PATCH")]]
+        for label in ("base", "instance")
+    )
+    print("plans identiques:", "oui" if same else "NON")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Comparaison des extracteurs de l'import PDF du plan de salle
+Extracteur par tables (page.extract_tables, référence) contre extracteur rapide par coordonnées
+des mots (page.extract_words + colonnes apprises sur l'en-tête), sur les exports Zenchef de test
+(ceux de test_pdf_parser.py / test_pdf_plumber.py). Affiche le temps par fichier, les pages
+passées par le chemin rapide ou retombées sur extract_tables, et la concordance des lignes.
+Usage: python bench/bench_import_extract.py [itérations] [fichier.pdf ...]
+"""
+import sys
+import os
+import time
+import warnings
+warnings.filterwarnings("ignore")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from datetime import date
+import pdfplumber
+from backend.floorplan_import import default_arrival, extract_page
+
+SERVICE_DATE = date(2026, 12, 19)
+FIXTURES = ("samedi.pdf", "77c7e340-62f8-4a95-aa5f-3af26d52b7e1.pdf")
+
+
+def run(path: str, fast: bool):
+    rows, used = [], []
+    layout = None
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages:
+            try:
+                page_rows, layout, was_fast = extract_page(page, layout, SERVICE_DATE, default_arrival(None), fast)
+            finally:
+                page.close()
+            rows.extend(page_rows)
+            used.append(was_fast)
+    return rows, used
+
+
+def timed(path: str, fast: bool, n: int):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        rows, used = run(path, fast)
+    return rows, used, (time.perf_counter() - t0) / n
+
+
+if __name__ == "__main__":
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    files = sys.argv[2:] or [os.path.join(root, f) for f in FIXTURES]
+    print(f"{n} itérations par fichier")
+    for path in files:
+        if not os.path.exists(path):
+            print(f"  {os.path.basename(path)}: absent, ignoré")
+            continue
+        ref, _, t_tables = timed(path, False, n)
+        rows, used, t_fast = timed(path, True, n)
+        ref_ids = {r["id"] for r in ref}
+        ids = {r["id"] for r in rows}
+        found = len(ref_ids & ids)
+        print(f"  {os.path.basename(path)[:24]:<24} tables {t_tables * 1000:7.0f} ms   "
+              f"mots {t_fast * 1000:7.0f} ms   x{t_tables / t_fast:4.2f}")
+        print(f"  {'':<24} pages rapides {sum(used)}/{len(used)}   lignes {len(rows)}/{len(ref)}   "
+              f"retrouvées {found}/{len(ref_ids)}   en trop {len(ids - ref_ids)}   "
+              f"identiques (ordre compris): {'oui' if rows == ref else 'NON'}")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'import PDF du plan de salle (export Zenchef -> réservations)
+Compare l'ancien chemin (upload entier en mémoire, toutes les pages extraites puis renvoyées à la
+fin) au chemin en flux (upload copié sur disque, pages traitées une à une et libérées) sur
+samedi.pdf répété N fois: temps jusqu'aux premières lignes, temps total et pic mémoire Python
+(mesuré à part avec tracemalloc).
+Usage: python bench/bench_import_pdf.py [fichier.pdf] [répétitions...]
+"""
+import sys
+import os
+import io
+import time
+import tracemalloc
+import warnings
+warnings.filterwarnings("ignore")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from datetime import date
+import pdfplumber
+from pypdf import PdfReader, PdfWriter
+from backend.floorplan_import import default_arrival, iter_pdf_pages, parse_tables, spool_upload
+
+SERVICE_DATE = date(2026, 12, 19)
+
+
+def replicate(path: str, times: int) -> bytes:
+    src = PdfReader(path)
+    writer = PdfWriter()
+    for _ in range(times):
+        for page in src.pages:
+            writer.add_page(page)
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+def legacy(blob: bytes):
+    """Ancien endpoint: blob entier, pages jamais libérées, résultat à la fin."""
+    out = []
+    with pdfplumber.open(io.BytesIO(blob)) as pdf:
+        for page in pdf.pages:
+            out.extend(parse_tables(page.extract_tables(), SERVICE_DATE, default_arrival(None)))
+    return out, None
+
+
+def streamed(blob: bytes):
+    out, first = [], None
+    path = spool_upload(io.BytesIO(blob))
+    try:
+        for _, _, rows in iter_pdf_pages(path, SERVICE_DATE):
+            if first is None:
+                first = time.perf_counter()
+            out.extend(rows)
+    finally:
+        os.remove(path)
+    return out, first
+
+
+def measure(fn, blob: bytes):
+    t0 = time.perf_counter()
+    rows, first = fn(blob)
+    total = time.perf_counter() - t0
+    first_ms = (first - t0) * 1000 if first else total * 1000
+    # Second run for the memory peak (tracemalloc slows the parser down a lot)
+    tracemalloc.start()
+    fn(blob)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rows, first_ms, total * 1000, peak / (1024 * 1024)
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "..", "samedi.pdf")
+    repeats = [int(x) for x in sys.argv[2:]] or [1, 4]
+    print(f"{'pages':>6} {'mode':<8} {'1re page':>12} {'total':>10} {'pic mém.':>10} {'lignes':>7}")
+    for n in repeats:
+        blob = replicate(src, n)
+        pages = len(PdfReader(io.BytesIO(blob)).pages)
+        ref = None
+        for name, fn in (("ancien", legacy), ("flux", streamed)):
+            rows, first_ms, total_ms, peak_mb = measure(fn, blob)
+            ref = rows if ref is None else ref
+            assert rows == ref, "Résultats différents entre les deux chemins"
+            print(f"{pages:>6} {name:<8} {first_ms:>9.0f} ms {total_ms:>7.0f} ms {peak_mb:>7.1f} Mo {len(rows):>7}")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tables collées: graphe d'adjacence des tables rect contre le parcours de toutes les paires
+Sur des plans de N tables rect (rangées avec quelques tables isolées), compare l'énumération
+O(n²) de toutes les paires disponibles avec la construction du JoinGraph (buckets de grille)
+suivie du parcours de ses arêtes, et la recherche d'un ensemble connexe pour un groupe.
+Vérifie que les deux chemins trouvent les mêmes paires collables.
+Usage: python bench/bench_join_graph.py [itérations] [nb_tables...]
+"""
+import sys
+import os
+import time
+import random
+import warnings
+warnings.filterwarnings("ignore")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from backend.floorplan_geometry import JOIN_GAP, JoinGraph, compile_rect, rects_joinable
+
+
+def plan(n: int, seed: int = 5) -> list:
+    rnd = random.Random(seed)
+    tables = []
+    per_row = 12
+    for k in range(n):
+        x = 40 + 130 * (k % per_row) + (rnd.choice((0, 0, 0, 90)))
+        y = 40 + 110 * (k // per_row)
+        tables.append({"id": f"t{k}", "kind": "rect", "x": x, "y": y, "w": 120, "h": 60, "capacity": 6})
+    return tables
+
+
+def all_pairs(tables: list) -> list:
+    shapes = [(str(t["id"]), compile_rect(t, 120, 60)) for t in tables]
+    out = []
+    for i in range(len(shapes)):
+        for j in range(i + 1, len(shapes)):
+            if rects_joinable(shapes[i][1], shapes[j][1], JOIN_GAP):
+                out.append((shapes[i][0], shapes[j][0]))
+    return out
+
+
+def per_call(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1000
+
+
+def main() -> None:
+    iters = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    sizes = [int(x) for x in sys.argv[2:]] or [40, 200, 800]
+    print(f"{'tables':>7} {'paires':>7} {'O(n²)':>9} {'graphe':>9} {'gain':>7} {'connexe 20p':>12}  identiques")
+    for n in sizes:
+        tables = plan(n)
+        ref = all_pairs(tables)
+        g = JoinGraph(tables)
+        same = list(g.pairs(set(g.adj))) == ref
+        t_all = per_call(lambda: all_pairs(tables), iters)
+        t_graph = per_call(lambda: list(JoinGraph(tables).pairs(set(g.adj))), iters)
+        t_conn = per_call(lambda: g.best_connected(set(g.adj), 20, lambda t: 8), iters)
+        print(f"{n:>7} {len(ref):>7} {t_all:>6.2f} ms {t_graph:>6.2f} ms {t_all / t_graph:>6.1f}x {t_conn:>9.2f} ms  {'oui' if same else 'NON'}")
+
+
+if __name__ == "__main__":
+    main()
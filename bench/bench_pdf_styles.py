@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark des fiches PDF (pdf_service): styles partagés contre styles reconstruits
+Mesure le temps moyen par fiche (both / salle / cuisine / incident / facture) dans deux modes:
+- avant: feuilles de styles (getSampleStyleSheet + styles ajoutés) et TableStyle recréés à chaque
+  rendu, comme avant le partage (fonctions lru_cache appelées sans cache, _TS_* reconstruits);
+- après: styles partagés du module.
+Vérifie que le texte extrait de chaque fiche est identique dans les deux modes.
+Usage: python bench/bench_pdf_styles.py [iterations] [passes]
+"""
+import sys
+import os
+import time
+import hashlib
+import tempfile
+from contextlib import contextmanager
+os.environ.setdefault("PDF_DIR", os.path.join(tempfile.gettempdir(), "bench_pdf_styles"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from datetime import date, time as dtime
+from pypdf import PdfReader
+from reportlab.platypus import TableStyle
+from backend.models import Reservation, ReservationItem, BillingInfo, IncidentReport
+from backend import pdf_service
+
+TABLE_STYLES = [name for name in dir(pdf_service) if name.startswith("_TS_")]
+
+
+def build_fiche():
+    r = Reservation(
+        client_name="Client Bench", pax=24, service_date=date(2026, 12, 18), arrival_time=dtime(19, 30),
+        drink_formula="Forfait vin", notes="*VIP* table au calme\n- gâteau\n- bougies",
+        allergens="gl,la", on_invoice=True,
+    )
+    items = [
+        ReservationItem(type=t, name=f"{t.capitalize()} {j}", quantity=4 + j, reservation_id=r.id,
+                        comment="sans sel" if j == 1 else None)
+        for t in ("entrée", "plat", "dessert") for j in range(3)
+    ]
+    billing = BillingInfo(reservation_id=r.id, company_name="ACME", address_line1="1 rue du Port",
+                          zip_code="1000", city="Bruxelles", country="BE", vat_number="BE0123456789")
+    incident = IncidentReport(date=r.service_date, heure=dtime(21, 0), client=r.client_name,
+                              description_incident="Verre renversé", mesures_prises="Nettoyage")
+    return r, items, billing, incident
+
+
+@contextmanager
+def rebuilt_styles():
+    """Mode « avant »: styles construits à chaque appel au lieu d'être partagés."""
+    saved = {name: getattr(pdf_service, name) for name in ("_fiche_styles", "_invoice_styles", "_drink_table_style")}
+    for name, fn in saved.items():
+        setattr(pdf_service, name, fn.__wrapped__)
+    try:
+        yield
+    finally:
+        for name, fn in saved.items():
+            setattr(pdf_service, name, fn)
+
+
+def rebuild_table_styles() -> None:
+    for name in TABLE_STYLES:
+        setattr(pdf_service, name, TableStyle(getattr(pdf_service, name).getCommands()))
+
+
+def timed(fn, n: int) -> float:
+    fn()  # échauffement (polices, icônes, imports)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n
+
+
+def text_sig(path: str) -> str:
+    txt = "\f".join(p.extract_text() for p in PdfReader(path).pages)
+    return hashlib.sha256(txt.encode("utf-8")).hexdigest()[:12]
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    r, items, billing, incident = build_fiche()
+    cases = {
+        "both": lambda: pdf_service.generate_reservation_pdf_both(r, items, billing),
+        "salle": lambda: pdf_service.generate_reservation_pdf_salle(r, items, billing),
+        "cuisine": lambda: pdf_service.generate_reservation_pdf_cuisine(r, items),
+        "incident": lambda: pdf_service.generate_incident_report_pdf(incident),
+        "facture": lambda: pdf_service.generate_invoice_pdf(r, items, billing, []),
+    }
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    shared_ts = {name: getattr(pdf_service, name) for name in TABLE_STYLES}
+    print(f"{n} itérations par fiche, meilleur de {rounds} passes alternées")
+    print(f"  {'fiche':<9} {'avant':>10} {'après':>10} {'gain':>7}  texte identique")
+    for name, fn in cases.items():
+        def before():
+            rebuild_table_styles()
+            return fn()
+        t_before = t_after = float("inf")
+        for _ in range(rounds):
+            with rebuilt_styles():
+                t_before = min(t_before, timed(before, n))
+                sig_before = text_sig(before())
+            for ts_name, ts in shared_ts.items():
+                setattr(pdf_service, ts_name, ts)
+            t_after = min(t_after, timed(fn, n))
+        same = text_sig(fn()) == sig_before
+        print(f"  {name:<9} {t_before * 1000:7.2f} ms {t_after * 1000:7.2f} ms {(t_before - t_after) / t_before * 100:6.1f}%  {'oui' if same else 'NON'}")
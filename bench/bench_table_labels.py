@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Cache des numéros de tables (id -> libellé) du plan de salle
+1) Calcul seul: _assign_table_numbers (partition + tris) contre _table_labels (clé du cache +
+   lecture) sur des plans de N tables, avec vérification que les libellés sont identiques.
+2) Endpoints: /instances/{id}/compare et /instances/{id}/export-pdf sur une instance de N tables
+   (base SQLite temporaire, TestClient), cache désactivé puis activé.
+Usage: python bench/bench_table_labels.py [itérations] [nb_tables...]
+"""
+import sys
+import os
+import time
+import random
+import tempfile
+import warnings
+warnings.filterwarnings("ignore")
+BENCH_DB = os.path.join(tempfile.gettempdir(), "bench_table_labels.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{BENCH_DB}")
+os.environ.setdefault("PDF_DIR", os.path.join(tempfile.gettempdir(), "bench_table_labels_pdfs"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+import logging
+logging.disable(logging.INFO)
+
+KINDS = ("rect", "rect", "round", "fixed", "sofa", "standing")
+
+
+def plan(n: int, seed: int = 7) -> dict:
+    rnd = random.Random(seed)
+    tables = []
+    for k in range(n):
+        kind = KINDS[k % len(KINDS)]
+        t = {"id": f"t{k}", "kind": kind, "x": round(rnd.uniform(20, 1800), 1), "y": round(rnd.uniform(20, 1200), 1), "capacity": 4}
+        if kind == "round":
+            t["r"] = 25
+        else:
+            t.update(w=50, h=50)
+        tables.append(t)
+    return {"room": {"width": 2000, "height": 1400, "grid": 10}, "tables": tables}
+
+
+def per_call(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1000
+
+
+def seed_instance(data: dict, n_res: int) -> str:
+    from backend.database import session_context
+    from backend.models import FloorPlanInstance
+    from backend.routers.floorplan import _get_or_create_base
+    from datetime import date
+    tables = data["tables"]
+    items = [{"id": f"r{i}", "client_name": f"Client {i}", "pax": 2 + i % 6, "arrival_time": "19:30"} for i in range(n_res)]
+    assignments = {"tables": {tables[i]["id"]: {"res_id": f"r{i}", "name": f"Client {i}", "pax": 2 + i % 6} for i in range(min(n_res, len(tables)))}}
+    with session_context() as s:
+        base = _get_or_create_base(s)
+        row = FloorPlanInstance(service_date=date(2026, 12, 19), service_label=f"dinner-{len(tables)}", template_id=base.id, data=data,
+                                assignments=assignments, reservations={"items": items})
+        s.add(row)
+        s.commit()
+        return str(row.id)
+
+
+def main() -> None:
+    iters = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    sizes = [int(x) for x in sys.argv[2:]] or [50, 200, 1000]
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(BENCH_DB + suffix)
+        except OSError:
+            pass
+    from backend.database import init_db
+    from backend.routers import floorplan
+    init_db()
+
+    print("1) calcul des libellés (ms par appel)")
+    print(f"{'tables':>7} {'recalcul':>10} {'cache':>10} {'gain':>7}  identiques")
+    for n in sizes:
+        data = plan(n)
+        ref = floorplan._assign_table_numbers(dict(data), persist=False)[1]
+        floorplan._label_cache.clear()
+        same = floorplan._table_labels(data) == ref
+        t_raw = per_call(lambda: floorplan._assign_table_numbers(dict(data), persist=False), iters * 20)
+        t_hit = per_call(lambda: floorplan._table_labels(data), iters * 20)
+        print(f"{n:>7} {t_raw:>10.3f} {t_hit:>10.3f} {t_raw / t_hit:>6.1f}x  {'oui' if same else 'NON'}")
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    app = FastAPI()
+    app.include_router(floorplan.router)
+    client = TestClient(app)
+    print("2) endpoints (ms par requête)")
+    print(f"{'tables':>7} {'endpoint':<12} {'sans cache':>11} {'avec cache':>11}")
+    size_default = floorplan.LABEL_CACHE_SIZE
+    for n in sizes:
+        inst = seed_instance(plan(n), n_res=min(n, 120))
+        for name, path, k in (("compare", f"/api/floorplan/instances/{inst}/compare", iters),
+                              ("export-pdf", f"/api/floorplan/instances/{inst}/export-pdf", max(3, iters // 10))):
+            times = {}
+            bodies = {}
+            for label, size in (("off", 0), ("on", size_default)):
+                floorplan.LABEL_CACHE_SIZE = size
+                floorplan._label_cache.clear()
+                bodies[label] = client.get(path).content  # warm-up (and cache fill when on)
+                times[label] = per_call(lambda: client.get(path), k)
+            floorplan.LABEL_CACHE_SIZE = size_default
+            flag = "" if name != "compare" or bodies["off"] == bodies["on"] else "  réponses différentes!"
+            print(f"{n:>7} {name:<12} {times['off']:>11.2f} {times['on']:>11.2f}{flag}")
+
+
+if __name__ == "__main__":
+    main()
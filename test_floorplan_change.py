@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests de la réaffectation incrémentale (POST /api/floorplan/instances/{id}/reservations/change)
+- add: le groupe est placé sur une table libre, les affectations des autres groupes ne bougent pas
+- resize sur place: même table, entrée reconstruite (pas de drapeau last_resort périmé)
+- resize avec déplacement: un groupe en dernier recours (ronde) quitte sa table quand une table
+  ordinaire se libère, le drapeau est recalculé
+- remove: tables libérées, une table dynamique quitte le plan
+Base SQLite temporaire (engine dédié, injecté via dependency_overrides): data.db n'est pas touché.
+Usage: pytest test_floorplan_change.py
+"""
+import sys
+import os
+import copy
+import tempfile
+os.environ.setdefault("PDF_DIR", os.path.join(tempfile.gettempdir(), "test_floorplan_change_pdfs"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+# t1 t2: rect de 6 (collables), f1: table fixe de 4, o1: ronde de 8; une ronde dynamique au plus
+PLAN = {
+    "room": {"width": 1600, "height": 1000, "grid": 50},
+    "tables": [
+        {"id": "t1", "kind": "rect", "x": 100, "y": 100, "w": 120, "h": 60, "capacity": 6},
+        {"id": "t2", "kind": "rect", "x": 230, "y": 100, "w": 120, "h": 60, "capacity": 6},
+        {"id": "f1", "kind": "fixed", "x": 100, "y": 400, "w": 60, "h": 60, "capacity": 4},
+        {"id": "o1", "kind": "round", "x": 800, "y": 400, "r": 50, "capacity": 8},
+    ],
+    "max_dynamic_tables": {"rect": 0, "round": 1},
+}
+
+
+def _client():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session, SQLModel, create_engine
+    from backend import models  # noqa: F401  (enregistre les tables)
+    from backend.database import get_session
+    from backend.routers import floorplan
+    db_path = os.path.join(tempfile.mkdtemp(prefix="test_floorplan_change_"), "test.db")
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+
+    def session_override():
+        with Session(engine) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(floorplan.router)
+    app.dependency_overrides[get_session] = session_override
+    floorplan._invalidate_base_cache()
+    return TestClient(app)
+
+
+def _others(tables, res_id):
+    return {tid: a for tid, a in tables.items() if a["res_id"] != res_id}
+
+
+def _tables_of(tables, res_id):
+    return sorted(tid for tid, a in tables.items() if a["res_id"] == res_id)
+
+
+def test_change_add_resize_remove():
+    c = _client()
+    assert c.put("/api/floorplan/base", json={"data": PLAN}).status_code == 200
+    inst = c.post("/api/floorplan/instances", json={"service_date": "2026-12-19", "service_label": "dinner"}).json()
+    url = f"/api/floorplan/instances/{inst['id']}/reservations/change"
+    state = {"tables": {}, "plan": [t["id"] for t in PLAN["tables"]]}
+
+    def change(op, res_id, **kw):
+        before = copy.deepcopy(state["tables"])
+        r = c.post(url, json={"op": op, "reservation_id": res_id, **kw})
+        assert r.status_code == 200, r.text
+        body = r.json()
+        tables = body["instance"]["assignments"]["tables"]
+        # Les autres groupes gardent exactement leurs entrées
+        assert _others(tables, res_id) == _others(before, res_id), (op, res_id)
+        state["tables"] = tables
+        state["plan"] = [t["id"] for t in body["instance"]["data"]["tables"]]
+        return body["diff"], tables
+
+    # add
+    for name, pax in (("A", 4), ("B", 6), ("C", 6), ("D", 8), ("E", 9)):
+        diff, tables = change("add", name, client_name=name, pax=pax, arrival_time="19:00")
+        assert not diff["unplaced"] and not diff["removed"] and not diff["changed"], name
+    assert _tables_of(tables, "A") == ["f1"]
+    assert tables["o1"] == {"res_id": "D", "name": "D", "pax": 8, "last_resort": True}
+    (dyn,) = _tables_of(tables, "E")
+    assert dyn in diff["tables_added"] and dyn in state["plan"]
+
+    # resize sur place: même table, seule son entrée change
+    held = _tables_of(tables, "B")
+    diff, tables = change("resize", "B", pax=5)
+    assert _tables_of(tables, "B") == held
+    assert diff["changed"] == {held[0]: {"res_id": "B", "name": "B", "pax": 5}}
+    assert not diff["added"] and not diff["removed"]
+
+    # remove: f1 libérée
+    diff, tables = change("remove", "A")
+    assert diff["removed"] == ["f1"] and "f1" not in tables and not diff["tables_removed"]
+
+    # resize avec déplacement: D (ronde, dernier recours) passe à 1 pax -> table fixe libre, sans drapeau
+    diff, tables = change("resize", "D", pax=1)
+    assert tables["f1"] == {"res_id": "D", "name": "D", "pax": 1}
+    assert "o1" not in tables and diff["removed"] == ["o1"]
+    assert not any(a.get("last_resort") for tid, a in tables.items() if a["res_id"] == "D")
+
+    # remove d'un groupe sur table dynamique: la table quitte le plan
+    diff, tables = change("remove", "E")
+    assert diff["removed"] == [dyn] and diff["tables_removed"] == [dyn]
+    assert dyn not in state["plan"] and not _tables_of(tables, "E")
+    assert state["plan"] == [t["id"] for t in PLAN["tables"]]
+
+
+def test_resize_drops_stale_last_resort():
+    from backend.routers.floorplan import _resize_in_place
+    plan = copy.deepcopy(PLAN)
+    # Seul o1 est occupé: un groupe en dernier recours n'est pas redimensionné sur place
+    tables = {"o1": {"res_id": "r1", "name": "R1", "pax": 8, "last_resort": True}}
+    assert not _resize_in_place(plan, tables, "r1", 1)
+    assert tables["o1"]["pax"] == 8
+    # Tables collées: entrées reconstruites, la table vidée est libérée
+    tables = {
+        "t1": {"res_id": "r2", "name": "R2", "pax": 6, "extra": 1},
+        "t2": {"res_id": "r2", "name": "R2", "pax": 6, "extra": 1},
+    }
+    assert _resize_in_place(plan, tables, "r2", 7)
+    assert tables == {"t1": {"res_id": "r2", "name": "R2", "pax": 7}}
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test de l'import PDF du plan de salle: extracteur rapide (coordonnées des mots) contre extract_tables
+Sur les exports Zenchef de test (samedi.pdf, 77c7e340-...pdf): mêmes lignes, dans le même ordre,
+et chaque page passe par le chemin rapide (sinon le repli extract_tables masquerait une régression).
+Page de suite dont les colonnes ont bougé: le chemin rapide renonce et extract_tables lit la page.
+Usage: pytest test_floorplan_import.py
+"""
+import sys
+import os
+import warnings
+warnings.filterwarnings("ignore")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from datetime import date
+import pdfplumber
+from backend.floorplan_import import _lines, default_arrival, extract_page, rows_from_words
+
+SERVICE_DATE = date(2026, 12, 19)
+FIXTURES = ("samedi.pdf", "77c7e340-62f8-4a95-aa5f-3af26d52b7e1.pdf")
+
+
+def _extract(path: str, fast: bool):
+    rows, used = [], []
+    layout = None
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages:
+            try:
+                page_rows, layout, was_fast = extract_page(page, layout, SERVICE_DATE, default_arrival(None), fast)
+            finally:
+                page.close()
+            rows.extend(page_rows)
+            used.append(was_fast)
+    return rows, used
+
+
+def test_word_extractor_matches_extract_tables():
+    root = os.path.dirname(os.path.abspath(__file__))
+    for name in FIXTURES:
+        path = os.path.join(root, name)
+        ref, used_ref = _extract(path, False)
+        rows, used = _extract(path, True)
+        assert ref, name
+        assert not any(used_ref)
+        assert all(used), f"{name}: pages retombées sur extract_tables {used}"
+        assert rows == ref, name
+
+
+def test_shifted_columns_fall_back_to_extract_tables():
+    root = os.path.dirname(os.path.abspath(__file__))
+    for name in FIXTURES:
+        with pdfplumber.open(os.path.join(root, name)) as pdf:
+            _, layout, _ = extract_page(pdf.pages[0], None, SERVICE_DATE, default_arrival(None))
+            page = pdf.pages[1]
+            ref, _, _ = extract_page(page, None, SERVICE_DATE, default_arrival(None), fast=False)
+            assert ref, name
+            for shift in (40, 60, -30):
+                # Colonnes apprises en page 1 décalées: plus aucune ancre Heure/Pax sur la page 2
+                moved = layout._replace(borders=tuple(b + shift for b in layout.borders))
+                lines = _lines(page.extract_words())
+                assert rows_from_words(lines, moved, None, SERVICE_DATE, default_arrival(None)) is None, (name, shift)
+                rows, _, was_fast = extract_page(page, moved, SERVICE_DATE, default_arrival(None))
+                assert not was_fast and rows == ref, (name, shift)
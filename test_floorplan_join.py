@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests du graphe des tables collables (floorplan_geometry.JoinGraph)
+- plan fixe: voisines côte à côte / l'une sous l'autre, trop loin, décalées (recouvrement < 50%)
+- plans aléatoires: les arêtes trouvées par seaux de grille == test de toutes les paires (rects_joinable)
+- pairs() et best_connected(): ordre du plan, ensemble connexe, le moins de tables puis le moins de places vides
+- auto-assign: sans join_tables, affectations identiques à l'avant-graphe; le solveur optimal
+  ne répartit jamais un groupe sur des tables non voisines
+Usage: pytest test_floorplan_join.py
+"""
+import sys
+import os
+import json
+import random
+import hashlib
+import itertools
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from backend.floorplan_geometry import JoinGraph, compile_rect, rects_joinable
+
+
+def _t(tid, x, y, w=120, h=60, capacity=4):
+    return {"id": tid, "kind": "rect", "x": x, "y": y, "w": w, "h": h, "capacity": capacity}
+
+
+# A B     (A|B à 40: collables)      D loin à droite
+# C       (C sous A à 30: collable)  E décalée sous B (recouvrement 30/120 < 50%)
+PLAN = [
+    _t("A", 0, 0), _t("B", 160, 0), _t("C", 0, 90),
+    _t("D", 1000, 0), _t("E", 250, 90),
+]
+
+
+def test_fixed_plan_adjacency():
+    g = JoinGraph(PLAN)
+    assert g.adj == {"A": {"B", "C"}, "B": {"A"}, "C": {"A"}, "D": set(), "E": set()}
+    assert g.edge_count() == 2
+    # Un écart plus grand fait apparaître E-C (écart 130 horizontalement) mais pas D
+    wide = JoinGraph(PLAN, gap=140)
+    assert "C" in wide.adj["E"] and not wide.adj["D"]
+
+
+def test_buckets_match_all_pairs():
+    rng = random.Random(5)
+    for case in range(60):
+        tables = [_t(f"t{i}", rng.uniform(0, 1500), rng.uniform(0, 900),
+                     rng.choice([60, 80, 120, 180]), rng.choice([60, 80, 120]))
+                  for i in range(rng.randint(1, 60))]
+        gap = rng.choice([0, 30, 60, 100])
+        g = JoinGraph(tables, gap=gap)
+        shapes = {t["id"]: compile_rect(t, 120, 60) for t in tables}
+        expected = {(a, b) for a, b in itertools.combinations(shapes, 2) if rects_joinable(shapes[a], shapes[b], gap)}
+        found = {(a, b) for a in g.adj for b in g.adj[a] if g.order[a] < g.order[b]}
+        assert found == expected, f"case {case}"
+
+
+def test_pairs_in_plan_order_and_availability():
+    g = JoinGraph(PLAN)
+    assert list(g.pairs({"A", "B", "C", "D", "E"})) == [("A", "B"), ("A", "C")]
+    assert list(g.pairs({"B", "C", "D"})) == []
+    assert list(g.pairs({"A", "C", "inconnue"})) == [("A", "C")]
+
+
+def test_best_connected():
+    seats = {t["id"]: t["capacity"] for t in PLAN}.__getitem__
+    g = JoinGraph(PLAN)
+    avail = {"A", "B", "C", "D", "E"}
+    assert g.best_connected(avail, 4, seats) == ["A"]
+    assert g.best_connected(avail, 8, seats) == ["A", "B"]
+    assert g.best_connected(avail, 12, seats) == ["A", "B", "C"]
+    # B et C ne sont reliées que par A
+    assert g.best_connected({"B", "C", "D", "E"}, 8, seats) is None
+    assert g.best_connected(avail, 13, seats) is None
+    # Rangée de 6 tables: au plus max_tables tables
+    row = [_t(f"r{i}", i * 130, 0) for i in range(6)]
+    gr = JoinGraph(row)
+    ids = {t["id"] for t in row}
+    assert gr.best_connected(ids, 20, lambda t: 4) == ["r0", "r1", "r2", "r3", "r4"]
+    assert gr.best_connected(ids, 24, lambda t: 4) is None
+    assert gr.best_connected(ids, 24, lambda t: 4, max_tables=6) == [f"r{i}" for i in range(6)]
+
+
+# ---- Auto-assign ----
+
+def _bench_case(size: int, load: float, seed: int):
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'bench'))
+    from bench_auto_assign import synthetic_plan, synthetic_reservations
+    plan = synthetic_plan(size, seed=seed)
+    return plan, synthetic_reservations(plan, load, seed=seed)
+
+
+def _assignment_digest(plan, result) -> str:
+    """Empreinte des affectations dans l'ordre du plan (tables dynamiques identifiées par leur position)."""
+    out = []
+    for t in plan.get("tables") or []:
+        key = t["id"] if not t.get("dynamic") else "dyn:%s:%s:%s:%s:%s" % (t.get("x"), t.get("y"), t.get("w"), t.get("h"), t.get("r"))
+        a = result["tables"].get(t["id"])
+        if a:
+            out.append([key, a.get("res_id"), a.get("pax")])
+    return hashlib.sha1(json.dumps(out).encode()).hexdigest()[:16]
+
+
+# Empreintes de _auto_assign avant le graphe des tables collées (commit précédant user-025), plans
+# et réservations de bench/bench_auto_assign.py, taille-charge-graine
+BASELINE_GREEDY = {
+    (20, 0.4, 1): "4006ff6b93afe16f", (20, 0.4, 2): "8a72b8e48cd1a729", (20, 0.4, 3): "9f15bf4632864e52",
+    (60, 0.4, 1): "46a5e11991f3a6a9", (60, 0.4, 2): "5b9dfede129eae73", (60, 0.4, 3): "3b6e08ed82ab72f8",
+    (150, 0.4, 1): "bff0488939d372b7", (150, 0.4, 2): "c9dec6dd17f1229b", (150, 0.4, 3): "0cd898f8a8a2ca8a",
+}
+
+
+def test_greedy_unchanged_without_join_tables():
+    from backend.routers.floorplan import _auto_assign
+    for case, expected in BASELINE_GREEDY.items():
+        plan, reservations = _bench_case(*case)
+        assert "join_tables" not in (plan.get("large_table_config") or {})
+        result = _auto_assign(plan, reservations)
+        assert _assignment_digest(plan, result) == expected, case
+
+
+def _split_groups_joinable(plan, result):
+    by_id = {str(t.get("id")): t for t in plan.get("tables") or []}
+    groups = {}
+    for tid, a in result["tables"].items():
+        groups.setdefault(a["res_id"], []).append(tid)
+    g = JoinGraph([t for t in by_id.values() if t.get("kind") == "rect"])
+    for res_id, tids in groups.items():
+        if len(tids) < 2:
+            continue
+        assert all(by_id[t].get("kind") == "rect" for t in tids), (res_id, tids)
+        # Ensemble connexe du graphe
+        seen, todo = {tids[0]}, [tids[0]]
+        while todo:
+            for n in g.adj[todo.pop()] & set(tids):
+                if n not in seen:
+                    seen.add(n)
+                    todo.append(n)
+        assert seen == set(tids), (res_id, tids)
+
+
+def test_optimal_never_pairs_tables_apart():
+    from types import SimpleNamespace
+    from datetime import time as dtime
+    from backend.routers.floorplan import _auto_assign_optimal
+    # 4 rect de 6 de même classe: A-B voisines, C et D isolées -> une seule paire collable
+    plan = {
+        "room": {"width": 2000, "height": 1200, "grid": 50},
+        "tables": [_t("A", 100, 100, capacity=6), _t("B", 230, 100, capacity=6),
+                   _t("C", 100, 600, capacity=6), _t("D", 900, 600, capacity=6)],
+        "max_dynamic_tables": {"rect": 0, "round": 0},
+    }
+    groups = [SimpleNamespace(id=f"g{i}", client_name=f"G{i}", pax=12, arrival_time=dtime(19, i)) for i in range(2)]
+    result = _auto_assign_optimal(plan, groups, 1.0)
+    _split_groups_joinable(plan, result)
+    seated = {a["res_id"] for a in result["tables"].values()}
+    assert len(seated) == 1 and {"A", "B"} <= set(result["tables"])
+    assert not any("non voisines" in a for a in result["alerts"])
+    for case in BASELINE_GREEDY:
+        plan, reservations = _bench_case(*case)
+        _split_groups_joinable(plan, _auto_assign_optimal(plan, reservations, 1.0))
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Tests des mises à jour delta du plan de salle (floorplan_patch + PATCH /base et /instances/{id})
+- apply_patch: échappement des pointeurs (~0, ~1), move dans son propre sous-arbre refusé,
+  opérations par table, un « test » en échec rejette tout le patch (le plan n'est pas modifié)
+- endpoints: version périmée -> 409 avec X-Plan-Version, écritures concurrentes -> StaleDataError
+Base SQLite temporaire (engine dédié, injecté via dependency_overrides): data.db n'est pas touché.
+Usage: pytest test_floorplan_patch.py
+"""
+import sys
+import os
+import copy
+import tempfile
+os.environ.setdefault("PDF_DIR", os.path.join(tempfile.gettempdir(), "test_floorplan_patch_pdfs"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from backend.floorplan_patch import PatchError, apply_patch
+
+
+def _doc():
+    return {
+        "data": {
+            "room": {"width": 1200, "height": 900},
+            "tables": [
+                {"id": "t1", "kind": "rect", "x": 10, "y": 20, "w": 120, "h": 60},
+                {"id": "t2", "kind": "round", "x": 300, "y": 40, "r": 25},
+            ],
+            "meta": {"a/b": 1, "c~d": 2},
+        },
+        "assignments": {"tables": {}},
+    }
+
+
+def _raises(fn, *args) -> str:
+    try:
+        fn(*args)
+    except PatchError as e:
+        return str(e)
+    raise AssertionError("PatchError attendu")
+
+
+# ---- floorplan_patch.apply_patch ----
+
+def test_pointer_escaping():
+    doc = apply_patch(_doc(), [
+        {"op": "replace", "path": "/data/meta/a~1b", "value": 10},
+        {"op": "replace", "path": "/data/meta/c~0d", "value": 20},
+    ], ["data"])
+    assert doc["data"]["meta"] == {"a/b": 10, "c~d": 20}
+    # Sans échappement, "a/b" est lu comme deux segments
+    assert "not found" in _raises(apply_patch, _doc(), [{"op": "replace", "path": "/data/meta/a/b", "value": 1}], ["data"])
+
+
+def test_array_add_remove_and_indexes():
+    doc = apply_patch(_doc(), [
+        {"op": "add", "path": "/data/tables/-", "value": {"id": "t3", "kind": "rect", "x": 0, "y": 0, "w": 50, "h": 50}},
+        {"op": "remove", "path": "/data/tables/0"},
+    ], ["data"])
+    assert [t["id"] for t in doc["data"]["tables"]] == ["t2", "t3"]
+    assert "Invalid array index" in _raises(apply_patch, _doc(), [{"op": "replace", "path": "/data/tables/01/x", "value": 1}], ["data"])
+    assert "out of range" in _raises(apply_patch, _doc(), [{"op": "remove", "path": "/data/tables/2"}], ["data"])
+
+
+def test_move_into_itself_rejected():
+    msg = _raises(apply_patch, _doc(), [{"op": "move", "from": "/data/tables", "path": "/data/tables/0/children"}], ["data"])
+    assert "into itself" in msg
+    # Déplacer vers un frère reste permis
+    doc = apply_patch(_doc(), [{"op": "move", "from": "/data/meta", "path": "/data/info"}], ["data"])
+    assert "meta" not in doc["data"] and doc["data"]["info"] == {"a/b": 1, "c~d": 2}
+
+
+def test_copy_is_deep():
+    doc = apply_patch(_doc(), [
+        {"op": "copy", "from": "/data/tables/0", "path": "/data/tables/-"},
+        {"op": "replace", "path": "/data/tables/2/x", "value": 999},
+    ], ["data"])
+    assert doc["data"]["tables"][0]["x"] == 10 and doc["data"]["tables"][2]["x"] == 999
+
+
+def test_table_ops():
+    doc = apply_patch(_doc(), [
+        {"op": "move_table", "id": "t1", "x": 100, "y": 200},
+        {"op": "resize_table", "id": "t2", "r": 40},
+        {"op": "relabel_table", "id": "t1", "label": "12"},
+    ], ["data"])
+    t1, t2 = doc["data"]["tables"]
+    assert (t1["x"], t1["y"], t1["label"], t2["r"]) == (100, 200, "12", 40)
+    assert "Table not found" in _raises(apply_patch, _doc(), [{"op": "move_table", "id": "nope", "x": 1}], ["data"])
+    assert "must be > 0" in _raises(apply_patch, _doc(), [{"op": "resize_table", "id": "t1", "w": 0}], ["data"])
+    assert "must be a number" in _raises(apply_patch, _doc(), [{"op": "move_table", "id": "t1", "x": True}], ["data"])
+    assert "not allowed" in _raises(apply_patch, _doc(), [{"op": "move_table", "id": "t1", "x": 1}], ["assignments"])
+
+
+def test_paths_restricted_to_allowed_keys():
+    assert "not allowed" in _raises(apply_patch, _doc(), [{"op": "replace", "path": "/assignments/tables", "value": {}}], ["data"])
+    assert "not allowed" in _raises(apply_patch, _doc(), [{"op": "add", "path": "", "value": {}}], ["data"])
+    assert "unknown op" in _raises(apply_patch, _doc(), [{"op": "frobnicate", "path": "/data/x"}], ["data"])
+
+
+def test_failed_test_op_rejects_whole_patch():
+    original = _doc()
+    work = copy.deepcopy(original)
+    msg = _raises(apply_patch, work, [
+        {"op": "replace", "path": "/data/tables/0/x", "value": 555},
+        {"op": "test", "path": "/data/tables/1/r", "value": 99},
+    ], ["data"])
+    assert "test failed" in msg
+    assert original["data"]["tables"][0]["x"] == 10  # l'appelant travaille sur une copie
+
+
+# ---- Endpoints (version, 409, rollback) ----
+
+def _client():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session, SQLModel, create_engine
+    from backend import models  # noqa: F401  (enregistre les tables)
+    from backend.database import get_session
+    from backend.routers import floorplan
+    db_path = os.path.join(tempfile.mkdtemp(prefix="test_floorplan_patch_"), "test.db")
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+
+    def session_override():
+        with Session(engine) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(floorplan.router)
+    app.dependency_overrides[get_session] = session_override
+    floorplan._invalidate_base_cache()
+    return TestClient(app), engine
+
+
+def test_patch_base_versions_and_409():
+    c, _ = _client()
+    data = _doc()["data"]
+    r = c.put("/api/floorplan/base", json={"data": data})
+    assert r.status_code == 200, r.text
+    v = r.json()["version"]
+    r = c.patch("/api/floorplan/base", json={"version": v, "ops": [{"op": "move_table", "id": "t1", "x": 50, "y": 60}]})
+    assert r.status_code == 200, r.text
+    assert r.json()["version"] == v + 1
+    assert r.headers["etag"]
+    # Même version une deuxième fois: le plan a changé depuis -> 409, version courante en en-tête
+    r = c.patch("/api/floorplan/base", json={"version": v, "ops": [{"op": "move_table", "id": "t1", "x": 70, "y": 80}]})
+    assert r.status_code == 409, r.text
+    assert r.headers["x-plan-version"] == str(v + 1)
+    t1 = c.get("/api/floorplan/base").json()["data"]["tables"][0]
+    assert (t1["x"], t1["y"]) == (50, 60)
+
+
+def test_patch_instance_rollback_on_error():
+    c, engine = _client()
+    c.put("/api/floorplan/base", json={"data": _doc()["data"]})
+    inst = c.post("/api/floorplan/instances", json={"service_date": "2026-12-19", "service_label": "dinner"}).json()
+    url = f"/api/floorplan/instances/{inst['id']}"
+    v = inst["version"]
+    # Le 2e op échoue: rien n'est écrit, la version ne bouge pas
+    r = c.patch(url, json={"version": v, "ops": [
+        {"op": "move_table", "id": "t1", "x": 500, "y": 500},
+        {"op": "test", "path": "/data/tables/1/kind", "value": "rect"},
+    ]})
+    assert r.status_code == 400, r.text
+    from sqlmodel import Session
+    from backend.models import FloorPlanInstance
+    import uuid
+    with Session(engine) as s:
+        row = s.get(FloorPlanInstance, uuid.UUID(inst["id"]))
+        assert row.version == v
+        assert row.data["tables"][0]["x"] == 10
+    # Le plan validé refuse une table invalide (validation après patch)
+    r = c.patch(url, json={"version": v, "ops": [{"op": "replace", "path": "/data/tables", "value": "oops"}]})
+    assert r.status_code == 400, r.text
+    r = c.patch(url, json={"version": v, "ops": [{"op": "replace", "path": "/assignments/tables", "value": {"t1": {"res_id": "r1", "name": "A", "pax": 4}}}]})
+    assert r.status_code == 200, r.text
+    assert r.json()["version"] == v + 1
+
+
+def test_concurrent_writers_raise_stale_data():
+    from sqlalchemy.orm.exc import StaleDataError
+    from sqlalchemy.orm.attributes import flag_modified
+    from sqlmodel import Session
+    from backend.models import FloorPlanBase
+    c, engine = _client()
+    base_id = c.put("/api/floorplan/base", json={"data": _doc()["data"]}).json()["id"]
+    import uuid
+    with Session(engine) as a, Session(engine) as b:
+        ra, rb = a.get(FloorPlanBase, uuid.UUID(base_id)), b.get(FloorPlanBase, uuid.UUID(base_id))
+        ra.data = {**ra.data, "room": {"width": 1, "height": 1}}
+        a.commit()
+        rb.data["room"] = {"width": 2, "height": 2}
+        flag_modified(rb, "data")
+        try:
+            b.commit()
+        except StaleDataError:
+            pass
+        else:
+            raise AssertionError("StaleDataError attendu pour le second écrivain")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests du solveur d'affectation (floorplan_solver.solve_assignment)
+- petits cas aléatoires comparés à une énumération exhaustive: même coût optimal, solution faisable
+- groupes interchangeables (group_keys): la coupure de symétrie ne perd pas l'optimum
+- budget de temps nul: la meilleure solution trouvée reste faisable, optimal=False
+Usage: pytest test_floorplan_solver.py
+"""
+import sys
+import os
+import random
+import itertools
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from backend.floorplan_solver import Option, solve_assignment
+
+
+def _brute_force(options, unplaced_cost, capacities):
+    best = None
+    for combo in itertools.product(*[list(range(len(opts))) + [None] for opts in options]):
+        used = {}
+        cost = 0
+        for g, i in enumerate(combo):
+            if i is None:
+                cost += unplaced_cost[g]
+                continue
+            cost += options[g][i].cost
+            for key, amount in options[g][i].uses:
+                used[key] = used.get(key, 0) + amount
+        if all(used[k] <= capacities.get(k, 0) for k in used) and (best is None or cost < best):
+            best = cost
+    return best
+
+
+def _check_feasible(res, options, unplaced_cost, capacities):
+    used = {}
+    cost = 0
+    for g, i in enumerate(res.choices):
+        if i is None:
+            cost += unplaced_cost[g]
+            continue
+        cost += options[g][i].cost
+        for key, amount in options[g][i].uses:
+            used[key] = used.get(key, 0) + amount
+    assert all(used[k] <= capacities.get(k, 0) for k in used), (used, capacities)
+    assert cost == res.cost, (cost, res.cost)
+
+
+def _random_case(rng, n_groups, classes):
+    """Options façon auto-assign: une table d'une classe (slot) + éventuellement des chaises en extra."""
+    capacities = {f"class{c}": rng.randint(0, 3) for c in range(classes)}
+    capacities["chairs"] = rng.randint(0, 6)
+    options, unplaced = [], []
+    for _ in range(n_groups):
+        opts = []
+        for c in rng.sample(range(classes), rng.randint(1, classes)):
+            uses = [(f"class{c}", 1)]
+            extra = rng.choice([0, 0, 1, 2])
+            if extra:
+                uses.append(("chairs", extra))
+            opts.append(Option(rng.randint(0, 40), uses, tag=c))
+        opts.sort(key=lambda o: o.cost)
+        options.append(opts)
+        unplaced.append(rng.randint(20, 100))
+    return options, unplaced, capacities
+
+
+def test_matches_brute_force_on_small_cases():
+    rng = random.Random(1234)
+    for case in range(300):
+        options, unplaced, capacities = _random_case(rng, rng.randint(1, 6), rng.randint(1, 3))
+        res = solve_assignment(options, unplaced, capacities, time_budget=5.0)
+        assert res.optimal
+        _check_feasible(res, options, unplaced, capacities)
+        assert res.cost == _brute_force(options, unplaced, capacities), f"case {case}"
+
+
+def test_interchangeable_groups_keep_optimum():
+    rng = random.Random(99)
+    for case in range(100):
+        # Groupes identiques consécutifs (même taille, mêmes options): clé commune
+        kinds = [_random_case(rng, 1, rng.randint(1, 3)) for _ in range(rng.randint(1, 3))]
+        capacities = {}
+        for _, _, caps in kinds:
+            for k, v in caps.items():
+                capacities[k] = max(capacities.get(k, 0), v)
+        options, unplaced, keys = [], [], []
+        for kind, (opts, unp, _) in enumerate(kinds):
+            for _ in range(rng.randint(1, 3)):
+                options.append(opts[0])
+                unplaced.append(unp[0])
+                keys.append(kind)
+        res = solve_assignment(options, unplaced, capacities, time_budget=5.0, group_keys=keys)
+        assert res.optimal
+        _check_feasible(res, options, unplaced, capacities)
+        assert res.cost == _brute_force(options, unplaced, capacities), f"case {case}"
+
+
+def test_empty_and_no_capacity():
+    res = solve_assignment([], [], {})
+    assert res.choices == [] and res.cost == 0 and res.optimal
+    options = [[Option(1, [("class0", 1)])], [Option(2, [("class0", 1)])]]
+    res = solve_assignment(options, [10, 50], {"class0": 0})
+    assert res.choices == [None, None] and res.cost == 60
+    res = solve_assignment(options, [10, 50], {"class0": 1})
+    assert res.choices == [None, 0] and res.cost == 12
+
+
+def test_zero_time_budget_returns_feasible_incumbent():
+    rng = random.Random(7)
+    options, unplaced, capacities = _random_case(rng, 40, 3)
+    res = solve_assignment(options, unplaced, capacities, time_budget=0.0)
+    _check_feasible(res, options, unplaced, capacities)
+    assert res.cost <= sum(unplaced)
+    if not res.optimal:
+        assert res.nodes >= 256
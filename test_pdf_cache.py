@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Tests du cache des fiches PDF (pdf_cache + GET /api/reservations/{id}/pdf)
+- clé stable: mêmes données -> même clé, les horodatages (last_pdf_exported_at, updated_at) n'y entrent pas
+- clé invalidée par un plat, la facturation (sauf variante cuisine) ou une icône d'allergène remplacée
+- endpoint: ETag, 304 sur If-None-Match (l'export est quand même horodaté), réponse depuis le cache
+Base SQLite, cache et assets temporaires: data.db et app/backend/assets ne sont pas touchés.
+Usage: pytest test_pdf_cache.py
+"""
+import sys
+import os
+import shutil
+import tempfile
+import contextlib
+from datetime import date, time, datetime
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from backend import pdf_cache, pdf_service
+from backend.models import BillingInfo, Reservation, ReservationItem
+
+
+@contextlib.contextmanager
+def _temp_assets():
+    """Copie des assets et cache PDF dans un répertoire temporaire le temps du test."""
+    tmp = tempfile.mkdtemp(prefix="test_pdf_cache_")
+    shutil.copytree(pdf_service.ASSETS_DIR, os.path.join(tmp, "assets"),
+                    ignore=shutil.ignore_patterns("*.pdf", "*.txt"))
+    saved = (pdf_service.ASSETS_DIR, pdf_service._ASSETS_MARKER, pdf_service._marker_mtime_ns, pdf_cache.PDF_CACHE_DIR)
+    pdf_service.ASSETS_DIR = os.path.join(tmp, "assets")
+    pdf_service._ASSETS_MARKER = os.path.join(tmp, ".assets_version")
+    pdf_cache.PDF_CACHE_DIR = os.path.join(tmp, "cache")
+    pdf_service.invalidate_assets()
+    try:
+        yield tmp
+    finally:
+        pdf_service.invalidate_assets()
+        pdf_service.ASSETS_DIR, pdf_service._ASSETS_MARKER, pdf_service._marker_mtime_ns, pdf_cache.PDF_CACHE_DIR = saved
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _reservation(**kw):
+    data = dict(client_name="Dupont", pax=6, service_date=date(2026, 12, 19), arrival_time=time(19, 30),
+                drink_formula="Sans alcool", allergens="gluten,lait")
+    data.update(kw)
+    return Reservation(**data)
+
+
+def _billing(res, **kw):
+    data = dict(reservation_id=res.id, company_name="ACME", address_line1="Rue 1", zip_code="1000", city="Bruxelles")
+    data.update(kw)
+    return BillingInfo(**data)
+
+
+def _replace_icon(name: str, source: str) -> None:
+    icons = os.path.join(pdf_service.ASSETS_DIR, "allergens")
+    shutil.copyfile(os.path.join(icons, source), os.path.join(icons, name))
+    st = os.stat(os.path.join(icons, name))
+    os.utime(os.path.join(icons, name), ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    pdf_service.invalidate_assets(os.path.join(icons, name))
+
+
+def test_key_stable_and_ignores_timestamps():
+    with _temp_assets():
+        res = _reservation()
+        items = [ReservationItem(reservation_id=res.id, type="plat", name="Boeuf", quantity=6)]
+        key = pdf_cache.reservation_pdf_key(res, items, None, "both")
+        assert key == pdf_cache.reservation_pdf_key(res, items, None, "both")
+        res.last_pdf_exported_at = datetime(2026, 12, 1)
+        res.updated_at = datetime(2026, 12, 2)
+        assert key == pdf_cache.reservation_pdf_key(res, items, None, "both")
+        assert key != pdf_cache.reservation_pdf_key(res, items, None, "salle")
+
+
+def test_key_changes_with_items_billing_and_icons():
+    with _temp_assets():
+        res = _reservation()
+        items = [ReservationItem(reservation_id=res.id, type="plat", name="Boeuf", quantity=6)]
+        billing = _billing(res)
+        key = pdf_cache.reservation_pdf_key(res, items, billing, "both")
+        items[0].quantity = 5
+        assert pdf_cache.reservation_pdf_key(res, items, billing, "both") != key
+        items[0].quantity = 6
+        key_cuisine = pdf_cache.reservation_pdf_key(res, items, None, "cuisine")
+        billing.city = "Liège"
+        assert pdf_cache.reservation_pdf_key(res, items, billing, "both") != key
+        billing.city = "Bruxelles"
+        assert pdf_cache.reservation_pdf_key(res, items, billing, "both") == key
+        # Icône remplacée (upload): nouvelle clé; une icône non utilisée par la fiche ne change rien
+        _replace_icon("soja.png", "celeri.png")
+        assert pdf_cache.reservation_pdf_key(res, items, billing, "both") == key
+        _replace_icon("gluten.png", "celeri.png")
+        assert pdf_cache.reservation_pdf_key(res, items, billing, "both") != key
+        assert pdf_cache.reservation_pdf_key(res, items, None, "cuisine") != key_cuisine
+
+
+def _client(engine):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session
+    from backend.database import get_session
+    from backend.routers import reservations
+
+    def session_override():
+        with Session(engine) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(reservations.router)
+    app.dependency_overrides[get_session] = session_override
+    return TestClient(app)
+
+
+def test_endpoint_etag_304_and_export_timestamp():
+    from sqlmodel import Session, SQLModel, create_engine
+    with _temp_assets() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'test.db')}", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(engine)
+        res = _reservation()
+        rid = res.id
+        with Session(engine) as s:
+            s.add(res)
+            s.add(ReservationItem(reservation_id=rid, type="plat", name="Boeuf", quantity=6))
+            s.commit()
+        c = _client(engine)
+        url = f"/api/reservations/{rid}/pdf"
+
+        def exported_at():
+            with Session(engine) as s:
+                return s.get(Reservation, rid).last_pdf_exported_at
+
+        r1 = c.get(url)
+        assert r1.status_code == 200 and r1.content.startswith(b"%PDF")
+        etag = r1.headers["etag"]
+        assert exported_at() is not None
+        assert len(os.listdir(pdf_cache.PDF_CACHE_DIR)) == 1
+
+        # L'horodatage d'export ne change pas la clé, et un 304 marque quand même l'export
+        with Session(engine) as s:
+            row = s.get(Reservation, rid)
+            row.last_pdf_exported_at = None
+            s.add(row)
+            s.commit()
+        r2 = c.get(url, headers={"If-None-Match": etag})
+        assert r2.status_code == 304 and r2.headers["etag"] == etag
+        assert exported_at() is not None
+
+        r3 = c.get(url)
+        assert r3.status_code == 200 and r3.headers["etag"] == etag and r3.content == r1.content
+
+        with Session(engine) as s:
+            s.add(ReservationItem(reservation_id=rid, type="dessert", name="Tiramisu", quantity=6))
+            s.commit()
+        r4 = c.get(url, headers={"If-None-Match": etag})
+        assert r4.status_code == 200 and r4.headers["etag"] != etag
+        assert len(os.listdir(pdf_cache.PDF_CACHE_DIR)) == 2
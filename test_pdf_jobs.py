@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests de la file de rendu PDF en arrière-plan (pdf_jobs.JobQueue)
+- dédoublonnage: même rendu demandé deux fois tant qu'il est en file -> même job; une fois fini, nouveau job
+- pool cassé (worker tué): le job repart en file et le pool reconstruit le rend; un job perdu deux fois
+  par un crash du pool finit en erreur
+- gc: jobs terminés, fichiers rendus et uploads expirés supprimés, les récents gardés
+File SQLite, jobs et PDF_DIR temporaires: app/generated_pdfs n'est pas touché.
+Usage: pytest test_pdf_jobs.py
+"""
+import sys
+import os
+import time
+import uuid
+import signal
+import tempfile
+import contextlib
+from datetime import date, datetime, time as dtime
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from backend import pdf_jobs, pdf_service
+from backend.models import IncidentReport
+
+
+@contextlib.contextmanager
+def _queue(workers: int = 1):
+    """JobQueue sur un répertoire temporaire; le dispatcher n'est lancé que par _drain."""
+    tmp = tempfile.mkdtemp(prefix="test_pdf_jobs_")
+    saved = (pdf_jobs.PDF_JOBS_DIR, pdf_jobs.UPLOADS_DIR, pdf_service.PDF_DIR)
+    pdf_jobs.PDF_JOBS_DIR = os.path.join(tmp, "jobs")
+    pdf_jobs.UPLOADS_DIR = os.path.join(tmp, "jobs", "uploads")
+    pdf_service.PDF_DIR = tmp
+    q = pdf_jobs.JobQueue(os.path.join(tmp, "jobs", "jobs.sqlite3"), workers=workers)
+    q.start = lambda: None
+    try:
+        yield q
+    finally:
+        if q._pool is not None:
+            q._pool.shutdown(wait=True, cancel_futures=True)
+        pdf_jobs.PDF_JOBS_DIR, pdf_jobs.UPLOADS_DIR, pdf_service.PDF_DIR = saved
+
+
+def _incident(client: str = "Dupont") -> dict:
+    """Paramètres d'un job "incident"; mêmes paramètres pour un même client (id et dates fixés)."""
+    row = IncidentReport(id=uuid.uuid5(uuid.NAMESPACE_DNS, client), date=date(2026, 12, 19), heure=dtime(20, 30),
+                         client=client, created_at=datetime(2026, 12, 19), updated_at=datetime(2026, 12, 19))
+    return {"incident": row.model_dump()}
+
+
+def _drain(q, job_id: str, timeout: float = 60.0) -> dict:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        q._dispatch()
+        job = q.get(job_id)
+        if job["status"] in ("done", "error"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} toujours {q.get(job_id)['status']}")
+
+
+def test_dedup_while_in_flight():
+    with _queue() as q:
+        a = q.submit("incident", _incident(), "a.pdf")
+        b = q.submit("incident", _incident(), "b.pdf")
+        other = q.submit("incident", _incident("Martin"), "c.pdf")
+        assert not a["deduplicated"] and b["deduplicated"] and b["id"] == a["id"]
+        assert other["id"] != a["id"] and not other["deduplicated"]
+        assert q.metrics()["queue_depth"] == 2
+        job = _drain(q, a["id"])
+        assert job["status"] == "done", job
+        with open(job["path"], "rb") as f:
+            assert f.read(4) == b"%PDF"
+        # Rendu terminé: la même demande relance un nouveau job
+        again = q.submit("incident", _incident(), "a.pdf")
+        assert again["id"] != a["id"] and not again["deduplicated"]
+
+
+def test_broken_pool_requeues_job():
+    with _queue() as q:
+        pool = q._get_pool()
+        assert pool.submit(os.getpid).result(timeout=60)
+        for p in list(pool._processes.values()):
+            os.kill(p.pid, signal.SIGKILL)
+        deadline = time.time() + 30
+        while not pool._broken and time.time() < deadline:
+            time.sleep(0.05)
+        assert pool._broken
+        job = q.submit("incident", _incident(), "a.pdf")
+        # Le pool cassé refuse le job: il repart en file et le pool est oublié
+        q._dispatch()
+        assert q.get(job["id"])["status"] == "queued" and q._pool is None and q._running == 0
+        done = _drain(q, job["id"])
+        assert done["status"] == "done" and q._pool is not None and q._pool is not pool
+
+
+def test_job_lost_twice_by_crashed_pool_errors():
+    with _queue() as q:
+        job_id = q.submit("incident", _incident(), "a.pdf")["id"]
+        for expected in ("queued", "error"):
+            q._db.execute("UPDATE pdf_job SET status = 'running' WHERE id = ?", (job_id,))
+            q._running += 1
+            fut = Future()
+            fut.set_exception(BrokenProcessPool("worker killed"))
+            q._finish(job_id, fut)
+            job = q.get(job_id)
+            assert job["status"] == expected and q._running == 0
+        assert "BrokenProcessPool" in job["error"] and job_id not in q._retried
+
+
+def test_gc_drops_expired_jobs_and_files():
+    with _queue() as q:
+        old = _drain(q, q.submit("incident", _incident(), "a.pdf")["id"])
+        recent = _drain(q, q.submit("incident", _incident("Martin"), "b.pdf")["id"])
+        upload = pdf_jobs.save_upload(b"%PDF-1.4 upload")
+        assert q.gc() == 0 and os.path.exists(old["path"]) and os.path.exists(upload)
+        # Vieillis au-delà du TTL: le job, son PDF et l'upload partent, le job récent reste
+        q._db.execute("UPDATE pdf_job SET finished_at = ? WHERE id = ?", (time.time() - 2 * pdf_jobs.PDF_JOB_TTL_S, old["id"]))
+        past = time.time() - 2 * pdf_jobs.PDF_JOB_TTL_S
+        os.utime(upload, (past, past))
+        assert q.gc() == 1
+        assert q.get(old["id"]) is None and not os.path.exists(old["path"]) and not os.path.exists(upload)
+        assert q.get(recent["id"])["status"] == "done" and os.path.exists(recent["path"])
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests de la pagination par curseur des réservations (X-Next-Cursor)
+- /api/reservations?limit=: suivre les curseurs donne exactement la liste non paginée (ni doublon, ni trou)
+  y compris avec beaucoup d'ex æquo sur (date, heure) départagés par l'id
+- /upcoming et /past: curseur et ancienne pagination ?page= renvoient le même ordre
+- curseur invalide -> 400, curseur sans limit -> 400
+Base SQLite temporaire: get_session est surchargé et l'engine global remplacé le temps du test
+(run_read sans AsyncSession passe par database.engine), data.db n'est pas touché.
+Usage: pytest test_reservations_cursor.py
+"""
+import sys
+import os
+import random
+import tempfile
+import contextlib
+from datetime import date, time, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+
+@contextlib.contextmanager
+def _client(n_rows: int = 0, seed: int = 0):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session, SQLModel, create_engine
+    from backend import database
+    from backend.models import Reservation
+    from backend.routers import reservations
+    db_path = os.path.join(tempfile.mkdtemp(prefix="test_reservations_cursor_"), "test.db")
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+
+    rng = random.Random(seed)
+    today = date.today()
+    with Session(engine) as s:
+        for i in range(n_rows):
+            # Peu de créneaux distincts: nombreux ex æquo sur (service_date, arrival_time)
+            s.add(Reservation(
+                client_name=f"Client {i:03d}",
+                pax=rng.randint(1, 12),
+                service_date=today + timedelta(days=rng.choice([-40, -3, 5, 30])),
+                arrival_time=time(rng.choice([12, 19, 20]), rng.choice([0, 30])),
+                drink_formula="Sans alcool",
+            ))
+        s.commit()
+
+    def session_override():
+        with Session(engine) as session:
+            yield session
+
+    async def async_session_override():
+        yield None
+
+    app = FastAPI()
+    app.include_router(reservations.router)
+    app.dependency_overrides[database.get_session] = session_override
+    app.dependency_overrides[database.get_async_session] = async_session_override
+    previous = database.engine
+    database.engine = engine
+    try:
+        yield TestClient(app)
+    finally:
+        database.engine = previous
+        engine.dispose()
+
+
+def _ids(resp):
+    assert resp.status_code == 200, resp.text
+    return [r["id"] for r in resp.json()]
+
+
+def _walk(c, url: str, limit_param: str, limit: int, **filters):
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {**filters, limit_param: limit}
+        if cursor:
+            params["cursor"] = cursor
+        r = c.get(url, params=params)
+        page = _ids(r)
+        seen.extend(page)
+        pages += 1
+        cursor = r.headers.get("x-next-cursor")
+        if not cursor:
+            assert len(page) < limit
+            return seen, pages
+        assert len(page) == limit
+        assert pages < 1000, "boucle de pagination"
+
+
+def test_cursor_round_trip_matches_full_list():
+    with _client(n_rows=137, seed=1) as c:
+        full = _ids(c.get("/api/reservations"))
+        assert len(full) == 137
+        for limit in (1, 7, 50, 137, 500):
+            seen, pages = _walk(c, "/api/reservations", "limit", limit)
+            assert seen == full, f"limit={limit}"
+            assert len(set(seen)) == len(seen)
+            assert pages == len(full) // limit + 1
+
+
+def test_cursor_with_filters():
+    with _client(n_rows=80, seed=2) as c:
+        d_from = (date.today() - timedelta(days=10)).isoformat()
+        full = _ids(c.get("/api/reservations", params={"date_from": d_from}))
+        seen, _ = _walk(c, "/api/reservations", "limit", 9, date_from=d_from)
+        assert seen == full and 0 < len(full) < 80
+
+
+def test_upcoming_and_past_cursor_matches_offset_pages():
+    with _client(n_rows=90, seed=3) as c:
+        for url in ("/api/reservations/upcoming", "/api/reservations/past"):
+            by_page, page = [], 1
+            while True:
+                chunk = _ids(c.get(url, params={"page": page, "per_page": 8}))
+                by_page.extend(chunk)
+                if len(chunk) < 8:
+                    break
+                page += 1
+            seen, _ = _walk(c, url, "per_page", 8)
+            assert seen == by_page, url
+            assert len(set(seen)) == len(seen)
+        upcoming = _ids(c.get("/api/reservations/upcoming", params={"per_page": 1000}))
+        past = _ids(c.get("/api/reservations/past", params={"per_page": 1000}))
+        assert not set(upcoming) & set(past) and len(upcoming) + len(past) == 90
+
+
+def test_invalid_cursor():
+    with _client(n_rows=3) as c:
+        assert c.get("/api/reservations", params={"limit": 2, "cursor": "pas-un-curseur"}).status_code == 400
+        cursor = c.get("/api/reservations", params={"limit": 2}).headers["x-next-cursor"]
+        assert c.get("/api/reservations", params={"cursor": cursor}).status_code == 400